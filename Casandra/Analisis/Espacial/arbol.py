@@ -0,0 +1,170 @@
+# casandra/analisis/espacial/arbol.py
+"""
+R-tree empaquetado (Sort-Tile-Recursive) en arreglos planos.
+
+- Las entradas se reordenan UNA vez (STR: franjas por x del centro, y dentro
+  de cada franja por y) y se agrupan de a `capacidad`: la hoja j cubre las
+  entradas `[j*M, (j+1)*M)` del orden empaquetado. Cada nivel superior agrupa
+  de a M los nodos consecutivos del anterior. No hay punteros: los hijos del
+  nodo j son `[j*M, (j+1)*M)` del nivel de abajo.
+- Todo el árbol son dos arreglos (`cajas` (nodos, 4) y `niveles`, offsets
+  por nivel), así que se guarda como `.npy` y se reabre con `mmap`.
+- Las cajas de las entradas no se guardan en el árbol: quien consulta tiene
+  sus propios datos (coordenadas de puntos, cajas de polígonos) y filtra los
+  candidatos exactos.
+- Consultas vectorizadas nivel por nivel: una caja (`candidatos`) o muchos
+  puntos a la vez (`pares`), sin recursión en Python.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+CAPACIDAD = 16
+
+Caja = tuple[float, float, float, float]  # (xmin, ymin, xmax, ymax)
+
+
+def orden_str(cx: np.ndarray, cy: np.ndarray, capacidad: int = CAPACIDAD) -> np.ndarray:
+    """Permutación STR de las entradas de centros (cx, cy)."""
+    n = cx.size
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    hojas = -(-n // capacidad)
+    franjas = int(np.ceil(np.sqrt(hojas)))
+    por_x = np.argsort(cx, kind="stable")
+    franja = np.arange(n) // (franjas * capacidad)
+    return por_x[np.lexsort((cy[por_x], franja))]
+
+
+def _agrupar(cajas: np.ndarray, capacidad: int) -> np.ndarray:
+    inicios = np.arange(0, cajas.shape[0], capacidad)
+    return np.column_stack(
+        [
+            np.minimum.reduceat(cajas[:, 0], inicios),
+            np.minimum.reduceat(cajas[:, 1], inicios),
+            np.maximum.reduceat(cajas[:, 2], inicios),
+            np.maximum.reduceat(cajas[:, 3], inicios),
+        ]
+    )
+
+
+def _intersecta(cajas: np.ndarray, caja: Caja) -> np.ndarray:
+    xmin, ymin, xmax, ymax = caja
+    return (
+        (cajas[:, 0] <= xmax)
+        & (cajas[:, 2] >= xmin)
+        & (cajas[:, 1] <= ymax)
+        & (cajas[:, 3] >= ymin)
+    )
+
+
+@dataclass(frozen=True)
+class ArbolR:
+    cajas: np.ndarray  # (nodos, 4) float64; hojas primero, la raíz al final
+    niveles: (
+        np.ndarray
+    )  # cajas[niveles[l]:niveles[l + 1]] = nodos del nivel l (0 = hojas)
+    capacidad: int
+    entradas: int
+
+    @classmethod
+    def empaquetar(
+        cls, cajas: np.ndarray, capacidad: int = CAPACIDAD
+    ) -> tuple["ArbolR", np.ndarray]:
+        """
+        Árbol sobre `cajas` (n, 4). Devuelve (árbol, orden): el árbol indexa
+        las entradas en el orden `cajas[orden]`, que el llamador debe adoptar.
+        """
+        cajas = np.asarray(cajas, dtype=np.float64).reshape(-1, 4)
+        orden = orden_str(
+            (cajas[:, 0] + cajas[:, 2]) / 2, (cajas[:, 1] + cajas[:, 3]) / 2, capacidad
+        )
+        nivel = cajas[orden]
+        partes = []
+        while nivel.shape[0] and (
+            nivel.shape[0] > 1 or not partes
+        ):  # hasta una sola raíz
+            nivel = _agrupar(nivel, capacidad)
+            partes.append(nivel)
+        niveles = np.zeros(len(partes) + 1, dtype=np.int64)
+        np.cumsum([p.shape[0] for p in partes], out=niveles[1:])
+        todas = np.concatenate(partes) if partes else np.zeros((0, 4))
+        return cls(todas, niveles, capacidad, int(cajas.shape[0])), orden
+
+    @property
+    def altura(self) -> int:
+        return len(self.niveles) - 1
+
+    def _hijos(self, nodos: np.ndarray, limite: int) -> np.ndarray:
+        hijos = (nodos[:, None] * self.capacidad + np.arange(self.capacidad)).ravel()
+        return hijos[hijos < limite]
+
+    def _tam(self, nivel: int) -> int:
+        """Nodos del nivel (-1 = las entradas)."""
+        if nivel < 0:
+            return self.entradas
+        return int(self.niveles[nivel + 1] - self.niveles[nivel])
+
+    def candidatos(self, caja: Caja) -> np.ndarray:
+        """Posiciones (en orden empaquetado) de las entradas cuyas hojas intersectan `caja`."""
+        if self.altura == 0:
+            return np.empty(0, dtype=np.int64)
+        nodos = np.zeros(1, dtype=np.int64)  # la raíz
+        for nivel in range(self.altura - 1, -1, -1):
+            ini = int(self.niveles[nivel])
+            nodos = nodos[_intersecta(self.cajas[ini + nodos], caja)]
+            nodos = self._hijos(nodos, self._tam(nivel - 1))
+        return nodos
+
+    def pares(
+        self, x: np.ndarray, y: np.ndarray, cajas: Optional[np.ndarray] = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Pares (punto, entrada) con el punto dentro de una hoja que contiene a
+        la entrada (y de la caja de la entrada, si se pasan `cajas` en orden
+        empaquetado): descenso simultáneo de todos los puntos.
+        """
+        punto = np.arange(x.size)
+        if self.altura == 0 or x.size == 0:
+            return punto[:0], punto[:0]
+        nodo = np.zeros(x.size, dtype=np.int64)  # todos parten de la raíz
+        for nivel in range(self.altura - 1, -1, -1):
+            c = self.cajas[int(self.niveles[nivel]) + nodo]
+            px, py = x[punto], y[punto]
+            dentro = (
+                (c[:, 0] <= px) & (px <= c[:, 2]) & (c[:, 1] <= py) & (py <= c[:, 3])
+            )
+            punto, nodo = punto[dentro], nodo[dentro]
+            # Expandir a los hijos (los que existen en el nivel de abajo).
+            m = self.capacidad
+            punto = np.repeat(punto, m)
+            nodo = (np.repeat(nodo, m) * m) + np.tile(np.arange(m), nodo.size)
+            ok = nodo < self._tam(nivel - 1)
+            punto, nodo = punto[ok], nodo[ok]
+        if cajas is not None:
+            c, px, py = cajas[nodo], x[punto], y[punto]
+            dentro = (
+                (c[:, 0] <= px) & (px <= c[:, 2]) & (c[:, 1] <= py) & (py <= c[:, 3])
+            )
+            punto, nodo = punto[dentro], nodo[dentro]
+        return punto, nodo
+
+    def guardar(self, directorio: Path, nombre: str) -> None:
+        np.save(directorio / f"{nombre}.npy", self.cajas)
+        np.save(directorio / f"{nombre}_niveles.npy", self.niveles)
+
+    @classmethod
+    def abrir(
+        cls, directorio: Path, nombre: str, capacidad: int, entradas: int
+    ) -> "ArbolR":
+        return cls(
+            np.load(directorio / f"{nombre}.npy", mmap_mode="r"),
+            np.load(directorio / f"{nombre}_niveles.npy"),
+            capacidad,
+            entradas,
+        )
@@ -0,0 +1,89 @@
+# casandra/analisis/espacial/densidad.py
+"""
+Hotspots sobre una malla de conteos (filas = latitud, columnas = longitud).
+
+- `gi_estrella`: Getis-Ord Gi* con pesos binarios en la vecindad
+  (2r+1)×(2r+1) de cada celda (incluida ella). Las sumas de vecindad salen
+  de una tabla de áreas acumuladas: O(1) por celda para cualquier radio.
+  Las celdas del borde usan solo los vecinos que existen.
+- `densidad_kernel`: KDE gaussiano "binned": los conteos de la malla son
+  puntos con peso en el centro de su celda y el kernel es una convolución
+  separable (sigma por eje en celdas, porque una celda en grados no es
+  cuadrada en km). El resultado es eventos por km².
+- `picos`: máximos locales 3×3 positivos, de mayor a menor.
+
+    Gi*_i = (Σ_j w_ij x_j - x̄ W_i) / (S sqrt((n Σ_j w_ij² - W_i²) / (n - 1)))
+"""
+from __future__ import annotations
+
+import numpy as np
+from scipy import ndimage
+
+
+KM_POR_GRADO_LAT = 110.574
+KM_POR_GRADO_LON_ECUADOR = 111.320
+
+
+def km_por_grado(lat: float) -> tuple[float, float]:
+    """(km por grado de longitud, km por grado de latitud) a la latitud `lat`."""
+    return KM_POR_GRADO_LON_ECUADOR * float(np.cos(np.radians(lat))), KM_POR_GRADO_LAT
+
+
+def _sumas_vecindad(x: np.ndarray, radio: int) -> np.ndarray:
+    """Σ de x en la ventana (2r+1)² centrada en cada celda, recortada al borde."""
+    filas, cols = x.shape
+    sat = np.zeros((filas + 1, cols + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(x, axis=0), axis=1, out=sat[1:, 1:])
+    f0 = np.clip(np.arange(filas) - radio, 0, filas)
+    f1 = np.clip(np.arange(filas) + radio + 1, 0, filas)
+    c0 = np.clip(np.arange(cols) - radio, 0, cols)
+    c1 = np.clip(np.arange(cols) + radio + 1, 0, cols)
+    return (
+        sat[np.ix_(f1, c1)]
+        - sat[np.ix_(f0, c1)]
+        - sat[np.ix_(f1, c0)]
+        + sat[np.ix_(f0, c0)]
+    )
+
+
+def gi_estrella(conteos: np.ndarray, radio: int = 1) -> np.ndarray:
+    """z-score Gi* por celda (0 donde la malla es constante)."""
+    x = np.asarray(conteos, dtype=np.float64)
+    n = x.size
+    if n < 2:
+        return np.zeros_like(x)
+    media = x.mean()
+    s = np.sqrt(max((x * x).mean() - media * media, 0.0))
+    if s == 0:
+        return np.zeros_like(x)
+    w = _sumas_vecindad(
+        np.ones_like(x), radio
+    )  # W_i = Σ w_ij = Σ w_ij² (pesos binarios)
+    suma = _sumas_vecindad(x, radio)
+    den = s * np.sqrt(np.maximum(n * w - w * w, 0.0) / (n - 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (suma - media * w) / den
+    return np.where(den > 0, z, 0.0)
+
+
+def densidad_kernel(
+    conteos: np.ndarray, celda_grados: float, lat_centro: float, ancho_banda_km: float
+) -> np.ndarray:
+    """Eventos por km² suavizados con un kernel gaussiano de `ancho_banda_km`."""
+    km_lon, km_lat = km_por_grado(lat_centro)
+    ancho_km, alto_km = celda_grados * km_lon, celda_grados * km_lat
+    sigma = (ancho_banda_km / alto_km, ancho_banda_km / ancho_km)  # (filas, columnas)
+    suave = ndimage.gaussian_filter(
+        np.asarray(conteos, dtype=np.float64), sigma, mode="constant", truncate=3.0
+    )
+    return suave / (ancho_km * alto_km)
+
+
+def picos(valores: np.ndarray, minimo: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    """(filas, columnas) de los máximos locales 3×3 > 0 y >= `minimo`, de mayor a menor."""
+    if valores.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    maximos = ndimage.maximum_filter(valores, size=3, mode="constant", cval=-np.inf)
+    f, c = np.nonzero((valores == maximos) & (valores > 0) & (valores >= minimo))
+    orden = np.lexsort((c, f, -valores[f, c]))
+    return f[orden], c[orden]
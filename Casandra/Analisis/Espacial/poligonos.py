@@ -0,0 +1,162 @@
+# casandra/analisis/espacial/poligonos.py
+"""
+Polígonos (municipios) en arreglos planos y asignación punto -> polígono.
+
+- Vértices de todos los anillos en un solo `xy` (V, 2); `anillos` son los
+  offsets de cada anillo y `partes` el rango de anillos de cada polígono
+  (exterior, huecos y partes de un MultiPolygon van juntos: la regla par-impar
+  resuelve huecos y multipartes sin distinguirlos).
+- `asignar(x, y)`: los candidatos salen del R-tree de cajas (`ArbolR.pares`,
+  todos los puntos a la vez) y solo esos pares pasan la prueba exacta de
+  cruces de rayo, vectorizada sobre puntos × aristas por polígono.
+- Todo se guarda como `.npy` y se reabre con `mmap`.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from .arbol import ArbolR
+
+
+# Pocas entradas por hoja: las cajas de municipios vecinos se solapan y cada
+# entrada de una hoja visitada es un par candidato más.
+CAPACIDAD = 4
+BLOQUE_PUNTOS = 1 << 18  # puntos por pasada: acota los pares candidatos en memoria
+MAX_CELDAS_CRUCES = 1 << 22  # puntos × aristas por prueba vectorizada
+
+
+class Poligonos:
+    def __init__(
+        self, xy: np.ndarray, anillos: np.ndarray, partes: np.ndarray, arbol: ArbolR
+    ) -> None:
+        self.xy = xy
+        self.anillos = anillos
+        self.partes = partes
+        self.arbol = arbol
+        n = len(partes) - 1
+        self.cajas = np.empty((n, 4), dtype=np.float64)
+        for p in range(n):
+            v = self._vertices(p)
+            self.cajas[p] = (v[:, 0].min(), v[:, 1].min(), v[:, 0].max(), v[:, 1].max())
+
+    def __len__(self) -> int:
+        return len(self.partes) - 1
+
+    @classmethod
+    def desde_anillos(
+        cls, poligonos: Sequence[Sequence[np.ndarray]], capacidad: int = CAPACIDAD
+    ) -> tuple["Poligonos", np.ndarray]:
+        """
+        `poligonos[i]` = anillos (k, 2) del polígono i. Devuelve (Poligonos en
+        orden empaquetado, orden): la posición p corresponde a `poligonos[orden[p]]`.
+        """
+        cajas = np.array(
+            [
+                (
+                    min(a[:, 0].min() for a in anillos),
+                    min(a[:, 1].min() for a in anillos),
+                    max(a[:, 0].max() for a in anillos),
+                    max(a[:, 1].max() for a in anillos),
+                )
+                for anillos in poligonos
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 4)
+        arbol, orden = ArbolR.empaquetar(cajas, capacidad)
+        xy: list[np.ndarray] = []
+        anillos_off = [0]
+        partes_off = [0]
+        for i in orden:
+            for a in poligonos[int(i)]:
+                a = np.asarray(a, dtype=np.float64)
+                if a.shape[0] and not np.array_equal(a[0], a[-1]):
+                    a = np.vstack(
+                        [a, a[:1]]
+                    )  # anillo cerrado: la última arista vuelve al inicio
+                xy.append(a)
+                anillos_off.append(anillos_off[-1] + a.shape[0])
+            partes_off.append(len(anillos_off) - 1)
+        return (
+            cls(
+                np.concatenate(xy) if xy else np.zeros((0, 2)),
+                np.array(anillos_off, dtype=np.int64),
+                np.array(partes_off, dtype=np.int64),
+                arbol,
+            ),
+            orden,
+        )
+
+    def _vertices(self, p: int) -> np.ndarray:
+        return self.xy[self.anillos[self.partes[p]] : self.anillos[self.partes[p + 1]]]
+
+    def _aristas(self, p: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Extremos (x1, y1, x2, y2) de las aristas de todos los anillos de `p`."""
+        inicio = []
+        for r in range(int(self.partes[p]), int(self.partes[p + 1])):
+            inicio.append(np.arange(self.anillos[r], self.anillos[r + 1] - 1))
+        i = np.concatenate(inicio) if inicio else np.empty(0, dtype=np.int64)
+        return self.xy[i, 0], self.xy[i, 1], self.xy[i + 1, 0], self.xy[i + 1, 1]
+
+    def contiene(self, p: int, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Máscara de los puntos dentro del polígono `p` (regla par-impar)."""
+        x1, y1, x2, y2 = self._aristas(p)
+        dentro = np.zeros(x.size, dtype=bool)
+        if x1.size == 0:
+            return dentro
+        paso = max(1, MAX_CELDAS_CRUCES // x1.size)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for k in range(0, x.size, paso):
+                px, py = x[k : k + paso, None], y[k : k + paso, None]
+                cruza = (y1 > py) != (y2 > py)
+                corte = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+                dentro[k : k + paso] = (
+                    np.count_nonzero(cruza & (px < corte), axis=1) % 2 == 1
+                )
+        return dentro
+
+    def asignar(
+        self, x: np.ndarray, y: np.ndarray, bloque: int = BLOQUE_PUNTOS
+    ) -> np.ndarray:
+        """
+        Polígono que contiene a cada punto (posición en orden empaquetado);
+        -1 si ninguno. En una frontera compartida gana el de menor posición.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        codigo = np.full(x.size, -1, dtype=np.int32)
+        for ini in range(0, x.size, bloque):
+            bx, by = x[ini : ini + bloque], y[ini : ini + bloque]
+            punto, pol = self.arbol.pares(bx, by, self.cajas)
+            # Por polígono, de mayor a menor: la escritura del menor queda al final.
+            orden = np.argsort(pol, kind="stable")
+            punto, pol = punto[orden], pol[orden]
+            cortes = np.flatnonzero(np.diff(pol)) + 1
+            res = codigo[ini : ini + bloque]
+            for grupo in reversed(np.split(np.arange(pol.size), cortes)):
+                if grupo.size == 0:
+                    continue
+                p = int(pol[grupo[0]])
+                g = punto[grupo]
+                res[g[self.contiene(p, bx[g], by[g])]] = p
+        return codigo
+
+    def guardar(self, directorio: Path, nombre: str) -> None:
+        np.save(directorio / f"{nombre}_xy.npy", self.xy)
+        np.save(directorio / f"{nombre}_anillos.npy", self.anillos)
+        np.save(directorio / f"{nombre}_partes.npy", self.partes)
+        self.arbol.guardar(directorio, f"arbol_{nombre}")
+
+    @classmethod
+    def abrir(
+        cls, directorio: Path, nombre: str, capacidad: int = CAPACIDAD
+    ) -> "Poligonos":
+        partes = np.load(directorio / f"{nombre}_partes.npy")
+        return cls(
+            np.load(directorio / f"{nombre}_xy.npy", mmap_mode="r"),
+            np.load(directorio / f"{nombre}_anillos.npy", mmap_mode="r"),
+            partes,
+            ArbolR.abrir(directorio, f"arbol_{nombre}", capacidad, len(partes) - 1),
+        )
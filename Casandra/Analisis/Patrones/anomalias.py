@@ -0,0 +1,103 @@
+# casandra/analisis/patrones/anomalias.py
+"""
+Anomalías por z-score rodante sobre una matriz series × días.
+
+Todas las series se procesan a la vez: media y desviación de la ventana previa
+salen de sumas acumuladas de x y x² (O(1) por punto, sin bucles por serie).
+El punto t se compara contra los `ventana` días anteriores (sin incluirse).
+
+Convenciones:
+- Solo picos hacia arriba (z >= umbral).
+- `std_min` acota la desviación por abajo: en series casi siempre en cero, un
+  salto de 0 a 1 evento no debe dar z infinito.
+- `severidad` = 1 - umbral / z: 0 en el umbral, tiende a 1 con z grande.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+STD_MIN = 1.0
+
+
+@dataclass(frozen=True)
+class Anomalias:
+    serie: np.ndarray  # índice de serie (fila de la matriz)
+    dia: np.ndarray  # índice de día (columna)
+    valor: np.ndarray
+    media: np.ndarray
+    z: np.ndarray
+    severidad: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.z.size)
+
+    def top(self, k: int) -> np.ndarray:
+        """Índices (sobre estas anomalías) de las k de mayor z, desc; empates por (serie, día)."""
+        n = len(self)
+        if n == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64)
+        cand = np.arange(n)
+        if k < n:
+            umbral = np.partition(self.z, n - k)[n - k]
+            cand = cand[self.z >= umbral]
+        orden = cand[np.lexsort((self.dia[cand], self.serie[cand], -self.z[cand]))]
+        return orden[:k]
+
+
+def zscores_rodantes(
+    matriz: np.ndarray, ventana: int, std_min: float = STD_MIN
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (z, media) de cada punto contra los `ventana` días previos.
+    Columnas sin historia completa (t < ventana) quedan en NaN.
+    """
+    x = np.asarray(matriz, dtype=np.float64)
+    n, t = x.shape
+    z = np.full((n, t), np.nan)
+    media = np.full((n, t), np.nan)
+    if t <= ventana:
+        return z, media
+
+    cs = np.zeros((n, t + 1))
+    cs2 = np.zeros((n, t + 1))
+    np.cumsum(x, axis=1, out=cs[:, 1:])
+    np.cumsum(x * x, axis=1, out=cs2[:, 1:])
+
+    # Ventana para el punto t: días [t - ventana, t) -> cs[t] - cs[t - ventana].
+    suma = cs[:, ventana:t] - cs[:, : t - ventana]
+    suma2 = cs2[:, ventana:t] - cs2[:, : t - ventana]
+    m = suma / ventana
+    var = np.maximum(
+        suma2 / ventana - m * m, 0.0
+    )  # el redondeo puede dar negativos mínimos
+    std = np.maximum(np.sqrt(var), std_min)
+
+    media[:, ventana:] = m
+    z[:, ventana:] = (x[:, ventana:] - m) / std
+    return z, media
+
+
+def detectar(
+    matriz: np.ndarray,
+    ventana: int,
+    z_umbral: float,
+    desde_dia: int = 0,
+    std_min: float = STD_MIN,
+) -> Anomalias:
+    """Puntos con z >= `z_umbral` a partir de la columna `desde_dia`."""
+    z, media = zscores_rodantes(matriz, ventana, std_min)
+    z[:, :desde_dia] = np.nan
+    with np.errstate(invalid="ignore"):
+        serie, dia = np.nonzero(z >= z_umbral)
+    zs = z[serie, dia]
+    return Anomalias(
+        serie=serie,
+        dia=dia,
+        valor=np.asarray(matriz)[serie, dia],
+        media=media[serie, dia],
+        z=zs,
+        severidad=1.0 - z_umbral / zs if z_umbral > 0 else np.ones_like(zs),
+    )
@@ -0,0 +1,182 @@
+# casandra/analisis/patrones/coocurrencia.py
+"""
+Co-ocurrencias de delitos por celda tiempo × lugar con matrices dispersas.
+
+- Matriz de incidencia X (celdas × ítems) binaria en CSR.
+- Poda por soporte mínimo ANTES de multiplicar: un par nunca tiene más
+  soporte que su ítem menos frecuente, así que se descartan columnas primero.
+- Todos los pares salen de un solo producto disperso XᵀX.
+- Itemsets de más de dos ítems: crecimiento de patrones estilo FP-growth
+  sobre bases condicionales, con transacciones idénticas agrupadas por peso
+  (como máscaras de bits en numpy cuando hay <= 62 ítems vivos).
+
+Medidas (n = celdas):
+    support(S) = celdas con todos los ítems de S / n
+    lift(S)    = support(S) / Π support(i)
+    score(S)   = support(S) - Π support(i)   (leverage: exceso sobre independencia)
+"""
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def matriz_incidencia(
+    celda: np.ndarray, item: np.ndarray, n_celdas: int, n_items: int
+) -> sp.csr_matrix:
+    """CSR binaria celdas × ítems a partir de pares (celda, ítem), con repetidos."""
+    datos = np.ones(celda.size, dtype=np.int32)
+    x = sp.csr_matrix((datos, (celda, item)), shape=(n_celdas, n_items))
+    x.sum_duplicates()
+    x.data[:] = 1
+    # Celdas vacías no cuentan en n: solo existen las celdas con algún evento.
+    return x[np.flatnonzero(np.diff(x.indptr))]
+
+
+@dataclass(frozen=True)
+class Patrones:
+    items: list[tuple[int, ...]]
+    conteo: np.ndarray
+    support: np.ndarray
+    lift: np.ndarray
+    score: np.ndarray
+    celdas: int
+    items_vivos: int
+
+
+def _medidas(
+    items: list[tuple[int, ...]], conteo: np.ndarray, soporte_item: np.ndarray, n: int
+) -> Patrones:
+    support = conteo / n if n else np.zeros(0)
+    esperado = np.array(
+        [np.prod(soporte_item[list(s)]) for s in items], dtype=np.float64
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lift = np.where(esperado > 0, support / esperado, 0.0)
+    return Patrones(
+        items=items,
+        conteo=conteo,
+        support=support,
+        lift=lift,
+        score=support - esperado,
+        celdas=n,
+        items_vivos=int((soporte_item > 0).sum()),
+    )
+
+
+def pares(x: sp.csr_matrix, min_support: float) -> Patrones:
+    """Todos los pares con support >= min_support en un producto XᵀX."""
+    n = x.shape[0]
+    min_conteo = max(1, int(np.ceil(min_support * n)))
+    conteo_item = np.asarray(x.sum(axis=0)).ravel()
+    vivos = np.flatnonzero(conteo_item >= min_conteo)
+    soporte_item = conteo_item / n if n else conteo_item.astype(np.float64)
+
+    xv = x[:, vivos]
+    co = sp.triu(xv.T @ xv, k=1).tocoo()
+    keep = co.data >= min_conteo
+    a, b = vivos[co.row[keep]], vivos[co.col[keep]]
+    items = list(zip(a.tolist(), b.tolist()))
+    patrones = _medidas(items, co.data[keep].astype(np.int64), soporte_item, n)
+    return Patrones(**{**patrones.__dict__, "items_vivos": int(vivos.size)})
+
+
+def _crecer(
+    base: dict[tuple[int, ...], int],
+    sufijo: tuple[int, ...],
+    min_conteo: int,
+    max_len: int,
+    out: list[tuple[tuple[int, ...], int]],
+) -> None:
+    conteos: Counter[int] = Counter()
+    for tx, w in base.items():
+        for it in tx:
+            conteos[it] += w
+    frecuentes = {it for it, c in conteos.items() if c >= min_conteo}
+    for it in sorted(frecuentes):
+        patron = tuple(sorted(sufijo + (it,)))
+        out.append((patron, conteos[it]))
+        if len(patron) >= max_len:
+            continue
+        # Base condicional de `it`: solo ítems frecuentes menores (cada patrón sale una vez).
+        condicional: dict[tuple[int, ...], int] = defaultdict(int)
+        for tx, w in base.items():
+            if it in tx:
+                prefijo = tuple(x for x in tx if x < it and x in frecuentes)
+                if prefijo:
+                    condicional[prefijo] += w
+        if condicional:
+            _crecer(condicional, sufijo + (it,), min_conteo, max_len, out)
+
+
+def _crecer_bits(
+    mascaras: np.ndarray,
+    pesos: np.ndarray,
+    sufijo: tuple[int, ...],
+    n_items: int,
+    min_conteo: int,
+    max_len: int,
+    out: list[tuple[tuple[int, ...], int]],
+) -> None:
+    """Igual que `_crecer`, con cada transacción como máscara de bits (vectorizado en numpy)."""
+    bits = np.arange(n_items, dtype=np.int64)
+    presentes = (mascaras[:, None] >> bits) & 1
+    conteos = (presentes * pesos[:, None]).sum(axis=0)
+    frecuentes = np.flatnonzero(conteos >= min_conteo)
+    mascara_frec = (
+        int(np.bitwise_or.reduce(np.left_shift(1, frecuentes)))
+        if frecuentes.size
+        else 0
+    )
+    for it in frecuentes.tolist():
+        patron = tuple(sorted(sufijo + (it,)))
+        out.append((patron, int(conteos[it])))
+        if len(patron) >= max_len:
+            continue
+        sel = presentes[:, it].astype(bool)
+        menores = mascara_frec & ((1 << it) - 1)
+        cond = mascaras[sel] & menores
+        vivas = cond != 0
+        if vivas.any():
+            cm, inv = np.unique(cond[vivas], return_inverse=True)
+            cw = np.bincount(inv, weights=pesos[sel][vivas]).astype(np.int64)
+            _crecer_bits(cm, cw, sufijo + (it,), it, min_conteo, max_len, out)
+
+
+def itemsets(x: sp.csr_matrix, min_support: float, max_len: int = 3) -> Patrones:
+    """Itemsets frecuentes de tamaño 2..max_len (FP-growth sobre transacciones agrupadas)."""
+    n = x.shape[0]
+    min_conteo = max(1, int(np.ceil(min_support * n)))
+    conteo_item = np.asarray(x.sum(axis=0)).ravel()
+    vivos = conteo_item >= min_conteo
+    soporte_item = conteo_item / n if n else conteo_item.astype(np.float64)
+
+    ids = np.flatnonzero(vivos)
+    xv = x[:, ids]
+    encontrados: list[tuple[tuple[int, ...], int]] = []
+    if ids.size <= 62:
+        # Cada celda como máscara de bits: transacciones idénticas se agrupan con np.unique.
+        mascaras, pesos = np.unique(
+            xv @ np.left_shift(np.int64(1), np.arange(ids.size, dtype=np.int64)),
+            return_counts=True,
+        )
+        _crecer_bits(mascaras, pesos, (), ids.size, min_conteo, max_len, encontrados)
+        encontrados = [(tuple(int(ids[j]) for j in s), c) for s, c in encontrados]
+    else:
+        transacciones: Counter[tuple[int, ...]] = Counter()
+        for i in range(xv.shape[0]):
+            fila = np.sort(xv.indices[xv.indptr[i] : xv.indptr[i + 1]])
+            if fila.size >= 2:
+                transacciones[tuple(int(ids[j]) for j in fila)] += 1
+        _crecer(dict(transacciones), (), min_conteo, max_len, encontrados)
+    encontrados = [(s, c) for s, c in encontrados if len(s) >= 2]
+    patrones = _medidas(
+        [s for s, _ in encontrados],
+        np.array([c for _, c in encontrados], dtype=np.int64),
+        soporte_item,
+        n,
+    )
+    return Patrones(**{**patrones.__dict__, "items_vivos": int(vivos.sum())})
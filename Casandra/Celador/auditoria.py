@@ -1,21 +1,35 @@
 # casandra/celador/auditoria.py
 from __future__ import annotations
 
+import atexit
 import hashlib
+import io
 import json
 import os
+import re
+import threading
 import time
 import uuid
+from collections import deque
 from contextvars import ContextVar
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 
 job_id_ctx: ContextVar[str] = ContextVar("job_id", default="")
 
+# El directorio se crea al primer evento escrito (o en `preparar_auditoria`),
+# no al importar: importar el paquete no toca el disco.
 AUDIT_DIR = Path(os.getenv("CASANDRA_AUDIT_DIR", "./data/audit"))
-AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+
+# Política del sumidero: "batch" (default) encola y escribe en lotes desde un hilo;
+# "sync" conserva la escritura por evento (útil para depurar).
+AUDIT_MODE = os.getenv("CASANDRA_AUDIT_MODE", "batch")
+AUDIT_BATCH = int(os.getenv("CASANDRA_AUDIT_BATCH", "256"))
+AUDIT_FLUSH_MS = int(os.getenv("CASANDRA_AUDIT_FLUSH_MS", "200"))
+AUDIT_QUEUE_MAX = int(os.getenv("CASANDRA_AUDIT_QUEUE_MAX", "50000"))
+AUDIT_ZSTD = os.getenv("CASANDRA_AUDIT_ZSTD", "0") == "1"
 
 
 def new_job_id() -> str:
@@ -52,6 +66,8 @@ def query_hash(plan_normalizado: dict[str, Any], catalog_version: str) -> str:
 
 @dataclass(frozen=True)
 class AuditRecord:
+    """Forma de cada línea JSONL (el sumidero la serializa sin pasar por asdict)."""
+
     job_id: str
     when_ms: int
     stage: str
@@ -59,29 +75,315 @@ class AuditRecord:
 
 
 def _audit_file_for_day(ts_ms: int) -> Path:
-    # Un archivo por día evita explosión de archivos por job.
+    # Un archivo por día y proceso: evita explosión de archivos por job y que
+    # dos workers compartan el archivo que uno de ellos está rotando.
     day = time.strftime("%Y-%m-%d", time.localtime(ts_ms / 1000))
-    return AUDIT_DIR / f"audit_{day}.jsonl"
+    return AUDIT_DIR / f"audit_{day}.p{os.getpid()}.jsonl"
+
+
+# Nombres de archivo de auditoría, actuales y anteriores:
+#   audit_<día>.jsonl                  (formato previo: un archivo por día)
+#   audit_<día>.p<pid>.jsonl           (uno por día y proceso)
+#   audit_<día>[.p<pid>][.<n>].jsonl.zst  (rotados; <n> numera rotaciones tardías)
+GLOB_AUDITORIA = "audit_*.jsonl*"
+ARCHIVO_AUDITORIA = re.compile(
+    r"^audit_(?P<dia>\d{4}-\d{2}-\d{2})(?:\.p(?P<pid>\d+))?(?:\.\d+)?\.jsonl(?:\.zst)?$"
+)
+
+
+def archivos_auditoria(
+    directorio: Path = AUDIT_DIR, dia: Optional[str] = None
+) -> list[Path]:
+    """
+    Archivos de auditoría de `directorio` (de un `dia` 'YYYY-MM-DD' o todos),
+    con el nombre viejo `audit_<día>.jsonl` o el actual por proceso.
+    """
+    if not directorio.exists():
+        return []
+    rutas = []
+    for p in sorted(directorio.glob(GLOB_AUDITORIA)):
+        m = ARCHIVO_AUDITORIA.match(p.name)
+        if m and (dia is None or m.group("dia") == dia):
+            rutas.append(p)
+    return rutas
+
+
+def leer_auditoria(rutas: list[Path]) -> Iterator[dict[str, Any]]:
+    """Registros (`AuditRecord` como dict) de archivos JSONL planos o `.zst`."""
+    for ruta in rutas:
+        if ruta.suffix == ".zst":
+            import zstandard  # solo si hay archivos rotados
+
+            with ruta.open("rb") as fi:
+                lector = zstandard.ZstdDecompressor().stream_reader(fi)
+                lineas = io.TextIOWrapper(lector, encoding="utf-8").read().splitlines()
+        else:
+            lineas = ruta.read_text(encoding="utf-8").splitlines()
+        for linea in lineas:
+            if linea.strip():
+                yield json.loads(linea)
+
+
+def _linea(job_id: str, when_ms: int, stage: str, payload: dict[str, Any]) -> str:
+    rec = {"job_id": job_id, "when_ms": when_ms, "stage": stage, "payload": payload}
+    return json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+
+
+def _comprimir_zstd(src: Path) -> None:
+    """
+    Rota un archivo de día cerrado a `.jsonl.zst` (requiere `zstandard`).
+    Si ya hay un archivo rotado (eventos tardíos que recrearon el JSONL), el
+    nuevo se numera (`.1.jsonl.zst`, ...): nunca se reemplaza uno existente.
+    Si la dependencia no está o falla la escritura, el JSONL se queda como está.
+    """
+    try:
+        import zstandard
+    except ImportError:
+        return
+
+    base = src.name[: -len(".jsonl")]
+    tmp = src.with_name(src.name + ".zst.tmp")
+    try:
+        cctx = zstandard.ZstdCompressor(level=10)
+        with src.open("rb") as fi, tmp.open("wb") as fo:
+            cctx.copy_stream(fi, fo)
+        n = 0
+        while True:
+            dst = src.with_name(f"{base}.{n}.jsonl.zst" if n else f"{base}.jsonl.zst")
+            try:
+                os.link(tmp, dst)  # falla si `dst` existe, a diferencia de os.replace
+                break
+            except FileExistsError:
+                n += 1
+        tmp.unlink()
+        src.unlink()
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+class SumideroAuditoria:
+    """
+    Sumidero de auditoría por lotes.
+
+    - `encolar` solo agrega una tupla a un deque acotado (sin I/O ni json).
+    - Un hilo daemon serializa y escribe en lotes: por tamaño (`batch`) o por
+      tiempo (`flush_ms`), abriendo cada archivo de día una vez por lote.
+    - Si la cola está llena el evento se descarta y se cuenta (best-effort).
+    - `cerrar()` drena lo pendiente; se registra en `atexit` y en el shutdown de la app.
+    - Cada proceso escribe sus propios archivos (`audit_<día>.p<pid>.jsonl`);
+      con `comprimir=True`, rota a `.jsonl.zst` solo los suyos de días cerrados.
+    """
+
+    def __init__(
+        self,
+        directorio: Path,
+        *,
+        batch: int = AUDIT_BATCH,
+        flush_ms: int = AUDIT_FLUSH_MS,
+        queue_max: int = AUDIT_QUEUE_MAX,
+        comprimir: bool = AUDIT_ZSTD,
+    ) -> None:
+        self.directorio = directorio
+        self.batch = max(1, batch)
+        self.flush_s = max(1, flush_ms) / 1000
+        self.queue_max = max(1, queue_max)
+        self.comprimir = comprimir
+
+        self._cola: deque[tuple[str, int, str, dict[str, Any]]] = deque()
+        self._despertar = threading.Event()
+        self._detener = False
+        self._hilo: Optional[threading.Thread] = None
+        self._pid = 0
+        self._arranque = threading.Lock()
+        self._escribiendo = False
+        self._dia_actual = ""
+        self._directorio_listo = False
+
+        self.descartados = 0
+        self.escritos = 0
+        self.errores = 0
+
+    # --- productor (hot path) ---
+    def encolar(
+        self, job_id: str, when_ms: int, stage: str, payload: dict[str, Any]
+    ) -> None:
+        if self._pid != os.getpid():
+            self._arrancar()
+
+        cola = self._cola
+        if len(cola) >= self.queue_max:
+            # Contador sin lock: puede perder algún incremento bajo carrera, es aceptable.
+            self.descartados += 1
+            return
+        cola.append((job_id, when_ms, stage, payload))
+        if len(cola) >= self.batch:
+            self._despertar.set()
+
+    # --- ciclo de vida ---
+    def _arrancar(self) -> None:
+        with self._arranque:
+            pid = os.getpid()
+            if self._pid == pid:
+                return
+            # Tras un fork el hilo del padre no existe en el hijo: se relanza.
+            self._cola = deque()
+            self._despertar = threading.Event()
+            self._detener = False
+            self._hilo = threading.Thread(
+                target=self._ciclo, name="casandra-audit", daemon=True
+            )
+            self._hilo.start()
+            self._pid = pid
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Fuerza la escritura de lo encolado; True si se vació antes del timeout."""
+        if self._hilo is None or not self._hilo.is_alive():
+            self._drenar()
+            return True
+        fin = time.monotonic() + timeout
+        while self._cola or self._escribiendo:
+            self._despertar.set()
+            if time.monotonic() >= fin:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def cerrar(self, timeout: float = 2.0) -> None:
+        """Detiene el hilo escritor y drena lo pendiente (idempotente)."""
+        hilo = self._hilo
+        self._detener = True
+        self._despertar.set()
+        if (
+            hilo is not None
+            and hilo.is_alive()
+            and hilo is not threading.current_thread()
+        ):
+            hilo.join(timeout)
+        self._drenar()
+        self._hilo = None
+        self._pid = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pendientes": len(self._cola),
+            "escritos": self.escritos,
+            "descartados": self.descartados,
+            "errores": self.errores,
+        }
+
+    # --- consumidor (hilo escritor) ---
+    def _ciclo(self) -> None:
+        while not self._detener:
+            self._despertar.wait(self.flush_s)
+            self._despertar.clear()
+            self._drenar()
+
+    def _drenar(self) -> None:
+        cola = self._cola
+        while cola:
+            self._escribiendo = True
+            lote = []
+            try:
+                for _ in range(min(len(cola), self.batch * 4)):
+                    lote.append(cola.popleft())
+            except IndexError:
+                pass  # otro hilo drenó en paralelo (flush/cerrar)
+            try:
+                if lote:
+                    self._escribir(lote)
+            finally:
+                self._escribiendo = False
+
+    def _escribir(self, lote: list[tuple[str, int, str, dict[str, Any]]]) -> None:
+        por_archivo: dict[Path, list[str]] = {}
+        for job_id, when_ms, stage, payload in lote:
+            try:
+                linea = _linea(job_id, when_ms, stage, payload)
+            except Exception:
+                self.errores += 1
+                continue
+            out = self.directorio / _audit_file_for_day(when_ms).name
+            por_archivo.setdefault(out, []).append(linea)
+
+        if por_archivo and not self._directorio_listo:
+            try:
+                self.directorio.mkdir(parents=True, exist_ok=True)
+                self._directorio_listo = True
+            except OSError:
+                pass  # el open de abajo cuenta el error
+
+        for out, lineas in por_archivo.items():
+            try:
+                with out.open("a", encoding="utf-8") as f:
+                    f.write("".join(lineas))
+                self.escritos += len(lineas)
+            except Exception:
+                # Best-effort: si falla escribir, no rompemos el flujo principal.
+                self.errores += len(lineas)
+
+        if self.comprimir:
+            self._rotar(max(por_archivo, default=None))
+
+    def _rotar(self, actual: Optional[Path]) -> None:
+        if actual is None or actual.name == self._dia_actual:
+            return
+        self._dia_actual = actual.name
+        for viejo in self.directorio.glob(f"audit_*.p{os.getpid()}.jsonl"):
+            if viejo.name < actual.name:
+                _comprimir_zstd(viejo)
+
+
+_sumidero = SumideroAuditoria(AUDIT_DIR)
+atexit.register(_sumidero.cerrar)
 
 
 def audit(stage: str, payload: dict[str, Any]) -> None:
     """
     Escribe un evento de auditoría en JSONL.
     Regla: auditoría nunca debe tumbar el request (best-effort).
+
+    En modo "batch" solo encola; el `payload` no debe mutarse después de auditarlo.
     """
     when_ms = int(time.time() * 1000)
-    rec = AuditRecord(
-        job_id=get_job_id(),
-        when_ms=when_ms,
-        stage=stage,
-        payload=payload,
-    )
+    jid = get_job_id()
+
+    if AUDIT_MODE != "sync":
+        _sumidero.encolar(jid, when_ms, stage, payload)
+        return
 
     out = _audit_file_for_day(when_ms)
     try:
-        with out.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(asdict(rec), ensure_ascii=False, default=str) + "\n")
+        try:
+            f = out.open("a", encoding="utf-8")
+        except FileNotFoundError:
+            preparar_auditoria()
+            f = out.open("a", encoding="utf-8")
+        with f:
+            f.write(_linea(jid, when_ms, stage, payload))
     except Exception:
         # Best-effort: si falla escribir, no rompemos el flujo principal.
         # (Si quieres, aquí luego metemos fallback a stderr/logger)
         return
+
+
+def preparar_auditoria() -> None:
+    """Crea el directorio de auditoría (arranque de la app); best-effort."""
+    try:
+        AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        pass
+
+
+def flush_auditoria(timeout: float = 2.0) -> bool:
+    """Escribe de inmediato los eventos encolados."""
+    return _sumidero.flush(timeout)
+
+
+def cerrar_auditoria(timeout: float = 2.0) -> None:
+    """Drena y detiene el sumidero (shutdown de la app / fin de proceso)."""
+    _sumidero.cerrar(timeout)
+
+
+def audit_stats() -> dict[str, int]:
+    """Contadores del sumidero: pendientes, escritos, descartados, errores."""
+    return _sumidero.stats()
@@ -0,0 +1,374 @@
+# casandra/celador/bitacora.py
+"""
+Bitácora: compactación y consulta de la auditoría.
+
+El sumidero (`auditoria.py`) sigue escribiendo `audit_<día>.p<pid>.jsonl`,
+uno por proceso (o `.jsonl.zst`, `.<n>.jsonl.zst` si rota comprimido). Los días cerrados se compactan a Parquet
+(zstd) ordenado por (`job_id`, `when_ms`), con las llaves que más se
+consultan sacadas del payload a columnas:
+
+    data/audit/
+      audit_2025-08-19.p4182.jsonl              # día en curso (vivo)
+      compactado/dia=2025-08-18/audit.parquet   # días cerrados
+
+Con el orden por `job_id`, las estadísticas min/max de cada row group
+acotan a uno o dos grupos por job: buscar un job en meses de bitácora es
+leer footers y unos pocos KB, no parsear JSON. Las consultas (DuckDB) unen
+lo compactado con los archivos vivos, así que también ven el día actual.
+
+CLI:
+    python -m Casandra.Celador.bitacora compactar
+    python -m Casandra.Celador.bitacora job <job_id>
+    python -m Casandra.Celador.bitacora latencias --desde 2025-08-01 --cuantil 0.99
+    python -m Casandra.Celador.bitacora errores --desde 2025-08-01
+"""
+from __future__ import annotations
+
+import os
+import re
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Optional
+
+import duckdb
+import pyarrow as pa
+
+from .auditoria import AUDIT_DIR, audit
+
+
+COMPACTADO = "compactado"
+ARCHIVO_DIA = "audit.parquet"
+FILAS_POR_GRUPO = (
+    8_192  # grupos chicos: el min/max de job_id descarta casi todo el archivo
+)
+
+_VIVO = re.compile(
+    r"^audit_(\d{4}-\d{2}-\d{2})(\.p\d+(\.\d+)?)?(\.compactando)?\.jsonl(\.zst)?$"
+)
+_PARTICION = re.compile(r"^dia=(\d{4}-\d{2}-\d{2})$")
+
+_COLUMNAS_JSON = (
+    "{'job_id': 'VARCHAR', 'when_ms': 'BIGINT', 'stage': 'VARCHAR', 'payload': 'JSON'}"
+)
+
+# Forma compactada: mismas columnas para Parquet y para los JSONL vivos.
+_SELECT = """
+    job_id,
+    when_ms,
+    stage,
+    payload->>'component' AS component,
+    payload->>'tool' AS tool,
+    payload->>'code' AS code,
+    payload->>'error' AS error,
+    TRY_CAST(payload->>'timing_ms' AS DOUBLE) AS timing_ms,
+    payload::VARCHAR AS payload
+"""
+COLUMNAS = (
+    "job_id",
+    "when_ms",
+    "stage",
+    "component",
+    "tool",
+    "code",
+    "error",
+    "timing_ms",
+    "payload",
+)
+
+
+def _literal(ruta: Path) -> str:
+    return "'" + ruta.as_posix().replace("'", "''") + "'"
+
+
+def _lista(rutas: list[Path]) -> str:
+    return "[" + ", ".join(_literal(r) for r in rutas) + "]"
+
+
+def _leer_json(rutas: list[Path]) -> str:
+    return (
+        f"SELECT {_SELECT} FROM read_json({_lista(rutas)}, format = 'newline_delimited', "
+        f"columns = {_COLUMNAS_JSON}, ignore_errors = true)"
+    )
+
+
+class Bitacora:
+    """Compactador + consultas sobre un directorio de auditoría."""
+
+    def __init__(self, directorio: Path = AUDIT_DIR) -> None:
+        self.directorio = directorio
+        self.compactado = directorio / COMPACTADO
+        self._con = duckdb.connect(":memory:")
+
+    # --- inventario ---
+
+    def vivos(self) -> dict[date, list[Path]]:
+        """Archivos JSONL (planos o .zst) por día, aún sin compactar."""
+        dias: dict[date, list[Path]] = {}
+        if self.directorio.exists():
+            for p in sorted(self.directorio.iterdir()):
+                m = _VIVO.match(p.name)
+                if m:
+                    dias.setdefault(date.fromisoformat(m.group(1)), []).append(p)
+        return dias
+
+    def compactados(self) -> dict[date, Path]:
+        dias: dict[date, Path] = {}
+        if self.compactado.exists():
+            for p in sorted(self.compactado.iterdir()):
+                m = _PARTICION.match(p.name)
+                if m and (p / ARCHIVO_DIA).exists():
+                    dias[date.fromisoformat(m.group(1))] = p / ARCHIVO_DIA
+        return dias
+
+    # --- compactación ---
+
+    def compactar(self, antes_de: Optional[date] = None) -> list[date]:
+        """
+        Compacta los días cerrados (< `antes_de`, por defecto hoy en hora
+        local, igual que el nombre de archivo del sumidero). Si un día ya
+        compactado recibió eventos tardíos, se reescribe con ambos.
+
+        Los JSONL se renombran a `*.compactando.jsonl` antes de leerlos: si el
+        sumidero aún agrega un lote tardío, cae en un archivo nuevo que entra
+        en la siguiente pasada. Se borran solo tras el rename del Parquet.
+        """
+        limite = antes_de or date.fromtimestamp(time.time())
+        previos = self.compactados()
+        hechos: list[date] = []
+        for dia, fuentes in self.vivos().items():
+            if dia >= limite:
+                continue
+            t0 = time.perf_counter()
+            fuentes = [self._apartar(p) for p in fuentes]
+            filas = self._compactar_dia(dia, fuentes, previos.get(dia))
+            for p in fuentes:
+                p.unlink(missing_ok=True)
+            hechos.append(dia)
+            audit(
+                "audit.compact",
+                {
+                    "dia": dia.isoformat(),
+                    "archivos": len(fuentes),
+                    "rows": filas,
+                    "timing_ms": round((time.perf_counter() - t0) * 1000, 3),
+                },
+            )
+        return hechos
+
+    @staticmethod
+    def _apartar(p: Path) -> Path:
+        if ".compactando." in p.name:
+            return p  # quedó de una pasada interrumpida
+        nuevo = p.with_name(p.name.replace(".jsonl", ".compactando.jsonl", 1))
+        os.replace(p, nuevo)
+        return nuevo
+
+    def _compactar_dia(
+        self, dia: date, fuentes: list[Path], previo: Optional[Path]
+    ) -> int:
+        destino = self.compactado / f"dia={dia.isoformat()}" / ARCHIVO_DIA
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        tmp = destino.with_name(f"{ARCHIVO_DIA}.{os.getpid()}.tmp")
+        origen = _leer_json(fuentes)
+        if previo is not None:
+            origen += f" UNION ALL SELECT {', '.join(COLUMNAS)} FROM read_parquet({_literal(previo)})"
+        cur = self._con.cursor()
+        try:
+            cur.execute(
+                f"COPY ({origen} ORDER BY job_id, when_ms) TO {_literal(tmp)} "
+                f"(FORMAT parquet, COMPRESSION zstd, ROW_GROUP_SIZE {FILAS_POR_GRUPO})"
+            )
+            filas = cur.execute(
+                f"SELECT count(*) FROM read_parquet({_literal(tmp)})"
+            ).fetchone()[0]
+            os.replace(tmp, destino)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        finally:
+            cur.close()
+        return int(filas)
+
+    # --- consultas ---
+
+    def _fuente(self, desde: Optional[date], hasta: Optional[date]) -> Optional[str]:
+        """SELECT con la unión de días compactados y vivos dentro de [desde, hasta]."""
+
+        def dentro(d: date) -> bool:
+            return (desde is None or d >= desde) and (hasta is None or d <= hasta)
+
+        parquet = [p for d, p in self.compactados().items() if dentro(d)]
+        vivos = [p for d, ps in self.vivos().items() if dentro(d) for p in ps]
+        partes = []
+        if parquet:
+            partes.append(
+                f"SELECT {', '.join(COLUMNAS)} FROM read_parquet({_lista(parquet)})"
+            )
+        if vivos:
+            partes.append(_leer_json(vivos))
+        return " UNION ALL ".join(partes) if partes else None
+
+    def _consultar(
+        self,
+        sql: str,
+        params: list[Any],
+        desde: Optional[date],
+        hasta: Optional[date],
+        vacio: pa.Schema,
+    ) -> pa.Table:
+        fuente = self._fuente(desde, hasta)
+        if fuente is None:
+            return vacio.empty_table()
+        cur = self._con.cursor()
+        try:
+            cur.execute(sql.format(fuente=fuente), params)
+            return (
+                cur.to_arrow_table()
+                if hasattr(cur, "to_arrow_table")
+                else cur.fetch_arrow_table()
+            )
+        finally:
+            cur.close()
+
+    def eventos_job(
+        self, job_id: str, desde: Optional[date] = None, hasta: Optional[date] = None
+    ) -> pa.Table:
+        """Todos los eventos de un job, en orden de llegada."""
+        return self._consultar(
+            "SELECT * FROM ({fuente}) WHERE job_id = ? ORDER BY when_ms",
+            [job_id],
+            desde,
+            hasta,
+            _ESQUEMA_EVENTOS,
+        )
+
+    def latencias(
+        self,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        cuantil: float = 0.99,
+    ) -> pa.Table:
+        """Cuantil de `timing_ms` por tool y hora (UTC), sobre eventos `tool.*` con timing."""
+        return self._consultar(
+            "SELECT tool, date_trunc('hour', make_timestamp(when_ms * 1000)) AS hora, "
+            "count(*) AS n, quantile_cont(timing_ms, ?) AS timing_ms "
+            "FROM ({fuente}) WHERE stage LIKE 'tool.%' AND tool IS NOT NULL AND timing_ms IS NOT NULL "
+            "GROUP BY ALL ORDER BY tool, hora",
+            [cuantil],
+            desde,
+            hasta,
+            _ESQUEMA_LATENCIAS,
+        )
+
+    def errores(
+        self, desde: Optional[date] = None, hasta: Optional[date] = None
+    ) -> pa.Table:
+        """Conteo de errores por etapa y código (o tipo de excepción si no hay código)."""
+        return self._consultar(
+            "SELECT stage, coalesce(code, 'COMPUTE_ERROR') AS code, error, count(*) AS n "
+            "FROM ({fuente}) WHERE code IS NOT NULL OR error IS NOT NULL "
+            "GROUP BY ALL ORDER BY n DESC, stage, code",
+            [],
+            desde,
+            hasta,
+            _ESQUEMA_ERRORES,
+        )
+
+
+_ESQUEMA_EVENTOS = pa.schema(
+    [
+        ("job_id", pa.string()),
+        ("when_ms", pa.int64()),
+        ("stage", pa.string()),
+        ("component", pa.string()),
+        ("tool", pa.string()),
+        ("code", pa.string()),
+        ("error", pa.string()),
+        ("timing_ms", pa.float64()),
+        ("payload", pa.string()),
+    ]
+)
+_ESQUEMA_LATENCIAS = pa.schema(
+    [
+        ("tool", pa.string()),
+        ("hora", pa.timestamp("us")),
+        ("n", pa.int64()),
+        ("timing_ms", pa.float64()),
+    ]
+)
+_ESQUEMA_ERRORES = pa.schema(
+    [
+        ("stage", pa.string()),
+        ("code", pa.string()),
+        ("error", pa.string()),
+        ("n", pa.int64()),
+    ]
+)
+
+
+# --- CLI ---
+
+
+def _imprimir(tabla: pa.Table, maximo: int) -> None:
+    print("\t".join(tabla.column_names))
+    for fila in tabla.slice(0, maximo).to_pylist():
+        print("\t".join("" if v is None else str(v) for v in fila.values()))
+    if tabla.num_rows > maximo:
+        print(f"... {tabla.num_rows - maximo} filas más")
+
+
+def main() -> None:
+    import typer
+
+    app = typer.Typer(
+        help="Bitácora de auditoría: compactación y consultas.", add_completion=False
+    )
+    directorio = typer.Option(AUDIT_DIR, "--dir", help="Directorio de auditoría.")
+    desde_opt = typer.Option(None, "--desde", help="Día inicial (YYYY-MM-DD).")
+    hasta_opt = typer.Option(None, "--hasta", help="Día final (YYYY-MM-DD).")
+    max_opt = typer.Option(200, "--max", help="Filas a imprimir.")
+
+    def _dia(valor: Optional[str]) -> Optional[date]:
+        return date.fromisoformat(valor) if valor else None
+
+    @app.command()
+    def compactar(
+        raiz: Path = directorio,
+        antes_de: Optional[str] = typer.Option(None, "--antes-de"),
+    ):
+        """Compacta los días cerrados a Parquet."""
+        for dia in Bitacora(raiz).compactar(_dia(antes_de)):
+            print(f"compactado {dia}")
+
+    @app.command()
+    def job(job_id: str, raiz: Path = directorio, maximo: int = max_opt):
+        """Todos los eventos de un job."""
+        _imprimir(Bitacora(raiz).eventos_job(job_id), maximo)
+
+    @app.command()
+    def latencias(
+        raiz: Path = directorio,
+        desde: Optional[str] = desde_opt,
+        hasta: Optional[str] = hasta_opt,
+        cuantil: float = typer.Option(0.99, "--cuantil"),
+        maximo: int = max_opt,
+    ):
+        """Cuantil de timing_ms por tool y hora."""
+        _imprimir(Bitacora(raiz).latencias(_dia(desde), _dia(hasta), cuantil), maximo)
+
+    @app.command()
+    def errores(
+        raiz: Path = directorio,
+        desde: Optional[str] = desde_opt,
+        hasta: Optional[str] = hasta_opt,
+        maximo: int = max_opt,
+    ):
+        """Errores por etapa y código."""
+        _imprimir(Bitacora(raiz).errores(_dia(desde), _dia(hasta)), maximo)
+
+    app()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# casandra/celador/cache.py
+"""
+Caché de resultados para tools deterministas (Anexo C.7).
+
+Llave: `name@version` + `dataset_version` + `query_hash(args normalizados,
+catalog_version)`. Dos niveles:
+  - memoria: LRU acotada por bytes (los sobres se guardan ya codificados)
+  - disco: un archivo msgpack por llave en `./data/cache/<dataset_version>/<tool>/`
+
+Cuando cambia `dataset_version` se purgan las entradas de versiones viejas en
+ambos niveles. En disco solo se borran directorios que creó esta caché (llevan
+el marcador `.casandra-cache`) y sin escrituras en `CASANDRA_CACHE_VERSION_TTL_S`:
+otro worker que aún no ve la versión nueva puede seguir usando la anterior,
+y `CASANDRA_CACHE_DIR` puede apuntar a un directorio con otras cosas. Igual que la auditoría, la caché es best-effort: si algo falla
+se comporta como un miss y nunca tumba la tool.
+"""
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import msgspec
+
+from ..dominio.sobre import SobreOk
+
+
+CACHE_DIR = Path(os.getenv("CASANDRA_CACHE_DIR", "./data/cache"))
+CACHE_MEM_BYTES = int(os.getenv("CASANDRA_CACHE_MEM_BYTES", str(64 * 1024 * 1024)))
+CACHE_DISK = os.getenv("CASANDRA_CACHE_DISK", "1") == "1"
+CACHE_VERSION_TTL_S = float(os.getenv("CASANDRA_CACHE_VERSION_TTL_S", "3600"))
+
+MARCADOR = ".casandra-cache"
+
+_SEGURO_RE = re.compile(r"[^A-Za-z0-9._@-]")
+
+_ENCODER = msgspec.msgpack.Encoder()
+_DECODER = msgspec.msgpack.Decoder(SobreOk)
+
+
+class ClaveCache(NamedTuple):
+    tool: str
+    dataset_version: str
+    query_hash: str
+
+
+class CacheMemoria:
+    """LRU acotada por la suma de bytes de los valores (no por número de entradas)."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._datos: OrderedDict[ClaveCache, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave: ClaveCache) -> Optional[bytes]:
+        with self._lock:
+            blob = self._datos.get(clave)
+            if blob is not None:
+                self._datos.move_to_end(clave)
+            return blob
+
+    def put(self, clave: ClaveCache, blob: bytes) -> None:
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            viejo = self._datos.pop(clave, None)
+            if viejo is not None:
+                self.bytes -= len(viejo)
+            self._datos[clave] = blob
+            self.bytes += len(blob)
+            while self.bytes > self.max_bytes:
+                _, fuera = self._datos.popitem(last=False)
+                self.bytes -= len(fuera)
+
+    def purgar_excepto(self, dataset_version: str) -> None:
+        with self._lock:
+            for clave in [
+                c for c in self._datos if c.dataset_version != dataset_version
+            ]:
+                self.bytes -= len(self._datos.pop(clave))
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+
+class CacheDisco:
+    """Un archivo por llave; escritura atómica (tmp + replace) para lectores concurrentes."""
+
+    def __init__(self, raiz: Path, ttl_s: float = CACHE_VERSION_TTL_S) -> None:
+        self.raiz = raiz
+        self.ttl_s = ttl_s
+
+    def _ruta(self, clave: ClaveCache) -> Path:
+        qh = clave.query_hash.split(":", 1)[-1]
+        return (
+            self.raiz
+            / _SEGURO_RE.sub("_", clave.dataset_version)
+            / _SEGURO_RE.sub("_", clave.tool)
+            / f"{qh}.msgpack"
+        )
+
+    def get(self, clave: ClaveCache) -> Optional[bytes]:
+        try:
+            return self._ruta(clave).read_bytes()
+        except OSError:
+            return None
+
+    def put(self, clave: ClaveCache, blob: bytes) -> None:
+        ruta = self._ruta(clave)
+        tmp = ruta.with_name(f"{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            # El marcador identifica el directorio como de esta caché; su mtime, la última escritura.
+            (ruta.parent.parent / MARCADOR).touch()
+            tmp.write_bytes(blob)
+            os.replace(tmp, ruta)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+
+    def purgar_excepto(
+        self, dataset_version: str, ttl_s: Optional[float] = None
+    ) -> None:
+        """Borra las versiones marcadas distintas de `dataset_version` sin escrituras en `ttl_s`."""
+        vigente = _SEGURO_RE.sub("_", dataset_version)
+        limite = time.time() - (self.ttl_s if ttl_s is None else ttl_s)
+        try:
+            viejas = [
+                p
+                for p in self.raiz.iterdir()
+                if p.name != vigente and _escrito_antes(p, limite)
+            ]
+        except OSError:
+            return
+        for p in viejas:
+            shutil.rmtree(p, ignore_errors=True)
+
+
+def _escrito_antes(version: Path, limite: float) -> bool:
+    """True si `version` es un directorio de la caché sin escrituras desde `limite`."""
+    try:
+        return (version / MARCADOR).stat().st_mtime <= limite
+    except OSError:
+        return False  # sin marcador: no es de la caché
+
+
+class CacheResultados:
+    """Fachada de dos niveles usada por `celar`."""
+
+    def __init__(self, memoria: CacheMemoria, disco: Optional[CacheDisco]) -> None:
+        self.memoria = memoria
+        self.disco = disco
+        self._dataset_version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _observar_version(self, dataset_version: str) -> None:
+        if dataset_version == self._dataset_version:
+            return
+        with self._lock:
+            if dataset_version == self._dataset_version:
+                return
+            previa = self._dataset_version
+            self._dataset_version = dataset_version
+        if previa is None:
+            return
+        self.memoria.purgar_excepto(dataset_version)
+        if self.disco is not None:
+            self.disco.purgar_excepto(dataset_version)
+
+    def obtener(self, clave: ClaveCache) -> Optional[tuple[SobreOk, str]]:
+        """Devuelve (sobre, nivel) con nivel "mem" | "disk", o None si es miss."""
+        self._observar_version(clave.dataset_version)
+        try:
+            blob = self.memoria.get(clave)
+            if blob is not None:
+                self.hits += 1
+                return _DECODER.decode(blob), "mem"
+
+            if self.disco is not None:
+                blob = self.disco.get(clave)
+                if blob is not None:
+                    sobre = _DECODER.decode(blob)
+                    self.memoria.put(clave, blob)
+                    self.hits += 1
+                    return sobre, "disk"
+        except msgspec.DecodeError:
+            pass
+        self.misses += 1
+        return None
+
+    def guardar(self, clave: ClaveCache, sobre: SobreOk) -> None:
+        try:
+            blob = _ENCODER.encode(sobre)
+        except (TypeError, msgspec.EncodeError):
+            return
+        self.memoria.put(clave, blob)
+        if self.disco is not None:
+            self.disco.put(clave, blob)
+
+    def limpiar(self) -> None:
+        self.memoria.purgar_excepto("")
+        if self.disco is not None:
+            self.disco.purgar_excepto("", ttl_s=0)
+
+
+cache_resultados = CacheResultados(
+    CacheMemoria(CACHE_MEM_BYTES),
+    CacheDisco(CACHE_DIR) if CACHE_DISK else None,
+)
@@ -0,0 +1,141 @@
+# casandra/celador/coalescencia.py
+"""
+Single-flight: llamadas concurrentes idénticas (misma llave normalizada)
+comparten una sola ejecución de la tool.
+
+- Sync (threadpool): el primer hilo es el líder y ejecuta; los demás esperan
+  un `threading.Event`.
+- Async: el líder lanza la corrutina como task; todos (líder incluido) la
+  esperan con `asyncio.shield`, así cancelar a un waiter no cancela la
+  ejecución compartida ni a los otros.
+
+Los errores del líder se propagan a todos los waiters. Cada seguidor recibe
+su propia copia del resultado (el líder lo congela una sola vez), de modo que
+el post-proceso de `celar` bajo su propio job_id no pisa el de los demás.
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import threading
+from typing import Any, Awaitable, Callable, Hashable, Literal, Optional
+
+import msgspec
+
+from ..dominio.sobre import SobreOk
+from .auditoria import get_job_id
+
+
+Rol = Literal["leader", "follower"]
+
+_ENCODER = msgspec.msgpack.Encoder()
+_DECODER = msgspec.msgpack.Decoder(SobreOk)
+
+
+def _congelar(resultado: Any) -> Any:
+    if isinstance(resultado, SobreOk):
+        return _ENCODER.encode(resultado)
+    return copy.deepcopy(resultado)
+
+
+def _descongelar(congelado: Any) -> Any:
+    if isinstance(congelado, bytes):
+        return _DECODER.decode(congelado)
+    return copy.deepcopy(congelado)
+
+
+class _Vuelo:
+    __slots__ = ("lider_job_id", "evento", "congelado", "error", "seguidores", "task")
+
+    def __init__(self, lider_job_id: str) -> None:
+        self.lider_job_id = lider_job_id
+        self.evento = threading.Event()
+        self.congelado: Any = None
+        self.error: Optional[BaseException] = None
+        self.seguidores = 0
+        self.task: Optional[asyncio.Future] = None
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._vuelos: dict[Hashable, _Vuelo] = {}
+        self._lock = threading.Lock()
+
+    def _unirse(self, clave: Hashable) -> tuple[_Vuelo, bool]:
+        with self._lock:
+            vuelo = self._vuelos.get(clave)
+            if vuelo is None:
+                vuelo = _Vuelo(get_job_id())
+                self._vuelos[clave] = vuelo
+                return vuelo, True
+            vuelo.seguidores += 1
+            return vuelo, False
+
+    def _soltar(self, clave: Hashable, vuelo: _Vuelo) -> None:
+        with self._lock:
+            if self._vuelos.get(clave) is vuelo:
+                del self._vuelos[clave]
+
+    def ejecutar(
+        self,
+        clave: Hashable,
+        fn: Callable[[], Any],
+        auditar: Callable[[Rol, _Vuelo], None],
+    ) -> tuple[Any, Rol]:
+        """
+        Versión sync. Devuelve (resultado, rol).
+        `auditar` se llama al unirse (seguidor) o al terminar (líder, con el
+        total de seguidores), también cuando la ejecución falla.
+        """
+        vuelo, lider = self._unirse(clave)
+        if not lider:
+            auditar("follower", vuelo)
+            vuelo.evento.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return _descongelar(vuelo.congelado), "follower"
+
+        try:
+            resultado = fn()
+            vuelo.congelado = _congelar(resultado)
+            return resultado, "leader"
+        except BaseException as e:
+            vuelo.error = e
+            raise
+        finally:
+            self._soltar(clave, vuelo)
+            vuelo.evento.set()
+            auditar("leader", vuelo)
+
+    async def ejecutar_async(
+        self,
+        clave: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        auditar: Callable[[Rol, _Vuelo], None],
+    ) -> tuple[Any, Rol]:
+        """Versión async. La ejecución compartida vive en su propia task."""
+        loop = asyncio.get_running_loop()
+        clave = (id(loop), clave)  # las tasks no cruzan event loops
+        vuelo, lider = self._unirse(clave)
+
+        if not lider:
+            auditar("follower", vuelo)
+            await asyncio.shield(vuelo.task)
+            return _descongelar(vuelo.congelado), "follower"
+
+        async def _correr() -> Any:
+            try:
+                resultado = await fn()
+                vuelo.congelado = _congelar(resultado)
+                return resultado
+            finally:
+                self._soltar(clave, vuelo)
+
+        vuelo.task = loop.create_task(_correr())
+        try:
+            return await asyncio.shield(vuelo.task), "leader"
+        finally:
+            auditar("leader", vuelo)
+
+
+single_flight = SingleFlight()
@@ -1,7 +1,9 @@
 # casandra/celador/errores.py
 from __future__ import annotations
 
-from typing import Any, Literal, Optional, TypedDict, Type
+from typing import Any, Optional, Sequence, Type
+
+from ..dominio.sobre import SobreError, SobreErrorDetails, SobreMeta
 
 
 # Excepciones internas (contrato estable con el doc)
@@ -21,40 +23,52 @@ class HerramientaError(CeladorError):
     """Falló una tool (cálculo/ejecución) de forma controlada."""
 
 
+class LimiteRecursosError(CeladorError):
+    """La tool excedió un límite de recursos (p. ej. su tiempo de reloj)."""
+
+
+class PresupuestoExcedido(LimiteRecursosError):
+    """El costo estimado del plan supera el presupuesto; se rechaza antes de ejecutar."""
+
+    def __init__(self, mensaje: str, hints: Sequence[str] = ()) -> None:
+        super().__init__(mensaje)
+        self.hints = list(hints)
+
+
 class RangoFueraDeCorte(ValidacionError):
     """Rango temporal fuera del watermark del dataset (strict_time)."""
 
 
+class RangoVacio(ValidacionError):
+    """La conjunción de rangos temporales quedó vacía (from > to)."""
+
+
+class ArtefactoNoEncontrado(DatosFaltantesError):
+    """El artefacto pedido no existe o ya fue recolectado."""
+
+
 # Mapa → (código_sobre, http_status)
 ERROR_MAP: dict[Type[Exception], tuple[str, int]] = {
     ValidacionError: ("INVALID_PAYLOAD", 422),
     DatosFaltantesError: ("DATA_QUALITY_ISSUE", 409),
     HerramientaError: ("COMPUTE_ERROR", 500),
+    LimiteRecursosError: ("RESOURCE_LIMIT", 503),
+    PresupuestoExcedido: ("RESOURCE_LIMIT", 422),
     RangoFueraDeCorte: ("INVALID_DATE_RANGE", 422),
+    RangoVacio: ("INVALID_DATE_RANGE", 422),
+    ArtefactoNoEncontrado: ("ARTIFACT_NOT_FOUND", 404),
 }
 
 
-class SobreErrorDetails(TypedDict):
-    code: str
-    details: str
-    hints: list[str]
-
-
-class SobreError(TypedDict):
-    status: Literal["error"]
-    tool: str
-    error: SobreErrorDetails
-    meta: dict[str, Any]
-
-
 def error_code_http(exc: Exception) -> tuple[str, int]:
     """
-    Devuelve (code, http) usando el mapa, respetando herencia.
+    Devuelve (code, http) usando el mapa, respetando herencia: gana la clase
+    más específica del MRO (RangoFueraDeCorte antes que ValidacionError).
     Si no hay match, cae a COMPUTE_ERROR/500.
     """
-    for exc_type, (code, http) in ERROR_MAP.items():
-        if isinstance(exc, exc_type):
-            return code, http
+    for exc_type in type(exc).__mro__:
+        if exc_type in ERROR_MAP:
+            return ERROR_MAP[exc_type]
     return "COMPUTE_ERROR", 500
 
 
@@ -66,19 +80,19 @@ def a_sobre_error(
     hints: Optional[list[str]] = None,
 ) -> SobreError:
     code, _http = error_code_http(exc)
-    return {
-        "status": "error",
-        "tool": tool_name,
-        "error": {
-            "code": code,
-            "details": str(exc),
-            "hints": hints or [],
-        },
-        "meta": {
-            "schema_version": schema_version,
-            "tool_version": tool_version,
-        },
-    }
+    if hints is None:
+        hints = getattr(exc, "hints", None)  # errores que traen sus propias pistas
+    return SobreError(
+        tool=tool_name,
+        error=SobreErrorDetails(code=code, details=str(exc), hints=list(hints or [])),
+        meta=SobreMeta(schema_version=schema_version, tool_version=tool_version),
+    )
+
+
+_CAMPOS_META = frozenset(SobreMeta.__struct_fields__) - {
+    "schema_version",
+    "tool_version",
+}
 
 
 def sobre_compute_error(
@@ -93,17 +107,16 @@ def sobre_compute_error(
     """
     Constructor tipado de SobreError para fallos no controlados (500).
     Mantiene el shape estable y evita dicts sueltos por el código.
+    `extra_meta` solo acepta campos declarados en SobreMeta; los demás se
+    ignoran (construir el error no puede fallar).
     """
-    meta: dict[str, Any] = {
-        "schema_version": schema_version,
-        "tool_version": tool_version,
-    }
-    if extra_meta:
-        meta.update(extra_meta)
-
-    return {
-        "status": "error",
-        "tool": tool_name,
-        "error": {"code": "COMPUTE_ERROR", "details": details, "hints": hints or []},
-        "meta": meta,
-    }
+    extra = {k: v for k, v in (extra_meta or {}).items() if k in _CAMPOS_META}
+    meta = SobreMeta(schema_version=schema_version, tool_version=tool_version, **extra)
+
+    return SobreError(
+        tool=tool_name,
+        error=SobreErrorDetails(
+            code="COMPUTE_ERROR", details=details, hints=hints or []
+        ),
+        meta=meta,
+    )
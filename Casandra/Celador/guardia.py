@@ -2,10 +2,16 @@
 from __future__ import annotations
 
 from functools import wraps
+import inspect
 import time
-from typing import Any, Callable, TypeVar
+from typing import Any, Awaitable, Callable, TypeVar
 
-from .auditoria import audit, get_job_id
+from ..dominio.sobre import SobreOk
+from .auditoria import audit, get_job_id, query_hash
+from .cache import ClaveCache, cache_resultados
+from .coalescencia import single_flight
+from .procesos import pool_cpu
+from .telemetria import TOOL_CACHE, TOOL_EN_VUELO, TOOL_LATENCIA, TOOL_RESULTADOS
 from .errores import (
     CeladorError,
     a_sobre_error,
@@ -13,8 +19,13 @@ from .errores import (
     SobreError,
     sobre_compute_error,
 )
+from .versiones import catalog_version, dataset_version
 
-T = TypeVar("T", bound=dict)
+T = TypeVar("T", SobreOk, dict)
+
+
+def _ms(t0: float) -> int:
+    return int((time.perf_counter() - t0) * 1000)
 
 
 def _warn_if_noncanonical(tool: str) -> None:
@@ -23,88 +34,352 @@ def _warn_if_noncanonical(tool: str) -> None:
         audit("tool.name_warning", {"tool": tool, "reason": "missing @version"})
 
 
+def _completar_meta(
+    sobre_ok: SobreOk | dict,
+    tool_name: str,
+    schema_version: str,
+    tool_version: str,
+    dt: int,
+) -> None:
+    # Inyección suave de meta consistente: solo llena lo que la tool no puso.
+    if isinstance(sobre_ok, SobreOk):
+        meta = sobre_ok.meta
+        if meta.schema_version is None:
+            meta.schema_version = schema_version
+        if meta.tool_version is None:
+            meta.tool_version = tool_version
+        if meta.timing_ms is None:
+            meta.timing_ms = dt
+        if not sobre_ok.tool:
+            sobre_ok.tool = tool_name
+        return
+
+    # Compat: tools que aún devuelven dicts.
+    meta_d = sobre_ok.setdefault("meta", {})
+    meta_d.setdefault("schema_version", schema_version)
+    meta_d.setdefault("tool_version", tool_version)
+    meta_d.setdefault("timing_ms", dt)
+    sobre_ok.setdefault("tool", tool_name)
+
+
+def _clave_cache(
+    tool: str, firma: inspect.Signature, args: tuple, kwargs: dict[str, Any]
+) -> ClaveCache | None:
+    # Solo args por nombre: son los que forman el plan normalizado.
+    if args:
+        return None
+    try:
+        ligados = firma.bind(**kwargs)
+    except TypeError:
+        return None  # la tool reventará con su propio error; no se cachea
+    ligados.apply_defaults()  # omitir un default y pasarlo explícito es el mismo plan
+    try:
+        version = dataset_version()
+    except CeladorError:
+        return None  # sin dataset vigente no hay llave: la tool reportará el error
+    qh = query_hash({"tool": tool, "args": ligados.arguments}, catalog_version())
+    return ClaveCache(tool, version, qh)
+
+
+class Guardia:
+    """
+    Pasos comunes de `celar`, compartidos por el wrapper sync y el async:
+    auditoría, caché, coalescencia, métricas y conversión de errores a Sobre.
+    El Orquestador corre cada paso de un plan con la Guardia de su tool.
+
+    `ejecutar` / `ejecutar_async` propagan la excepción de la tool tras
+    auditarla; el wrapper la convierte en SobreError. La latencia y el gauge
+    en vuelo se cierran una sola vez, en el `finally`.
+    """
+
+    def __init__(
+        self,
+        tool_name: str,
+        schema_version: str,
+        tool_version: str,
+        deterministic: bool,
+        coalesce: bool,
+    ) -> None:
+        self.tool_name = tool_name
+        self.schema_version = schema_version
+        self.tool_version = tool_version
+        self.deterministic = deterministic
+        self.coalesce = coalesce
+        # Hijos de las métricas resueltos una vez: observar en caliente no busca etiquetas.
+        self._latencia = TOOL_LATENCIA.con(tool_name)
+        self._en_vuelo = TOOL_EN_VUELO.con(tool_name)
+        self._ok = TOOL_RESULTADOS.con(tool_name, "ok", "")
+        self._hit = TOOL_CACHE.con(tool_name, "hit")
+        self._miss = TOOL_CACHE.con(tool_name, "miss")
+
+    def _abrir(self, argumentos: dict[str, Any]) -> float:
+        _ = get_job_id()  # asegura job_id en contexto
+        _warn_if_noncanonical(self.tool_name)
+        audit("tool.start", {"tool": self.tool_name, "args": argumentos})
+        return time.perf_counter()
+
+    def _terminar(self, t0: float) -> None:
+        self._latencia.observar(time.perf_counter() - t0)
+        self._en_vuelo.dec()
+
+    def _clave(self, clave_de: Callable[[], ClaveCache | None]) -> ClaveCache | None:
+        if self.deterministic or self.coalesce:
+            return clave_de()
+        return None
+
+    def _buscar(
+        self,
+        clave: ClaveCache | None,
+        t0: float,
+        vigente: Callable[[SobreOk], bool] | None,
+    ) -> SobreOk | None:
+        if clave is None or not self.deterministic:
+            return None
+        hit = cache_resultados.obtener(clave)
+        if hit is None or (vigente is not None and not vigente(hit[0])):
+            self._miss.inc()
+            return None
+        self._hit.inc()
+        sobre_hit, nivel = hit
+        dt = _ms(t0)
+        sobre_hit.meta.timing_ms = dt
+        sobre_hit.meta.cache = "hit"
+        audit(
+            "tool.cache",
+            {
+                "tool": self.tool_name,
+                "cache": "hit",
+                "tier": nivel,
+                "query_hash": clave.query_hash,
+            },
+        )
+        self._ok.inc()
+        audit("tool.ok", {"tool": self.tool_name, "timing_ms": dt, "cache": "hit"})
+        return sobre_hit
+
+    def _auditor(self, clave: ClaveCache) -> Callable[[str, Any], None]:
+        def auditar(rol: str, vuelo: Any) -> None:
+            payload = {
+                "tool": self.tool_name,
+                "role": rol,
+                "leader_job_id": vuelo.lider_job_id,
+                "query_hash": clave.query_hash,
+            }
+            if rol == "leader":
+                payload["followers"] = vuelo.seguidores
+            audit("tool.coalesce", payload)
+
+        return auditar
+
+    def _cerrar_ok(
+        self, sobre_ok: T, t0: float, clave: ClaveCache | None, *, guardar: bool = True
+    ) -> T:
+        dt = _ms(t0)
+        # Primero el meta: si la tool devolvió algo que no es Sobre, esto falla
+        # y cuenta como excepción, no como ok.
+        _completar_meta(
+            sobre_ok, self.tool_name, self.schema_version, self.tool_version, dt
+        )
+
+        if clave is not None and self.deterministic and isinstance(sobre_ok, SobreOk):
+            meta = sobre_ok.meta
+            meta.query_hash = clave.query_hash
+            if meta.dataset_version is None:
+                meta.dataset_version = clave.dataset_version
+            meta.cache = "miss"
+            if guardar:
+                cache_resultados.guardar(clave, sobre_ok)
+                audit(
+                    "tool.cache",
+                    {
+                        "tool": self.tool_name,
+                        "cache": "miss",
+                        "query_hash": clave.query_hash,
+                    },
+                )
+
+        self._ok.inc()
+        audit("tool.ok", {"tool": self.tool_name, "timing_ms": dt})
+        return sobre_ok
+
+    def _fallo(self, e: Exception, t0: float) -> None:
+        dt = _ms(t0)
+        if isinstance(e, CeladorError):
+            code, _http = error_code_http(e)
+            TOOL_RESULTADOS.con(self.tool_name, "error", code).inc()
+            audit(
+                "tool.error",
+                {
+                    "tool": self.tool_name,
+                    "code": code,
+                    "error": type(e).__name__,
+                    "details": str(e),
+                    "timing_ms": dt,
+                },
+            )
+            return
+        TOOL_RESULTADOS.con(self.tool_name, "exception", "COMPUTE_ERROR").inc()
+        audit(
+            "tool.exception",
+            {
+                "tool": self.tool_name,
+                "error": type(e).__name__,
+                "details": str(e),
+                "timing_ms": dt,
+            },
+        )
+
+    def ejecutar(
+        self,
+        llamar: Callable[[], T],
+        argumentos: dict[str, Any],
+        clave_de: Callable[[], ClaveCache | None],
+        vigente: Callable[[SobreOk], bool] | None = None,
+    ) -> T:
+        """
+        Corre `llamar` bajo la guardia; los errores se auditan y se propagan.
+        `vigente` descarta un hit de caché que ya no sirve (p. ej. cuyos
+        artefactos fueron recolectados): cuenta como miss y se recalcula.
+        """
+        t0 = self._abrir(argumentos)
+        self._en_vuelo.inc()
+        try:
+            clave = self._clave(clave_de)
+            hit = self._buscar(clave, t0, vigente)
+            if hit is not None:
+                return hit
+            if self.coalesce and clave is not None:
+                sobre_ok, rol = single_flight.ejecutar(
+                    clave, llamar, self._auditor(clave)
+                )
+                return self._cerrar_ok(sobre_ok, t0, clave, guardar=rol == "leader")
+            return self._cerrar_ok(llamar(), t0, clave)
+        except Exception as e:
+            self._fallo(e, t0)
+            raise
+        finally:
+            self._terminar(t0)
+
+    async def ejecutar_async(
+        self,
+        llamar: Callable[[], Awaitable[T]],
+        argumentos: dict[str, Any],
+        clave_de: Callable[[], ClaveCache | None],
+        vigente: Callable[[SobreOk], bool] | None = None,
+    ) -> T:
+        t0 = self._abrir(argumentos)
+        self._en_vuelo.inc()
+        try:
+            clave = self._clave(clave_de)
+            hit = self._buscar(clave, t0, vigente)
+            if hit is not None:
+                return hit
+            if self.coalesce and clave is not None:
+                sobre_ok, rol = await single_flight.ejecutar_async(
+                    clave, llamar, self._auditor(clave)
+                )
+                return self._cerrar_ok(sobre_ok, t0, clave, guardar=rol == "leader")
+            return self._cerrar_ok(await llamar(), t0, clave)
+        except Exception as e:
+            self._fallo(e, t0)
+            raise
+        finally:
+            self._terminar(t0)
+
+    def sobre_error(self, e: Exception, t0: float) -> tuple[SobreError, int]:
+        """El Sobre de error (ya auditado por `ejecutar`) y su status HTTP."""
+        if isinstance(e, CeladorError):
+            _code, http = error_code_http(e)
+            sobre_err = a_sobre_error(
+                e, self.tool_name, self.schema_version, self.tool_version
+            )
+            sobre_err.meta.timing_ms = _ms(t0)
+            return sobre_err, http
+        sobre_err = sobre_compute_error(
+            tool_name=self.tool_name,
+            schema_version=self.schema_version,
+            tool_version=self.tool_version,
+            details="Error interno no controlado durante la ejecución de la tool.",
+            extra_meta={"timing_ms": _ms(t0)},
+        )
+        return sobre_err, 500
+
+
 def celar(
     tool_name: str,
     schema_version: str = "1.0.0",
     tool_version: str = "1.0.0",
+    *,
+    deterministic: bool = False,
+    coalesce: bool = False,
+    cpu_bound: bool = False,
+    limite_s: float | None = None,
 ) -> Callable[[Callable[..., T]], Callable[..., tuple[T | SobreError, int]]]:
     """
-    Decorador para funciones Tool:
+    Decorador para funciones Tool (sync o async):
     - Audita inicio/fin/error
     - Captura errores y los convierte a SobreError
     - Devuelve (sobre_ok | sobre_error, http_status)
+    - Si `deterministic=True`, consulta/llena la caché de resultados
+      (solo se cachean SobreOk; meta.cache y el evento `tool.cache` reflejan hit/miss)
+    - Si `coalesce=True`, llamadas concurrentes con los mismos args normalizados
+      comparten una ejecución (evento `tool.coalesce` con líder y seguidores)
+    - Si `cpu_bound=True` (solo tools sync de nivel módulo), el cuerpo corre en
+      el pool de procesos (`procesos.pool_cpu`) en vez de en el hilo del
+      request; caché, coalescencia y auditoría siguen aquí. `limite_s` es su
+      límite de reloj: al excederlo el Sobre sale con RESOURCE_LIMIT.
 
-    La tool decorada debe devolver el 'sobre ok' (dict) en éxito.
+    La tool decorada debe devolver el 'sobre ok' (SobreOk; se acepta dict por compat).
     """
 
     def deco(fn: Callable[..., T]) -> Callable[..., tuple[T | SobreError, int]]:
-        @wraps(fn)
-        def wrapper(*args: Any, **kwargs: Any):
-            _ = get_job_id()  # asegura job_id en contexto
-            _warn_if_noncanonical(tool_name)
-
-            t0 = time.perf_counter()
-            audit("tool.start", {"tool": tool_name, "args": kwargs})
+        g = Guardia(tool_name, schema_version, tool_version, deterministic, coalesce)
+        firma = inspect.signature(fn)
 
-            try:
-                sobre_ok = fn(*args, **kwargs)
-                dt = int((time.perf_counter() - t0) * 1000)
+        if limite_s is not None and not cpu_bound:
+            raise ValueError(
+                f"{tool_name}: limite_s requiere cpu_bound=True (un hilo no se puede interrumpir)"
+            )
+        if cpu_bound:
+            if inspect.iscoroutinefunction(fn):
+                raise TypeError(f"{tool_name}: una tool cpu_bound debe ser sync")
+            pool_cpu.registrar_modulo(fn.__module__)
 
-                # Inyección suave de meta consistente
-                meta = sobre_ok.setdefault("meta", {})
-                meta.setdefault("schema_version", schema_version)
-                meta.setdefault("tool_version", tool_version)
-                meta.setdefault("timing_ms", dt)
+        if inspect.iscoroutinefunction(fn):
 
-                # Asegurar coherencia del productor (si la tool no lo puso)
-                sobre_ok.setdefault("tool", tool_name)
+            @wraps(fn)
+            async def wrapper_async(*args: Any, **kwargs: Any):
+                t0 = time.perf_counter()
 
-                audit("tool.ok", {"tool": tool_name, "timing_ms": dt})
-                return sobre_ok, 200
+                async def llamar() -> T:
+                    return await fn(*args, **kwargs)
 
-            except CeladorError as e:
-                dt = int((time.perf_counter() - t0) * 1000)
-                code, http = error_code_http(e)
+                def clave_de() -> ClaveCache | None:
+                    return _clave_cache(tool_name, firma, args, kwargs)
 
-                audit(
-                    "tool.error",
-                    {
-                        "tool": tool_name,
-                        "code": code,
-                        "error": type(e).__name__,
-                        "details": str(e),
-                        "timing_ms": dt,
-                    },
-                )
+                try:
+                    return await g.ejecutar_async(llamar, kwargs, clave_de), 200
+                except Exception as e:
+                    return g.sobre_error(e, t0)
 
-                sobre_err = a_sobre_error(e, tool_name, schema_version, tool_version)
-                sobre_err.setdefault("tool", tool_name)
-                sobre_err_meta = sobre_err.setdefault("meta", {})
-                sobre_err_meta.setdefault("timing_ms", dt)
+            return wrapper_async
 
-                return sobre_err, http
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any):
+            t0 = time.perf_counter()
 
-            except Exception as e:
-                dt = int((time.perf_counter() - t0) * 1000)
+            def llamar() -> T:
+                if cpu_bound:
+                    return pool_cpu.ejecutar(fn, args, kwargs, limite_s)
+                return fn(*args, **kwargs)
 
-                audit(
-                    "tool.exception",
-                    {
-                        "tool": tool_name,
-                        "error": type(e).__name__,
-                        "details": str(e),
-                        "timing_ms": dt,
-                    },
-                )
+            def clave_de() -> ClaveCache | None:
+                return _clave_cache(tool_name, firma, args, kwargs)
 
-                sobre_err = sobre_compute_error(
-                    tool_name=tool_name,
-                    schema_version=schema_version,
-                    tool_version=tool_version,
-                    details="Error interno no controlado durante la ejecución de la tool.",
-                    extra_meta={"timing_ms": dt},
-                )
-                return sobre_err, 500
+            try:
+                return g.ejecutar(llamar, kwargs, clave_de), 200
+            except Exception as e:
+                return g.sobre_error(e, t0)
 
         return wrapper
 
@@ -0,0 +1,412 @@
+# casandra/celador/procesos.py
+"""
+Pool de procesos para tools CPU-bound (`celar(..., cpu_bound=True)` y las
+tools de plan con `ToolSpec.cpu_bound`, vía `Herramientas.spec.calcular`).
+
+Una tool de cálculo pesado corriendo en el hilo del request retiene el GIL y
+frena a todos los demás requests del worker. Estas tools se ejecutan en
+procesos hijos administrados aquí:
+
+- Cada trabajador es un proceso con su propio Pipe y atiende una tarea a la
+  vez; si una tarea excede su límite de reloj (`limite_s`) se mata SOLO ese
+  proceso y se repone, y el request recibe `LimiteRecursosError`
+  (RESOURCE_LIMIT). La espera por un trabajador libre cuenta dentro del límite.
+- La función se envía por referencia (módulo + qualname) y el hijo resuelve
+  la original, sin el wrapper de `celar`: caché, coalescencia, métricas y
+  auditoría de inicio/fin siguen en el proceso padre.
+- El `job_id` del request viaja con la tarea; los eventos que audita la tool
+  en el hijo quedan correlacionados (el hijo drena su sumidero al terminar).
+- Argumentos grandes (tablas/lotes Arrow, ndarrays numéricos) no se picklean:
+  se escriben como archivo Arrow IPC en memoria compartida (/dev/shm si
+  existe) y el hijo los mapea sin copiar. Solo los args de primer nivel.
+  pyarrow y numpy no se importan aquí: un argumento solo puede ser de sus
+  tipos si quien llama ya los cargó (el arranque del Expositor no los paga).
+- `calentar()` (lifespan) arranca los procesos e importa los módulos de las
+  tools CPU-bound, para que el primer request no pague spawn + imports.
+
+Método de arranque: `forkserver` en POSIX (seguro con los hilos de DuckDB y
+de auditoría); `spawn` en el resto.
+"""
+from __future__ import annotations
+
+import atexit
+import importlib
+import inspect
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Literal, Optional
+
+from .auditoria import flush_auditoria, get_job_id, set_job_id
+from .errores import HerramientaError, LimiteRecursosError
+
+
+CPU_PROCESOS = int(
+    os.getenv("CASANDRA_CPU_PROCESOS", str(max(1, (os.cpu_count() or 2) - 1)))
+)
+CPU_METODO = os.getenv(
+    "CASANDRA_CPU_METODO",
+    (
+        "forkserver"
+        if "forkserver" in multiprocessing.get_all_start_methods()
+        else "spawn"
+    ),
+)
+# Desde este tamaño un argumento Arrow/ndarray viaja por memoria compartida.
+CPU_COMPARTIR_BYTES = int(os.getenv("CASANDRA_CPU_COMPARTIR_BYTES", str(1 << 20)))
+CPU_COMPARTIDO_DIR = Path(
+    os.getenv(
+        "CASANDRA_CPU_COMPARTIDO_DIR",
+        "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+    )
+)
+
+Referencia = tuple[str, str]  # (módulo, qualname)
+
+
+@dataclass(frozen=True)
+class _Compartido:
+    """Argumento publicado como archivo Arrow IPC; el hijo lo mapea en memoria."""
+
+    ruta: str
+    tipo: Literal["tabla", "lote", "tensor"]
+
+
+def referencia(fn: Callable[..., Any]) -> Referencia:
+    """(módulo, qualname) de una función de nivel módulo; el hijo la resuelve por import."""
+    qualname = getattr(fn, "__qualname__", "")
+    if not qualname or "<locals>" in qualname or "<lambda>" in qualname:
+        raise TypeError(
+            f"{fn!r}: una tool cpu_bound debe ser una función de nivel módulo"
+        )
+    return fn.__module__, qualname
+
+
+def _resolver(ref: Referencia) -> Callable[..., Any]:
+    obj: Any = importlib.import_module(ref[0])
+    for parte in ref[1].split("."):
+        obj = getattr(obj, parte)
+    return inspect.unwrap(obj)  # la función original, no el wrapper de celar
+
+
+# --- Argumentos por memoria compartida ---
+
+
+def _exportar(valor: Any, archivos: list[Path]) -> Any:
+    pa, np = sys.modules.get("pyarrow"), sys.modules.get("numpy")
+    if pa is not None and isinstance(valor, (pa.Table, pa.RecordBatch)):
+        tipo = "tabla" if isinstance(valor, pa.Table) else "lote"
+    elif (
+        np is not None and isinstance(valor, np.ndarray) and valor.dtype.kind in "biuf"
+    ):
+        tipo = "tensor"
+    else:
+        return valor
+    if valor.nbytes < CPU_COMPARTIR_BYTES:
+        return valor
+    import pyarrow as pa
+
+    ruta = CPU_COMPARTIDO_DIR / f"casandra-cpu-{os.getpid()}-{uuid.uuid4().hex}.arrow"
+    archivos.append(ruta)
+    with pa.OSFile(str(ruta), "wb") as sink:
+        if tipo == "tensor":
+            pa.ipc.write_tensor(pa.Tensor.from_numpy(np.ascontiguousarray(valor)), sink)
+        else:
+            with pa.ipc.new_file(sink, valor.schema) as escritor:
+                escritor.write(valor)
+    return _Compartido(str(ruta), tipo)
+
+
+def _importar(valor: Any) -> Any:
+    if not isinstance(valor, _Compartido):
+        return valor
+    import pyarrow as pa
+
+    mapa = pa.memory_map(valor.ruta)  # los buffers quedan ligados al mapa: sin copia
+    if valor.tipo == "tensor":
+        return pa.ipc.read_tensor(mapa).to_numpy()
+    lector = pa.ipc.open_file(mapa)
+    return lector.read_all() if valor.tipo == "tabla" else lector.get_batch(0)
+
+
+# --- Proceso hijo ---
+
+
+def _bucle(conexion: Any, inicializadores: tuple[Referencia, ...]) -> None:
+    # Ctrl-C llega a todo el grupo de procesos: el padre decide cuándo cerrar.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for ref in inicializadores:
+        _resolver(ref)()
+    while True:
+        try:
+            mensaje = conexion.recv()
+        except (EOFError, OSError):
+            return
+        if mensaje is None:
+            return
+        orden, carga = mensaje
+        if orden == "calentar":
+            for modulo in carga:
+                try:
+                    importlib.import_module(modulo)
+                except Exception:
+                    pass  # el error real aparecerá (y se reportará) al ejecutar
+            conexion.send(("ok", os.getpid()))
+            continue
+
+        ref, args, kwargs, job_id = carga
+        set_job_id(job_id)
+        try:
+            fn = _resolver(ref)
+            resultado = fn(
+                *(_importar(a) for a in args),
+                **{k: _importar(v) for k, v in kwargs.items()},
+            )
+            respuesta: tuple[str, Any] = ("ok", resultado)
+        except Exception as e:
+            respuesta = ("error", e)
+        finally:
+            flush_auditoria()
+        try:
+            conexion.send(respuesta)
+        except Exception as e:
+            # Resultado (o excepción) que no se puede picklear: se reporta como fallo de la tool.
+            conexion.send(
+                ("error", HerramientaError(f"{ref[1]}: respuesta no serializable: {e}"))
+            )
+
+
+class _Trabajador:
+    __slots__ = ("proceso", "conexion")
+
+    def __init__(self, ctx: Any, inicializadores: tuple[Referencia, ...]) -> None:
+        self.conexion, hijo = ctx.Pipe()
+        self.proceso = ctx.Process(
+            target=_bucle,
+            args=(hijo, inicializadores),
+            name="casandra-cpu",
+            daemon=True,
+        )
+        self.proceso.start()
+        hijo.close()
+
+    def terminar(self) -> None:
+        self.proceso.kill()
+        self.proceso.join(1.0)
+        self.conexion.close()
+
+
+# --- Pool (proceso padre) ---
+
+
+class PoolCPU:
+    def __init__(self, procesos: int = CPU_PROCESOS, metodo: str = CPU_METODO) -> None:
+        self.procesos = max(1, procesos)
+        self.metodo = metodo
+        self._ctx = multiprocessing.get_context(metodo)
+        self._cond = threading.Condition()
+        self._libres: list[_Trabajador] = []
+        self._vivos = 0
+        self._pid = os.getpid()
+        self._modulos: set[str] = set()
+        self._inicializadores: list[Referencia] = []
+
+        self.tareas = 0
+        self.limites = 0
+        self.caidas = 0
+
+    # --- configuración ---
+    def registrar_modulo(self, modulo: str) -> None:
+        """Módulo que `calentar()` importa en cada hijo (el de cada tool cpu_bound)."""
+        with self._cond:
+            self._modulos.add(modulo)
+
+    def al_iniciar(self, fn: Callable[[], Any]) -> None:
+        """Función de nivel módulo que corre en cada hijo al arrancar (p. ej. registrar proveedores)."""
+        ref = referencia(fn)
+        with self._cond:
+            if ref not in self._inicializadores:
+                self._inicializadores.append(ref)
+
+    @property
+    def en_uso(self) -> bool:
+        return bool(self._modulos)
+
+    # --- trabajadores ---
+    def _verificar_fork(self) -> None:
+        # Tras un fork, los hijos (y sus pipes) son del padre: se empieza de cero.
+        if self._pid != os.getpid():
+            self._libres, self._vivos, self._pid = [], 0, os.getpid()
+
+    def _tomar(self, fin: float, limite_s: Optional[float]) -> _Trabajador:
+        with self._cond:
+            self._verificar_fork()
+            while not self._libres and self._vivos >= self.procesos:
+                restante = fin - time.monotonic()
+                if restante <= 0:
+                    self.limites += 1
+                    raise LimiteRecursosError(
+                        f"sin proceso de cómputo libre en {limite_s:g} s"
+                    )
+                self._cond.wait(restante)
+            if self._libres:
+                return self._libres.pop()
+            self._vivos += 1
+            inicializadores = tuple(self._inicializadores)
+        try:
+            return _Trabajador(
+                self._ctx, inicializadores
+            )  # fuera del lock: arrancar tarda
+        except BaseException:
+            self._soltar(None)
+            raise
+
+    def _devolver(self, trabajador: _Trabajador) -> None:
+        with self._cond:
+            self._libres.append(trabajador)
+            self._cond.notify()
+
+    def _soltar(self, trabajador: Optional[_Trabajador]) -> None:
+        """Descarta un trabajador (colgado o muerto) y libera su lugar."""
+        if trabajador is not None:
+            trabajador.terminar()
+        with self._cond:
+            self._vivos -= 1
+            self._cond.notify()
+
+    # --- ejecución ---
+    def ejecutar(
+        self,
+        fn: Callable[..., Any],
+        args: tuple = (),
+        kwargs: Optional[dict[str, Any]] = None,
+        limite_s: Optional[float] = None,
+    ) -> Any:
+        """Corre `fn(*args, **kwargs)` en un hijo; propaga su excepción tal cual."""
+        fin = time.monotonic() + limite_s if limite_s else float("inf")
+        ref = referencia(fn)
+        archivos: list[Path] = []
+        try:
+            args_x = tuple(_exportar(a, archivos) for a in args)
+            kwargs_x = {k: _exportar(v, archivos) for k, v in (kwargs or {}).items()}
+            trabajador = self._tomar(fin, limite_s)
+            sano = False  # si el trabajador puede volver al pool; si no, se mata
+            try:
+                try:
+                    trabajador.conexion.send(
+                        ("tarea", (ref, args_x, kwargs_x, get_job_id()))
+                    )
+                except (EOFError, OSError):
+                    raise
+                except Exception as e:
+                    # Se picklea antes de escribir: el pipe no recibió nada.
+                    sano = True
+                    raise HerramientaError(
+                        f"{ref[1]}: argumentos no serializables: {e}"
+                    ) from e
+                espera = (
+                    None if fin == float("inf") else max(0.0, fin - time.monotonic())
+                )
+                if not trabajador.conexion.poll(espera):
+                    self.limites += 1
+                    raise LimiteRecursosError(
+                        f"{ref[1]}: superó el límite de {limite_s:g} s"
+                    )
+                try:
+                    estado, valor = trabajador.conexion.recv()
+                except (EOFError, OSError):
+                    raise
+                except Exception as e:
+                    raise HerramientaError(
+                        f"{ref[1]}: respuesta no deserializable: {e}"
+                    ) from e
+                sano = True
+            except (EOFError, OSError) as e:
+                self.caidas += 1
+                raise HerramientaError(
+                    f"{ref[1]}: el proceso de cómputo terminó inesperadamente"
+                ) from e
+            finally:
+                if sano:
+                    self._devolver(trabajador)
+                else:
+                    self._soltar(trabajador)
+        finally:
+            for ruta in archivos:
+                ruta.unlink(missing_ok=True)
+        self.tareas += 1
+        if estado == "error":
+            raise valor
+        return valor
+
+    def calentar(self) -> int:
+        """Arranca los procesos que falten e importa en cada uno los módulos registrados."""
+        if not self.en_uso:
+            return 0
+        with self._cond:
+            modulos = sorted(self._modulos)
+        tomados: list[_Trabajador] = []
+        for _ in range(self.procesos):
+            with self._cond:
+                self._verificar_fork()
+                if not self._libres and self._vivos >= self.procesos:
+                    break  # el resto está ocupado: ya está caliente
+            tomados.append(self._tomar(float("inf"), None))
+        listos = 0
+        for t in tomados:
+            try:
+                t.conexion.send(("calentar", modulos))
+                t.conexion.recv()
+            except (EOFError, OSError):
+                self._soltar(t)  # murió al arrancar; el próximo request lo repone
+                self.caidas += 1
+                continue
+            self._devolver(t)
+            listos += 1
+        return listos
+
+    def cerrar(self, timeout: float = 2.0) -> None:
+        """Detiene los procesos libres (idempotente); los ocupados mueren con el padre (daemon)."""
+        with self._cond:
+            self._verificar_fork()
+            libres, self._libres = self._libres, []
+            self._vivos -= len(libres)
+        for t in libres:
+            try:
+                t.conexion.send(None)
+            except OSError:
+                pass
+        for t in libres:
+            t.proceso.join(timeout)
+            if t.proceso.is_alive():
+                t.proceso.kill()
+            t.conexion.close()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "procesos": self._vivos,
+            "libres": len(self._libres),
+            "tareas": self.tareas,
+            "limites": self.limites,
+            "caidas": self.caidas,
+        }
+
+
+pool_cpu = PoolCPU()
+atexit.register(pool_cpu.cerrar)
+
+
+def calentar_pool() -> int:
+    """Para el lifespan: no arranca procesos si no hay tools cpu_bound."""
+    return pool_cpu.calentar()
+
+
+def cerrar_pool(timeout: float = 2.0) -> None:
+    pool_cpu.cerrar(timeout)
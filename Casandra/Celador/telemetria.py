@@ -0,0 +1,358 @@
+# casandra/celador/telemetria.py
+"""
+Métricas en proceso (histogramas de latencia, contadores, gauges) con
+exposición en formato texto de Prometheus (`/metrics`).
+
+Diseño "lock-light": cada métrica guarda un fragmento por hilo (una lista
+de ints/floats en `threading.local`), así que observar es solo un
+`bisect` + dos sumas sobre memoria del propio hilo, sin locks ni
+contención. El lock se toma únicamente la primera vez que un hilo toca una
+métrica (para registrar su fragmento) y al exportar, que suma fragmentos.
+
+Las series etiquetadas se resuelven con `Familia.con(*valores)`; quien
+observa en caliente (p.ej. `celar`) guarda el hijo una vez y reutiliza.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterable, Literal, Optional, Union
+
+from .auditoria import audit_stats
+from .procesos import pool_cpu
+
+
+Tipo = Literal["counter", "gauge", "histogram"]
+
+# Segundos. Cubren desde hits de caché (~µs) hasta planes pesados.
+BUCKETS_LATENCIA: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class _Fragmentada:
+    """Base: un fragmento (lista) por hilo; se suman al exportar."""
+
+    __slots__ = ("_ancho", "_local", "_fragmentos", "_lock")
+
+    def __init__(self, ancho: int) -> None:
+        self._ancho = ancho
+        self._local = threading.local()
+        self._fragmentos: list[list] = []
+        self._lock = threading.Lock()
+
+    def _fragmento(self) -> list:
+        try:
+            return self._local.f
+        except AttributeError:
+            f = [0] * self._ancho
+            with self._lock:
+                self._fragmentos.append(f)
+            self._local.f = f
+            return f
+
+    def _sumar(self) -> list:
+        with self._lock:
+            fragmentos = list(self._fragmentos)
+        total = [0] * self._ancho
+        for f in fragmentos:
+            for i, v in enumerate(f):
+                total[i] += v
+        return total
+
+
+class Contador(_Fragmentada):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def inc(self, n: Union[int, float] = 1) -> None:
+        try:
+            self._local.f[0] += n
+        except AttributeError:
+            self._fragmento()[0] += n
+
+    def valor(self) -> Union[int, float]:
+        return self._sumar()[0]
+
+
+class Gauge(Contador):
+    """Contador que también baja (p.ej. en vuelo). Los fragmentos netean al sumar."""
+
+    __slots__ = ()
+
+    def dec(self, n: Union[int, float] = 1) -> None:
+        self.inc(-n)
+
+
+class Histograma(_Fragmentada):
+    """Fragmento = [cuenta por bucket..., cuenta +Inf, suma]."""
+
+    __slots__ = ("limites",)
+
+    def __init__(self, limites: tuple[float, ...] = BUCKETS_LATENCIA) -> None:
+        super().__init__(len(limites) + 2)
+        self.limites = limites
+
+    def observar(self, v: float) -> None:
+        try:
+            f = self._local.f
+        except AttributeError:
+            f = self._fragmento()
+        f[bisect_left(self.limites, v)] += 1
+        f[-1] += v
+
+    def instantanea(self) -> tuple[list[int], float]:
+        """(cuentas acumuladas por `le`, incluyendo +Inf; suma)."""
+        total = self._sumar()
+        acumuladas, corrida = [], 0
+        for c in total[:-1]:
+            corrida += c
+            acumuladas.append(corrida)
+        return acumuladas, total[-1]
+
+    def cuantil(self, q: float) -> Optional[float]:
+        """Aproximación por interpolación lineal dentro del bucket (como histogram_quantile)."""
+        acumuladas, _ = self.instantanea()
+        n = acumuladas[-1]
+        if n == 0:
+            return None
+        objetivo = q * n
+        previo, inferior = 0, 0.0
+        for limite, acum in zip(self.limites + (math.inf,), acumuladas):
+            if acum >= objetivo:
+                if limite == math.inf:
+                    return inferior
+                en_bucket = acum - previo
+                return inferior + (limite - inferior) * (
+                    (objetivo - previo) / en_bucket if en_bucket else 0
+                )
+            previo, inferior = acum, limite
+        return inferior
+
+
+Metrica = Union[Contador, Gauge, Histograma]
+
+
+class Familia:
+    """Una métrica con nombre, ayuda y etiquetas; cada combinación es un hijo."""
+
+    def __init__(
+        self,
+        nombre: str,
+        ayuda: str,
+        tipo: Tipo,
+        etiquetas: tuple[str, ...] = (),
+        limites: tuple[float, ...] = BUCKETS_LATENCIA,
+    ) -> None:
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.tipo = tipo
+        self.etiquetas = etiquetas
+        self.limites = limites
+        self._hijos: dict[tuple[str, ...], Metrica] = {}
+        self._lock = threading.Lock()
+
+    def _nueva(self) -> Metrica:
+        if self.tipo == "histogram":
+            return Histograma(self.limites)
+        return Gauge() if self.tipo == "gauge" else Contador()
+
+    def con(self, *valores: str) -> Metrica:
+        hijo = self._hijos.get(valores)
+        if hijo is None:
+            if len(valores) != len(self.etiquetas):
+                raise ValueError(
+                    f"{self.nombre}: se esperaban etiquetas {self.etiquetas}"
+                )
+            with self._lock:
+                hijo = self._hijos.setdefault(valores, self._nueva())
+        return hijo
+
+    def hijos(self) -> list[tuple[tuple[str, ...], Metrica]]:
+        with self._lock:
+            return list(self._hijos.items())
+
+
+def _escapar(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas(nombres: Iterable[str], valores: Iterable[str], extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(str(v))}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _num(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+Colector = Callable[
+    [], Iterable[tuple[str, str, Tipo, dict[tuple[str, ...], float], tuple[str, ...]]]
+]
+
+
+class Registro:
+    def __init__(self) -> None:
+        self._familias: dict[str, Familia] = {}
+        self._colectores: list[Colector] = []
+        self._lock = threading.Lock()
+
+    def _familia(
+        self, nombre: str, ayuda: str, tipo: Tipo, etiquetas: tuple[str, ...], **kw
+    ) -> Familia:
+        with self._lock:
+            fam = self._familias.get(nombre)
+            if fam is None:
+                fam = self._familias[nombre] = Familia(
+                    nombre, ayuda, tipo, etiquetas, **kw
+                )
+            elif fam.tipo != tipo or fam.etiquetas != etiquetas:
+                raise ValueError(
+                    f"métrica {nombre} ya registrada con otro tipo/etiquetas"
+                )
+            return fam
+
+    def contador(
+        self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = ()
+    ) -> Familia:
+        return self._familia(nombre, ayuda, "counter", etiquetas)
+
+    def gauge(
+        self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = ()
+    ) -> Familia:
+        return self._familia(nombre, ayuda, "gauge", etiquetas)
+
+    def histograma(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: tuple[str, ...] = (),
+        limites: tuple[float, ...] = BUCKETS_LATENCIA,
+    ) -> Familia:
+        return self._familia(nombre, ayuda, "histogram", etiquetas, limites=limites)
+
+    def colector(self, fn: Colector) -> None:
+        """Métricas calculadas al exportar: (nombre, ayuda, tipo, {valores: v}, etiquetas)."""
+        with self._lock:
+            self._colectores.append(fn)
+
+    def exportar(self) -> str:
+        """Formato de exposición de texto de Prometheus (0.0.4)."""
+        with self._lock:
+            familias = sorted(self._familias.values(), key=lambda f: f.nombre)
+            colectores = list(self._colectores)
+
+        lineas: list[str] = []
+        for fam in familias:
+            lineas.append(f"# HELP {fam.nombre} {fam.ayuda}")
+            lineas.append(f"# TYPE {fam.nombre} {fam.tipo}")
+            for valores, m in sorted(fam.hijos(), key=lambda h: h[0]):
+                if isinstance(m, Histograma):
+                    acumuladas, suma = m.instantanea()
+                    for limite, acum in zip(m.limites + (math.inf,), acumuladas):
+                        le = _etiquetas(fam.etiquetas, valores, f'le="{_num(limite)}"')
+                        lineas.append(f"{fam.nombre}_bucket{le} {acum}")
+                    et = _etiquetas(fam.etiquetas, valores)
+                    lineas.append(f"{fam.nombre}_sum{et} {_num(suma)}")
+                    lineas.append(f"{fam.nombre}_count{et} {acumuladas[-1]}")
+                else:
+                    lineas.append(
+                        f"{fam.nombre}{_etiquetas(fam.etiquetas, valores)} {_num(m.valor())}"
+                    )
+
+        for fn in colectores:
+            try:
+                for nombre, ayuda, tipo, series, etiquetas in fn():
+                    lineas.append(f"# HELP {nombre} {ayuda}")
+                    lineas.append(f"# TYPE {nombre} {tipo}")
+                    for valores, v in series.items():
+                        lineas.append(
+                            f"{nombre}{_etiquetas(etiquetas, valores)} {_num(v)}"
+                        )
+            except Exception:
+                continue  # igual que la auditoría: exportar nunca debe tumbar el request
+        return "\n".join(lineas) + "\n"
+
+
+registro = Registro()
+
+# --- Métricas estándar (las actualizan `celar` y el middleware HTTP) ---
+
+TOOL_LATENCIA = registro.histograma(
+    "casandra_tool_duration_seconds",
+    "Latencia de tools decoradas con celar.",
+    ("tool",),
+)
+TOOL_RESULTADOS = registro.contador(
+    "casandra_tool_results_total",
+    "Resultados de tools por status (ok|error|exception) y código de ERROR_MAP.",
+    ("tool", "status", "code"),
+)
+TOOL_EN_VUELO = registro.gauge(
+    "casandra_tool_in_flight", "Ejecuciones de tools en curso.", ("tool",)
+)
+TOOL_CACHE = registro.contador(
+    "casandra_tool_cache_total",
+    "Consultas a la caché de resultados (hit|miss).",
+    ("tool", "result"),
+)
+
+HTTP_LATENCIA = registro.histograma(
+    "casandra_http_request_duration_seconds",
+    "Latencia HTTP total por ruta.",
+    ("method", "route"),
+)
+HTTP_RESPUESTAS = registro.contador(
+    "casandra_http_responses_total",
+    "Respuestas HTTP por ruta y status.",
+    ("method", "route", "status"),
+)
+HTTP_EN_VUELO = registro.gauge("casandra_http_in_flight", "Requests HTTP en curso.")
+
+
+def _colector_auditoria():
+    stats = audit_stats()
+    yield (
+        "casandra_audit_sink",
+        "Estado del sumidero de auditoría (pendientes, escritos, descartados, errores).",
+        "gauge",
+        {(k,): v for k, v in stats.items()},
+        ("estado",),
+    )
+
+
+registro.colector(_colector_auditoria)
+
+
+def _colector_pool_cpu():
+    yield (
+        "casandra_cpu_pool",
+        "Pool de procesos de tools cpu_bound (procesos, libres, tareas, limites, caidas).",
+        "gauge",
+        {(k,): v for k, v in pool_cpu.stats().items()},
+        ("estado",),
+    )
+
+
+registro.colector(_colector_pool_cpu)
@@ -1,10 +1,14 @@
 # casandra/celador/validaciones.py
 from __future__ import annotations
 
+import re
+import unicodedata
 from datetime import date
-from typing import Any, Iterable, Mapping
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Optional
 
 from .errores import RangoFueraDeCorte, ValidacionError
+from .versiones import watermark
 
 
 def requeridos(payload: Mapping[str, Any], campos: Iterable[str]) -> None:
@@ -40,25 +44,50 @@ def as_date(val: Any, *, field: str = "date") -> date:
     )
 
 
+@lru_cache(maxsize=4096)
+def _par_iso(desde: str, hasta: str) -> tuple[date, date]:
+    d1 = as_date(desde, field="from")
+    d2 = as_date(hasta, field="to")
+    if d1 > d2:
+        raise ValidacionError("Rango inválido: 'from' > 'to'")
+    return d1, d2
+
+
+def par_fechas(from_val: Any, to_val: Any) -> tuple[date, date]:
+    """
+    (from, to) como fechas, con from <= to. Los pares ISO (str) se memoizan:
+    los planes repiten los mismos rangos una y otra vez.
+    """
+    if type(from_val) is str and type(to_val) is str:
+        return _par_iso(from_val, to_val)
+    d1 = as_date(from_val, field="from")
+    d2 = as_date(to_val, field="to")
+    if d1 > d2:
+        raise ValidacionError("Rango inválido: 'from' > 'to'")
+    return d1, d2
+
+
 def validar_rango(
     from_val: Any,
     to_val: Any,
-    min_date: date,
-    max_date: date,
-    strict_time: bool,
+    min_date: Optional[date] = None,
+    max_date: Optional[date] = None,
+    strict_time: bool = False,
 ) -> tuple[date, date, bool]:
     """
     Devuelve (from_effective, to_effective, range_adjusted).
+    Sin `min_date`/`max_date` explícitos usa el watermark vigente del dataset.
     Reglas:
       - from <= to
       - si strict_time=False: recorta a [min_date, max_date]
       - si strict_time=True: error si se sale del watermark
     """
-    d1 = as_date(from_val, field="from")
-    d2 = as_date(to_val, field="to")
+    d1, d2 = par_fechas(from_val, to_val)
 
-    if d1 > d2:
-        raise ValidacionError("Rango inválido: 'from' > 'to'")
+    if min_date is None or max_date is None:
+        wm_min, wm_max = watermark()
+        min_date = wm_min if min_date is None else min_date
+        max_date = wm_max if max_date is None else max_date
 
     adjusted = False
     ef1, ef2 = d1, d2
@@ -79,6 +108,54 @@ def validar_rango(
     return d1, d2, False
 
 
+def sin_acentos(val: str) -> str:
+    """'León' -> 'Leon'; quita marcas diacríticas (NFKD) y conserva lo demás."""
+    return "".join(
+        ch for ch in unicodedata.normalize("NFKD", val) if not unicodedata.combining(ch)
+    )
+
+
+def normalizar_entidad_id(val: str) -> str:
+    """
+    Forma canónica de un entidad_id "sucio" (p. ej. de un CSV):
+    sin acentos, mayúsculas, y espacios/guiones como '_'.
+    No valida: el resultado se pasa después por `entidad_id`.
+    """
+    partes = sin_acentos(val).upper().split(".")
+    return ".".join("_".join(p.replace("-", " ").split()) for p in partes)
+
+
+_NO_ALFANUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar_nombre(val: str) -> str:
+    """'Apaseo el Alto' / 'APASEO_EL_ALTO' -> 'apaseo el alto' (clave de búsqueda por nombre)."""
+    return " ".join(_NO_ALFANUM.sub(" ", sin_acentos(val).lower()).split())
+
+
+def normalizar_delito(val: str) -> str:
+    """'Robo a Casa-Habitación' -> 'robo_a_casa_habitacion'."""
+    return "_".join(sin_acentos(val).lower().replace("-", " ").split())
+
+
+@lru_cache(maxsize=4096)
+def _delito(val: str) -> str:
+    clave = normalizar_delito(val)
+    if not clave:
+        raise ValidacionError(f"delito inválido: {val!r}")
+    return clave
+
+
+def delito(val: Any) -> str:
+    """Valida un tipo de delito y devuelve su clave canónica (snake_case)."""
+    if not isinstance(val, str):
+        raise ValidacionError(f"delito inválido: {val!r}")
+    return _delito(val)
+
+
+_ENTIDAD_ID = re.compile(r"[A-Z]{3}\.(?:EST|MUN)\.[A-Z0-9_]+")
+
+
 def entidad_id(val: Any) -> str:
     """
     Valida entidad_id con patrón:
@@ -87,8 +164,14 @@ def entidad_id(val: Any) -> str:
     """
     if not isinstance(val, str):
         raise ValidacionError(f"entidad_id inválido: {val!r}")
+    return _entidad_id(val)
 
-    # Evito regex porque aquí es simple y da errores más claros:
+
+@lru_cache(maxsize=4096)
+def _entidad_id(val: str) -> str:
+    if _ENTIDAD_ID.fullmatch(val):
+        return val
+    # Fuera del caso común se revisa parte por parte, para dar un error claro.
     parts = val.split(".")
     if len(parts) != 3:
         raise ValidacionError(
@@ -0,0 +1,59 @@
+# casandra/celador/versiones.py
+"""
+Versiones vigentes de dataset y catálogo, y watermark temporal del dataset.
+
+Celador no conoce el Depósito ni el catálogo: otras capas registran aquí un
+proveedor (callable sin args) y Celador solo lo consulta al armar llaves de
+caché y `query_hash`. Sin proveedor, se usan las variables de entorno.
+"""
+from __future__ import annotations
+
+import os
+from datetime import date
+from typing import Callable
+
+from .errores import DatosFaltantesError
+
+
+_DATASET_VERSION_DEFAULT = os.getenv("CASANDRA_DATASET_VERSION", "dev")
+# Versión del catálogo fija por despliegue. Vacía, el catálogo la deriva de
+# su checksum al registrarse como proveedor.
+CATALOG_VERSION = os.getenv("CASANDRA_CATALOG_VERSION", "")
+
+_proveedor_dataset: Callable[[], str] = lambda: _DATASET_VERSION_DEFAULT
+_proveedor_catalogo: Callable[[], str] = lambda: CATALOG_VERSION
+
+
+def _sin_watermark() -> tuple[date, date]:
+    raise DatosFaltantesError("No hay watermark de dataset registrado")
+
+
+_proveedor_watermark: Callable[[], tuple[date, date]] = _sin_watermark
+
+
+def registrar_proveedor_dataset(fn: Callable[[], str]) -> None:
+    global _proveedor_dataset
+    _proveedor_dataset = fn
+
+
+def registrar_proveedor_catalogo(fn: Callable[[], str]) -> None:
+    global _proveedor_catalogo
+    _proveedor_catalogo = fn
+
+
+def registrar_proveedor_watermark(fn: Callable[[], tuple[date, date]]) -> None:
+    global _proveedor_watermark
+    _proveedor_watermark = fn
+
+
+def dataset_version() -> str:
+    return _proveedor_dataset()
+
+
+def catalog_version() -> str:
+    return _proveedor_catalogo()
+
+
+def watermark() -> tuple[date, date]:
+    """(min_date, max_date) del dataset vigente."""
+    return _proveedor_watermark()
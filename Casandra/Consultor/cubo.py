@@ -0,0 +1,168 @@
+# casandra/consultor/cubo.py
+"""
+Lectura del cubo de conteos (ver `Etl/cubo.py`) por `mmap`.
+
+Una ventana [desde, hasta] son dos lecturas contiguas del acumulado
+(`acumulado[t2 + 1] - acumulado[t1]`), O(1) por celda sin importar su largo.
+Los rankings son una suma vectorizada + `argpartition` para el top_k.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Literal, Optional, Sequence
+
+import numpy as np
+
+from ..Celador.errores import CeladorError, DatosFaltantesError
+from ..Celador.versiones import dataset_version
+from ..Etl.cubo import dir_cubo, leer_ejes
+from ..Etl.deposito import DEPOSITO_DIR
+from .entidades import JerarquiaEntidades
+from .repo import Filtros
+
+
+Medida = Literal["conteo", "tasa_per_100k"]
+
+
+class CuboConteos:
+    def __init__(self, directorio: Path) -> None:
+        ejes = leer_ejes(directorio)
+        if ejes is None:
+            raise DatosFaltantesError(f"Cubo incompleto en {directorio}")
+        self.ejes = ejes
+        self.dataset_version = ejes.dataset_version
+        self.acumulado = np.load(directorio / "conteos.npy", mmap_mode="r")
+        self.poblacion = np.load(directorio / "poblacion.npy", mmap_mode="r")
+        self.entidades = np.array(ejes.entidades, dtype=object)
+        self.delitos = np.array(ejes.delitos, dtype=object)
+        # Ejes ordenados: el código de la jerarquía es el índice del eje.
+        self.jerarquia = JerarquiaEntidades(ejes.entidades)
+        self._pos_del = {d: i for i, d in enumerate(ejes.delitos)}
+
+    def _seleccion(
+        self, valores: Optional[Sequence[str]], pos: dict[str, int], n: int
+    ) -> np.ndarray:
+        if valores is None:
+            return np.arange(n)
+        return np.array(sorted(pos[v] for v in valores if v in pos), dtype=np.int64)
+
+    def indices_entidades(self, valores: Optional[Sequence[str]]) -> np.ndarray:
+        return self._seleccion(valores, self.jerarquia.codigos, len(self.entidades))
+
+    def indices_hijos(
+        self, padre: str, dentro: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Índices de los hijos de `padre` (un rango contiguo del eje), opcionalmente dentro de `dentro`."""
+        ini, fin = self.jerarquia.rango_hijos(padre)
+        if dentro is None:
+            return np.arange(ini, fin)
+        return dentro[(dentro >= ini) & (dentro < fin)]
+
+    def indices_delitos(self, valores: Optional[Sequence[str]]) -> np.ndarray:
+        return self._seleccion(valores, self._pos_del, len(self.delitos))
+
+    def _dias(self, desde: Optional[date], hasta: Optional[date]) -> tuple[int, int]:
+        dias = self.ejes.dias
+        t1 = 0 if desde is None else max(0, (desde - self.ejes.dia0).days)
+        t2 = dias - 1 if hasta is None else min(dias - 1, (hasta - self.ejes.dia0).days)
+        return t1, t2
+
+    def diarios(
+        self, desde: Optional[date], hasta: Optional[date]
+    ) -> tuple[np.ndarray, date]:
+        """Eventos por día (T, E, D) en [desde, hasta] recortado; y la fecha del primer día."""
+        t1, t2 = self._dias(desde, hasta)
+        dia1 = self.ejes.dia0 + timedelta(days=t1)
+        if t1 > t2:
+            return np.zeros((0,) + self.acumulado.shape[1:], dtype=np.int64), dia1
+        return np.diff(self.acumulado[t1 : t2 + 2], axis=0).astype(np.int64), dia1
+
+    def ventana(self, desde: Optional[date], hasta: Optional[date]) -> np.ndarray:
+        """SUM(eventos) por (entidad, delito) en [desde, hasta] (recortado al cubo)."""
+        t1, t2 = self._dias(desde, hasta)
+        if t1 > t2:
+            return np.zeros(self.acumulado.shape[1:], dtype=np.int64)
+        return self.acumulado[t2 + 1].astype(np.int64) - self.acumulado[t1]
+
+    def ranking(
+        self,
+        filtros: Filtros,
+        por: Literal["entidad_id", "delito"],
+        top_k: int,
+        medida: Medida = "conteo",
+        hijos_de: Optional[str] = None,
+    ) -> tuple[list[tuple[str, int, Optional[float]]], bool]:
+        """
+        Top `top_k` de `por` con las mismas reglas que el SQL del Consultor:
+        solo grupos con eventos, orden por medida desc y luego por nombre.
+        `hijos_de` restringe las entidades candidatas a los hijos de esa entidad.
+        Devuelve ([(clave, conteo, tasa)], hubo_recorte).
+        """
+        ie = self.indices_entidades(filtros.entidad_ids)
+        if hijos_de is not None:
+            ie = self.indices_hijos(hijos_de, ie)
+        idl = self.indices_delitos(filtros.delitos)
+
+        celdas = self.ventana(filtros.desde, filtros.hasta)[np.ix_(ie, idl)]
+        if por == "entidad_id":
+            conteos, claves = celdas.sum(axis=1), self.entidades[ie]
+        else:
+            conteos, claves = celdas.sum(axis=0), self.delitos[idl]
+
+        tasas = None
+        score = conteos.astype(np.float64)
+        validos = conteos > 0
+        if medida == "tasa_per_100k":
+            pob = np.asarray(self.poblacion)[ie]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                tasas = conteos / pob * 1e5
+            validos &= np.isfinite(tasas)
+            score = tasas
+
+        cand = np.flatnonzero(validos)
+        k = min(top_k, cand.size)
+        if k == 0:
+            return [], False
+        if k < cand.size:
+            # argpartition acota a los k mejores; los empates en la frontera se resuelven abajo.
+            umbral = -np.partition(-score[cand], k - 1)[k - 1]
+            cand = cand[score[cand] >= umbral]
+        orden = cand[np.lexsort((cand, -score[cand]))][
+            :k
+        ]  # claves ya vienen ordenadas por nombre
+        filas = [
+            (
+                str(claves[i]),
+                int(conteos[i]),
+                None if tasas is None else round(float(tasas[i]), 4),
+            )
+            for i in orden
+        ]
+        return filas, int(validos.sum()) > k
+
+
+_cubos: "OrderedDict[str, CuboConteos]" = OrderedDict()
+_cubos_lock = threading.Lock()
+
+
+def obtener_cubo(deposito_dir: Path = DEPOSITO_DIR) -> Optional[CuboConteos]:
+    """Cubo del `dataset_version` vigente; None si no existe (se usa SQL)."""
+    try:
+        dv = dataset_version()
+    except CeladorError:
+        return None
+    cubo = _cubos.get(dv)
+    if cubo is not None:
+        return cubo
+    directorio = dir_cubo(deposito_dir, dv)
+    if not (directorio / "ejes.json").exists():
+        return None
+    with _cubos_lock:
+        if dv not in _cubos:
+            _cubos[dv] = CuboConteos(directorio)
+            while len(_cubos) > 2:
+                _cubos.popitem(last=False)
+        return _cubos[dv]
@@ -0,0 +1,263 @@
+# casandra/consultor/entidades.py
+"""
+Jerarquía de entidades del dataset vigente, respaldada por arreglos.
+
+- Código entero de una entidad = su posición en el universo ordenado de
+  `entidad_id` (strings internados). Es el mismo orden que los ejes del cubo
+  (`Etl/cubo.py`), así que el código ES el índice del eje: el cubo y las
+  tools seleccionan con enteros, sin mapear strings.
+- Hijos estilo CSR: `ini_hijos[i]:fin_hijos[i]` es el rango de códigos de
+  los hijos de la entidad `i` (los AAA.MUN.* de un AAA.EST.*, contiguos en
+  orden lexicográfico). "Hijos de GTO.EST.GTO" es un slice. Enfocar una
+  entidad (`enfoque_entidad`) la expande a ella y sus hijos, así filtros,
+  evidencia y rankings `nivel=hijos` ven la misma población.
+- Resolución de nombres libres (`municipio` -> `entidad_id`): índice hash
+  por nombre normalizado (sin acentos ni mayúsculas) y, si no hay match
+  exacto, vecindario de borrado de 1 carácter (symmetric delete) para
+  errores de tipeo, acotado a nombres de 4+ letras. Los nombres salen del
+  propio id (`APASEO_EL_ALTO` -> "apaseo el alto") y, si existe, de
+  `<deposito>/entidades.csv` (entidad_id, nombre).
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+
+from ..Celador.auditoria import audit
+from ..Celador.errores import ValidacionError
+from ..Celador.validaciones import normalizar_nombre
+from ..Celador.versiones import dataset_version
+from ..dominio.nombres import CONSULTOR
+from ..Etl.deposito import DEPOSITO_DIR
+from .repo import Consultor, Filtros, obtener_consultor
+
+
+NOMBRES = "entidades.csv"
+_PREFIJOS_NOMBRE = ("municipio de ", "municipio ", "mpio de ", "mpio ", "estado de ")
+_MIN_DIFUSO = 4  # nombres más cortos solo por match exacto
+
+
+@lru_cache(maxsize=8192)
+def _clave(texto: str) -> str:
+    clave = normalizar_nombre(texto)
+    for pref in _PREFIJOS_NOMBRE:
+        if clave.startswith(pref):
+            return clave[len(pref) :]
+    return clave
+
+
+def _borrados(clave: str) -> set[str]:
+    return {clave[:i] + clave[i + 1 :] for i in range(len(clave))}
+
+
+def _rango_prefijo(ids: Sequence[str], prefijo: str) -> tuple[int, int]:
+    # Los ids con `prefijo` son contiguos en orden lexicográfico.
+    return bisect_left(ids, prefijo), bisect_left(ids, prefijo + "\uffff")
+
+
+def _prefijo_y_nivel(entidad_id: str) -> tuple[str, str]:
+    """('GTO', 'MUN') para 'GTO.MUN.LEON'; nivel '' si el id no trae scope."""
+    partes = entidad_id.split(".", 2)
+    return partes[0], partes[1] if len(partes) > 1 else ""
+
+
+def _prefijo_hijos(entidad_id: str) -> str:
+    pref, nivel = _prefijo_y_nivel(entidad_id)
+    return f"{pref}.MUN." if nivel == "EST" else entidad_id + "."
+
+
+def nombre_de_id(entidad_id: str) -> str:
+    """'GTO.MUN.APASEO_EL_ALTO' -> 'Apaseo El Alto' (si no hay nombre en el catálogo)."""
+    return entidad_id.rsplit(".", 1)[-1].replace("_", " ").title()
+
+
+def leer_nombres(deposito_dir: Path = DEPOSITO_DIR) -> dict[str, str]:
+    """`<deposito>/entidades.csv` (entidad_id, nombre); vacío si no existe."""
+    ruta = deposito_dir / NOMBRES
+    if not ruta.exists():
+        return {}
+    import pyarrow.csv as pacsv
+
+    tabla = pacsv.read_csv(
+        ruta,
+        convert_options=pacsv.ConvertOptions(include_columns=["entidad_id", "nombre"]),
+    )
+    return dict(
+        zip(tabla.column("entidad_id").to_pylist(), tabla.column("nombre").to_pylist())
+    )
+
+
+class JerarquiaEntidades:
+    """Universo ordenado de entidades con códigos enteros, padres, rangos de hijos e índice de nombres."""
+
+    def __init__(
+        self, entidades: Sequence[str], nombres: Optional[Mapping[str, str]] = None
+    ) -> None:
+        # Mismo orden que los ejes del cubo: sorted(set(...)).
+        self.ids: tuple[str, ...] = tuple(sys.intern(e) for e in sorted(set(entidades)))
+        self.codigos: dict[str, int] = {e: i for i, e in enumerate(self.ids)}
+        self._nombres = dict(nombres or {})
+        n = len(self.ids)
+        self.padre = np.full(n, -1, dtype=np.int32)
+        self.ini_hijos = np.zeros(n, dtype=np.int32)
+        self.fin_hijos = np.zeros(n, dtype=np.int32)
+        estados: dict[str, int] = {}
+        for i, e in enumerate(self.ids):
+            self.ini_hijos[i], self.fin_hijos[i] = _rango_prefijo(
+                self.ids, _prefijo_hijos(e)
+            )
+            pref, nivel = _prefijo_y_nivel(e)
+            if nivel == "EST":
+                estados.setdefault(pref, i)
+        for i, e in enumerate(self.ids):
+            pref, nivel = _prefijo_y_nivel(e)
+            if nivel == "MUN":
+                self.padre[i] = estados.get(pref, -1)
+        self._exactos: Optional[dict[str, tuple[int, ...]]] = None
+        self._difusos: dict[str, tuple[int, ...]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def codigo(self, entidad_id: str) -> int:
+        """Código entero; -1 si la entidad no está en el dataset."""
+        return self.codigos.get(entidad_id, -1)
+
+    def rango_hijos(self, padre: str) -> tuple[int, int]:
+        """[ini, fin) de códigos de los hijos de `padre` (esté o no `padre` en el dataset)."""
+        i = self.codigos.get(padre)
+        if i is not None:
+            return int(self.ini_hijos[i]), int(self.fin_hijos[i])
+        return _rango_prefijo(self.ids, _prefijo_hijos(padre))
+
+    def hijos(self, padre: str) -> tuple[str, ...]:
+        ini, fin = self.rango_hijos(padre)
+        return self.ids[ini:fin]
+
+    def expandir(self, entidad_id: str) -> tuple[str, ...]:
+        """La entidad y sus hijos: la población que cubre un enfoque en ella."""
+        return (entidad_id,) + self.hijos(entidad_id)
+
+    def nombre(self, entidad_id: str) -> str:
+        return self._nombres.get(entidad_id) or nombre_de_id(entidad_id)
+
+    # --- nombres libres -> entidad_id ---
+
+    def _indice(self) -> dict[str, tuple[int, ...]]:
+        exactos = self._exactos
+        if exactos is not None:
+            return exactos
+        with self._lock:
+            if self._exactos is None:
+                claves: dict[str, list[int]] = {}
+                difusos: dict[str, list[int]] = {}
+                for i, e in enumerate(self.ids):
+                    claves.setdefault(_clave(e), []).append(
+                        i
+                    )  # el id completo: solo exacto
+                    for nombre in {
+                        _clave(nombre_de_id(e)),
+                        _clave(self._nombres.get(e) or ""),
+                    }:
+                        if not nombre:
+                            continue
+                        claves.setdefault(nombre, []).append(i)
+                        if len(nombre) >= _MIN_DIFUSO:
+                            for b in _borrados(nombre):
+                                difusos.setdefault(b, []).append(i)
+                self._difusos = {k: tuple(sorted(set(v))) for k, v in difusos.items()}
+                self._exactos = {k: tuple(sorted(set(v))) for k, v in claves.items()}
+            return self._exactos
+
+    def _codigos(self, clave: str) -> tuple[int, ...]:
+        exactos = self._indice()
+        codigos = exactos.get(clave)
+        if codigos is not None or len(clave) < _MIN_DIFUSO:
+            return codigos or ()
+        vistos: set[int] = set(self._difusos.get(clave, ()))
+        for b in _borrados(clave):
+            vistos.update(exactos.get(b, ()))
+            vistos.update(self._difusos.get(b, ()))
+        return tuple(sorted(vistos))
+
+    def buscar(self, texto: str, estado: Optional[str] = None) -> tuple[str, ...]:
+        """
+        Candidatos para un nombre libre: match exacto normalizado o, si no hay,
+        los que quedan a un borrado/inserción/sustitución. `estado` (AAA o
+        AAA.EST.X) acota a las entidades de ese prefijo.
+        """
+        candidatos = tuple(self.ids[i] for i in self._codigos(_clave(texto)))
+        if estado:
+            pref = estado.split(".", 1)[0].upper() + "."
+            candidatos = tuple(e for e in candidatos if e.startswith(pref))
+        return candidatos
+
+    def resolver(self, texto: str, estado: Optional[str] = None) -> str:
+        """`entidad_id` de un nombre libre; ValidacionError si no hay uno solo."""
+        if texto in self.codigos:
+            return texto
+        if estado is None:
+            # Camino común: un solo match exacto, sin armar tuplas.
+            codigos = self._indice().get(_clave(texto))
+            if codigos is not None and len(codigos) == 1:
+                return self.ids[codigos[0]]
+        candidatos = self.buscar(texto, estado)
+        if len(candidatos) == 1:
+            return candidatos[0]
+        if not candidatos:
+            raise ValidacionError(f"Entidad desconocida: {texto!r}")
+        # Un municipio y su estado homónimo (p.ej. 'Guanajuato'): gana el municipio.
+        municipios = [e for e in candidatos if ".MUN." in e]
+        if len(municipios) == 1:
+            return municipios[0]
+        muestra = ", ".join(candidatos[:5]) + (" ..." if len(candidatos) > 5 else "")
+        raise ValidacionError(f"Entidad ambigua: {texto!r} puede ser {muestra}")
+
+
+_jerarquia: Optional[tuple[str, JerarquiaEntidades]] = None
+_jerarquia_lock = threading.Lock()
+
+
+def _universo(consultor: Consultor) -> Sequence[str]:
+    # Con cubo del dataset vigente, sus ejes: los códigos coinciden con sus índices.
+    from .cubo import obtener_cubo  # cubo.py importa este módulo
+
+    cubo = obtener_cubo()
+    if cubo is not None:
+        return cubo.ejes.entidades
+    tabla = consultor.conteo_por(Filtros(), ("entidad_id",))
+    return [e for e in tabla.column("entidad_id").to_pylist() if e]
+
+
+def obtener_jerarquia(consultor: Optional[Consultor] = None) -> JerarquiaEntidades:
+    """Jerarquía del `dataset_version` vigente (se arma una vez por versión)."""
+    global _jerarquia
+    dv = dataset_version()
+    actual = _jerarquia
+    if actual is not None and actual[0] == dv:
+        return actual[1]
+    with _jerarquia_lock:
+        if _jerarquia is None or _jerarquia[0] != dv:
+            t0 = time.perf_counter()
+            jerarquia = JerarquiaEntidades(
+                _universo(consultor or obtener_consultor()), leer_nombres()
+            )
+            _jerarquia = (dv, jerarquia)
+            audit(
+                "consultor.entities",
+                {
+                    "component": CONSULTOR,
+                    "dataset_version": dv,
+                    "entidades": len(jerarquia),
+                    "timing_ms": round((time.perf_counter() - t0) * 1000, 3),
+                },
+            )
+        return _jerarquia[1]
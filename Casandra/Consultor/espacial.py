@@ -0,0 +1,254 @@
+# casandra/consultor/espacial.py
+"""
+Lectura del índice espacial (ver `Etl/espacial.py`) por `mmap`.
+
+- `malla(caja, desde, hasta, ...)`: conteos por celda de un nivel de la malla
+  multirresolución, recortados a la caja. Por cada día de la ventana se lee
+  solo el tramo de las filas de la caja (`searchsorted` sobre la clave
+  día-celda) y las columnas se recortan con un filtro vectorizado: nunca se
+  tocan los puntos.
+- Con filtro de entidad (la malla no la distingue) o para evidencia, los
+  puntos salen del R-tree: solo se leen las hojas que tocan la caja.
+- `municipios_en(x, y)`: punto -> municipio con el R-tree de polígonos.
+
+Todos los workers comparten las mismas páginas; el índice se recarga al
+cambiar el `dataset_version`, como el cubo.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ..Analisis.Espacial.arbol import ArbolR, Caja
+from ..Analisis.Espacial.poligonos import Poligonos
+from ..Celador.errores import CeladorError, DatosFaltantesError
+from ..Celador.versiones import dataset_version
+from ..Etl.deposito import DEPOSITO_DIR
+from ..Etl.espacial import dir_espacial, leer_ejes_espaciales
+
+
+MAX_CELDAS = int(os.getenv("CASANDRA_ESPACIAL_MAX_CELDAS", str(256 * 256)))
+
+
+@dataclass(frozen=True)
+class Malla:
+    """Conteos (filas, columnas) de un nivel; fila 0 = sur, columna 0 = oeste."""
+
+    nivel: int
+    celda: float  # grados por lado
+    lon0: float  # esquina suroeste de la celda (0, 0)
+    lat0: float
+    conteos: np.ndarray
+
+    def centros(
+        self, filas: np.ndarray, columnas: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        return (
+            self.lon0 + (columnas + 0.5) * self.celda,
+            self.lat0 + (filas + 0.5) * self.celda,
+        )
+
+    def caja(self, fila: int, columna: int) -> Caja:
+        x, y = self.lon0 + columna * self.celda, self.lat0 + fila * self.celda
+        return x, y, x + self.celda, y + self.celda
+
+
+class IndiceEspacial:
+    def __init__(self, directorio: Path) -> None:
+        ejes = leer_ejes_espaciales(directorio)
+        if ejes is None:
+            raise DatosFaltantesError(f"Índice espacial incompleto en {directorio}")
+        self.ejes = ejes
+        self.dataset_version = ejes.dataset_version
+        self.xy = np.load(directorio / "puntos_xy.npy", mmap_mode="r")
+        self.dia = np.load(directorio / "puntos_dia.npy", mmap_mode="r")
+        self.delito = np.load(directorio / "puntos_delito.npy", mmap_mode="r")
+        self.entidad = np.load(directorio / "puntos_entidad.npy", mmap_mode="r")
+        self.eventos = np.load(directorio / "puntos_eventos.npy", mmap_mode="r")
+        self.ids = np.load(directorio / "puntos_id.npy", mmap_mode="r")
+        self.arbol = ArbolR.abrir(
+            directorio, "arbol_puntos", ejes.capacidad, ejes.puntos
+        )
+        self._mallas = [
+            tuple(
+                np.load(directorio / f"malla_{k}_{c}.npy", mmap_mode="r")
+                for c in ("clave", "delito", "eventos")
+            )
+            for k in range(ejes.niveles)
+        ]
+        self.municipios = (
+            Poligonos.abrir(directorio, "municipios", ejes.capacidad_municipios)
+            if ejes.municipios
+            else None
+        )
+        self._pos_del = {d: i for i, d in enumerate(ejes.delitos)}
+        self._pos_ent = {e: i for i, e in enumerate(ejes.entidades)}
+
+    def extension(self) -> Caja:
+        e = self.ejes
+        return e.lon0, e.lat0, e.lon0 + e.columnas * e.celda, e.lat0 + e.filas * e.celda
+
+    def celda(self, nivel: int) -> float:
+        return self.ejes.celda * 2**nivel
+
+    def _rango(self, caja: Caja, nivel: int) -> Optional[tuple[int, int, int, int]]:
+        """(col0, fila0, col1, fila1) inclusivos de las celdas del nivel que tocan `caja`."""
+        e, tam = self.ejes, self.celda(nivel)
+        cols, filas = e.columnas >> nivel, e.filas >> nivel
+        c0 = max(0, int(np.floor((caja[0] - e.lon0) / tam)))
+        f0 = max(0, int(np.floor((caja[1] - e.lat0) / tam)))
+        c1 = min(cols - 1, int(np.floor((caja[2] - e.lon0) / tam)))
+        f1 = min(filas - 1, int(np.floor((caja[3] - e.lat0) / tam)))
+        if c0 > c1 or f0 > f1:
+            return None
+        return c0, f0, c1, f1
+
+    def nivel_para(self, caja: Caja, max_celdas: int = MAX_CELDAS) -> int:
+        """El nivel más fino en el que `caja` cubre a lo sumo `max_celdas` celdas."""
+        for k in range(self.ejes.niveles):
+            r = self._rango(caja, k)
+            if r is None or (r[2] - r[0] + 1) * (r[3] - r[1] + 1) <= max_celdas:
+                return k
+        return self.ejes.niveles - 1
+
+    def _dias(self, desde: Optional[date], hasta: Optional[date]) -> tuple[int, int]:
+        dias = self.ejes.dias
+        t1 = 0 if desde is None else max(0, (desde - self.ejes.dia0).days)
+        t2 = dias - 1 if hasta is None else min(dias - 1, (hasta - self.ejes.dia0).days)
+        return t1, t2
+
+    def _codigos(
+        self, valores: Optional[Sequence[str]], pos: dict[str, int]
+    ) -> Optional[np.ndarray]:
+        if valores is None:
+            return None
+        return np.array(sorted(pos[v] for v in valores if v in pos), dtype=np.int64)
+
+    def puntos(
+        self,
+        caja: Caja,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        delitos: Optional[Sequence[str]] = None,
+        entidades: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """Posiciones de los puntos dentro de `caja` y de los filtros, vía R-tree."""
+        pos = self.arbol.candidatos(caja)
+        xy = self.xy[pos]
+        ok = (
+            (xy[:, 0] >= caja[0])
+            & (xy[:, 0] <= caja[2])
+            & (xy[:, 1] >= caja[1])
+            & (xy[:, 1] <= caja[3])
+        )
+        t1, t2 = self._dias(desde, hasta)
+        dia = self.dia[pos]
+        ok &= (dia >= t1) & (dia <= t2)
+        for valores, codigos, pos_eje in (
+            (delitos, self.delito, self._pos_del),
+            (entidades, self.entidad, self._pos_ent),
+        ):
+            cod = self._codigos(valores, pos_eje)
+            if cod is not None:
+                ok &= np.isin(codigos[pos], cod)
+        return pos[ok]
+
+    def malla(
+        self,
+        caja: Caja,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        delitos: Optional[Sequence[str]] = None,
+        entidades: Optional[Sequence[str]] = None,
+        nivel: Optional[int] = None,
+    ) -> Malla:
+        """Conteos por celda del `nivel` (None = `nivel_para(caja)`) en `caja` × [desde, hasta]."""
+        k = (
+            self.nivel_para(caja)
+            if nivel is None
+            else min(max(nivel, 0), self.ejes.niveles - 1)
+        )
+        tam = self.celda(k)
+        r = self._rango(caja, k)
+        if r is None:
+            return Malla(k, tam, caja[0], caja[1], np.zeros((0, 0), dtype=np.int64))
+        c0, f0, c1, f1 = r
+        ancho, alto = c1 - c0 + 1, f1 - f0 + 1
+        lon0, lat0 = self.ejes.lon0 + c0 * tam, self.ejes.lat0 + f0 * tam
+
+        if entidades is not None:
+            # La malla no distingue entidades: puntos del R-tree en la caja alineada a celdas.
+            pos = self.puntos(
+                (lon0, lat0, lon0 + ancho * tam, lat0 + alto * tam),
+                desde,
+                hasta,
+                delitos,
+                entidades,
+            )
+            xy, e = self.xy[pos], self.ejes
+            # Misma asignación a celdas que la ETL: índice del nivel 0 desplazado.
+            c = (np.floor((xy[:, 0] - e.lon0) / e.celda).astype(np.int64) >> k) - c0
+            f = (np.floor((xy[:, 1] - e.lat0) / e.celda).astype(np.int64) >> k) - f0
+            ok = (c >= 0) & (c < ancho) & (f >= 0) & (f < alto)
+            f, c, pesos = f[ok], c[ok], self.eventos[pos][ok]
+        else:
+            clave, delito, eventos = self._mallas[k]
+            cols_k = self.ejes.columnas >> k
+            n_celdas = cols_k * (self.ejes.filas >> k)
+            t1, t2 = self._dias(desde, hasta)
+            base = np.arange(t1, t2 + 1, dtype=np.int64) * n_celdas
+            lo = np.searchsorted(clave, base + f0 * cols_k)
+            hi = np.searchsorted(clave, base + (f1 + 1) * cols_k)
+            # Concatena los tramos [lo, hi) sin un loop por día.
+            largos = hi - lo
+            pos = np.repeat(lo - np.cumsum(largos) + largos, largos) + np.arange(
+                int(largos.sum())
+            )
+            f, c = np.divmod(np.asarray(clave[pos]) % n_celdas, cols_k)
+            ok = (c >= c0) & (c <= c1)
+            cod = self._codigos(delitos, self._pos_del)
+            if cod is not None:
+                ok &= np.isin(delito[pos], cod)
+            f, c, pesos = f[ok] - f0, c[ok] - c0, np.asarray(eventos[pos])[ok]
+        conteos = np.bincount(f * ancho + c, weights=pesos, minlength=alto * ancho)
+        return Malla(k, tam, lon0, lat0, conteos.astype(np.int64).reshape(alto, ancho))
+
+    def municipios_en(self, x: np.ndarray, y: np.ndarray) -> list[Optional[str]]:
+        """`entidad_id` del polígono municipal que contiene cada punto (None si ninguno o sin polígonos)."""
+        if self.municipios is None:
+            return [None] * len(x)
+        nombres = self.ejes.municipios
+        return [nombres[c] if c >= 0 else None for c in self.municipios.asignar(x, y)]
+
+
+_indices: "OrderedDict[str, IndiceEspacial]" = OrderedDict()
+_indices_lock = threading.Lock()
+
+
+def obtener_indice_espacial(
+    deposito_dir: Path = DEPOSITO_DIR,
+) -> Optional[IndiceEspacial]:
+    """Índice espacial del `dataset_version` vigente; None si no existe (Depósito sin coordenadas)."""
+    try:
+        dv = dataset_version()
+    except CeladorError:
+        return None
+    indice = _indices.get(dv)
+    if indice is not None:
+        return indice
+    directorio = dir_espacial(deposito_dir, dv)
+    if not (directorio / "ejes.json").exists():
+        return None
+    with _indices_lock:
+        if dv not in _indices:
+            _indices[dv] = IndiceEspacial(directorio)
+            while len(_indices) > 2:
+                _indices.popitem(last=False)
+        return _indices[dv]
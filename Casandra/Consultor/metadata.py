@@ -0,0 +1,218 @@
+# casandra/consultor/metadata.py
+"""
+Metadata vigente del Depósito: `dataset_version` y watermark temporal.
+
+El snapshot se calcula UNA vez por versión a partir de los footers Parquet
+(estadísticas min/max de `fecha`, sin leer datos) y se guarda en memoria.
+Para detectar una versión nueva basta un `stat()` del manifest que publica el
+ETL, y aun eso se hace como máximo una vez cada `CASANDRA_METADATA_CHECK_S`.
+El snapshot es inmutable y se reemplaza con una sola asignación, así que los
+lectores nunca ven un estado a medias.
+
+Un depósito sin manifest (cargado a mano) se firma con (ruta, tamaño, mtime)
+de sus Parquet: la versión `local-…` y `updated_at` (el mtime más reciente)
+salen de esa firma, así que un archivo nuevo o modificado cambia la versión y
+el mismo contenido siempre da el mismo cuerpo (y el mismo ETag).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import msgspec
+import pyarrow.parquet as pq
+
+from ..Celador.auditoria import audit
+from ..Celador.errores import DatosFaltantesError
+from ..Celador.versiones import (
+    registrar_proveedor_dataset,
+    registrar_proveedor_watermark,
+)
+from ..dominio.nombres import CONSULTOR
+from ..Etl.deposito import (
+    DEPOSITO_DIR,
+    incidentes_dir,
+    leer_manifest,
+    partes,
+    ruta_manifest,
+)
+
+
+INTERVALO_REVISION_S = float(os.getenv("CASANDRA_METADATA_CHECK_S", "1.0"))
+
+
+class MetadataDataset(msgspec.Struct, frozen=True, gc=False):
+    dataset_version: str
+    min_date: date
+    max_date: date
+    updated_at: str
+    filas: int
+    archivos: int
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.dataset_version}"'
+
+
+def _firma(ruta: Path) -> Optional[tuple[int, int, int]]:
+    try:
+        st = ruta.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _firma_archivos(base: Path) -> tuple[tuple[str, int, int], ...]:
+    """(ruta, tamaño, mtime_ns) de cada Parquet bajo `base`."""
+    firma = []
+    for ruta in sorted(base.glob("**/*.parquet")):
+        try:
+            st = ruta.stat()
+        except FileNotFoundError:
+            continue  # borrado entre el glob y el stat
+        firma.append((ruta.as_posix(), st.st_size, st.st_mtime_ns))
+    return tuple(firma)
+
+
+def _estadisticas_footers(
+    archivos: list[Path],
+) -> tuple[Optional[date], Optional[date], int]:
+    """min/max de `fecha` y filas totales leyendo solo footers."""
+    dmin: Optional[date] = None
+    dmax: Optional[date] = None
+    filas = 0
+    for ruta in archivos:
+        md = pq.read_metadata(ruta)
+        filas += md.num_rows
+        try:
+            col = md.schema.names.index("fecha")
+        except ValueError:
+            continue
+        for i in range(md.num_row_groups):
+            st = md.row_group(i).column(col).statistics
+            if st is None or not st.has_min_max:
+                continue
+            dmin = st.min if dmin is None else min(dmin, st.min)
+            dmax = st.max if dmax is None else max(dmax, st.max)
+    return dmin, dmax, filas
+
+
+class ServicioMetadata:
+    def __init__(
+        self,
+        deposito_dir: Path = DEPOSITO_DIR,
+        intervalo_s: float = INTERVALO_REVISION_S,
+    ) -> None:
+        self.deposito_dir = deposito_dir
+        self.intervalo_s = intervalo_s
+        self._manifest = ruta_manifest(deposito_dir)
+        self._snapshot: Optional[MetadataDataset] = None
+        self._firma: Optional[tuple] = None
+        self._proxima_revision = 0.0
+        self._lock = threading.Lock()
+
+    def actual(self) -> MetadataDataset:
+        """Snapshot vigente. Camino caliente: una comparación de reloj."""
+        snap = self._snapshot
+        if snap is not None and time.monotonic() < self._proxima_revision:
+            return snap
+        return self._revisar()
+
+    def _revisar(self) -> MetadataDataset:
+        with self._lock:
+            firma = _firma(self._manifest) or _firma_archivos(
+                incidentes_dir(self.deposito_dir)
+            )
+            if self._snapshot is None or firma != self._firma:
+                self._snapshot = self._calcular()
+                self._firma = firma
+            self._proxima_revision = time.monotonic() + self.intervalo_s
+            return self._snapshot
+
+    def invalidar(self) -> None:
+        """Fuerza un recálculo en la próxima lectura (p.ej. tras una ingesta local)."""
+        with self._lock:
+            self._firma = None
+            self._proxima_revision = 0.0
+
+    def _calcular(self) -> MetadataDataset:
+        t0 = time.perf_counter()
+        manifest = leer_manifest(self.deposito_dir)
+        archivos = partes(manifest, self.deposito_dir)
+        dmin, dmax, filas = _estadisticas_footers(archivos)
+        if dmin is None or dmax is None:
+            raise DatosFaltantesError(
+                f"Depósito sin estadísticas de 'fecha' en {incidentes_dir(self.deposito_dir)}"
+            )
+
+        version, updated_at = manifest.dataset_version, manifest.updated_at
+        if not version:
+            # Depósito sin manifest (cargado a mano): versión y fecha derivadas de los archivos.
+            firma = _firma_archivos(incidentes_dir(self.deposito_dir))
+            h = hashlib.sha256()
+            for ruta, tam, mtime in firma:
+                h.update(f"{ruta}\0{tam}\0{mtime}\n".encode("utf-8"))
+            version = f"local-{h.hexdigest()[:8]}"
+            ultimo = max((mtime for _, _, mtime in firma), default=0)
+            updated_at = datetime.fromtimestamp(ultimo / 1e9, timezone.utc).isoformat(
+                timespec="seconds"
+            )
+        elif not updated_at:
+            updated_at = datetime.fromtimestamp(
+                self._manifest.stat().st_mtime, timezone.utc
+            ).isoformat(timespec="seconds")
+
+        snap = MetadataDataset(
+            dataset_version=version,
+            min_date=dmin,
+            max_date=dmax,
+            updated_at=updated_at,
+            filas=filas,
+            archivos=len(archivos),
+        )
+        audit(
+            "consultor.metadata",
+            {
+                "component": CONSULTOR,
+                "dataset_version": version,
+                "min_date": dmin.isoformat(),
+                "max_date": dmax.isoformat(),
+                "archivos": len(archivos),
+                "timing_ms": round((time.perf_counter() - t0) * 1000, 3),
+            },
+        )
+        return snap
+
+
+_servicio: Optional[ServicioMetadata] = None
+_servicio_lock = threading.Lock()
+
+
+def obtener_servicio_metadata() -> ServicioMetadata:
+    """Servicio compartido del proceso (se crea al primer uso)."""
+    global _servicio
+    if _servicio is None:
+        with _servicio_lock:
+            if _servicio is None:
+                _servicio = ServicioMetadata()
+    return _servicio
+
+
+def registrar_proveedores(
+    servicio: Optional[ServicioMetadata] = None,
+) -> ServicioMetadata:
+    """Conecta el servicio con Celador (versión de dataset y watermark)."""
+    svc = servicio or obtener_servicio_metadata()
+
+    def _watermark() -> tuple[date, date]:
+        snap = svc.actual()  # un solo snapshot: min y max de la misma versión
+        return snap.min_date, snap.max_date
+
+    registrar_proveedor_dataset(lambda: svc.actual().dataset_version)
+    registrar_proveedor_watermark(_watermark)
+    return svc
@@ -0,0 +1,487 @@
+# casandra/consultor/repo.py
+"""
+Consultor: repositorio de solo lectura sobre el Depósito (Parquet/DuckDB).
+
+- Una base DuckDB en memoria por proceso con la vista `incidentes` sobre el
+  Parquet particionado (`anio=YYYY/mes=M`) del Depósito.
+- Un cursor por hilo (los cursores de DuckDB no se comparten entre hilos), así
+  que es seguro bajo el threadpool de FastAPI.
+- Consultas parametrizadas por "forma" de filtro: el SQL de cada forma se arma
+  una sola vez y los valores viajan siempre como parámetros.
+- Resultados Arrow nativos (sin pasar por pandas) y timing/row count por
+  consulta en la auditoría.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, replace
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+
+import duckdb
+import pyarrow as pa
+
+from ..Celador.auditoria import audit
+from ..Celador.errores import DatosFaltantesError, RangoVacio
+from ..dominio.nombres import CONSULTOR
+from ..Etl.deposito import (
+    DEPOSITO_DIR,
+    firma_manifest,
+    incidentes_dir,
+    leer_manifest,
+    partes,
+    sql_parquet,
+)
+
+
+INCIDENTES_DIR = incidentes_dir(DEPOSITO_DIR)
+
+# Columnas del esquema mínimo (doc §9).
+COLUMNAS_INCIDENTES = ("fecha", "entidad_id", "delito", "eventos")
+# + `id` estable que escribe el ETL (evidencia).
+COLUMNAS_CONSULTABLES = COLUMNAS_INCIDENTES + ("id",)
+
+CONSULTOR_THREADS = int(os.getenv("CASANDRA_CONSULTOR_THREADS", "2"))
+
+
+@dataclass(frozen=True)
+class Filtros:
+    """
+    Filtros núcleo; `None` = sin filtro. Hashable para llaves de caché.
+    `enfoque` es la última entidad enfocada tal cual la pidió el plan (antes
+    de expandir su jerarquía en `entidad_ids`); no entra al SQL.
+    """
+
+    entidad_ids: Optional[tuple[str, ...]] = None
+    desde: Optional[date] = None
+    hasta: Optional[date] = None
+    delitos: Optional[tuple[str, ...]] = None
+    enfoque: Optional[str] = None
+
+    def forma(self) -> tuple[int, bool, bool, int]:
+        return (
+            len(self.entidad_ids) if self.entidad_ids is not None else -1,
+            self.desde is not None,
+            self.hasta is not None,
+            len(self.delitos) if self.delitos is not None else -1,
+        )
+
+    def parametros(self, poda: bool = True) -> list[Any]:
+        params: list[Any] = []
+        if self.entidad_ids is not None:
+            params.extend(self.entidad_ids)
+        if self.desde is not None:
+            d = self.desde
+            params.extend([d, d.year, d.year, d.month] if poda else [d])
+        if self.hasta is not None:
+            h = self.hasta
+            params.extend([h, h.year, h.year, h.month] if poda else [h])
+        if self.delitos is not None:
+            params.extend(self.delitos)
+        return params
+
+    def restringir(
+        self,
+        *,
+        entidad_ids: Optional[Sequence[str]] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        delitos: Optional[Sequence[str]] = None,
+    ) -> "Filtros":
+        """
+        Conjunción con otro filtro: el resultado siempre es igual o más estrecho.
+        Dos rangos de fecha disjuntos no dan un rango invertido: `RangoVacio`.
+        """
+        desde = (
+            desde
+            if self.desde is None or (desde and desde > self.desde)
+            else self.desde
+        )
+        hasta = (
+            hasta
+            if self.hasta is None or (hasta and hasta < self.hasta)
+            else self.hasta
+        )
+        if desde is not None and hasta is not None and desde > hasta:
+            raise RangoVacio(
+                f"Rangos de fecha disjuntos: la intersección {desde}..{hasta} es vacía"
+            )
+        return replace(
+            self,
+            entidad_ids=_interseccion(self.entidad_ids, entidad_ids),
+            desde=desde,
+            hasta=hasta,
+            delitos=_interseccion(self.delitos, delitos),
+        )
+
+    def como_dict(self) -> dict[str, Any]:
+        return {
+            "entidad_ids": (
+                list(self.entidad_ids) if self.entidad_ids is not None else None
+            ),
+            "from": str(self.desde) if self.desde else None,
+            "to": str(self.hasta) if self.hasta else None,
+            "delitos": list(self.delitos) if self.delitos is not None else None,
+        }
+
+
+def _interseccion(
+    actual: Optional[tuple[str, ...]], nuevos: Optional[Sequence[str]]
+) -> Optional[tuple[str, ...]]:
+    if nuevos is None:
+        return actual
+    nuevos = tuple(dict.fromkeys(nuevos))
+    if actual is None:
+        return nuevos
+    return tuple(v for v in actual if v in nuevos)
+
+
+def _tabla(cur: duckdb.DuckDBPyConnection) -> pa.Table:
+    # duckdb 1.4 renombró fetch_arrow_table -> to_arrow_table (el viejo queda deprecado).
+    if hasattr(cur, "to_arrow_table"):
+        return cur.to_arrow_table()
+    return cur.fetch_arrow_table()
+
+
+def _lector(
+    cur: duckdb.DuckDBPyConnection, filas_por_lote: int
+) -> pa.RecordBatchReader:
+    if hasattr(cur, "to_arrow_reader"):
+        return cur.to_arrow_reader(filas_por_lote)
+    return cur.fetch_record_batch(filas_por_lote)
+
+
+def _placeholders(n: int) -> str:
+    return ", ".join("?" * n) if n else "NULL"
+
+
+@lru_cache(maxsize=256)
+def _condicion(forma: tuple[int, bool, bool, int], poda: bool = True) -> str:
+    """
+    Predicado parametrizado para una forma de filtro ("" si no filtra nada).
+    Con `poda`, además del predicado sobre `fecha` agrega predicados sobre las
+    columnas de partición (`anio`, `mes`) para que DuckDB pode directorios
+    completos; sin `poda` (p.ej. dentro de un `FILTER`) solo sobran.
+    """
+    n_ent, con_desde, con_hasta, n_del = forma
+    conds: list[str] = []
+    if n_ent >= 0:
+        conds.append(f"entidad_id IN ({_placeholders(n_ent)})")
+    if con_desde:
+        conds.append(
+            "fecha >= ? AND anio >= ? AND (anio > ? OR mes >= ?)"
+            if poda
+            else "fecha >= ?"
+        )
+    if con_hasta:
+        conds.append(
+            "fecha <= ? AND anio <= ? AND (anio < ? OR mes <= ?)"
+            if poda
+            else "fecha <= ?"
+        )
+    if n_del >= 0:
+        conds.append(f"delito IN ({_placeholders(n_del)})")
+    return " AND ".join(conds)
+
+
+def _where(forma: tuple[int, bool, bool, int]) -> str:
+    cond = _condicion(forma)
+    return f" WHERE {cond}" if cond else ""
+
+
+@lru_cache(maxsize=256)
+def _sql_filas(
+    forma: tuple[int, bool, bool, int],
+    columnas: tuple[str, ...],
+    con_limite: bool = False,
+) -> str:
+    limite = " LIMIT ?" if con_limite else ""
+    return f"SELECT {', '.join(columnas)} FROM incidentes{_where(forma)}{limite}"
+
+
+@lru_cache(maxsize=256)
+def _sql_conteo(
+    forma: tuple[int, bool, bool, int], por: tuple[str, ...], con_limite: bool = False
+) -> str:
+    grupos = ", ".join(por)
+    limite = " LIMIT ?" if con_limite else ""
+    return (
+        f"SELECT {grupos}, SUM(eventos)::BIGINT AS conteo FROM incidentes"
+        f"{_where(forma)} GROUP BY {grupos} ORDER BY conteo DESC, {grupos}{limite}"
+    )
+
+
+@lru_cache(maxsize=256)
+def _sql_conteos_acumulados(formas: tuple[tuple[int, bool, bool, int], ...]) -> str:
+    """
+    Filas que sobreviven a cada etapa en una sola pasada: el WHERE externo es
+    la primera etapa (la más amplia, y la que poda) y cada etapa siguiente se
+    cuenta con un agregado `FILTER` sin los predicados de partición.
+    """
+    cols = ["COUNT(*)"] + [
+        f"COUNT(*) FILTER (WHERE {_condicion(f, poda=False) or 'TRUE'})"
+        for f in formas[1:]
+    ]
+    return f"SELECT {', '.join(cols)} FROM incidentes{_where(formas[0])}"
+
+
+@lru_cache(maxsize=256)
+def _sql_conteos_lote(
+    formas: tuple[tuple[int, bool, bool, int], ...],
+    envolvente: tuple[int, bool, bool, int],
+) -> str:
+    """Como `_sql_conteos_acumulados`, pero las etapas no se refinan: el WHERE es su envolvente."""
+    cols = [
+        f"COUNT(*) FILTER (WHERE {_condicion(f, poda=False) or 'TRUE'})" for f in formas
+    ]
+    return f"SELECT {', '.join(cols)} FROM incidentes{_where(envolvente)}"
+
+
+def _union(valores: Sequence[Optional[tuple[str, ...]]]) -> Optional[tuple[str, ...]]:
+    if any(v is None for v in valores):
+        return None
+    return tuple(dict.fromkeys(x for v in valores for x in v))
+
+
+def envolvente(filtros: Sequence[Filtros]) -> Filtros:
+    """El filtro más estrecho que contiene a todos (poda de una pasada compartida)."""
+    desdes = [f.desde for f in filtros]
+    hastas = [f.hasta for f in filtros]
+    return Filtros(
+        entidad_ids=_union([f.entidad_ids for f in filtros]),
+        desde=None if None in desdes else min(desdes),
+        hasta=None if None in hastas else max(hastas),
+        delitos=_union([f.delitos for f in filtros]),
+    )
+
+
+def _validar_columnas(
+    columnas: Sequence[str], permitidas: Sequence[str]
+) -> tuple[str, ...]:
+    # Los nombres de columna no pueden ir como parámetro: se validan contra lista blanca.
+    fuera = [c for c in columnas if c not in permitidas]
+    if fuera:
+        raise ValueError(f"Columnas no permitidas en Consultor: {fuera}")
+    return tuple(columnas)
+
+
+class _Generacion:
+    """Una conexión base con su vista; vive mientras algún cursor la use."""
+
+    __slots__ = ("conn", "firma", "cursores")
+
+    def __init__(
+        self, conn: duckdb.DuckDBPyConnection, firma: Optional[tuple[int, int, int]]
+    ) -> None:
+        self.conn = conn
+        self.firma = firma
+        self.cursores = 0
+
+
+class PoolDuckDB:
+    """
+    Base DuckDB en memoria + un cursor por hilo.
+
+    Con manifest, la vista lee exactamente las partes que él lista y se rehace
+    cuando el manifest cambia (un stat() por consulta): las partes nuevas o
+    retiradas por una ingesta en curso no se ven a medias. Sin manifest
+    (depósito armado a mano) la vista es un glob que se re-evalúa en cada consulta.
+
+    Cada vista es una generación con su conexión; cerrar una conexión cierra
+    sus cursores, así que la generación reemplazada se cierra cuando se libera
+    su último cursor (el hilo pasa a la nueva o el cursor se recolecta).
+    """
+
+    def __init__(self, incidentes_dir: Path, threads: int = CONSULTOR_THREADS) -> None:
+        self.incidentes_dir = incidentes_dir
+        self.deposito_dir = incidentes_dir.parent
+        self.threads = threads
+        self._actual: Optional[_Generacion] = None
+        # Reentrante: el finalizador de un cursor puede correr (gc) con el lock tomado.
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    def _abrir(self, firma: Optional[tuple[int, int, int]]) -> _Generacion:
+        """Generación vigente para `firma`; la crea si cambió. Con `_lock` tomado."""
+        actual = self._actual
+        if actual is not None and actual.firma == firma:
+            return actual
+        manifest = leer_manifest(self.deposito_dir)
+        if manifest.fuentes:
+            rutas = partes(manifest, self.deposito_dir)
+            fuente = sql_parquet(rutas)
+        else:
+            rutas = list(self.incidentes_dir.glob("**/*.parquet"))
+            patron = (
+                (self.incidentes_dir / "**" / "*.parquet").as_posix().replace("'", "''")
+            )
+            fuente = f"read_parquet('{patron}', hive_partitioning = true, union_by_name = true)"
+        if not rutas:
+            raise DatosFaltantesError(
+                f"Depósito sin datos de incidentes en {self.incidentes_dir}"
+            )
+        conn = duckdb.connect(
+            ":memory:",
+            config={"threads": self.threads, "enable_object_cache": True},
+        )
+        conn.execute(f"CREATE VIEW incidentes AS SELECT * FROM {fuente}")
+        conn.execute("SET lock_configuration = true")
+        self._actual = _Generacion(conn, firma)
+        if actual is not None and actual.cursores == 0:
+            actual.conn.close()  # nadie la usa: si no, la cierra su último cursor
+        return self._actual
+
+    def _soltar(self, generacion: _Generacion) -> None:
+        with self._lock:
+            generacion.cursores -= 1
+            if generacion.cursores == 0 and generacion is not self._actual:
+                generacion.conn.close()
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        firma = firma_manifest(self.deposito_dir)
+        local = self._local
+        # Generación y cursor se leen juntos: el cursor es de la conexión de `generacion`.
+        generacion: Optional[_Generacion] = getattr(local, "generacion", None)
+        if (
+            generacion is not None
+            and generacion is self._actual
+            and generacion.firma == firma
+        ):
+            return local.cursor
+        with self._lock:
+            generacion = self._abrir(firma)
+            cur = generacion.conn.cursor()
+            generacion.cursores += 1
+        weakref.finalize(cur, self._soltar, generacion)
+        # Reemplazar el cursor del hilo suelta el anterior (si nadie más lo retiene).
+        local.cursor, local.generacion = cur, generacion
+        return cur
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if self._actual is not None:
+                self._actual.conn.close()
+                self._actual = None
+
+
+class Consultor:
+    def __init__(self, pool: PoolDuckDB) -> None:
+        self.pool = pool
+
+    def _ejecutar(
+        self, nombre: str, sql: str, params: list[Any], filtros: Filtros
+    ) -> pa.Table:
+        t0 = time.perf_counter()
+        tabla = _tabla(self.pool.cursor().execute(sql, params))
+        dt = round((time.perf_counter() - t0) * 1000, 3)
+        audit(
+            "consultor.query",
+            {
+                "component": CONSULTOR,
+                "query": nombre,
+                "filtros": filtros.como_dict(),
+                "rows": tabla.num_rows,
+                "timing_ms": dt,
+            },
+        )
+        return tabla
+
+    def incidentes(
+        self,
+        filtros: Filtros,
+        columnas: Sequence[str] = COLUMNAS_INCIDENTES,
+        limite: Optional[int] = None,
+    ) -> pa.Table:
+        cols = _validar_columnas(columnas, COLUMNAS_CONSULTABLES)
+        sql = _sql_filas(filtros.forma(), cols, limite is not None)
+        params = filtros.parametros() + ([limite] if limite is not None else [])
+        return self._ejecutar("incidentes", sql, params, filtros)
+
+    def lotes_incidentes(
+        self,
+        filtros: Filtros,
+        columnas: Sequence[str] = COLUMNAS_INCIDENTES,
+        filas_por_lote: int = 65_536,
+    ) -> Iterator[pa.RecordBatch]:
+        """Iterador de RecordBatch para respuestas en streaming (memoria acotada)."""
+        cols = _validar_columnas(columnas, COLUMNAS_CONSULTABLES)
+        sql = _sql_filas(filtros.forma(), cols)
+        t0 = time.perf_counter()
+        filas = 0
+        cur = self.pool.cursor()  # retenido mientras se lee: su generación no se cierra
+        lector = _lector(cur.execute(sql, filtros.parametros()), filas_por_lote)
+        try:
+            for lote in lector:
+                filas += lote.num_rows
+                yield lote
+        finally:
+            audit(
+                "consultor.query",
+                {
+                    "component": CONSULTOR,
+                    "query": "lotes_incidentes",
+                    "filtros": filtros.como_dict(),
+                    "rows": filas,
+                    "timing_ms": round((time.perf_counter() - t0) * 1000, 3),
+                },
+            )
+
+    def conteo_por(
+        self,
+        filtros: Filtros,
+        por: Sequence[str] = ("entidad_id",),
+        limite: Optional[int] = None,
+    ) -> pa.Table:
+        """`SUM(eventos)` agrupado por `por`, ordenado de mayor a menor."""
+        grupos = _validar_columnas(por, ("fecha", "entidad_id", "delito"))
+        sql = _sql_conteo(filtros.forma(), grupos, limite is not None)
+        params = filtros.parametros() + ([limite] if limite is not None else [])
+        return self._ejecutar("conteo_por", sql, params, filtros)
+
+    def conteos_acumulados(self, etapas: Sequence[Filtros]) -> list[int]:
+        """
+        Filas tras cada etapa de una cadena de filtros, en UNA consulta.
+        Cada etapa debe ser un refinamiento de la anterior (filtros conjuntivos).
+        """
+        if not etapas:
+            return []
+        sql = _sql_conteos_acumulados(tuple(f.forma() for f in etapas))
+        params = [p for f in etapas[1:] for p in f.parametros(poda=False)]
+        params += etapas[0].parametros()
+        fila = self._ejecutar("conteos_acumulados", sql, params, etapas[-1])
+        return [int(fila.column(i)[0].as_py()) for i in range(fila.num_columns)]
+
+    def conteos_lote(self, filtros: Sequence[Filtros]) -> dict[Filtros, int]:
+        """
+        Filas tras cada filtro, para filtros independientes (p.ej. los de
+        varios planes de un lote), en UNA pasada podada por su envolvente.
+        """
+        unicos = list(dict.fromkeys(filtros))
+        if not unicos:
+            return {}
+        env = envolvente(unicos)
+        sql = _sql_conteos_lote(tuple(f.forma() for f in unicos), env.forma())
+        params = [
+            p for f in unicos for p in f.parametros(poda=False)
+        ] + env.parametros()
+        fila = self._ejecutar("conteos_lote", sql, params, env)
+        return {f: int(fila.column(i)[0].as_py()) for i, f in enumerate(unicos)}
+
+
+_consultor: Optional[Consultor] = None
+_consultor_lock = threading.Lock()
+
+
+def obtener_consultor() -> Consultor:
+    """Consultor compartido del proceso (se crea al primer uso)."""
+    global _consultor
+    if _consultor is None:
+        with _consultor_lock:
+            if _consultor is None:
+                _consultor = Consultor(PoolDuckDB(INCIDENTES_DIR))
+    return _consultor
@@ -0,0 +1,312 @@
+# casandra/empaquetador/artefactos.py
+"""
+Almacén de artefactos: resultados completos detrás de `limit_notice` (doc §4.4).
+
+El Sobre lleva a lo más `max_rows` filas inline; el resultado completo se
+escribe una sola vez como archivo Arrow IPC (sin compresión, para poder
+mapearlo) bajo una clave derivada de (dataset_version, query_hash, paso).
+Las páginas posteriores (`/artifacts/{id}?offset=&limit=`) rebanan la tabla
+mapeada en memoria: no se re-ejecuta la tool ni se copia el archivo.
+
+Layout:
+
+    data/artefactos/
+      <id>.arrow           # id = 24 hex
+      <id>.arrow.tmp       # escritura en curso (rename atómico al cerrar)
+
+Recolección: por edad (`CASANDRA_ARTEFACTOS_TTL_S`) y por tamaño total
+(`CASANDRA_ARTEFACTOS_MAX_MB`, se borran primero los menos usados).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
+
+import msgspec
+import pyarrow as pa
+
+from ..Celador.auditoria import audit
+from ..Celador.errores import ArtefactoNoEncontrado, ValidacionError
+from ..dominio.nombres import EMPAQUETADOR
+from ..dominio.sobre import Columna, Resumen, SobreMeta
+from ..Etl.deposito import DATA_DIR
+from .flujo import Flujo, columnas
+
+
+ARTEFACTOS_DIR = Path(
+    os.getenv("CASANDRA_ARTEFACTOS_DIR", str(DATA_DIR / "artefactos"))
+)
+ARTEFACTOS_MAX_MB = int(os.getenv("CASANDRA_ARTEFACTOS_MAX_MB", "1024"))
+ARTEFACTOS_TTL_S = int(os.getenv("CASANDRA_ARTEFACTOS_TTL_S", str(24 * 3600)))
+GC_CADA_S = 60.0
+ABIERTOS_MAX = 32  # tablas mapeadas que se mantienen abiertas (LRU)
+
+PAGINA_DEFAULT = 100
+PAGINA_MAX = 5_000
+LOTE_FLUJO = 65_536
+
+URI_TABLAS = "artifact://tables/"
+_EXT = ".arrow"
+_ID = re.compile(r"^[0-9a-f]{24}$")
+
+Fuente = Union[pa.Table, Iterable[pa.RecordBatch]]
+
+
+def id_artefacto(dataset_version: str, query_hash: str, paso: int, nombre: str) -> str:
+    blob = f"{dataset_version}|{query_hash}|{paso}|{nombre}".encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:24]
+
+
+def uri(aid: str) -> str:
+    return f"{URI_TABLAS}{aid}{_EXT}"
+
+
+def id_de_uri(u: str) -> str:
+    """Inverso de `uri`."""
+    return u[len(URI_TABLAS) : -len(_EXT)]
+
+
+class PaginaArtefacto(msgspec.Struct, gc=False, omit_defaults=True):
+    id: str
+    columns: list[Columna]
+    rows: list[list[Any]]
+    offset: int
+    limit: int
+    total_rows: int
+    next_offset: Optional[int] = None
+
+
+class AlmacenArtefactos:
+    """
+    Escritura idempotente por id y lectura por páginas sobre mmap.
+
+    Thread-safe: las tablas abiertas viven en un LRU protegido por lock; las
+    rebanadas de Arrow son vistas inmutables, así que se comparten sin copiar.
+    """
+
+    def __init__(
+        self,
+        raiz: Path = ARTEFACTOS_DIR,
+        max_bytes: int = ARTEFACTOS_MAX_MB * 1024 * 1024,
+        ttl_s: float = ARTEFACTOS_TTL_S,
+    ) -> None:
+        self.raiz = raiz
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._abiertos: "OrderedDict[str, pa.Table]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ultimo_gc = 0.0
+
+    def ruta(self, aid: str) -> Path:
+        if not _ID.match(aid):
+            raise ValidacionError(f"id de artefacto inválido: {aid!r}")
+        return self.raiz / f"{aid}{_EXT}"
+
+    def existe(self, aid: str) -> bool:
+        return self.ruta(aid).exists()
+
+    # --- escritura ---
+
+    def guardar(
+        self, aid: str, fuente: Fuente, esquema: Optional[pa.Schema] = None
+    ) -> int:
+        """
+        Escribe el artefacto si no existe y devuelve su número de filas.
+        `fuente` puede ser una tabla o un iterador de RecordBatch (entonces se
+        requiere `esquema`); en ese caso nunca se materializa completo en RAM.
+        """
+        ruta = self.ruta(aid)
+        if ruta.exists():
+            return self._tabla(aid).num_rows
+
+        if isinstance(fuente, pa.Table):
+            esquema, lotes = fuente.schema, fuente.to_batches()
+        elif esquema is None:
+            raise ValueError("guardar(): un iterador de lotes requiere `esquema`")
+        else:
+            lotes = fuente
+
+        self.raiz.mkdir(parents=True, exist_ok=True)
+        tmp = ruta.with_name(f"{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        filas = 0
+        t0 = time.perf_counter()
+        try:
+            with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(
+                sink, esquema
+            ) as escritor:
+                for lote in lotes:
+                    escritor.write_batch(lote)
+                    filas += lote.num_rows
+            os.replace(tmp, ruta)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+        audit(
+            "artifact.write",
+            {
+                "component": EMPAQUETADOR,
+                "artifact_id": aid,
+                "rows": filas,
+                "bytes": ruta.stat().st_size,
+                "timing_ms": int((time.perf_counter() - t0) * 1000),
+            },
+        )
+        self.recolectar(forzar=False)
+        return filas
+
+    # --- lectura ---
+
+    def _tabla(self, aid: str) -> pa.Table:
+        with self._lock:
+            tabla = self._abiertos.get(aid)
+            if tabla is not None:
+                self._abiertos.move_to_end(aid)
+                return tabla
+
+        ruta = self.ruta(aid)
+        try:
+            # read_all sobre un memory_map no copia: los buffers apuntan al mapa.
+            tabla = pa.ipc.open_file(pa.memory_map(str(ruta), "r")).read_all()
+        except FileNotFoundError:
+            raise ArtefactoNoEncontrado(f"artefacto {aid} no existe o expiró") from None
+
+        with self._lock:
+            self._abiertos[aid] = tabla
+            while len(self._abiertos) > ABIERTOS_MAX:
+                self._abiertos.popitem(last=False)
+        return tabla
+
+    def rebanada(
+        self, aid: str, offset: int = 0, limit: int = PAGINA_DEFAULT
+    ) -> tuple[pa.Table, int]:
+        """(vista sin copia de filas [offset, offset+limit), total de filas)."""
+        if offset < 0:
+            raise ValidacionError("offset debe ser >= 0")
+        if not 1 <= limit <= PAGINA_MAX:
+            raise ValidacionError(f"limit debe estar en [1, {PAGINA_MAX}]")
+        tabla = self._tabla(aid)
+        try:
+            os.utime(self.ruta(aid))  # el GC por tamaño borra primero lo menos usado
+        except FileNotFoundError:
+            pass
+        return tabla.slice(offset, limit), tabla.num_rows
+
+    def pagina(
+        self, aid: str, offset: int = 0, limit: int = PAGINA_DEFAULT
+    ) -> PaginaArtefacto:
+        vista, total = self.rebanada(aid, offset, limit)
+        cols = [c.to_pylist() for c in vista.columns]
+        fin = offset + vista.num_rows
+        return PaginaArtefacto(
+            id=aid,
+            columns=columnas(vista.schema),
+            rows=[list(f) for f in zip(*cols)] if cols else [],
+            offset=offset,
+            limit=limit,
+            total_rows=total,
+            next_offset=fin if fin < total else None,
+        )
+
+    def flujo(self, aid: str, offset: int = 0) -> Flujo:
+        """El artefacto desde `offset` hasta el final, como lotes del mmap (modo streaming)."""
+        if offset < 0:
+            raise ValidacionError("offset debe ser >= 0")
+        tabla = self._tabla(aid)
+        vista, total = tabla.slice(offset), tabla.num_rows
+        return Flujo(
+            tool=EMPAQUETADOR,
+            meta=SobreMeta(),
+            esquema=vista.schema,
+            lotes=vista.to_batches(max_chunksize=LOTE_FLUJO),
+            resumen=lambda n: Resumen(
+                headline=f"{n:,} de {total:,} filas del artefacto {aid}"
+            ),
+        )
+
+    # --- recolección ---
+
+    def recolectar(self, forzar: bool = True) -> int:
+        """
+        Borra artefactos vencidos por edad y, si el total excede `max_bytes`,
+        los menos usados (mtime). Sin `forzar` corre a lo más cada GC_CADA_S.
+        """
+        ahora = time.time()
+        if not forzar and ahora - self._ultimo_gc < GC_CADA_S:
+            return 0
+        self._ultimo_gc = ahora
+        if not self.raiz.exists():
+            return 0
+
+        vivos: list[tuple[float, int, Path]] = []
+        borrados = 0
+        for p in self.raiz.iterdir():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            vencido = ahora - st.st_mtime > self.ttl_s
+            if p.suffix == ".tmp":
+                # temporales huérfanos de un proceso muerto
+                if vencido:
+                    p.unlink(missing_ok=True)
+                continue
+            if p.suffix != _EXT:
+                continue
+            if vencido:
+                self._borrar(p)
+                borrados += 1
+            else:
+                vivos.append((st.st_mtime, st.st_size, p))
+
+        total = sum(s for _, s, _ in vivos)
+        for _, size, p in sorted(vivos):
+            if total <= self.max_bytes:
+                break
+            self._borrar(p)
+            total -= size
+            borrados += 1
+
+        if borrados:
+            audit(
+                "artifact.gc",
+                {"component": EMPAQUETADOR, "deleted": borrados, "bytes_kept": total},
+            )
+        return borrados
+
+    def _borrar(self, p: Path) -> None:
+        # Un mmap abierto sigue siendo válido tras unlink (POSIX); solo se olvida del LRU.
+        p.unlink(missing_ok=True)
+        with self._lock:
+            self._abiertos.pop(p.stem, None)
+
+
+_almacen: Optional[AlmacenArtefactos] = None
+_almacen_lock = threading.Lock()
+
+
+def obtener_almacen() -> AlmacenArtefactos:
+    global _almacen
+    if _almacen is None:
+        with _almacen_lock:
+            if _almacen is None:
+                _almacen = AlmacenArtefactos()
+    return _almacen
+
+
+def publicar(
+    almacen: AlmacenArtefactos,
+    aid: str,
+    producir: Callable[[], Fuente],
+    esquema: Optional[pa.Schema] = None,
+) -> str:
+    """Escribe el artefacto solo si no existe (`producir` no se invoca en un hit)."""
+    if not almacen.existe(aid):
+        almacen.guardar(aid, producir(), esquema)
+    return uri(aid)
@@ -0,0 +1,241 @@
+# casandra/empaquetador/flujo.py
+"""
+Modo streaming (opt-in) para salidas grandes: NDJSON o Arrow IPC stream.
+
+Se negocia con `Accept` o con `?stream=ndjson|arrow`. El orden de emisión
+es siempre: cabecera (status, tool, meta, columnas) -> filas por lotes ->
+cierre (summary, filas emitidas, timing). Así el cliente recibe bytes en
+cuanto la consulta produce el primer lote y la memoria queda acotada al
+tamaño de un lote, no del resultado.
+
+NDJSON:
+    {"type":"header","status":"ok","tool":...,"columns":[...],"meta":{...}}
+    ["GTO.MUN.LEON", 132]          # una fila por línea (arreglo)
+    {"type":"trailer","status":"ok","rows":N,"timing_ms":...,"summary":{...}}
+
+Arrow: la cabecera va en la metadata del schema (`casandra:header`) y el
+cierre en la metadata de un lote vacío final (`casandra:trailer`).
+
+Un fallo a mitad del stream ya no puede cambiar el HTTP status: en NDJSON
+se emite un cierre con `status:"error"` y el código de `ERROR_MAP`; en Arrow
+el stream se corta sin marca de fin, que el lector reporta como error.
+
+pyarrow se importa al codificar, no al importar el módulo: el Expositor lo
+carga al arrancar y el arranque no debe pagar por pyarrow.
+"""
+from __future__ import annotations
+
+import io
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Literal, Optional
+
+import msgspec
+
+from ..Celador.auditoria import audit, get_job_id, set_job_id
+from ..Celador.errores import ValidacionError, error_code_http
+from ..dominio.nombres import EMPAQUETADOR
+from ..dominio.sobre import Columna, Resumen, SobreErrorDetails, SobreMeta
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+Formato = Literal["ndjson", "arrow"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+_ACCEPT: dict[str, Formato] = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/vnd.apache.arrow.stream": "arrow",
+}
+
+_ENCODER = msgspec.json.Encoder()
+
+
+@dataclass
+class Flujo:
+    """
+    Salida en streaming de una tool. `lotes` debe ser perezoso (p.ej. el
+    iterador del Consultor) para que la consulta corra después de la cabecera.
+    """
+
+    tool: str
+    meta: SobreMeta
+    esquema: pa.Schema
+    lotes: Iterable[pa.RecordBatch]
+    resumen: Callable[[int], Resumen]  # recibe las filas emitidas
+
+
+class _Cabecera(msgspec.Struct, gc=False, tag_field="type", tag="header"):
+    status: Literal["ok"]
+    tool: str
+    columns: list[Columna]
+    meta: SobreMeta
+
+
+class _Cierre(
+    msgspec.Struct, gc=False, omit_defaults=True, tag_field="type", tag="trailer"
+):
+    status: Literal["ok", "error"]
+    rows: int
+    timing_ms: int
+    summary: Optional[Resumen] = None
+    error: Optional[SobreErrorDetails] = None
+
+
+def negociar(accept: Optional[str], stream: Optional[str]) -> Optional[Formato]:
+    """Formato pedido o None (respuesta JSON normal). `?stream=` manda sobre `Accept`."""
+    if stream:
+        if stream not in MEDIA_TYPES:
+            raise ValidacionError(
+                f"stream debe ser uno de {list(MEDIA_TYPES)}: {stream!r}"
+            )
+        return stream  # type: ignore[return-value]
+    for parte in (accept or "").split(","):
+        formato = _ACCEPT.get(parte.split(";", 1)[0].strip().lower())
+        if formato is not None:
+            return formato
+    return None
+
+
+def _tipo(t: pa.DataType) -> str:
+    import pyarrow as pa
+
+    if pa.types.is_integer(t):
+        return "int"
+    if pa.types.is_floating(t):
+        return "float"
+    if pa.types.is_boolean(t):
+        return "bool"
+    if pa.types.is_date(t) or pa.types.is_timestamp(t):
+        return "date"
+    return "string"
+
+
+def columnas(esquema: pa.Schema) -> list[Columna]:
+    """Columnas del Sobre (`data.inline.columns`) a partir de un schema Arrow."""
+    return [Columna(name=f.name, type=_tipo(f.type)) for f in esquema]
+
+
+def _ndjson(
+    flujo: Flujo, cierre: Callable[[], _Cierre], contar: Callable[[int], None]
+) -> Iterator[bytes]:
+    yield _ENCODER.encode(
+        _Cabecera("ok", flujo.tool, columnas(flujo.esquema), flujo.meta)
+    ) + b"\n"
+    for lote in flujo.lotes:
+        if lote.num_rows:
+            contar(lote.num_rows)
+            yield _ENCODER.encode_lines(
+                list(zip(*(c.to_pylist() for c in lote.columns)))
+            )
+    yield _ENCODER.encode(cierre()) + b"\n"
+
+
+def _arrow(
+    flujo: Flujo, cierre: Callable[[], _Cierre], contar: Callable[[int], None]
+) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    cabecera = _ENCODER.encode(
+        _Cabecera("ok", flujo.tool, columnas(flujo.esquema), flujo.meta)
+    )
+    esquema = flujo.esquema.with_metadata(
+        {**(flujo.esquema.metadata or {}), b"casandra:header": cabecera}
+    )
+    buf = io.BytesIO()
+
+    def drenar() -> bytes:
+        datos = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return datos
+
+    with pa.ipc.new_stream(buf, esquema) as escritor:
+        yield drenar()
+        for lote in flujo.lotes:
+            if lote.num_rows:
+                contar(lote.num_rows)
+                escritor.write_batch(lote)
+                yield drenar()
+        vacio = pa.RecordBatch.from_pylist([], schema=esquema)
+        escritor.write_batch(
+            vacio, custom_metadata={"casandra:trailer": _ENCODER.encode(cierre())}
+        )
+    yield drenar()
+
+
+def codificar(flujo: Flujo, formato: Formato) -> Iterator[bytes]:
+    """
+    Genera los bytes del stream. Audita `stream.end` (filas, bytes, TTFB) o
+    `stream.error`; el job_id se fija al crear el generador porque Starlette
+    lo itera desde un threadpool.
+    """
+    jid = get_job_id()
+    t0 = time.perf_counter()
+    estado = {"filas": 0}
+
+    def contar(n: int) -> None:
+        estado["filas"] += n
+
+    def cierre_ok() -> _Cierre:
+        return _Cierre(
+            status="ok",
+            rows=estado["filas"],
+            timing_ms=int((time.perf_counter() - t0) * 1000),
+            summary=flujo.resumen(estado["filas"]),
+        )
+
+    def generar() -> Iterator[bytes]:
+        set_job_id(jid)
+        escritor = _ndjson if formato == "ndjson" else _arrow
+        total = 0
+        ttfb_ms: Optional[float] = None
+        try:
+            for trozo in escritor(flujo, cierre_ok, contar):
+                if ttfb_ms is None:
+                    ttfb_ms = round((time.perf_counter() - t0) * 1000, 3)
+                total += len(trozo)
+                yield trozo
+        except Exception as e:
+            code, _http = error_code_http(e)
+            audit(
+                "stream.error",
+                {
+                    "component": EMPAQUETADOR,
+                    "tool": flujo.tool,
+                    "format": formato,
+                    "code": code,
+                    "rows": estado["filas"],
+                    "error": type(e).__name__,
+                    "details": str(e),
+                },
+            )
+            if formato == "ndjson":
+                # Solo NDJSON admite una línea de cierre tras un fallo a medio lote.
+                cierre = _Cierre(
+                    status="error",
+                    rows=estado["filas"],
+                    timing_ms=int((time.perf_counter() - t0) * 1000),
+                    error=SobreErrorDetails(code=code, details=str(e)),
+                )
+                yield _ENCODER.encode(cierre) + b"\n"
+            return
+        audit(
+            "stream.end",
+            {
+                "component": EMPAQUETADOR,
+                "tool": flujo.tool,
+                "format": formato,
+                "rows": estado["filas"],
+                "bytes": total,
+                "ttfb_ms": ttfb_ms,
+                "timing_ms": int((time.perf_counter() - t0) * 1000),
+            },
+        )
+
+    return generar()
@@ -0,0 +1,116 @@
+# casandra/etl/cargador.py
+"""
+Cargador: lectura en streaming de fuentes CSV o ZIP de CSVs.
+
+Nunca carga un archivo completo: pyarrow lee bloques de `block_size` bytes y
+entrega RecordBatch con todas las columnas como texto (el Curador tipa).
+Las columnas de `COLUMNAS_OPCIONALES` (coordenadas) se leen solo si el
+encabezado del CSV las trae.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import os
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from ..Celador.errores import DatosFaltantesError
+
+
+COLUMNAS_FUENTE = ("fecha", "entidad_id", "delito", "eventos")
+COLUMNAS_OPCIONALES = ("lat", "lon")
+BLOCK_BYTES = int(os.getenv("CASANDRA_ETL_BLOCK_BYTES", str(8 << 20)))
+
+
+@dataclass(frozen=True)
+class Fuente:
+    ruta: Path
+    hash: str  # "blake3:<hex>" o "sha256:<hex>"
+    bytes: int
+
+    @property
+    def clave(self) -> str:
+        return str(self.ruta.resolve())
+
+
+def hash_contenido(ruta: Path, bloque: int = 1 << 20) -> str:
+    """Hash del contenido en streaming (blake3 si está instalado; si no, sha256)."""
+    try:
+        import blake3
+
+        h, prefijo = blake3.blake3(), "blake3"
+    except ImportError:
+        h, prefijo = hashlib.sha256(), "sha256"
+    with ruta.open("rb") as f:
+        while chunk := f.read(bloque):
+            h.update(chunk)
+    return f"{prefijo}:{h.hexdigest()}"
+
+
+def describir(ruta: Path) -> Fuente:
+    return Fuente(ruta=ruta, hash=hash_contenido(ruta), bytes=ruta.stat().st_size)
+
+
+def _streams_csv(ruta: Path) -> Iterator[tuple[str, BinaryIO]]:
+    """(nombre, stream) por cada CSV: el archivo mismo o cada miembro del ZIP."""
+    if not zipfile.is_zipfile(ruta):
+        with ruta.open("rb") as f:
+            yield ruta.name, f
+        return
+
+    with zipfile.ZipFile(ruta) as zf:
+        miembros = sorted(
+            m
+            for m in zf.namelist()
+            if m.lower().endswith(".csv") and not m.startswith("__MACOSX")
+        )
+        if not miembros:
+            raise DatosFaltantesError(f"ZIP sin CSVs: {ruta}")
+        for m in miembros:
+            with zf.open(m) as f:  # descomprime en streaming
+                yield m, f
+
+
+def _encabezado(stream: BinaryIO) -> set[str]:
+    """Columnas de la primera línea, sin consumir el stream (`peek`)."""
+    primera = stream.peek(1 << 16).split(b"\n", 1)[0]  # type: ignore[attr-defined]
+    return {
+        c.strip()
+        for c in next(csv.reader([primera.decode("utf-8-sig", "replace")]), [])
+    }
+
+
+def leer_lotes(
+    fuente: Fuente, block_size: int = BLOCK_BYTES
+) -> Iterator[pa.RecordBatch]:
+    """
+    RecordBatch de texto con `COLUMNAS_FUENTE` (y las `COLUMNAS_OPCIONALES`
+    que traiga el CSV), en memoria acotada por `block_size`.
+    """
+    opciones_lectura = pacsv.ReadOptions(block_size=block_size)
+
+    for nombre, stream in _streams_csv(fuente.ruta):
+        columnas = list(COLUMNAS_FUENTE)
+        columnas += [c for c in COLUMNAS_OPCIONALES if c in _encabezado(stream)]
+        opciones_conversion = pacsv.ConvertOptions(
+            column_types={c: pa.string() for c in columnas},
+            include_columns=columnas,
+            strings_can_be_null=True,
+        )
+        try:
+            lector = pacsv.open_csv(
+                stream,
+                read_options=opciones_lectura,
+                convert_options=opciones_conversion,
+            )
+        except (pa.ArrowInvalid, KeyError) as e:
+            raise DatosFaltantesError(
+                f"CSV sin el esquema mínimo {COLUMNAS_FUENTE} en {fuente.ruta}:{nombre}: {e}"
+            ) from e
+        yield from lector
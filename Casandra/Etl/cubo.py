@@ -0,0 +1,233 @@
+# casandra/etl/cubo.py
+"""
+Cubo de conteos entidad × delito × día con sumas prefijo.
+
+    <deposito>/cubo/<dataset_version>/
+    ├── ejes.json        # entidades, delitos, dia0, dias, dtype
+    ├── conteos.npy      # acumulado[t, e, d] = SUM(eventos) de los días < t
+    └── poblacion.npy    # habitantes por entidad (NaN si no hay dato)
+
+El eje de días va primero para que una ventana [t1, t2] sean dos bloques
+contiguos: `acumulado[t2 + 1] - acumulado[t1]`. El Consultor lo abre con
+`mmap`, así que todos los workers comparten las mismas páginas.
+
+Reconstrucción incremental: si los ejes no cambian, se reutiliza el prefijo
+anterior a la primera partición tocada y solo se re-agrega desde ahí.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+import duckdb
+import msgspec
+import numpy as np
+import pyarrow.csv as pacsv
+
+from ..Celador.auditoria import audit
+from ..dominio.nombres import DEPOSITO
+from .deposito import Manifest, partes, podar_versiones, sql_parquet
+
+
+CUBO = "cubo"
+POBLACION = "poblacion.csv"
+
+
+class EjesCubo(msgspec.Struct, frozen=True):
+    dataset_version: str
+    dia0: date
+    dias: int
+    entidades: list[str]
+    delitos: list[str]
+    dtype: str
+
+
+def dir_cubo(deposito_dir: Path, dataset_version: str) -> Path:
+    return deposito_dir / CUBO / dataset_version
+
+
+def leer_ejes(directorio: Path) -> Optional[EjesCubo]:
+    try:
+        return msgspec.json.decode(
+            (directorio / "ejes.json").read_bytes(), type=EjesCubo
+        )
+    except FileNotFoundError:
+        return None
+
+
+def leer_poblacion(deposito_dir: Path) -> dict[str, float]:
+    """`<deposito>/poblacion.csv` (entidad_id, poblacion); vacío si no existe."""
+    ruta = deposito_dir / POBLACION
+    if not ruta.exists():
+        return {}
+    tabla = pacsv.read_csv(
+        ruta,
+        convert_options=pacsv.ConvertOptions(
+            include_columns=["entidad_id", "poblacion"]
+        ),
+    )
+    return dict(
+        zip(
+            tabla.column("entidad_id").to_pylist(),
+            tabla.column("poblacion").to_pylist(),
+        )
+    )
+
+
+def _diarios(rutas: list[Path], desde: Optional[date]):
+    """(entidad_id, delito, fecha, eventos) de las partes `rutas` agregados por día, desde `desde`."""
+    con = duckdb.connect(":memory:")
+    try:
+        where, params = (
+            ("WHERE fecha >= ? AND anio >= ?", [desde, desde.year])
+            if desde
+            else ("", [])
+        )
+        sql = (
+            "SELECT entidad_id, delito, fecha, SUM(eventos)::BIGINT AS eventos "
+            f"FROM {sql_parquet(rutas)} "
+            f"{where} GROUP BY ALL"
+        )
+        cur = con.execute(sql, params)
+        return (
+            cur.to_arrow_table()
+            if hasattr(cur, "to_arrow_table")
+            else cur.fetch_arrow_table()
+        )
+    finally:
+        con.close()
+
+
+def _indices(columna, eje: list[str]) -> np.ndarray:
+    pos = {v: i for i, v in enumerate(eje)}
+    dic = columna.combine_chunks().dictionary_encode()
+    mapa = np.array([pos[v] for v in dic.dictionary.to_pylist()], dtype=np.int64)
+    return mapa[dic.indices.to_numpy(zero_copy_only=False)]
+
+
+def _primer_dia_tocado(particiones: list[str]) -> Optional[date]:
+    fechas = []
+    for p in particiones:
+        partes = dict(kv.split("=", 1) for kv in p.split("/"))
+        fechas.append(date(int(partes["anio"]), int(partes["mes"]), 1))
+    return min(fechas, default=None)
+
+
+def construir_cubo(
+    deposito_dir: Path, manifest: Manifest, previo: Optional[str] = None
+) -> Optional[Path]:
+    """
+    Construye el cubo de `manifest.dataset_version`. `previo` es la versión
+    anterior; si su cubo existe y los ejes no cambian, la reconstrucción es
+    incremental. Devuelve el directorio del cubo (None si no hay datos).
+    """
+    if (
+        not manifest.dataset_version
+        or manifest.min_date is None
+        or manifest.max_date is None
+    ):
+        return None
+    t0 = time.perf_counter()
+    dia0 = date.fromisoformat(manifest.min_date)
+    dias = (date.fromisoformat(manifest.max_date) - dia0).days + 1
+    rutas = partes(manifest, deposito_dir)
+
+    ejes_prev = leer_ejes(dir_cubo(deposito_dir, previo)) if previo else None
+    desde = _primer_dia_tocado(manifest.particiones_tocadas)
+    incremental = ejes_prev is not None and ejes_prev.dia0 == dia0 and desde is not None
+    if incremental:
+        desde = max(desde, dia0)
+        diarios = _diarios(rutas, desde)
+        nuevas_ent = set(diarios.column("entidad_id").to_pylist()) - set(
+            ejes_prev.entidades
+        )
+        nuevos_del = set(diarios.column("delito").to_pylist()) - set(ejes_prev.delitos)
+        incremental = not nuevas_ent and not nuevos_del
+    if incremental:
+        entidades, delitos = ejes_prev.entidades, ejes_prev.delitos
+        t_min = (desde - dia0).days
+    else:
+        diarios = _diarios(rutas, None)
+        entidades = sorted(set(diarios.column("entidad_id").to_pylist()))
+        delitos = sorted(set(diarios.column("delito").to_pylist()))
+        t_min = 0
+
+    n_e, n_d = len(entidades), len(delitos)
+    t_idx = (
+        np.asarray(diarios.column("fecha").to_numpy(), dtype="datetime64[D]")
+        - np.datetime64(dia0, "D")
+    ).astype(np.int64) - t_min
+    planos = (t_idx * n_e + _indices(diarios.column("entidad_id"), entidades)) * n_d
+    planos += _indices(diarios.column("delito"), delitos)
+    por_dia = (
+        np.bincount(
+            planos,
+            weights=diarios.column("eventos").to_numpy(),
+            minlength=(dias - t_min) * n_e * n_d,
+        )
+        .astype(np.int64)
+        .reshape(dias - t_min, n_e, n_d)
+    )
+
+    base = np.zeros((n_e, n_d), dtype=np.int64)
+    if incremental:
+        prev = np.load(dir_cubo(deposito_dir, previo) / "conteos.npy", mmap_mode="r")
+        base = np.asarray(prev[min(t_min, prev.shape[0] - 1)], dtype=np.int64)
+    total = int(base.sum() + por_dia.sum())
+    dtype = np.int32 if total < np.iinfo(np.int32).max else np.int64
+
+    destino = dir_cubo(deposito_dir, manifest.dataset_version)
+    tmp = destino.with_name(f".tmp-{destino.name}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    acumulado = np.lib.format.open_memmap(
+        tmp / "conteos.npy", mode="w+", dtype=dtype, shape=(dias + 1, n_e, n_d)
+    )
+    if incremental:
+        # Prefijo intacto: días anteriores a la primera partición tocada.
+        k = min(t_min + 1, prev.shape[0])
+        acumulado[:k] = prev[:k]
+        acumulado[k : t_min + 1] = prev[k - 1]
+    else:
+        acumulado[0] = 0
+    np.cumsum(por_dia, axis=0, out=por_dia)
+    acumulado[t_min + 1 :] = por_dia + base
+    acumulado.flush()
+    del acumulado
+
+    pob = leer_poblacion(deposito_dir)
+    np.save(
+        tmp / "poblacion.npy",
+        np.array([pob.get(e, np.nan) for e in entidades], dtype=np.float64),
+    )
+    ejes = EjesCubo(
+        dataset_version=manifest.dataset_version,
+        dia0=dia0,
+        dias=dias,
+        entidades=entidades,
+        delitos=delitos,
+        dtype=np.dtype(dtype).name,
+    )
+    (tmp / "ejes.json").write_bytes(msgspec.json.encode(ejes))
+
+    shutil.rmtree(destino, ignore_errors=True)
+    os.replace(tmp, destino)
+    podar_versiones(deposito_dir / CUBO, conservar={manifest.dataset_version, previo})
+
+    audit(
+        "etl.cubo",
+        {
+            "component": DEPOSITO,
+            "dataset_version": manifest.dataset_version,
+            "incremental": incremental,
+            "desde": str(dia0 + timedelta(days=t_min)),
+            "forma": [dias + 1, n_e, n_d],
+            "timing_ms": int((time.perf_counter() - t0) * 1000),
+        },
+    )
+    return destino
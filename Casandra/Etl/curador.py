@@ -0,0 +1,145 @@
+# casandra/etl/curador.py
+"""
+Curador: tipa y normaliza lotes crudos del Cargador.
+
+- `fecha`: ISO `YYYY-MM-DD` (o `DD/MM/YYYY` como respaldo) -> date32.
+- `entidad_id`: mismas reglas que `Celador.validaciones.entidad_id`, tras
+  `normalizar_entidad_id` (acentos, mayúsculas, espacios).
+- `delito`: clave snake_case en minúsculas y sin acentos.
+- `eventos`: entero >= 0.
+- `lat` / `lon` (opcionales): grados decimales WGS84; si faltan, no son
+  numéricos o salen de rango quedan nulos (la fila no se descarta).
+- Con polígonos municipales (`Etl/espacial.py`), una fila sin `entidad_id`
+  válido pero con coordenadas toma el municipio que las contiene.
+
+Los valores de texto se normalizan sobre el diccionario de valores únicos
+(no fila por fila) y se memoizan entre lotes. Las filas inválidas se descartan
+y se cuentan.
+"""
+from __future__ import annotations
+
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ..Analisis.Espacial.poligonos import Poligonos
+from ..Celador.errores import ValidacionError
+from ..Celador.validaciones import entidad_id, normalizar_delito, normalizar_entidad_id
+
+
+ESQUEMA_CURADO = pa.schema(
+    [
+        ("fecha", pa.date32()),
+        ("entidad_id", pa.string()),
+        ("delito", pa.string()),
+        ("eventos", pa.int32()),
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+    ]
+)
+
+_NUMERO = r"^[+-]?\d{1,3}(\.\d+)?$"
+
+
+def _entidad(val: str) -> Optional[str]:
+    try:
+        return entidad_id(normalizar_entidad_id(val))
+    except ValidacionError:
+        return None
+
+
+def _delito(val: str) -> Optional[str]:
+    return normalizar_delito(val) or None
+
+
+def _fechas(col: pa.Array) -> pa.Array:
+    col = pc.utf8_trim_whitespace(col)
+    iso = pc.strptime(col, format="%Y-%m-%d", unit="s", error_is_null=True)
+    dmy = pc.strptime(col, format="%d/%m/%Y", unit="s", error_is_null=True)
+    return pc.coalesce(iso, dmy).cast(pa.date32())
+
+
+def _eventos(col: pa.Array) -> pa.Array:
+    col = pc.utf8_trim_whitespace(col)
+    ok = pc.match_substring_regex(col, r"^\d{1,9}$")
+    return pc.if_else(ok, col, pa.scalar(None, pa.string())).cast(pa.int32())
+
+
+def _coordenada(lote: pa.RecordBatch, nombre: str, limite: float) -> pa.Array:
+    if lote.schema.get_field_index(nombre) < 0:
+        return pa.nulls(lote.num_rows, pa.float64())
+    col = pc.utf8_trim_whitespace(lote.column(nombre))
+    ok = pc.match_substring_regex(col, _NUMERO)
+    val = pc.if_else(ok, col, pa.scalar(None, pa.string())).cast(pa.float64())
+    return pc.if_else(
+        pc.less_equal(pc.abs(val), limite), val, pa.scalar(None, pa.float64())
+    )
+
+
+class Curador:
+    def __init__(
+        self, municipios: Optional[tuple[Poligonos, Sequence[str]]] = None
+    ) -> None:
+        self._memo_entidad: dict[str, Optional[str]] = {}
+        self._memo_delito: dict[str, Optional[str]] = {}
+        self._municipios = municipios
+
+    def _por_coordenadas(self, ent: pa.Array, lat: pa.Array, lon: pa.Array) -> pa.Array:
+        """`entidad_id` faltante <- municipio que contiene (lon, lat)."""
+        poligonos, ids = self._municipios
+        huecos = pc.and_(pc.is_null(ent), pc.is_valid(lat))
+        filas = np.flatnonzero(huecos.to_numpy(zero_copy_only=False))
+        if filas.size == 0:
+            return ent
+        codigo = poligonos.asignar(
+            lon.to_numpy(zero_copy_only=False)[filas],
+            lat.to_numpy(zero_copy_only=False)[filas],
+        )
+        nuevos = pa.array([ids[c] if c >= 0 else None for c in codigo], pa.string())
+        return pc.replace_with_mask(ent, huecos, nuevos)
+
+    def _por_diccionario(
+        self,
+        col: pa.Array,
+        fn: Callable[[str], Optional[str]],
+        memo: dict[str, Optional[str]],
+    ) -> pa.Array:
+        codificada = pc.dictionary_encode(col)
+        if isinstance(codificada, pa.ChunkedArray):
+            codificada = codificada.combine_chunks()
+        unicos = codificada.dictionary.to_pylist()
+        limpios = []
+        for v in unicos:
+            if v not in memo:
+                memo[v] = fn(v)
+            limpios.append(memo[v])
+        return pc.take(pa.array(limpios, pa.string()), codificada.indices)
+
+    def curar(self, lote: pa.RecordBatch) -> tuple[pa.Table, int]:
+        """Devuelve (tabla curada con ESQUEMA_CURADO, filas rechazadas)."""
+        fecha = _fechas(lote.column("fecha"))
+        ent = self._por_diccionario(
+            lote.column("entidad_id"), _entidad, self._memo_entidad
+        )
+        dl = self._por_diccionario(lote.column("delito"), _delito, self._memo_delito)
+        eventos = _eventos(lote.column("eventos"))
+        lat = _coordenada(lote, "lat", 90.0)
+        lon = _coordenada(lote, "lon", 180.0)
+        # Las dos o ninguna.
+        par = pc.and_(pc.is_valid(lat), pc.is_valid(lon))
+        lat = pc.if_else(par, lat, pa.scalar(None, pa.float64()))
+        lon = pc.if_else(par, lon, pa.scalar(None, pa.float64()))
+        if self._municipios is not None:
+            ent = self._por_coordenadas(ent, lat, lon)
+
+        valido = pc.and_(
+            pc.and_(pc.is_valid(fecha), pc.is_valid(ent)),
+            pc.and_(pc.is_valid(dl), pc.is_valid(eventos)),
+        )
+        tabla = pa.Table.from_arrays(
+            [fecha, ent, dl, eventos, lat, lon], schema=ESQUEMA_CURADO
+        )
+        curada = tabla.filter(valido)
+        return curada, lote.num_rows - curada.num_rows
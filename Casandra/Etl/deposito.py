@@ -0,0 +1,313 @@
+# casandra/etl/deposito.py
+"""
+Depósito: layout en disco, manifest y escritura particionada.
+
+    <deposito>/
+    ├── manifest.json                      # versión, watermark, fuentes ingeridas
+    └── incidentes/anio=YYYY/mes=M/part-<fuente8>-<hash16>.parquet
+
+Cada fuente escribe sus propios archivos `part-<id de la fuente>-<hash del
+contenido>`: dos fuentes con el mismo contenido no comparten archivo, y
+re-ingerir una fuente modificada escribe partes nuevas sin tocar las vigentes.
+
+Publicación: la versión es lo que lista el manifest. Los lectores (Consultor,
+metadata, costos, cubo, índice espacial) solo leen las partes que él nombra
+(`partes`), así que las partes nuevas, aunque ya estén en su lugar, son
+invisibles hasta que el manifest se reemplaza de forma atómica. Las partes
+que una versión deja de usar quedan en `retiradas` (la versión anterior aún
+las lee) y se borran al publicar la siguiente. Un depósito sin manifest
+(armado a mano) se lee completo por glob.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import msgspec
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .curador import ESQUEMA_CURADO
+
+
+DATA_DIR = Path(os.getenv("CASANDRA_DATA_DIR", "./data"))
+DEPOSITO_DIR = Path(os.getenv("CASANDRA_DEPOSITO_DIR", str(DATA_DIR / "deposito")))
+INCIDENTES = "incidentes"
+MANIFEST = "manifest.json"
+
+FILAS_POR_GRUPO = int(os.getenv("CASANDRA_ETL_ROW_GROUP", "65536"))
+MAX_FILAS_EN_BUFFER = int(os.getenv("CASANDRA_ETL_MAX_BUFFER", "1000000"))
+
+VERSIONES_CONSERVADAS = 2  # la vigente + la anterior (workers que aún no recargan)
+
+# ids de fila = base de la fuente (BITS_FUENTE) << BITS_FILA | fila: < 2**53,
+# así los clientes JSON (doubles) no los redondean.
+BITS_FUENTE = 24
+BITS_FILA = 29
+MAX_FILAS_FUENTE = 1 << BITS_FILA
+
+ESQUEMA_DEPOSITO = ESQUEMA_CURADO.append(pa.field("id", pa.int64()))
+ORDEN_DEPOSITO = [
+    ("entidad_id", "ascending"),
+    ("delito", "ascending"),
+    ("fecha", "ascending"),
+]
+
+
+class FuenteManifest(msgspec.Struct):
+    hash: str
+    filas: int
+    rechazadas: int
+    min_date: Optional[str]
+    max_date: Optional[str]
+    particiones: list[str]
+    parte: str = (
+        ""  # nombre del archivo en cada partición ("" = manifests previos: part-<hash16>)
+    )
+    base_id: int = 0
+
+
+class Manifest(msgspec.Struct):
+    dataset_version: str = ""
+    min_date: Optional[str] = None
+    max_date: Optional[str] = None
+    updated_at: Optional[str] = None
+    fuentes: dict[str, FuenteManifest] = {}
+    particiones_tocadas: list[str] = (
+        []
+    )  # de la última ingesta (reconstrucciones incrementales)
+    retiradas: list[str] = (
+        []
+    )  # partes que esta versión dejó de usar; se borran con la siguiente
+
+
+def incidentes_dir(deposito_dir: Path = DEPOSITO_DIR) -> Path:
+    return deposito_dir / INCIDENTES
+
+
+def ruta_manifest(deposito_dir: Path = DEPOSITO_DIR) -> Path:
+    return deposito_dir / MANIFEST
+
+
+def leer_manifest(deposito_dir: Path = DEPOSITO_DIR) -> Manifest:
+    try:
+        return msgspec.json.decode(
+            ruta_manifest(deposito_dir).read_bytes(), type=Manifest
+        )
+    except FileNotFoundError:
+        return Manifest()
+
+
+def escribir_manifest(manifest: Manifest, deposito_dir: Path = DEPOSITO_DIR) -> None:
+    ruta = ruta_manifest(deposito_dir)
+    tmp = ruta.with_name(ruta.name + ".tmp")
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp.write_bytes(msgspec.json.format(msgspec.json.encode(manifest)))
+    os.replace(tmp, ruta)
+
+
+def conformar(tabla: pa.Table) -> pa.Table:
+    """`tabla` con las columnas de `ESQUEMA_DEPOSITO` en orden; las opcionales que falten, nulas."""
+    columnas = [
+        (
+            tabla.column(f.name)
+            if f.name in tabla.column_names
+            else pa.nulls(tabla.num_rows, f.type)
+        )
+        for f in ESQUEMA_DEPOSITO
+    ]
+    return pa.Table.from_arrays(columnas, schema=ESQUEMA_DEPOSITO)
+
+
+def particion(anio: int, mes: int) -> str:
+    return f"anio={anio}/mes={mes}"
+
+
+def _id_fuente(clave_fuente: str) -> str:
+    return hashlib.sha256(clave_fuente.encode("utf-8")).hexdigest()[:8]
+
+
+def nombre_parte(clave_fuente: str, hash_fuente: str) -> str:
+    return (
+        f"part-{_id_fuente(clave_fuente)}-{hash_fuente.split(':', 1)[-1][:16]}.parquet"
+    )
+
+
+def base_ids(clave_fuente: str, hash_fuente: str, ocupadas: Iterable[int] = ()) -> int:
+    """
+    Primer id de las filas de una fuente: estable para la misma (fuente,
+    contenido) y distinto del de las demás fuentes del manifest (`ocupadas`,
+    sus `base_id`); una colisión del hash se resuelve con la base siguiente.
+    """
+    tomadas = {b >> BITS_FILA for b in ocupadas}
+    h = hashlib.sha256(f"{clave_fuente}\0{hash_fuente}".encode("utf-8")).digest()
+    base = int.from_bytes(h[:4], "big") % (1 << BITS_FUENTE)
+    while base in tomadas:
+        base = (base + 1) % (1 << BITS_FUENTE)
+    return base << BITS_FILA
+
+
+def relativas(fuente: FuenteManifest) -> list[str]:
+    """Partes de una fuente, relativas a incidentes/."""
+    nombre = fuente.parte or f"part-{fuente.hash.split(':', 1)[-1][:16]}.parquet"
+    return [f"{p}/{nombre}" for p in fuente.particiones]
+
+
+def partes(manifest: Manifest, deposito_dir: Path = DEPOSITO_DIR) -> list[Path]:
+    """Parquet de la versión de `manifest`; sin fuentes (depósito a mano), todos los de incidentes/."""
+    base = incidentes_dir(deposito_dir)
+    if not manifest.fuentes:
+        return sorted(base.glob("**/*.parquet"))
+    return [
+        base / r
+        for clave in sorted(manifest.fuentes)
+        for r in relativas(manifest.fuentes[clave])
+    ]
+
+
+def sql_parquet(rutas: Sequence[Path]) -> str:
+    """`read_parquet([...])` de DuckDB sobre `rutas`, con las particiones hive como columnas."""
+    lista = ", ".join("'" + r.as_posix().replace("'", "''") + "'" for r in rutas)
+    return f"read_parquet([{lista}], hive_partitioning = true, union_by_name = true)"
+
+
+def firma_manifest(deposito_dir: Path = DEPOSITO_DIR) -> Optional[tuple[int, int, int]]:
+    """(mtime_ns, tamaño, inode) del manifest; None si no existe."""
+    try:
+        st = ruta_manifest(deposito_dir).stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def borrar_retiradas(deposito_dir: Path, previo: Manifest, nuevo: Manifest) -> None:
+    """
+    Borra las partes que `previo` ya había retirado: solo las leía la versión
+    anterior a `previo`, que deja de conservarse al publicar `nuevo`.
+    """
+    vivas = {
+        r for m in (previo, nuevo) for f in m.fuentes.values() for r in relativas(f)
+    }
+    base = incidentes_dir(deposito_dir)
+    for r in previo.retiradas:
+        if r not in vivas:
+            (base / r).unlink(missing_ok=True)
+
+
+class EscritorFuente:
+    """
+    Escribe lo curado de UNA fuente repartido por partición `anio/mes`.
+
+    Las filas se acumulan por partición y se vuelcan en grupos de
+    `FILAS_POR_GRUPO` (o todas si el buffer global pasa `MAX_FILAS_EN_BUFFER`).
+    Al cerrar, cada parte se reordena por (entidad_id, delito, fecha) para que
+    las estadísticas de row group permitan podar por entidad. Las partes quedan
+    en su lugar pero nadie las lee hasta que un manifest las liste.
+    """
+
+    def __init__(self, deposito_dir: Path, clave_fuente: str, hash_fuente: str) -> None:
+        self.base = incidentes_dir(deposito_dir)
+        self.nombre = nombre_parte(clave_fuente, hash_fuente)
+        self._buffers: dict[int, list[pa.Table]] = {}
+        self._filas: dict[int, int] = {}
+        self._en_buffer = 0
+        self._writers: dict[int, pq.ParquetWriter] = {}
+
+    def _ruta(self, clave: int) -> Path:
+        return self.base / particion(clave // 100, clave % 100) / self.nombre
+
+    def agregar(self, tabla: pa.Table) -> None:
+        if tabla.num_rows == 0:
+            return
+        tabla = conformar(tabla)
+        fecha = tabla.column("fecha")
+        clave = pc.add(pc.multiply(pc.year(fecha), 100), pc.month(fecha))
+        orden = pc.sort_indices(clave)
+        tabla = tabla.take(orden)
+        conteos = pc.value_counts(clave.take(orden))
+
+        inicio = 0
+        for par in conteos.to_pylist():
+            k, n = par["values"], par["counts"]
+            self._buffers.setdefault(k, []).append(tabla.slice(inicio, n))
+            self._filas[k] = self._filas.get(k, 0) + n
+            self._en_buffer += n
+            inicio += n
+            if self._filas[k] >= FILAS_POR_GRUPO:
+                self._volcar(k)
+
+        if self._en_buffer >= MAX_FILAS_EN_BUFFER:
+            for k in list(self._buffers):
+                self._volcar(k)
+
+    def _volcar(self, clave: int) -> None:
+        partes = self._buffers.pop(clave, None)
+        if not partes:
+            return
+        n = self._filas.pop(clave)
+        self._en_buffer -= n
+        writer = self._writers.get(clave)
+        if writer is None:
+            ruta = self._ruta(clave)
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(
+                ruta.with_suffix(".parquet.tmp"), ESQUEMA_DEPOSITO
+            )
+            self._writers[clave] = writer
+        writer.write_table(pa.concat_tables(partes), row_group_size=FILAS_POR_GRUPO)
+
+    def cerrar(self) -> list[str]:
+        """Vuelca, ordena y publica las partes. Devuelve las particiones escritas."""
+        for k in list(self._buffers):
+            self._volcar(k)
+        for w in self._writers.values():
+            w.close()
+
+        escritas = []
+        for k in sorted(self._writers):
+            ruta = self._ruta(k)
+            tmp = ruta.with_suffix(".parquet.tmp")
+            # Una parte = un mes de una fuente: acotado, cabe en memoria para ordenar.
+            tabla = pq.read_table(tmp).sort_by(ORDEN_DEPOSITO)
+            pq.write_table(
+                tabla,
+                tmp,
+                row_group_size=FILAS_POR_GRUPO,
+                compression="zstd",
+                write_statistics=True,
+            )
+            os.replace(tmp, ruta)
+            escritas.append(particion(k // 100, k % 100))
+        self._writers.clear()
+        return escritas
+
+    def abortar(self) -> None:
+        for k, w in self._writers.items():
+            try:
+                w.close()
+            finally:
+                self._ruta(k).with_suffix(".parquet.tmp").unlink(missing_ok=True)
+        self._writers.clear()
+        self._buffers.clear()
+
+
+def fecha_iso(d: Optional[date]) -> Optional[str]:
+    return d.isoformat() if d is not None else None
+
+
+def podar_versiones(raiz: Path, conservar: set[Optional[str]]) -> None:
+    """Deja en `raiz/<dataset_version>/` solo las versiones más recientes y las de `conservar`."""
+    # Un worker con la versión vieja mapeada sigue funcionando: el inode vive hasta el munmap.
+    versiones = sorted(
+        (d for d in raiz.iterdir() if d.is_dir() and not d.name.startswith(".")),
+        key=lambda d: d.stat().st_mtime,
+        reverse=True,
+    )
+    for d in versiones[VERSIONES_CONSERVADAS:]:
+        if d.name not in conservar:
+            shutil.rmtree(d, ignore_errors=True)
@@ -0,0 +1,296 @@
+# casandra/etl/espacial.py
+"""
+Índice espacial de los incidentes con coordenadas (`lat`, `lon`).
+
+    <deposito>/espacial/<dataset_version>/
+    ├── ejes.json                 # origen y tamaño de la malla, niveles, días, delitos, entidades
+    ├── puntos_{xy,dia,delito,entidad,eventos,id}.npy   # en orden del R-tree
+    ├── arbol_puntos{,_niveles}.npy                     # R-tree STR de los puntos
+    ├── malla_<k>_{clave,delito,eventos}.npy            # conteos por día, nivel k
+    └── municipios_{xy,anillos,partes}.npy + arbol_municipios*.npy   # si hay polígonos
+
+- Malla cuadrada en grados, multirresolución: el nivel k tiene celdas de
+  `celda * 2**k` grados y cada celda del nivel k+1 es la unión exacta de 2×2
+  del nivel k. Por nivel, las celdas con eventos se guardan dispersas y
+  ordenadas por `clave = día * celdas + fila * columnas + columna` (y delito):
+  las filas de una caja son, dentro de cada día, un tramo contiguo que se
+  ubica con `searchsorted`.
+- Los puntos van reordenados por el R-tree (`Analisis/Espacial/arbol.py`):
+  una caja pequeña lee pocas hojas contiguas.
+- Polígonos municipales opcionales en `<deposito>/municipios.geojson`
+  (`properties.entidad_id`; Polygon o MultiPolygon); los usa el Curador para
+  completar `entidad_id` desde coordenadas y las tools para nombrar celdas.
+
+Se arma completo en cada ingesta que publica una versión (después del cubo
+y antes del manifest); el Consultor lo abre con `mmap` (`Consultor/espacial.py`).
+Sin coordenadas en el Depósito no hay índice.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import duckdb
+import msgspec
+import numpy as np
+
+from ..Analisis.Espacial.arbol import CAPACIDAD, ArbolR
+from ..Analisis.Espacial.poligonos import CAPACIDAD as CAPACIDAD_MUNICIPIOS, Poligonos
+from ..Celador.auditoria import audit
+from ..Celador.errores import ValidacionError
+from ..Celador.validaciones import entidad_id, normalizar_entidad_id
+from ..dominio.nombres import DEPOSITO
+from .deposito import Manifest, partes, podar_versiones, sql_parquet
+
+
+ESPACIAL = "espacial"
+MUNICIPIOS = "municipios.geojson"
+CELDA_GRADOS = float(
+    os.getenv("CASANDRA_ESPACIAL_CELDA", str(1 / 128))
+)  # nivel 0: ~870 m
+NIVELES = int(os.getenv("CASANDRA_ESPACIAL_NIVELES", "7"))
+
+
+class EjesEspacial(msgspec.Struct, frozen=True):
+    dataset_version: str
+    dia0: date
+    dias: int
+    lon0: float  # esquina suroeste de la malla
+    lat0: float
+    celda: float  # grados por lado en el nivel 0
+    columnas: int  # celdas del nivel 0 (múltiplos de 2**(niveles - 1))
+    filas: int
+    niveles: int
+    delitos: list[str]
+    entidades: list[str]  # `entidad_id` de los puntos
+    puntos: int
+    capacidad: int  # entradas por hoja del R-tree de puntos
+    municipios: list[str] = []  # polígonos, en orden de su R-tree
+    capacidad_municipios: int = CAPACIDAD_MUNICIPIOS
+
+
+def dir_espacial(deposito_dir: Path, dataset_version: str) -> Path:
+    return deposito_dir / ESPACIAL / dataset_version
+
+
+def leer_ejes_espaciales(directorio: Path) -> Optional[EjesEspacial]:
+    try:
+        return msgspec.json.decode(
+            (directorio / "ejes.json").read_bytes(), type=EjesEspacial
+        )
+    except FileNotFoundError:
+        return None
+
+
+def _anillos(geometria: dict) -> list[np.ndarray]:
+    tipo, coords = geometria.get("type"), geometria.get("coordinates") or []
+    if tipo == "Polygon":
+        coords = [coords]
+    elif tipo != "MultiPolygon":
+        return []
+    return [
+        np.asarray(anillo, dtype=np.float64)[:, :2]
+        for poligono in coords
+        for anillo in poligono
+        if anillo
+    ]
+
+
+def leer_municipios(deposito_dir: Path) -> Optional[tuple[Poligonos, list[str]]]:
+    """
+    Polígonos de `<deposito>/municipios.geojson` con su R-tree y su
+    `entidad_id` (en orden del árbol); None si no hay archivo. Features con
+    el mismo `entidad_id` se juntan como partes de un solo polígono.
+    """
+    ruta = deposito_dir / MUNICIPIOS
+    if not ruta.exists():
+        return None
+    partes: dict[str, list[np.ndarray]] = {}
+    for feature in json.loads(ruta.read_text(encoding="utf-8")).get("features", []):
+        try:
+            clave = entidad_id(
+                normalizar_entidad_id(
+                    str((feature.get("properties") or {}).get("entidad_id", ""))
+                )
+            )
+        except ValidacionError:
+            continue
+        anillos = _anillos(feature.get("geometry") or {})
+        if anillos:
+            partes.setdefault(clave, []).extend(anillos)
+    if not partes:
+        return None
+    ids = sorted(partes)
+    poligonos, orden = Poligonos.desde_anillos([partes[e] for e in ids])
+    return poligonos, [ids[int(i)] for i in orden]
+
+
+def _puntos(rutas: list[Path]):
+    """(fecha, lon, lat, entidad_id, delito, eventos, id) de las filas con coordenadas; None si no hay columnas."""
+    fuente = sql_parquet(rutas)
+    con = duckdb.connect(":memory:")
+    try:
+        columnas = {
+            r[0] for r in con.execute(f"DESCRIBE SELECT * FROM {fuente}").fetchall()
+        }
+        if not {"lat", "lon"} <= columnas:
+            return None  # Depósito anterior a las coordenadas
+        cur = con.execute(
+            "SELECT fecha, lon, lat, entidad_id, delito, eventos, id "
+            f"FROM {fuente} WHERE lat IS NOT NULL AND lon IS NOT NULL"
+        )
+        return (
+            cur.to_arrow_table()
+            if hasattr(cur, "to_arrow_table")
+            else cur.fetch_arrow_table()
+        )
+    finally:
+        con.close()
+
+
+def _codigos(columna, eje: list[str]) -> np.ndarray:
+    pos = {v: i for i, v in enumerate(eje)}
+    dic = columna.combine_chunks().dictionary_encode()
+    mapa = np.array([pos[v] for v in dic.dictionary.to_pylist()], dtype=np.int32)
+    return mapa[dic.indices.to_numpy(zero_copy_only=False)]
+
+
+def _malla(
+    destino: Path,
+    k: int,
+    dia: np.ndarray,
+    celda: np.ndarray,
+    delito: np.ndarray,
+    eventos: np.ndarray,
+    n_celdas: int,
+    n_delitos: int,
+) -> None:
+    """Agrega (día, celda, delito) y guarda el nivel `k` ordenado por (día, celda)."""
+    clave = (dia.astype(np.int64) * n_celdas + celda) * n_delitos + delito
+    unicas, inversa = np.unique(clave, return_inverse=True)
+    suma = np.bincount(inversa, weights=eventos, minlength=unicas.size).astype(np.int64)
+    clave_u, delito_u = np.divmod(unicas, n_delitos)
+    np.save(destino / f"malla_{k}_clave.npy", clave_u)
+    np.save(destino / f"malla_{k}_delito.npy", delito_u.astype(np.int16))
+    dtype = (
+        np.int32 if suma.size == 0 or suma.max() < np.iinfo(np.int32).max else np.int64
+    )
+    np.save(destino / f"malla_{k}_eventos.npy", suma.astype(dtype))
+
+
+def construir_espacial(
+    deposito_dir: Path, manifest: Manifest, previo: Optional[str] = None
+) -> Optional[Path]:
+    """
+    Construye el índice espacial de `manifest.dataset_version`. `previo` se
+    conserva al podar (workers que aún lo tengan mapeado). Devuelve el
+    directorio (None si no hay incidentes con coordenadas).
+    """
+    if (
+        not manifest.dataset_version
+        or manifest.min_date is None
+        or manifest.max_date is None
+    ):
+        return None
+    t0 = time.perf_counter()
+    tabla = _puntos(partes(manifest, deposito_dir))
+    if tabla is None or tabla.num_rows == 0:
+        return None
+    dia0 = date.fromisoformat(manifest.min_date)
+    dias = (date.fromisoformat(manifest.max_date) - dia0).days + 1
+
+    x = tabla.column("lon").to_numpy()
+    y = tabla.column("lat").to_numpy()
+    arbol, orden = ArbolR.empaquetar(np.column_stack([x, y, x, y]), CAPACIDAD)
+    x, y = x[orden], y[orden]
+    dia = (
+        np.asarray(tabla.column("fecha").to_numpy(), dtype="datetime64[D]")
+        - np.datetime64(dia0, "D")
+    ).astype(np.int32)[orden]
+    delitos = sorted(set(tabla.column("delito").to_pylist()))
+    entidades = sorted(set(tabla.column("entidad_id").to_pylist()))
+    delito = _codigos(tabla.column("delito"), delitos)[orden].astype(np.int16)
+    entidad = _codigos(tabla.column("entidad_id"), entidades)[orden]
+    eventos = tabla.column("eventos").to_numpy().astype(np.int32)[orden]
+    ids = tabla.column("id").to_numpy().astype(np.int64)[orden]
+    del tabla
+
+    # Malla: origen alineado a la celda más gruesa para que los niveles aniden.
+    gruesa = CELDA_GRADOS * 2 ** (NIVELES - 1)
+    lon0 = float(np.floor(x.min() / gruesa) * gruesa)
+    lat0 = float(np.floor(y.min() / gruesa) * gruesa)
+    paso = 2 ** (NIVELES - 1)
+    columnas = int(np.floor((x.max() - lon0) / CELDA_GRADOS)) // paso * paso + paso
+    filas = int(np.floor((y.max() - lat0) / CELDA_GRADOS)) // paso * paso + paso
+    ix = np.clip(np.floor((x - lon0) / CELDA_GRADOS).astype(np.int64), 0, columnas - 1)
+    iy = np.clip(np.floor((y - lat0) / CELDA_GRADOS).astype(np.int64), 0, filas - 1)
+
+    destino = dir_espacial(deposito_dir, manifest.dataset_version)
+    tmp = destino.with_name(f".tmp-{destino.name}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    np.save(tmp / "puntos_xy.npy", np.column_stack([x, y]))
+    np.save(tmp / "puntos_dia.npy", dia)
+    np.save(tmp / "puntos_delito.npy", delito)
+    np.save(tmp / "puntos_entidad.npy", entidad)
+    np.save(tmp / "puntos_eventos.npy", eventos)
+    np.save(tmp / "puntos_id.npy", ids)
+    arbol.guardar(tmp, "arbol_puntos")
+    for k in range(NIVELES):
+        cols_k = columnas >> k
+        _malla(
+            tmp,
+            k,
+            dia,
+            (iy >> k) * cols_k + (ix >> k),
+            delito,
+            eventos,
+            cols_k * (filas >> k),
+            len(delitos),
+        )
+
+    municipios = leer_municipios(deposito_dir)
+    if municipios is not None:
+        municipios[0].guardar(tmp, "municipios")
+    ejes = EjesEspacial(
+        dataset_version=manifest.dataset_version,
+        dia0=dia0,
+        dias=dias,
+        lon0=lon0,
+        lat0=lat0,
+        celda=CELDA_GRADOS,
+        columnas=columnas,
+        filas=filas,
+        niveles=NIVELES,
+        delitos=delitos,
+        entidades=entidades,
+        puntos=int(x.size),
+        capacidad=CAPACIDAD,
+        municipios=municipios[1] if municipios is not None else [],
+    )
+    (tmp / "ejes.json").write_bytes(msgspec.json.encode(ejes))
+
+    shutil.rmtree(destino, ignore_errors=True)
+    os.replace(tmp, destino)
+    podar_versiones(
+        deposito_dir / ESPACIAL, conservar={manifest.dataset_version, previo}
+    )
+
+    audit(
+        "etl.espacial",
+        {
+            "component": DEPOSITO,
+            "dataset_version": manifest.dataset_version,
+            "puntos": ejes.puntos,
+            "malla": [columnas, filas, NIVELES],
+            "municipios": len(ejes.municipios),
+            "timing_ms": int((time.perf_counter() - t0) * 1000),
+        },
+    )
+    return destino
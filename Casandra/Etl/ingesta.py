@@ -0,0 +1,239 @@
+# casandra/etl/ingesta.py
+"""
+Pipeline ETL v0: Cargador -> Curador -> Depósito (+ cubo e índice espacial).
+
+Ingesta incremental: cada fuente se identifica por su ruta y el hash de su
+contenido. Las fuentes sin cambios se omiten; las modificadas escriben partes
+nuevas y las anteriores pasan a `retiradas` (ver `deposito`). Cada ingesta que
+publica cambios genera un `dataset_version` nuevo junto con el watermark
+`min_date`/`max_date`; el manifest se escribe al final, con todo listo.
+
+Uso:
+    python -m Casandra.Etl.ingesta datos/*.zip --deposito ./data/deposito
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ..Celador.auditoria import audit
+from ..dominio.nombres import CURADOR, DEPOSITO
+from .cargador import BLOCK_BYTES, Fuente, describir, leer_lotes
+from .cubo import construir_cubo, dir_cubo
+from .curador import Curador
+from .espacial import construir_espacial, dir_espacial, leer_municipios
+from .deposito import (
+    DEPOSITO_DIR,
+    EscritorFuente,
+    MAX_FILAS_FUENTE,
+    FuenteManifest,
+    Manifest,
+    base_ids,
+    borrar_retiradas,
+    escribir_manifest,
+    fecha_iso,
+    leer_manifest,
+    relativas,
+)
+
+
+@dataclass
+class ResultadoIngesta:
+    dataset_version: str
+    min_date: Optional[str]
+    max_date: Optional[str]
+    fuentes_procesadas: list[str] = field(default_factory=list)
+    fuentes_omitidas: list[str] = field(default_factory=list)
+    filas: int = 0
+    rechazadas: int = 0
+    bytes: int = 0
+    segundos: float = 0.0
+    particiones_tocadas: list[str] = field(default_factory=list)
+
+    @property
+    def filas_por_seg(self) -> float:
+        return self.filas / self.segundos if self.segundos else 0.0
+
+    @property
+    def mb_por_seg(self) -> float:
+        return self.bytes / (1 << 20) / self.segundos if self.segundos else 0.0
+
+
+def _ingerir_fuente(
+    fuente: Fuente, deposito_dir: Path, curador: Curador, block_size: int, base: int
+) -> FuenteManifest:
+    escritor = EscritorFuente(deposito_dir, fuente.clave, fuente.hash)
+    filas = rechazadas = 0
+    dmin: Optional[date] = None
+    dmax: Optional[date] = None
+
+    try:
+        for lote in leer_lotes(fuente, block_size):
+            curada, malas = curador.curar(lote)
+            rechazadas += malas
+            if curada.num_rows == 0:
+                continue
+            if filas + curada.num_rows > MAX_FILAS_FUENTE:
+                raise ValueError(
+                    f"{fuente.clave}: más de {MAX_FILAS_FUENTE:,} filas en una sola fuente"
+                )
+            ids = pa.array(
+                np.arange(base + filas, base + filas + curada.num_rows, dtype=np.int64)
+            )
+            escritor.agregar(curada.append_column("id", ids))
+            filas += curada.num_rows
+
+            mm = pc.min_max(curada.column("fecha")).as_py()
+            dmin = mm["min"] if dmin is None else min(dmin, mm["min"])
+            dmax = mm["max"] if dmax is None else max(dmax, mm["max"])
+        particiones = escritor.cerrar()
+    except BaseException:
+        escritor.abortar()
+        raise
+
+    return FuenteManifest(
+        hash=fuente.hash,
+        filas=filas,
+        rechazadas=rechazadas,
+        min_date=fecha_iso(dmin),
+        max_date=fecha_iso(dmax),
+        particiones=particiones,
+        parte=escritor.nombre,
+        base_id=base,
+    )
+
+
+def _version(fuentes: dict[str, FuenteManifest], hoy: date) -> str:
+    h = hashlib.sha256()
+    for clave in sorted(fuentes):
+        h.update(f"{clave}\0{fuentes[clave].hash}\n".encode("utf-8"))
+    return f"gx-{hoy:%Y.%m.%d}-{h.hexdigest()[:8]}"
+
+
+def ingerir(
+    rutas: Iterable[Path | str],
+    deposito_dir: Path = DEPOSITO_DIR,
+    block_size: int = BLOCK_BYTES,
+) -> ResultadoIngesta:
+    t0 = time.perf_counter()
+    manifest = leer_manifest(deposito_dir)
+    fuentes = dict(manifest.fuentes)
+    res = ResultadoIngesta(
+        dataset_version=manifest.dataset_version,
+        min_date=manifest.min_date,
+        max_date=manifest.max_date,
+    )
+    tocadas: set[str] = set()
+    retiradas: list[str] = []
+    curador = Curador(leer_municipios(deposito_dir))
+
+    for ruta in rutas:
+        fuente = describir(Path(ruta))
+        previa = fuentes.get(fuente.clave)
+        if previa is not None and previa.hash == fuente.hash:
+            res.fuentes_omitidas.append(fuente.clave)
+            continue
+
+        t_fuente = time.perf_counter()
+        ocupadas = [f.base_id for clave, f in fuentes.items() if clave != fuente.clave]
+        base = base_ids(fuente.clave, fuente.hash, ocupadas)
+        nueva = _ingerir_fuente(fuente, deposito_dir, curador, block_size, base)
+        if previa is not None:
+            # La versión vigente sigue leyendo las partes previas: se retiran, no se borran.
+            retiradas.extend(relativas(previa))
+            tocadas.update(previa.particiones)
+        tocadas.update(nueva.particiones)
+        fuentes[fuente.clave] = nueva
+
+        res.fuentes_procesadas.append(fuente.clave)
+        res.filas += nueva.filas
+        res.rechazadas += nueva.rechazadas
+        res.bytes += fuente.bytes
+        audit(
+            "etl.fuente",
+            {
+                "component": CURADOR,
+                "fuente": fuente.clave,
+                "hash": fuente.hash,
+                "filas": nueva.filas,
+                "rechazadas": nueva.rechazadas,
+                "timing_ms": int((time.perf_counter() - t_fuente) * 1000),
+            },
+        )
+
+    previo = manifest.dataset_version or None
+    if res.fuentes_procesadas:
+        mins = [f.min_date for f in fuentes.values() if f.min_date]
+        maxs = [f.max_date for f in fuentes.values() if f.max_date]
+        ahora = datetime.now(timezone.utc)
+        vigente, manifest = manifest, Manifest(
+            dataset_version=_version(fuentes, ahora.date()),
+            min_date=min(mins, default=None),
+            max_date=max(maxs, default=None),
+            updated_at=ahora.isoformat(timespec="seconds"),
+            fuentes=fuentes,
+            particiones_tocadas=sorted(tocadas),
+            retiradas=retiradas,
+        )
+        # Cubo e índice van antes que el manifest: quien vea la versión nueva ya los tiene.
+        construir_cubo(deposito_dir, manifest, previo)
+        construir_espacial(deposito_dir, manifest, previo)
+        escribir_manifest(manifest, deposito_dir)
+        borrar_retiradas(deposito_dir, vigente, manifest)
+        res.dataset_version = manifest.dataset_version
+        res.min_date, res.max_date = manifest.min_date, manifest.max_date
+        res.particiones_tocadas = manifest.particiones_tocadas
+    elif previo:
+        if not dir_cubo(deposito_dir, previo).exists():
+            construir_cubo(deposito_dir, manifest)
+        if not dir_espacial(deposito_dir, previo).exists():
+            construir_espacial(deposito_dir, manifest)
+
+    res.segundos = time.perf_counter() - t0
+    audit(
+        "etl.ingesta",
+        {
+            "component": DEPOSITO,
+            "dataset_version": res.dataset_version,
+            "min_date": res.min_date,
+            "max_date": res.max_date,
+            "procesadas": len(res.fuentes_procesadas),
+            "omitidas": len(res.fuentes_omitidas),
+            "filas": res.filas,
+            "rechazadas": res.rechazadas,
+            "filas_por_seg": round(res.filas_por_seg, 1),
+            "mb_por_seg": round(res.mb_por_seg, 2),
+        },
+    )
+    return res
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Ingesta CSV/ZIP -> Depósito Parquet")
+    ap.add_argument("fuentes", nargs="+", type=Path)
+    ap.add_argument("--deposito", type=Path, default=DEPOSITO_DIR)
+    args = ap.parse_args()
+
+    res = ingerir(args.fuentes, args.deposito)
+    print(f"dataset_version : {res.dataset_version}")
+    print(f"watermark       : {res.min_date} .. {res.max_date}")
+    print(
+        f"fuentes         : {len(res.fuentes_procesadas)} procesadas, {len(res.fuentes_omitidas)} sin cambios"
+    )
+    print(f"filas           : {res.filas:,} ({res.rechazadas:,} rechazadas)")
+    print(
+        f"throughput      : {res.filas_por_seg:,.0f} filas/s, {res.mb_por_seg:,.1f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
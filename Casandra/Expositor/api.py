@@ -1,26 +1,94 @@
 # casandra/expositor/api.py
+"""
+App HTTP de Casandra, construida por `crear_app()` (factory).
+
+Importar este módulo no toca el disco ni importa implementaciones de tools:
+las rutas viven en `router`, y los efectos de arranque (directorio de
+auditoría, recolección de artefactos, catálogo, pool cpu_bound) corren en
+el lifespan. Consultor, catálogo, Orquestador y artefactos (que arrastran
+duckdb, pyarrow y numpy) se importan dentro de `crear_app`, el lifespan y
+los handlers, no al importar el módulo.
+
+    uvicorn --factory Casandra.Expositor.api:crear_app
+
+`api.app` se conserva por compatibilidad: se construye al primer acceso.
+"""
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from datetime import date
+from typing import Any
 
-from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, FastAPI, Query, Request
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
 
 from .error_handlers import register_error_handlers
 from .middleware import JobIdMiddleware
+from .respuestas import SobreResponse, respuesta_flujo, respuesta_lote
 
+from ..Celador.auditoria import cerrar_auditoria, preparar_auditoria
+from ..Celador.errores import ValidacionError
 from ..Celador.guardia import celar
+from ..Celador.procesos import calentar_pool, cerrar_pool, pool_cpu
+from ..Celador.telemetria import registro
+from ..Celador.versiones import watermark
 from ..Celador.validaciones import (
     requeridos,
     validar_rango,
     entidad_id as validar_entidad_id,
 )
+from ..Empaquetador.flujo import Flujo, negociar
 from ..dominio.nombres import tool_name
+from ..dominio.sobre import RangoEfectivo, Resumen, SobreMeta, SobreOk
+
+
+@asynccontextmanager
+async def _ciclo_vida(_app: FastAPI):
+    from ..Empaquetador.artefactos import obtener_almacen
+    from ..Herramientas.catalogo import obtener_servicio_catalogo
+
+    await run_in_threadpool(preparar_auditoria)
+    await run_in_threadpool(obtener_almacen().recolectar)
+    await run_in_threadpool(obtener_servicio_catalogo().actual)
+    await run_in_threadpool(calentar_pool)  # no-op si no hay tools cpu_bound
+    yield
+    cerrar_pool()
+    # Drena el sumidero de auditoría antes de que muera el worker.
+    cerrar_auditoria()
+
+
+router = APIRouter()
+
+
+def crear_app() -> FastAPI:
+    """App lista para servir; los proveedores de versiones se conectan aquí, no al importar."""
+    from ..Consultor.metadata import registrar_proveedores
+    from ..Herramientas.catalogo import registrar_proveedor as registrar_catalogo
+
+    registrar_proveedores()
+    registrar_catalogo()
+    pool_cpu.al_iniciar(
+        registrar_proveedores
+    )  # watermark/dataset_version también en los hijos
+    nueva = FastAPI(lifespan=_ciclo_vida)
+    nueva.add_middleware(JobIdMiddleware)
+    register_error_handlers(nueva)
+    nueva.include_router(router)
+    return nueva
+
 
+_app: FastAPI | None = None
 
-app = FastAPI()
-app.add_middleware(JobIdMiddleware)
-register_error_handlers(app)
+
+def __getattr__(nombre: str) -> Any:
+    # `from Casandra.Expositor.api import app` sigue funcionando (una sola instancia).
+    global _app
+    if nombre == "app":
+        if _app is None:
+            _app = crear_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 
 # --- Canonical tool identity (single source of truth) ---
@@ -30,44 +98,39 @@ DEMO_RANK_TOOL = tool_name(TOOL_ID, TOOL_VER)
 
 
 # Tool (sin FastAPI adentro)
-@celar(DEMO_RANK_TOOL, schema_version="1.0.0", tool_version=TOOL_VER)
+@celar(
+    DEMO_RANK_TOOL,
+    schema_version="1.0.0",
+    tool_version=TOOL_VER,
+    deterministic=True,
+    coalesce=True,
+)
 def demo_rank(
     *, entidad_id: str, from_: date, to_: date, strict_time: bool = False
-) -> dict:
+) -> SobreOk:
     requeridos(
         {"entidad_id": entidad_id, "from": from_, "to": to_},
         ["entidad_id", "from", "to"],
     )
     entidad_id = validar_entidad_id(entidad_id)
 
-    # Ancla temporal ficticia v0; luego vendrá de /dataset/metadata
-    min_d, max_d = date(2024, 1, 1), date(2025, 8, 13)
+    # Ancla temporal: watermark vigente del Depósito (snapshot en memoria)
+    min_d, max_d = watermark()
 
     ef1, ef2, adjusted = validar_rango(from_, to_, min_d, max_d, strict_time)
 
-    return {
-        "status": "ok",
-        "tool": DEMO_RANK_TOOL,
-        "summary": {
-            "headline": f"Ventana efectiva {ef1}..{ef2}",
-            "highlights": [],
-        },
-        "data": {
-            "inline": {
-                "columns": [],
-                "rows": [],
-                "limit_notice": {"applied": False, "max_rows": 50},
-            }
-        },
-        "evidence": [],
-        "meta": {
-            "date_range_effective": {"from": str(ef1), "to": str(ef2)},
-            "range_adjusted": adjusted,
-        },
-    }
-
-
-@app.get("/demo/rank")
+    return SobreOk(
+        tool=DEMO_RANK_TOOL,
+        summary=Resumen(headline=f"Ventana efectiva {ef1}..{ef2}"),
+        meta=SobreMeta(
+            date_range_effective=RangoEfectivo(desde=str(ef1), hasta=str(ef2)),
+            range_adjusted=adjusted,
+            anchor_date=str(max_d),
+        ),
+    )
+
+
+@router.get("/demo/rank")
 def demo_rank_http(
     entidad_id: str = Query(...),
     from_: date = Query(..., alias="from"),
@@ -77,4 +140,118 @@ def demo_rank_http(
     sobre, http = demo_rank(
         entidad_id=entidad_id, from_=from_, to_=to_, strict_time=strict_time
     )
-    return JSONResponse(content=sobre, status_code=http)
+    return SobreResponse(content=sobre, status_code=http)
+
+
+def _etag_coincide(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Comparación débil (RFC 9110 §13.1.2): If-None-Match ignora el prefijo W/.
+    candidatos = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+    return "*" in candidatos or etag.removeprefix("W/") in candidatos
+
+
+@router.get("/dataset/metadata")
+def dataset_metadata(request: Request):
+    from ..Consultor.metadata import obtener_servicio_metadata
+
+    meta = obtener_servicio_metadata().actual()
+    headers = {"ETag": meta.etag, "Cache-Control": "no-cache"}
+    if _etag_coincide(request.headers.get("if-none-match"), meta.etag):
+        return Response(status_code=304, headers=headers)
+    return SobreResponse(content=meta, headers=headers)
+
+
+@router.get("/tools/catalog")
+def tools_catalog(request: Request):
+    # Bytes pre-serializados: el sondeo del LLM no serializa nada por request.
+    from ..Herramientas.catalogo import obtener_servicio_catalogo
+
+    pub = obtener_servicio_catalogo().actual()
+    headers = {"ETag": pub.etag, "Cache-Control": "no-cache"}
+    if _etag_coincide(request.headers.get("if-none-match"), pub.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=pub.cuerpo, media_type="application/json", headers=headers)
+
+
+@router.get("/entidades/resolver")
+def entidades_resolver(
+    texto: str = Query(..., min_length=1), estado: str | None = Query(None)
+):
+    # Nombre libre ("León", "apaseo el alto", "Acambaro") -> entidad_id canónico.
+    from ..Consultor.entidades import obtener_jerarquia
+
+    jerarquia = obtener_jerarquia()
+    entidad = jerarquia.resolver(texto, estado)
+    return SobreResponse(
+        content={
+            "texto": texto,
+            "entidad_id": entidad,
+            "nombre": jerarquia.nombre(entidad),
+            "candidatos": list(jerarquia.buscar(texto, estado)),
+        }
+    )
+
+
+@router.get("/metrics")
+def metrics():
+    return Response(
+        content=registro.exportar(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.post("/plan/execute")
+async def plan_execute(request: Request, stream: str | None = Query(None)):
+    # Streaming opt-in (Accept: application/x-ndjson | vnd.apache.arrow.stream, o ?stream=).
+    from ..Orquestador.core import ejecutar_plan, ejecutar_plan_flujo
+    from ..Orquestador.plan import decodificar_plan
+
+    formato = negociar(request.headers.get("accept"), stream)
+    plan = decodificar_plan(await request.body())
+    if formato is None:
+        respuesta, http = await run_in_threadpool(ejecutar_plan, plan)
+        return SobreResponse(content=respuesta, status_code=http)
+    resultado, http = await run_in_threadpool(ejecutar_plan_flujo, plan)
+    if isinstance(resultado, Flujo):
+        return respuesta_flujo(resultado, formato)
+    return SobreResponse(content=resultado, status_code=http)
+
+
+@router.post("/plan/batch")
+async def plan_batch(request: Request, stream: str | None = Query(None)):
+    # JSON con los resultados en el orden del lote, o NDJSON a medida que terminan.
+    from ..Orquestador.lote import decodificar_lote, iniciar_lote
+
+    formato = negociar(request.headers.get("accept"), stream)
+    if formato == "arrow":
+        raise ValidacionError("El lote solo se transmite como NDJSON (stream=ndjson)")
+    lote = decodificar_lote(await request.body())
+    ejecucion = await run_in_threadpool(iniciar_lote, lote)
+    if formato is None:
+        return SobreResponse(content=await run_in_threadpool(ejecucion.en_orden))
+    return respuesta_lote(ejecucion.al_completar())
+
+
+@router.get("/artifacts/{artifact_id}")
+def artifact_page(
+    artifact_id: str,
+    request: Request,
+    offset: int = Query(0),
+    limit: int | None = Query(None),  # None: PAGINA_DEFAULT
+    stream: str | None = Query(None),
+):
+    # El id viene de `artifact://tables/<id>.arrow`; se tolera con extensión.
+    from ..Empaquetador.artefactos import PAGINA_DEFAULT, obtener_almacen
+
+    aid = artifact_id.removesuffix(".arrow")
+    formato = negociar(request.headers.get("accept"), stream)
+    if formato is not None:
+        # En streaming se emite desde `offset` hasta el final; `limit` no aplica.
+        return respuesta_flujo(obtener_almacen().flujo(aid, offset), formato)
+    pagina = obtener_almacen().pagina(
+        aid, offset, PAGINA_DEFAULT if limit is None else limit
+    )
+    return SobreResponse(
+        content=pagina, headers={"Cache-Control": "private, max-age=3600"}
+    )
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 from fastapi import Request
-from fastapi.responses import JSONResponse
 
 from ..Celador.auditoria import audit, get_job_id
 from ..Celador.errores import (
@@ -12,6 +11,7 @@ from ..Celador.errores import (
     sobre_compute_error,
 )
 from ..dominio.nombres import EXPOSITOR, SYSTEM
+from .respuestas import SobreResponse
 
 
 def register_error_handlers(app) -> None:
@@ -35,7 +35,7 @@ def register_error_handlers(app) -> None:
 
         # Aquí el "productor" del sobre es la capa HTTP (Expositor), no una tool específica.
         sobre = a_sobre_error(exc, tool_name=EXPOSITOR, hints=[])
-        return JSONResponse(content=sobre, status_code=http, headers={"X-Job-Id": jid})
+        return SobreResponse(content=sobre, status_code=http, headers={"X-Job-Id": jid})
 
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(request: Request, exc: Exception):
@@ -57,4 +57,4 @@ def register_error_handlers(app) -> None:
             tool_name=SYSTEM,
             details="Error interno no controlado.",
         )
-        return JSONResponse(content=sobre, status_code=500, headers={"X-Job-Id": jid})
+        return SobreResponse(content=sobre, status_code=500, headers={"X-Job-Id": jid})
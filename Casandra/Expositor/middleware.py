@@ -2,19 +2,22 @@
 from __future__ import annotations
 
 import re
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from ..Celador.auditoria import audit, set_job_id
+from ..Celador.telemetria import HTTP_EN_VUELO, HTTP_LATENCIA, HTTP_RESPUESTAS
 
 
 _JOB_ID_RE = re.compile(r"^[a-f0-9]{16,64}$", re.IGNORECASE)  # uuid4 hex = 32 chars
+_EN_VUELO = HTTP_EN_VUELO.con()
 
 
-def _extract_job_id(request: Request) -> str | None:
+def _extract_job_id(headers: Headers) -> str | None:
     # Starlette normaliza headers a case-insensitive, pero mantenemos el nombre.
-    jid = request.headers.get("X-Job-Id")
+    jid = headers.get("X-Job-Id")
     if not jid:
         return None
     jid = jid.strip()
@@ -23,48 +26,80 @@ def _extract_job_id(request: Request) -> str | None:
     return jid
 
 
-class JobIdMiddleware(BaseHTTPMiddleware):
-    """Middleware que garantiza job_id contextual + auditoría básica."""
+class JobIdMiddleware:
+    """
+    Middleware ASGI puro que garantiza job_id contextual + auditoría básica.
+
+    No usa BaseHTTPMiddleware: no crea tareas ni memory streams extra y deja
+    pasar los cuerpos en streaming tal cual. Inyecta `X-Job-Id` en el mensaje
+    `http.response.start` y audita TTFB y latencia total en `response_out`.
+    También alimenta las métricas HTTP (latencia, status y en vuelo) por
+    plantilla de ruta (`/artifacts/{artifact_id}`), no por path crudo.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-    async def dispatch(self, request: Request, call_next):
-        incoming = _extract_job_id(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        t0 = time.perf_counter()
+        incoming = _extract_job_id(Headers(scope=scope))
         jid = set_job_id(
             incoming
         )  # si viene válido lo preserva; si no, genera uno nuevo
+        path = scope["path"]
+        method = scope["method"]
 
-        audit(
-            "request_in",
-            {
-                "job_id": jid,
-                "path": request.url.path,
-                "method": request.method,
-            },
-        )
+        audit("request_in", {"job_id": jid, "path": path, "method": method})
+
+        status_code = 500
+        ttfb_ms: float | None = None
+        _EN_VUELO.inc()
+
+        async def send_con_job_id(message: Message) -> None:
+            nonlocal status_code, ttfb_ms
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                ttfb_ms = round((time.perf_counter() - t0) * 1000, 3)
+                headers = MutableHeaders(scope=message)
+                headers["X-Job-Id"] = jid  # trazabilidad hacia el cliente
+            await send(message)
 
         try:
-            resp: Response = await call_next(request)
+            await self.app(scope, receive, send_con_job_id)
         except Exception as e:
+            self._medir(scope, method, status_code, t0)
             # Auditoría best-effort de excepción; el handler global de FastAPI decidirá el response final.
             audit(
                 "request_exception",
                 {
                     "job_id": jid,
-                    "path": request.url.path,
-                    "method": request.method,
+                    "path": path,
+                    "method": method,
                     "error": type(e).__name__,
                     "details": str(e),
                 },
             )
             raise
 
-        resp.headers["X-Job-Id"] = jid  # trazabilidad hacia el cliente
-
+        self._medir(scope, method, status_code, t0)
         audit(
             "response_out",
             {
                 "job_id": jid,
-                "status_code": resp.status_code,
+                "status_code": status_code,
+                "ttfb_ms": ttfb_ms,
+                "latency_ms": round((time.perf_counter() - t0) * 1000, 3),
             },
         )
 
-        return resp
+    @staticmethod
+    def _medir(scope: Scope, method: str, status_code: int, t0: float) -> None:
+        # El Router de Starlette deja la ruta resuelta en el scope (cardinalidad acotada).
+        ruta = getattr(scope.get("route"), "path", "unmatched")
+        HTTP_LATENCIA.con(method, ruta).observar(time.perf_counter() - t0)
+        HTTP_RESPUESTAS.con(method, ruta, str(status_code)).inc()
+        _EN_VUELO.dec()
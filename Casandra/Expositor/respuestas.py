@@ -0,0 +1,39 @@
+# casandra/expositor/respuestas.py
+from __future__ import annotations
+
+from typing import Any, Iterator
+
+import msgspec
+from starlette.responses import Response, StreamingResponse
+
+from ..Empaquetador.flujo import MEDIA_TYPES, Flujo, Formato, codificar
+
+
+_ENCODER = msgspec.json.Encoder()
+
+
+class SobreResponse(Response):
+    """
+    Response JSON que codifica Sobres (`msgspec.Struct`) directo a bytes.
+    También acepta dicts/listas, así que sirve para cualquier payload JSON.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return _ENCODER.encode(content)
+
+
+def respuesta_flujo(flujo: Flujo, formato: Formato) -> StreamingResponse:
+    """Cabecera, filas por lote y cierre, en NDJSON o Arrow IPC stream."""
+    return StreamingResponse(codificar(flujo, formato), media_type=MEDIA_TYPES[formato])
+
+
+def respuesta_lote(resultados: Iterator[Any]) -> StreamingResponse:
+    """Un `ResultadoLote` por línea NDJSON, en el orden en que terminan."""
+
+    def lineas() -> Iterator[bytes]:
+        for r in resultados:
+            yield _ENCODER.encode(r) + b"\n"
+
+    return StreamingResponse(lineas(), media_type=MEDIA_TYPES["ndjson"])
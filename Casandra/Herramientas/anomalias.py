@@ -0,0 +1,191 @@
+# casandra/herramientas/anomalias.py
+"""
+detectar_anomalias@1.0.0 (doc §13.1): picos por z-score rodante en todas las
+series entidad (× delito) a la vez.
+
+La matriz series × días sale del cubo (diferencias del acumulado) o, sin cubo,
+de un solo `conteo_por` agrupado por día; la detección corre en el pool de
+procesos (tool `cpu_bound`). Los `event_ids` se resuelven al final y solo
+para las top_k anomalías que se devuelven.
+"""
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+
+from ..Analisis.Patrones.anomalias import detectar
+from ..Celador.errores import ValidacionError
+from ..Celador.versiones import watermark
+from ..Consultor.entidades import obtener_jerarquia
+from ..Consultor.repo import Filtros
+from ..dominio.sobre import (
+    Columna,
+    DataInline,
+    Evidencia,
+    LimitNotice,
+    RangoEfectivo,
+    Resumen,
+    SobreData,
+    SobreOk,
+)
+from .filtros import restringir_propios
+from .registro import DETECTAR_ANOMALIAS
+from .spec import Args, Contexto, calcular
+
+
+def _matriz_cubo(
+    ctx: Contexto, filtros: Filtros, inicio: date, fin: date, hijos_de: Optional[str]
+) -> tuple[np.ndarray, list[str], list[str], date]:
+    cubo = ctx.cubo
+    ie = cubo.indices_entidades(filtros.entidad_ids)
+    if hijos_de is not None:
+        ie = cubo.indices_hijos(hijos_de, ie)
+    idl = cubo.indices_delitos(filtros.delitos)
+    diarios, dia1 = cubo.diarios(inicio, fin)
+    bloque = diarios[:, ie][:, :, idl]  # (T, E, D)
+    matriz = bloque.transpose(1, 2, 0)  # (E, D, T)
+    return matriz, list(cubo.entidades[ie]), list(cubo.delitos[idl]), dia1
+
+
+def _matriz_sql(
+    ctx: Contexto, filtros: Filtros, inicio: date, fin: date, hijos_de: Optional[str]
+) -> tuple[np.ndarray, list[str], list[str], date]:
+    f = replace(filtros, desde=inicio, hasta=fin)
+    if hijos_de is not None:
+        f = f.restringir(entidad_ids=obtener_jerarquia(ctx.consultor).hijos(hijos_de))
+    tabla = ctx.consultor.conteo_por(f, ("entidad_id", "delito", "fecha"))
+    ents = tabla.column("entidad_id").to_pylist()
+    dels = tabla.column("delito").to_pylist()
+
+    eje_e, eje_d = sorted(set(ents)), sorted(set(dels))
+    pos_e = {e: i for i, e in enumerate(eje_e)}
+    pos_d = {d: i for i, d in enumerate(eje_d)}
+    t = (
+        np.asarray(tabla.column("fecha").to_numpy(), dtype="datetime64[D]")
+        - np.datetime64(inicio, "D")
+    ).astype(np.int64)
+    matriz = np.zeros((len(eje_e), len(eje_d), (fin - inicio).days + 1), dtype=np.int64)
+    matriz[[pos_e[e] for e in ents], [pos_d[d] for d in dels], t] = tabla.column(
+        "conteo"
+    ).to_numpy()
+    return matriz, eje_e, eje_d, inicio
+
+
+def _ejecutar(filtros: Filtros, args: Args, ctx: Contexto) -> SobreOk:
+    filtros, meta = restringir_propios(filtros, args, ctx)
+    ventana, z_umbral, top_k = args["window"], args["z_threshold"], args["top_k"]
+
+    padre = None
+    if args["nivel"] == "hijos":
+        if filtros.enfoque is None:
+            raise ValidacionError("nivel 'hijos' requiere una entidad enfocada")
+        padre = filtros.enfoque
+        filtros = replace(filtros, entidad_ids=None)
+
+    min_d, max_d = watermark()
+    desde = filtros.desde or min_d
+    hasta = filtros.hasta or max_d
+    # Historia previa para que el primer día evaluado tenga ventana completa.
+    inicio = max(min_d, desde - timedelta(days=ventana))
+
+    armar = _matriz_cubo if ctx.cubo is not None else _matriz_sql
+    matriz, ejes_e, ejes_d, dia1 = armar(ctx, filtros, inicio, hasta, padre)
+
+    n_e, n_d, n_t = matriz.shape
+    if args["por"] == "entidad_id":
+        series = matriz.sum(axis=1)
+        etiquetas = [(e, None) for e in ejes_e]
+    else:
+        series = matriz.reshape(n_e * n_d, n_t)
+        etiquetas = [(e, d) for e in ejes_e for d in ejes_d]
+
+    # z-scores en el pool de procesos: la matriz ya está materializada aquí.
+    hallazgos = calcular(
+        DETECTAR_ANOMALIAS,
+        detectar,
+        series,
+        ventana,
+        z_umbral,
+        desde_dia=(desde - dia1).days,
+    )
+    top = hallazgos.top(top_k)
+
+    rows: list[list] = []
+    todos_ids: list[int] = []
+    for i in top:
+        ent, dl = etiquetas[int(hallazgos.serie[i])]
+        dia = dia1 + timedelta(days=int(hallazgos.dia[i]))
+        ids: list[int] = []
+        if args["max_ids"]:
+            f = Filtros(
+                entidad_ids=(ent,),
+                desde=dia,
+                hasta=dia,
+                delitos=(dl,) if dl else filtros.delitos,
+            )
+            tabla = ctx.consultor.incidentes(f, ("id",), limite=args["max_ids"])
+            ids = [x for x in tabla.column("id").to_pylist() if x is not None]
+            todos_ids.extend(ids)
+        rows.append(
+            [
+                ent,
+                dl,
+                str(dia),
+                int(hallazgos.valor[i]),
+                round(float(hallazgos.media[i]), 4),
+                round(float(hallazgos.z[i]), 4),
+                round(float(hallazgos.severidad[i]), 4),
+                ids,
+            ]
+        )
+
+    if meta.date_range_effective is None:
+        meta.date_range_effective = RangoEfectivo(desde=str(desde), hasta=str(hasta))
+    total = len(hallazgos)
+    highlights = [
+        f"Ventana {desde}..{hasta}",
+        f"{series.shape[0]} series, z >= {z_umbral}",
+    ]
+    if rows:
+        highlights.insert(
+            0,
+            f"Mayor: {rows[0][0]} {rows[0][1] or ''} {rows[0][2]} (z={rows[0][5]})".replace(
+                "  ", " "
+            ),
+        )
+
+    return SobreOk(
+        tool=DETECTAR_ANOMALIAS.canonical,
+        summary=Resumen(
+            headline=f"{total} anomalías detectadas", highlights=highlights
+        ),
+        data=SobreData(
+            inline=DataInline(
+                columns=[
+                    Columna(name="entidad_id", type="string"),
+                    Columna(name="delito", type="string"),
+                    Columna(name="fecha", type="date"),
+                    Columna(name="eventos", type="int"),
+                    Columna(name="media", type="float"),
+                    Columna(name="z_score", type="float"),
+                    Columna(name="severity", type="float"),
+                    Columna(name="event_ids", type="list[int]"),
+                ],
+                rows=rows,
+                limit_notice=LimitNotice(applied=total > len(rows), max_rows=top_k),
+            )
+        ),
+        evidence=[Evidencia(table="incidentes", ids=todos_ids)] if todos_ids else [],
+        metrics={
+            "total_anomalias": total,
+            "gravedad_promedio": (
+                round(float(hallazgos.severidad.mean()), 4) if total else 0.0
+            ),
+            "series": int(series.shape[0]),
+            "dias_evaluados": max(0, (hasta - desde).days + 1),
+        },
+        meta=meta,
+    )
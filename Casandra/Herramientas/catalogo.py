@@ -0,0 +1,227 @@
+# casandra/herramientas/catalogo.py
+"""
+CatalogSpec (doc anexo C.9): catálogo inmutable y verificable de tools,
+entidades y taxonomía de delitos.
+
+Se arma UNA vez (al arrancar, y de nuevo solo si cambia el `dataset_version`,
+que trae su propio universo de entidades/delitos) y se congela:
+
+- ToolSpecs como `HerramientaCatalogo` (Structs congelados; `args_schema` ya
+  codificado como `msgspec.Raw`), entidades y delitos como tuplas de strings
+  internados.
+- `checksum` = blake3 (sha256 si no está instalado) del contenido canónico,
+  sin `generated_at`: el mismo contenido da el mismo checksum.
+- La respuesta de `/tools/catalog` se serializa una sola vez; el ETag es el
+  checksum, así que un sondeo con `If-None-Match` cuesta una comparación de
+  strings y un 304. Es débil (`W/`): el cuerpo lleva el `generated_at` de
+  cada proceso, que no entra al checksum, así que dos workers pueden servir
+  bytes distintos con el mismo contenido.
+
+El reemplazo es atómico: `CatalogoPublicado` (spec + bytes + ETag) se
+publica con una sola asignación, y quien lo lee toma una referencia a la
+tripleta completa. Si un dataset nuevo no cambia el contenido (mismo
+checksum), se conservan spec, bytes y ETag: los clientes siguen en 304.
+"""
+from __future__ import annotations
+
+import hashlib
+import sys
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Optional
+
+import duckdb
+import msgspec
+
+from ..Celador.auditoria import audit
+from ..Celador.errores import CeladorError
+from ..Celador.versiones import (
+    CATALOG_VERSION,
+    dataset_version,
+    registrar_proveedor_catalogo,
+)
+from ..Consultor.cubo import obtener_cubo
+from ..Consultor.repo import Filtros, obtener_consultor
+from ..dominio.nombres import SYSTEM
+from .spec import ToolSpec, herramientas
+
+
+SCHEMA_VERSION = "1.0.0"
+
+
+class HerramientaCatalogo(msgspec.Struct, frozen=True, gc=False):
+    tool_id: int
+    name: str
+    version: str
+    canonical: str
+    kind: str
+    summary: str
+    requires: tuple[str, ...]
+    deterministic: bool
+    streaming: bool
+    args_schema: msgspec.Raw
+
+
+class CatalogSpec(msgspec.Struct, frozen=True, gc=False):
+    catalog_version: str
+    schema_version: str
+    generated_at: str
+    checksum: str
+    tools: tuple[HerramientaCatalogo, ...]
+    entidades: tuple[str, ...]
+    delitos: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CatalogoPublicado:
+    spec: CatalogSpec
+    cuerpo: bytes  # JSON de /tools/catalog, serializado una vez
+    etag: str
+    dataset_version: str  # del que salieron entidades y delitos
+
+
+_ENCODER = msgspec.json.Encoder(order="sorted")
+
+
+def _herramienta(spec: ToolSpec) -> HerramientaCatalogo:
+    return HerramientaCatalogo(
+        tool_id=spec.tool_id,
+        name=sys.intern(spec.name),
+        version=sys.intern(spec.version),
+        canonical=sys.intern(spec.canonical),
+        kind=spec.kind,
+        summary=spec.summary,
+        requires=tuple(sys.intern(r) for r in spec.requires),
+        deterministic=spec.deterministic,
+        streaming=spec.fluir is not None,
+        args_schema=msgspec.Raw(_ENCODER.encode(spec.args_schema or {})),
+    )
+
+
+def _universo(dv: str) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """(entidades, delitos) del dataset vigente: ejes del cubo o, sin cubo, un GROUP BY."""
+    cubo = obtener_cubo()
+    if cubo is not None and cubo.dataset_version == dv:
+        entidades, delitos = cubo.ejes.entidades, cubo.ejes.delitos
+    else:
+        try:
+            tabla = obtener_consultor().conteo_por(Filtros(), ("entidad_id", "delito"))
+        except (CeladorError, duckdb.Error):
+            return (), ()  # sin Depósito: el catálogo de tools sigue siendo válido
+        entidades = tabla.column("entidad_id").unique().to_pylist()
+        delitos = tabla.column("delito").unique().to_pylist()
+    return (
+        tuple(sys.intern(e) for e in sorted(entidades) if e),
+        tuple(sys.intern(d) for d in sorted(delitos) if d),
+    )
+
+
+def _checksum(blob: bytes) -> str:
+    try:
+        import blake3
+
+        return f"blake3:{blake3.blake3(blob).hexdigest()}"
+    except ImportError:
+        return f"sha256:{hashlib.sha256(blob).hexdigest()}"
+
+
+def construir_catalogo(dv: str) -> CatalogSpec:
+    """Catálogo con las tools registradas y el universo de entidades/delitos de `dv`."""
+    tools = tuple(_herramienta(s) for s in herramientas())
+    entidades, delitos = _universo(dv)
+    contenido = {
+        "schema_version": SCHEMA_VERSION,
+        "tools": tools,
+        "entidades": entidades,
+        "delitos": delitos,
+        "catalog_version": CATALOG_VERSION,
+    }
+    checksum = _checksum(_ENCODER.encode(contenido))
+    return CatalogSpec(
+        # Sin versión fija por despliegue, se deriva del checksum.
+        catalog_version=CATALOG_VERSION or f"auto-{checksum.split(':', 1)[1][:12]}",
+        schema_version=SCHEMA_VERSION,
+        generated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        checksum=checksum,
+        tools=tools,
+        entidades=entidades,
+        delitos=delitos,
+    )
+
+
+class ServicioCatalogo:
+    def __init__(self) -> None:
+        self._vigente: Optional[CatalogoPublicado] = None
+        self._lock = threading.Lock()
+
+    def actual(self) -> CatalogoPublicado:
+        """Catálogo vigente. Camino caliente: comparar el dataset_version."""
+        pub = self._vigente
+        dv = self._dataset_version()
+        if pub is not None and pub.dataset_version == dv:
+            return pub
+        return self.cargar(dv)
+
+    @staticmethod
+    def _dataset_version() -> str:
+        try:
+            return dataset_version()
+        except CeladorError:
+            return ""
+
+    def cargar(self, dv: Optional[str] = None) -> CatalogoPublicado:
+        """Arma el catálogo de `dv` (o el vigente) y lo publica."""
+        with self._lock:
+            dv = self._dataset_version() if dv is None else dv
+            previo = self._vigente
+            if previo is not None and previo.dataset_version == dv:
+                return previo  # otro hilo ya lo cargó
+            t0 = time.perf_counter()
+            spec = construir_catalogo(dv)
+            if previo is not None and previo.spec.checksum == spec.checksum:
+                self._vigente = replace(previo, dataset_version=dv)
+                return self._vigente
+            pub = CatalogoPublicado(
+                spec, msgspec.json.encode(spec), f'W/"{spec.checksum}"', dv
+            )
+            self._vigente = pub  # única asignación: los lectores ven el viejo o el nuevo, nunca mezcla
+        audit(
+            "catalog.load",
+            {
+                "component": SYSTEM,
+                "catalog_version": spec.catalog_version,
+                "checksum": spec.checksum,
+                "dataset_version": dv,
+                "tools": len(spec.tools),
+                "entidades": len(spec.entidades),
+                "delitos": len(spec.delitos),
+                "bytes": len(pub.cuerpo),
+                "timing_ms": round((time.perf_counter() - t0) * 1000, 3),
+            },
+        )
+        return pub
+
+
+_servicio: Optional[ServicioCatalogo] = None
+_servicio_lock = threading.Lock()
+
+
+def obtener_servicio_catalogo() -> ServicioCatalogo:
+    """Servicio compartido del proceso (se crea al primer uso)."""
+    global _servicio
+    if _servicio is None:
+        with _servicio_lock:
+            if _servicio is None:
+                _servicio = ServicioCatalogo()
+    return _servicio
+
+
+def registrar_proveedor(
+    servicio: Optional[ServicioCatalogo] = None,
+) -> ServicioCatalogo:
+    """Conecta el catálogo con Celador: `catalog_version()` pasa a ser la del catálogo vigente."""
+    svc = servicio or obtener_servicio_catalogo()
+    registrar_proveedor_catalogo(lambda: svc.actual().spec.catalog_version)
+    return svc
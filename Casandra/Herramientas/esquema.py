@@ -0,0 +1,163 @@
+# casandra/herramientas/esquema.py
+"""
+Validación de argumentos contra `args_schema` (doc anexo C.5).
+
+Cada ToolSpec declara un subconjunto estricto de JSON Schema (objeto con
+`properties`, `required`, `additionalProperties: false`; tipos `integer`,
+`number`, `string` con `enum`/`minLength`/`format`, `array` con `items` y
+`minItems`). En vez de interpretarlo en cada llamada, se compila UNA vez por
+`catalog_version` a un `msgspec.Struct` y se valida con `msgspec.convert`,
+que recorre el dict en C.
+
+Los mensajes de error no cambian: si el decodificador compilado rechaza los
+args, se repite la validación con los helpers de `spec` (`args_permitidos`,
+`entero`, `decimal`, `opcion`, `lista`) en el orden del esquema, que levantan el
+mismo `ValidacionError` de siempre. Ese camino solo se paga en el error.
+
+`format` (`entidad_id`, `date`, `delito`) es semántico: lo resuelve el
+`normalizar` de la tool, que recibe los args ya tipados y con defaults.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Annotated, Any, Literal, Optional, Union
+
+import msgspec
+
+from ..Celador.errores import ValidacionError
+from ..Celador.validaciones import requeridos
+from ..Celador.versiones import catalog_version
+from .spec import Args, ToolSpec, args_permitidos, decimal, entero, lista, opcion
+
+
+ArgsSchema = dict[str, Any]
+
+_ESCALARES: dict[str, type] = {
+    "integer": int,
+    "number": float,
+    "string": str,
+    "boolean": bool,
+}
+
+
+def _tipo(prop: ArgsSchema) -> Any:
+    """Tipo de Python/msgspec equivalente a una propiedad del esquema."""
+    if "enum" in prop:
+        return Literal[tuple(prop["enum"])]
+    tipos = prop.get("type")
+    if isinstance(tipos, list):
+        return Union[tuple(_tipo({**prop, "type": t}) for t in tipos)]
+    if tipos == "array":
+        base: Any = list[_tipo(prop.get("items", {}))]
+        limite = {"min_length": prop["minItems"]} if "minItems" in prop else {}
+    elif tipos in _ESCALARES:
+        base = _ESCALARES[tipos]
+        limite = {}
+        if tipos in ("integer", "number"):
+            if "minimum" in prop:
+                limite["ge"] = prop["minimum"]
+            if "maximum" in prop:
+                limite["le"] = prop["maximum"]
+        elif tipos == "string" and "minLength" in prop:
+            limite["min_length"] = prop["minLength"]
+    else:
+        return Any
+    return Annotated[base, msgspec.Meta(**limite)] if limite else base
+
+
+class Validador:
+    """`args_schema` compilado de una tool; `validar(args)` -> args normalizados."""
+
+    __slots__ = ("spec", "_tipo", "_campos")
+
+    def __init__(self, spec: ToolSpec) -> None:
+        esquema = spec.args_schema or {}
+        props: dict[str, ArgsSchema] = esquema.get("properties", {})
+        requeridas = set(esquema.get("required", ()))
+        campos = []
+        for nombre, prop in props.items():
+            tipo = _tipo(prop)
+            if nombre in requeridas:
+                campos.append((nombre, tipo))
+            elif "default" in prop:
+                campos.append((nombre, tipo, prop["default"]))
+            else:
+                campos.append((nombre, Union[tipo, msgspec.UnsetType], msgspec.UNSET))
+        self.spec = spec
+        self._campos = tuple(props)
+        self._tipo = msgspec.defstruct(
+            f"Args_{spec.name}",
+            campos,
+            kw_only=True,
+            forbid_unknown_fields=esquema.get("additionalProperties", False) is False,
+        )
+
+    def validar(self, args: Args) -> Args:
+        try:
+            obj = msgspec.convert(args, self._tipo)
+        except msgspec.ValidationError:
+            return self._interpretar(args)
+        tipados = {
+            c: v for c in self._campos if (v := getattr(obj, c)) is not msgspec.UNSET
+        }
+        return self.spec.normalizar(tipados)
+
+    def _interpretar(self, args: Args) -> Args:
+        """Camino lento, solo tras un rechazo: reproduce los mensajes de los helpers."""
+        esquema = self.spec.args_schema or {}
+        if not isinstance(args, dict):
+            raise ValidacionError(f"{self.spec.name}: args debe ser un objeto")
+        if esquema.get("additionalProperties", False) is False:
+            args_permitidos(args, self._campos, self.spec.name)
+        requeridos(args, esquema.get("required", ()))
+        tipados: Args = {}
+        for campo, prop in esquema.get("properties", {}).items():
+            if campo not in args and "default" not in prop:
+                continue
+            default = prop.get("default")
+            if "enum" in prop:
+                tipados[campo] = opcion(args, campo, default, tuple(prop["enum"]))
+            elif prop.get("type") == "integer":
+                tipados[campo] = entero(
+                    args, campo, default, prop["minimum"], prop["maximum"]
+                )
+            elif prop.get("type") == "number":
+                tipados[campo] = decimal(
+                    args, campo, default, prop["minimum"], prop["maximum"]
+                )
+            elif prop.get("type") == "array":
+                tipados[campo] = lista(args, campo, default)
+            else:
+                tipados[campo] = args[campo]
+        return self.spec.normalizar(tipados)
+
+
+_compilados: dict[tuple[int, str], Validador] = {}
+_version: Optional[str] = None
+_lock = threading.Lock()
+
+
+def validador(spec: ToolSpec) -> Validador:
+    """Validador compilado de `spec`; se recompila todo al cambiar `catalog_version`."""
+    global _version
+    cv = catalog_version()
+    clave = (spec.tool_id, spec.version)
+    if cv == _version:
+        v = _compilados.get(clave)
+        if v is not None and v.spec is spec:
+            return v
+    with _lock:
+        if cv != _version:
+            _compilados.clear()
+            _version = cv
+        v = _compilados.get(clave)
+        if v is None or v.spec is not spec:
+            v = _compilados[clave] = Validador(spec)
+        return v
+
+
+def validar_args(spec: ToolSpec, args: Args) -> Args:
+    """Validación estática + forma canónica de los args de un paso."""
+    if spec.args_schema is None:
+        return spec.normalizar(args)
+    return validador(spec).validar(args)
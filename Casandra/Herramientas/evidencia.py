@@ -0,0 +1,53 @@
+# casandra/herramientas/evidencia.py
+"""
+listar_evidencia@1.0.0: IDs de incidentes que sustentan el resultado del plan.
+
+Inline van a lo más `max_ids`; si hay más, la lista completa se publica como
+artefacto `evidencia_ids`, escrita por lotes desde el Consultor. En modo
+streaming se emiten todos los IDs (sin `max_ids`) directo de esos lotes.
+"""
+from __future__ import annotations
+
+import pyarrow as pa
+
+from ..Consultor.repo import Filtros
+from ..dominio.sobre import Evidencia, Resumen, SobreData, SobreMeta, SobreOk
+from ..Empaquetador.flujo import Flujo
+from .registro import LISTAR_EVIDENCIA
+from .spec import Args, Contexto, artefacto
+
+
+ESQUEMA_IDS = pa.schema([("id", pa.int64())])
+
+
+def _ejecutar(filtros: Filtros, args: Args, ctx: Contexto) -> SobreOk:
+    max_ids = args["max_ids"]
+    # max_ids + 1 para saber si hubo recorte sin traer la lista completa.
+    tabla = ctx.consultor.incidentes(filtros, ("id",), limite=max_ids + 1)
+    ids = [i for i in tabla.column("id").to_pylist() if i is not None]
+    artifacts = None
+    if len(ids) > max_ids:
+        ids = ids[:max_ids]
+        artifacts = artefacto(
+            ctx,
+            "evidencia_ids",
+            lambda: ctx.consultor.lotes_incidentes(filtros, ("id",)),
+            ESQUEMA_IDS,
+        )
+    return SobreOk(
+        tool=LISTAR_EVIDENCIA.canonical,
+        summary=Resumen(headline=f"{len(ids)} incidentes de evidencia"),
+        data=SobreData(artifacts=artifacts),
+        evidence=[Evidencia(table="incidentes", ids=ids)],
+        meta=SobreMeta(),
+    )
+
+
+def _fluir(filtros: Filtros, args: Args, ctx: Contexto) -> Flujo:
+    return Flujo(
+        tool=LISTAR_EVIDENCIA.canonical,
+        meta=SobreMeta(),
+        esquema=ESQUEMA_IDS,
+        lotes=ctx.consultor.lotes_incidentes(filtros, ("id",)),
+        resumen=lambda n: Resumen(headline=f"{n:,} incidentes de evidencia"),
+    )
@@ -0,0 +1,194 @@
+# casandra/herramientas/filtros.py
+"""
+Tools de filtro: solo restringen los `Filtros` acumulados del plan.
+No leen datos; el Orquestador empuja la conjunción completa al Consultor.
+"""
+from __future__ import annotations
+
+from dataclasses import replace
+
+from ..Celador.validaciones import (
+    delito,
+    entidad_id,
+    par_fechas,
+    requeridos,
+    validar_rango,
+)
+from ..Celador.errores import ValidacionError
+from ..Consultor.repo import Filtros
+from ..dominio.sobre import RangoEfectivo, SobreMeta
+from .spec import Args, Contexto, ToolSpec, esquema_objeto, registrar
+
+
+# Propiedades con `format` semántico; el tipo lo valida el esquema compilado.
+PROP_ENTIDAD_ID = {"type": "string", "format": "entidad_id", "minLength": 1}
+PROP_DELITO = {"type": "string", "format": "delito", "minLength": 1}
+PROP_FECHA = {"type": "string", "format": "date", "minLength": 1}
+
+
+# --- enfoque_entidad@1.0.0 ---
+
+
+def _norm_entidad(args: Args) -> Args:
+    requeridos(args, ["entidad_id"])
+    return {"entidad_id": entidad_id(args["entidad_id"])}
+
+
+def _restringir_entidad(
+    filtros: Filtros, args: Args, ctx: Contexto
+) -> tuple[Filtros, SobreMeta]:
+    # Un estado cubre a sus municipios: el filtro lleva la entidad y sus hijos.
+    from ..Consultor.entidades import obtener_jerarquia  # numpy: solo al ejecutar
+
+    enfoque = args["entidad_id"]
+    nuevos = filtros.restringir(
+        entidad_ids=obtener_jerarquia(ctx.consultor).expandir(enfoque)
+    )
+    return replace(nuevos, enfoque=enfoque), SobreMeta()
+
+
+ENFOQUE_ENTIDAD = registrar(
+    ToolSpec(
+        tool_id=1,
+        name="enfoque_entidad",
+        version="1.0.0",
+        kind="filter",
+        summary="Fija la entidad (entidad_id) y sus hijos en la jerarquía.",
+        requires=("dataset", "entity"),
+        normalizar=_norm_entidad,
+        args_schema=esquema_objeto({"entidad_id": PROP_ENTIDAD_ID}, ("entidad_id",)),
+        restringir=_restringir_entidad,
+    )
+)
+
+
+# --- filtro_fecha@1.0.0 ---
+
+
+def _norm_fecha(args: Args) -> Args:
+    requeridos(args, ["from", "to"])
+    d1, d2 = par_fechas(args["from"], args["to"])
+    return {"from": d1.isoformat(), "to": d2.isoformat()}
+
+
+def _restringir_fecha(
+    filtros: Filtros, args: Args, ctx: Contexto
+) -> tuple[Filtros, SobreMeta]:
+    # Validación contextual: recorte (o error con strict_time) contra el watermark.
+    ef1, ef2, adjusted = validar_rango(
+        args["from"], args["to"], strict_time=ctx.strict_time
+    )
+    nuevos = filtros.restringir(desde=ef1, hasta=ef2)
+    meta = SobreMeta(
+        date_range_effective=RangoEfectivo(
+            desde=str(nuevos.desde), hasta=str(nuevos.hasta)
+        ),
+        range_adjusted=adjusted,
+    )
+    return nuevos, meta
+
+
+FILTRO_FECHA = registrar(
+    ToolSpec(
+        tool_id=2,
+        name="filtro_fecha",
+        version="1.0.0",
+        kind="filter",
+        summary="Intervalo absoluto from/to (ISO día), recortado al watermark.",
+        requires=("dataset", "date_range"),
+        normalizar=_norm_fecha,
+        args_schema=esquema_objeto(
+            {"from": PROP_FECHA, "to": PROP_FECHA}, ("from", "to")
+        ),
+        restringir=_restringir_fecha,
+    )
+)
+
+
+# --- filtro_tipo@1.0.0 ---
+
+
+def _norm_tipo(args: Args) -> Args:
+    requeridos(args, ["delitos"])
+    valores = args["delitos"]
+    if isinstance(valores, str):
+        valores = [valores]
+    if not isinstance(valores, list):
+        raise ValidacionError("'delitos' debe ser lista de strings")
+    # Orden canónico: el mismo conjunto es el mismo plan.
+    return {"delitos": sorted({delito(v) for v in valores})}
+
+
+def _restringir_tipo(
+    filtros: Filtros, args: Args, ctx: Contexto
+) -> tuple[Filtros, SobreMeta]:
+    return filtros.restringir(delitos=args["delitos"]), SobreMeta()
+
+
+FILTRO_TIPO = registrar(
+    ToolSpec(
+        tool_id=3,
+        name="filtro_tipo",
+        version="1.0.0",
+        kind="filter",
+        summary="Restringe a uno o más tipos de delito.",
+        requires=("dataset",),
+        normalizar=_norm_tipo,
+        args_schema=esquema_objeto(
+            {
+                "delitos": {
+                    **PROP_DELITO,
+                    "type": ["string", "array"],
+                    "items": PROP_DELITO,
+                    "minItems": 1,
+                }
+            },
+            ("delitos",),
+        ),
+        restringir=_restringir_tipo,
+    )
+)
+
+
+# --- Filtros propios de tools de análisis (doc §4.3) ---
+
+PROPIEDADES_PROPIAS = {
+    "entidad_id": PROP_ENTIDAD_ID,
+    "delito": PROP_DELITO,
+    "from": PROP_FECHA,
+    "to": PROP_FECHA,
+}
+
+
+def normalizar_propios(args: Args) -> Args:
+    """
+    `entidad_id` / `delito` / `from` / `to` opcionales, con las reglas de las
+    tools de filtro. Devuelve los demás args tal cual más los propios canónicos.
+    """
+    out: Args = {k: v for k, v in args.items() if k not in PROPIEDADES_PROPIAS}
+    if "entidad_id" in args:
+        out.update(ENFOQUE_ENTIDAD.normalizar({"entidad_id": args["entidad_id"]}))
+    if "delito" in args:
+        out.update(FILTRO_TIPO.normalizar({"delitos": [args["delito"]]}))
+    if "from" in args or "to" in args:
+        out.update(
+            FILTRO_FECHA.normalizar({"from": args.get("from"), "to": args.get("to")})
+        )
+    return out
+
+
+def restringir_propios(
+    filtros: Filtros, args: Args, ctx: Contexto
+) -> tuple[Filtros, SobreMeta]:
+    meta = SobreMeta()
+    if "entidad_id" in args:
+        filtros, _ = ENFOQUE_ENTIDAD.restringir(
+            filtros, {"entidad_id": args["entidad_id"]}, ctx
+        )
+    if "delitos" in args:
+        filtros, _ = FILTRO_TIPO.restringir(filtros, {"delitos": args["delitos"]}, ctx)
+    if "from" in args:
+        filtros, meta = FILTRO_FECHA.restringir(
+            filtros, {"from": args["from"], "to": args["to"]}, ctx
+        )
+    return filtros, meta
@@ -0,0 +1,129 @@
+# casandra/herramientas/hotspots.py
+"""
+detectar_hotspots@1.0.0: concentraciones espaciales de eventos en una caja
+(`bbox`, por omisión toda la extensión) y ventana de fechas.
+
+La malla sale del índice espacial (`Consultor/espacial.py`) al nivel más fino
+que cabe en `MAX_CELDAS` (o el `nivel` pedido): un slice por fechas y un
+recorte, sin recorrer puntos. Con `entidad_id` los puntos salen del R-tree.
+
+- `gi`: celdas con Getis-Ord Gi* >= `z_threshold` que son máximo local.
+- `kde`: picos de densidad kernel gaussiana (`ancho_banda_km`), en eventos/km².
+
+Cada hotspot se nombra con el municipio cuyo polígono contiene su centro
+(si el Depósito trae `municipios.geojson`).
+"""
+from __future__ import annotations
+
+from ..Analisis.Espacial.densidad import (
+    densidad_kernel,
+    gi_estrella,
+    km_por_grado,
+    picos,
+)
+from ..Celador.errores import DatosFaltantesError
+from ..Celador.versiones import watermark
+from ..Consultor.espacial import obtener_indice_espacial
+from ..Consultor.repo import Filtros
+from ..dominio.sobre import (
+    Columna,
+    DataInline,
+    LimitNotice,
+    RangoEfectivo,
+    Resumen,
+    SobreData,
+    SobreOk,
+)
+from .filtros import restringir_propios
+from .registro import DETECTAR_HOTSPOTS
+from .spec import Args, Contexto
+
+
+def _ejecutar(filtros: Filtros, args: Args, ctx: Contexto) -> SobreOk:
+    indice = obtener_indice_espacial()
+    if indice is None:
+        raise DatosFaltantesError(
+            f"Sin índice espacial para dataset_version={ctx.dataset_version}: "
+            "el Depósito no tiene incidentes con coordenadas (lat/lon)"
+        )
+    filtros, meta = restringir_propios(filtros, args, ctx)
+    min_d, max_d = watermark()
+    desde, hasta = filtros.desde or min_d, filtros.hasta or max_d
+    caja = tuple(args["bbox"]) if "bbox" in args else indice.extension()
+    nivel = args["nivel"] if args["nivel"] >= 0 else None
+
+    malla = indice.malla(
+        caja, desde, hasta, filtros.delitos, filtros.entidad_ids, nivel
+    )
+    conteos = malla.conteos
+    lat_centro = malla.lat0 + conteos.shape[0] * malla.celda / 2
+    if args["metodo"] == "gi":
+        valores = gi_estrella(conteos, args["radio"])
+        filas, cols = picos(valores, args["z_threshold"])
+        columna_valor = "z_score"
+    else:
+        valores = densidad_kernel(
+            conteos, malla.celda, lat_centro, args["ancho_banda_km"]
+        )
+        filas, cols = picos(valores)
+        columna_valor = "densidad_km2"
+
+    top_k = args["top_k"]
+    total = int(filas.size)
+    filas, cols = filas[:top_k], cols[:top_k]
+    xs, ys = malla.centros(filas, cols)
+    municipios = indice.municipios_en(xs, ys)
+    rows = [
+        [
+            round(float(x), 6),
+            round(float(y), 6),
+            [round(v, 6) for v in malla.caja(int(f), int(c))],
+            int(conteos[f, c]),
+            round(float(valores[f, c]), 4),
+            m,
+        ]
+        for x, y, f, c, m in zip(xs, ys, filas, cols, municipios)
+    ]
+
+    if meta.date_range_effective is None:
+        meta.date_range_effective = RangoEfectivo(desde=str(desde), hasta=str(hasta))
+    km_lon, km_lat = km_por_grado(lat_centro)
+    alto, ancho = conteos.shape
+    highlights = [
+        f"Malla nivel {malla.nivel}: {ancho}×{alto} celdas de ~{malla.celda * km_lon:.2f}×{malla.celda * km_lat:.2f} km",
+        f"Ventana {desde}..{hasta}",
+    ]
+    if rows:
+        donde = rows[0][5] or f"({rows[0][0]}, {rows[0][1]})"
+        highlights.insert(
+            0, f"Mayor: {donde}, {rows[0][3]} eventos ({columna_valor}={rows[0][4]})"
+        )
+
+    return SobreOk(
+        tool=DETECTAR_HOTSPOTS.canonical,
+        summary=Resumen(
+            headline=f"{total} hotspots ({args['metodo']})", highlights=highlights
+        ),
+        data=SobreData(
+            inline=DataInline(
+                columns=[
+                    Columna(name="lon", type="float"),
+                    Columna(name="lat", type="float"),
+                    Columna(name="bbox", type="list[float]"),
+                    Columna(name="eventos", type="int"),
+                    Columna(name=columna_valor, type="float"),
+                    Columna(name="municipio", type="string"),
+                ],
+                rows=rows,
+                limit_notice=LimitNotice(applied=total > len(rows), max_rows=top_k),
+            )
+        ),
+        metrics={
+            "hotspots": total,
+            "nivel": malla.nivel,
+            "celda_km": round(malla.celda * km_lat, 3),
+            "celdas": int(conteos.size),
+            "eventos": int(conteos.sum()),
+        },
+        meta=meta,
+    )
@@ -0,0 +1,166 @@
+# casandra/herramientas/patrones.py
+"""
+detectar_patrones@1.0.0: delitos que co-ocurren en la misma celda
+(entidad × día|semana|mes), con support / lift / score.
+
+Las celdas salen del cubo (días con eventos) o, sin cubo, de un solo
+`conteo_por` agrupado por día; el cálculo es disperso (ver
+`Analisis/Patrones/coocurrencia.py`) y corre en el pool de procesos (tool
+`cpu_bound`) con los arreglos ya materializados.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+
+from ..Analisis.Patrones.coocurrencia import (
+    Patrones,
+    itemsets,
+    matriz_incidencia,
+    pares,
+)
+from ..Celador.versiones import watermark
+from ..Consultor.repo import Filtros
+from ..dominio.sobre import (
+    Columna,
+    DataInline,
+    LimitNotice,
+    RangoEfectivo,
+    Resumen,
+    SobreData,
+    SobreOk,
+)
+from .filtros import restringir_propios
+from .registro import DETECTAR_PATRONES
+from .spec import Args, Contexto, calcular
+
+
+def _periodo(dias: np.ndarray, inicio: date, celda: str) -> np.ndarray:
+    """Índice de periodo (desde `inicio`) para fechas datetime64[D]."""
+    if celda == "dia":
+        return (dias - np.datetime64(inicio, "D")).astype(np.int64)
+    if celda == "semana":
+        return (dias - np.datetime64(inicio, "D")).astype(np.int64) // 7
+    return (dias.astype("datetime64[M]") - np.datetime64(inicio, "M")).astype(np.int64)
+
+
+def _eventos(
+    ctx: Contexto, filtros: Filtros, desde: date, hasta: date
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, list[str], list[str]]:
+    """(fecha, idx_entidad, idx_delito) de cada (entidad, delito, día) con eventos."""
+    if ctx.cubo is not None:
+        cubo = ctx.cubo
+        ie = cubo.indices_entidades(filtros.entidad_ids)
+        idl = cubo.indices_delitos(filtros.delitos)
+        diarios, dia1 = cubo.diarios(desde, hasta)
+        t, e, d = np.nonzero(diarios[:, ie][:, :, idl])
+        fechas = np.datetime64(dia1, "D") + t.astype("timedelta64[D]")
+        return fechas, e, d, list(cubo.entidades[ie]), list(cubo.delitos[idl])
+
+    f = Filtros(filtros.entidad_ids, desde, hasta, filtros.delitos)
+    tabla = ctx.consultor.conteo_por(f, ("entidad_id", "delito", "fecha"))
+    ent = tabla.column("entidad_id").combine_chunks().dictionary_encode()
+    dl = tabla.column("delito").combine_chunks().dictionary_encode()
+    fechas = np.asarray(tabla.column("fecha").to_numpy(), dtype="datetime64[D]")
+    return (
+        fechas,
+        ent.indices.to_numpy(zero_copy_only=False).astype(np.int64),
+        dl.indices.to_numpy(zero_copy_only=False).astype(np.int64),
+        ent.dictionary.to_pylist(),
+        dl.dictionary.to_pylist(),
+    )
+
+
+def _patrones(
+    celda: np.ndarray,
+    delito: np.ndarray,
+    n_celdas: int,
+    n_delitos: int,
+    min_support: float,
+    max_len: int,
+) -> Patrones:
+    """Cálculo disperso (corre en el pool de procesos)."""
+    x = matriz_incidencia(celda, delito, n_celdas, n_delitos)
+    if max_len == 2:
+        return pares(x, min_support)
+    return itemsets(x, min_support, max_len)
+
+
+def _ejecutar(filtros: Filtros, args: Args, ctx: Contexto) -> SobreOk:
+    filtros, meta = restringir_propios(filtros, args, ctx)
+    min_d, max_d = watermark()
+    desde, hasta = filtros.desde or min_d, filtros.hasta or max_d
+
+    fechas, e, d, entidades, delitos = _eventos(ctx, filtros, desde, hasta)
+    periodo = _periodo(fechas, desde, args["celda"])
+    n_periodos = int(periodo.max()) + 1 if periodo.size else 0
+    celda = e * n_periodos + periodo
+    pat = calcular(
+        DETECTAR_PATRONES,
+        _patrones,
+        celda,
+        d,
+        len(entidades) * n_periodos,
+        len(delitos),
+        args["min_support"],
+        args["max_len"],
+    )
+
+    clave = {"score": pat.score, "lift": pat.lift, "support": pat.support}[
+        args["ordenar_por"]
+    ]
+    top_k = args["top_k"]
+    nombres = [sorted(delitos[i] for i in s) for s in pat.items]
+    # Desempate por nombres: el orden de los ejes difiere entre cubo y SQL.
+    orden = sorted(
+        range(len(nombres)), key=lambda k: (-clave[k], -pat.conteo[k], nombres[k])
+    )[:top_k]
+    rows = [
+        [
+            nombres[k],
+            int(pat.conteo[k]),
+            round(float(pat.support[k]), 6),
+            round(float(pat.lift[k]), 4),
+            round(float(pat.score[k]), 6),
+        ]
+        for k in orden
+    ]
+
+    if meta.date_range_effective is None:
+        meta.date_range_effective = RangoEfectivo(desde=str(desde), hasta=str(hasta))
+    highlights = [
+        f"{pat.celdas:,} celdas entidad×{args['celda']}",
+        f"Ventana {desde}..{hasta}",
+    ]
+    if rows:
+        highlights.insert(0, f"Top: {' + '.join(rows[0][0])} (lift={rows[0][3]})")
+
+    return SobreOk(
+        tool=DETECTAR_PATRONES.canonical,
+        summary=Resumen(
+            headline=f"{len(pat.items)} patrones de co-ocurrencia",
+            highlights=highlights,
+        ),
+        data=SobreData(
+            inline=DataInline(
+                columns=[
+                    Columna(name="delitos", type="list[string]"),
+                    Columna(name="celdas", type="int"),
+                    Columna(name="support", type="float"),
+                    Columna(name="lift", type="float"),
+                    Columna(name="score", type="float"),
+                ],
+                rows=rows,
+                limit_notice=LimitNotice(
+                    applied=len(pat.items) > len(rows), max_rows=top_k
+                ),
+            )
+        ),
+        metrics={
+            "celdas": pat.celdas,
+            "items_vivos": pat.items_vivos,
+            "patrones": len(pat.items),
+        },
+        meta=meta,
+    )
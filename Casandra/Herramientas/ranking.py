@@ -0,0 +1,290 @@
+# casandra/herramientas/ranking.py
+"""
+Rankings sobre los filtros acumulados del plan.
+
+- rank_por_delito@1.1.0: por delito o por entidad; `nivel=hijos` rankea las
+  entidades hijas de la entidad enfocada.
+- top_entidades_por_total@1.0.0: entidades por total de eventos.
+
+`medida` = `conteo` | `tasa_per_100k`. Si el cubo del dataset vigente está
+disponible, la ventana se resuelve con sumas prefijo (sin tocar Parquet); si
+no, se cae al SQL del Consultor con el mismo orden y desempates. Si el top_k
+recorta, el ranking completo se publica como artefacto `rank_full`; en modo
+streaming se emite completo sin top_k.
+
+rank_por_delito acepta también `entidad_id` / `delito` / `from` / `to` propios
+(doc §4.3; ver `filtros.normalizar_propios`).
+"""
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Optional
+
+import pyarrow as pa
+
+from ..Celador.errores import ValidacionError
+from ..Consultor.entidades import obtener_jerarquia
+from ..Consultor.repo import Filtros
+from ..dominio.sobre import (
+    Columna,
+    DataInline,
+    LimitNotice,
+    RangoEfectivo,
+    Resumen,
+    SobreData,
+    SobreMeta,
+    SobreOk,
+)
+from ..Empaquetador.flujo import Flujo
+from ..Etl.cubo import leer_poblacion
+from ..Etl.deposito import DEPOSITO_DIR
+from .filtros import restringir_propios
+from .registro import RANK_POR_DELITO, TOP_ENTIDADES_POR_TOTAL
+from .spec import Args, Contexto, ToolSpec, artefacto
+
+
+SIN_TOPE = 1 << 30  # top_k del ranking completo (artefacto)
+
+Fila = tuple[str, int, Optional[float]]
+
+
+def _ordenar(filas: list[Fila], medida: str, top_k: int) -> tuple[list[Fila], bool]:
+    col = 1 if medida == "conteo" else 2
+    validas = [f for f in filas if f[1] > 0 and f[col] is not None]
+    validas.sort(key=lambda f: (-f[col], f[0]))
+    return validas[:top_k], len(validas) > top_k
+
+
+def _ranking_sql(
+    ctx: Contexto,
+    filtros: Filtros,
+    por: str,
+    top_k: int,
+    medida: str,
+    padre: Optional[str],
+) -> tuple[list[Fila], bool]:
+    if padre is not None:
+        # Hijos = un slice de la jerarquía, empujado al SQL como IN.
+        filtros = filtros.restringir(
+            entidad_ids=obtener_jerarquia(ctx.consultor).hijos(padre)
+        )
+    if medida == "conteo":
+        # top_k + 1 para saber si hubo recorte sin traer el ranking completo.
+        tabla = ctx.consultor.conteo_por(filtros, (por,), limite=top_k + 1)
+        filas = [
+            (k, c, None)
+            for k, c in zip(
+                tabla.column(por).to_pylist(), tabla.column("conteo").to_pylist()
+            )
+        ]
+        return filas[:top_k], len(filas) > top_k
+
+    tabla = ctx.consultor.conteo_por(filtros, (por,))
+    pares = zip(tabla.column(por).to_pylist(), tabla.column("conteo").to_pylist())
+    pob = leer_poblacion(DEPOSITO_DIR) if medida == "tasa_per_100k" else {}
+    filas = [
+        (k, c, round(c / pob[k] * 1e5, 4) if pob.get(k) else None) for k, c in pares
+    ]
+    return _ordenar(filas, medida, top_k)
+
+
+def _ranking(
+    ctx: Contexto, filtros: Filtros, por: str, top_k: int, medida: str, nivel: str
+) -> tuple[list[Fila], bool]:
+    if medida == "tasa_per_100k" and por != "entidad_id":
+        raise ValidacionError(
+            "medida 'tasa_per_100k' solo aplica a rankings por entidad"
+        )
+
+    padre = None
+    if nivel == "hijos":
+        if filtros.enfoque is None:
+            raise ValidacionError("nivel 'hijos' requiere una entidad enfocada")
+        padre = filtros.enfoque
+        filtros = replace(filtros, entidad_ids=None)
+
+    if ctx.cubo is not None:
+        return ctx.cubo.ranking(filtros, por, top_k, medida, hijos_de=padre)
+    return _ranking_sql(ctx, filtros, por, top_k, medida, padre)
+
+
+def _tabla_ranking(filas: list[Fila], por: str, medida: str) -> pa.Table:
+    cols = {
+        por: pa.array([f[0] for f in filas], pa.string()),
+        "conteo": pa.array([f[1] for f in filas], pa.int64()),
+    }
+    if medida == "tasa_per_100k":
+        cols["tasa_per_100k"] = pa.array([f[2] for f in filas], pa.float64())
+    return pa.table(cols)
+
+
+def _artefacto_completo(
+    ctx: Contexto, filtros: Filtros, por: str, medida: str, nivel: str
+) -> Optional[dict[str, dict[str, str]]]:
+    return artefacto(
+        ctx,
+        "rank_full",
+        lambda: _tabla_ranking(
+            _ranking(ctx, filtros, por, SIN_TOPE, medida, nivel)[0], por, medida
+        ),
+    )
+
+
+def _flujo_ranking(
+    spec: ToolSpec,
+    ctx: Contexto,
+    filtros: Filtros,
+    meta: SobreMeta,
+    por: str,
+    medida: str,
+    nivel: str,
+) -> Flujo:
+    # El ranking completo cabe en memoria (a lo más entidades × delitos); se
+    # calcula antes de la cabecera para que un error de args aún sea un HTTP 4xx.
+    if (
+        filtros.desde is not None
+        and filtros.hasta is not None
+        and meta.date_range_effective is None
+    ):
+        meta.date_range_effective = RangoEfectivo(
+            desde=str(filtros.desde), hasta=str(filtros.hasta)
+        )
+    tabla = _tabla_ranking(
+        _ranking(ctx, filtros, por, SIN_TOPE, medida, nivel)[0], por, medida
+    )
+    return Flujo(
+        tool=spec.canonical,
+        meta=meta,
+        esquema=tabla.schema,
+        lotes=tabla.to_batches(),
+        resumen=lambda n: Resumen(
+            headline=f"Ranking completo por {por}: {n:,} filas ({medida})"
+        ),
+    )
+
+
+def _sobre_ranking(
+    spec: ToolSpec,
+    filtros: Filtros,
+    meta: SobreMeta,
+    por: str,
+    medida: str,
+    top_k: int,
+    filas: list[Fila],
+    recortado: bool,
+    titulo: str,
+    artifacts: Optional[dict[str, dict[str, str]]] = None,
+) -> SobreOk:
+    if (
+        filtros.desde is not None
+        and filtros.hasta is not None
+        and meta.date_range_effective is None
+    ):
+        meta.date_range_effective = RangoEfectivo(
+            desde=str(filtros.desde), hasta=str(filtros.hasta)
+        )
+
+    highlights = []
+    if filas:
+        k, c, t = filas[0]
+        highlights.append(f"Top-1: {k} ({c if t is None else t})")
+    if meta.date_range_effective is not None:
+        rango = meta.date_range_effective
+        highlights.append(f"Ventana {rango.desde}..{rango.hasta}")
+
+    columnas = [Columna(name=por, type="string"), Columna(name="conteo", type="int")]
+    if medida == "tasa_per_100k":
+        columnas.append(Columna(name="tasa_per_100k", type="float"))
+        rows = [[k, c, t] for k, c, t in filas]
+    else:
+        rows = [[k, c] for k, c, _ in filas]
+
+    return SobreOk(
+        tool=spec.canonical,
+        summary=Resumen(headline=f"{titulo} ({medida})", highlights=highlights),
+        data=SobreData(
+            inline=DataInline(
+                columns=columnas,
+                rows=rows,
+                limit_notice=LimitNotice(applied=recortado, max_rows=top_k),
+            ),
+            artifacts=artifacts,
+        ),
+        meta=meta,
+    )
+
+
+# --- rank_por_delito@1.1.0 ---
+
+
+def _ejecutar(filtros: Filtros, args: Args, ctx: Contexto) -> SobreOk:
+    filtros, meta = restringir_propios(filtros, args, ctx)
+    por, top_k, medida, nivel = (
+        args["por"],
+        args["top_k"],
+        args["medida"],
+        args["nivel"],
+    )
+    filas, recortado = _ranking(ctx, filtros, por, top_k, medida, nivel)
+    titulo = f"Top {len(filas)} por {por}"
+    if nivel == "hijos":
+        titulo += f" — hijos de {filtros.enfoque}"
+    artifacts = (
+        _artefacto_completo(ctx, filtros, por, medida, nivel) if recortado else None
+    )
+    return _sobre_ranking(
+        RANK_POR_DELITO,
+        filtros,
+        meta,
+        por,
+        medida,
+        top_k,
+        filas,
+        recortado,
+        titulo,
+        artifacts,
+    )
+
+
+def _fluir(filtros: Filtros, args: Args, ctx: Contexto) -> Flujo:
+    filtros, meta = restringir_propios(filtros, args, ctx)
+    return _flujo_ranking(
+        RANK_POR_DELITO, ctx, filtros, meta, args["por"], args["medida"], args["nivel"]
+    )
+
+
+# --- top_entidades_por_total@1.0.0 ---
+
+
+def _ejecutar_top(filtros: Filtros, args: Args, ctx: Contexto) -> SobreOk:
+    top_k, medida = args["top_k"], args["medida"]
+    filas, recortado = _ranking(ctx, filtros, "entidad_id", top_k, medida, "actual")
+    artifacts = (
+        _artefacto_completo(ctx, filtros, "entidad_id", medida, "actual")
+        if recortado
+        else None
+    )
+    return _sobre_ranking(
+        TOP_ENTIDADES_POR_TOTAL,
+        filtros,
+        SobreMeta(),
+        "entidad_id",
+        medida,
+        top_k,
+        filas,
+        recortado,
+        f"Top {len(filas)} entidades por total",
+        artifacts,
+    )
+
+
+def _fluir_top(filtros: Filtros, args: Args, ctx: Contexto) -> Flujo:
+    return _flujo_ranking(
+        TOP_ENTIDADES_POR_TOTAL,
+        ctx,
+        filtros,
+        SobreMeta(),
+        "entidad_id",
+        args["medida"],
+        "actual",
+    )
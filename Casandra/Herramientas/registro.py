@@ -0,0 +1,209 @@
+# casandra/herramientas/registro.py
+"""
+Declaración de las tools `analysis` y `terminal` (identidad, `args_schema`,
+`normalizar`), separada de su implementación.
+
+Este módulo no importa numpy ni scipy: el catálogo, la validación de planes
+y el arranque del servicio solo necesitan las declaraciones. `ejecutar` y
+`fluir` son referencias perezosas (`implementacion`) que importan el módulo
+de la tool la primera vez que un plan la ejecuta.
+"""
+from __future__ import annotations
+
+import os
+
+from ..Celador.errores import ValidacionError
+from .filtros import PROPIEDADES_PROPIAS, normalizar_propios
+from .spec import (
+    Args,
+    ToolSpec,
+    esquema_objeto,
+    implementacion,
+    prop_decimal,
+    prop_entero,
+    prop_opcion,
+    registrar,
+)
+
+
+MAX_TOP_K = 50
+MEDIDAS = ("conteo", "tasa_per_100k")
+MAX_IDS_EVIDENCIA = 500
+MAX_IDS_ANOMALIAS = 100
+# Límite de reloj del cálculo de las tools cpu_bound (en el pool de procesos).
+LIMITE_CPU_S = float(os.getenv("CASANDRA_TOOL_LIMITE_S", "60"))
+NIVELES_MALLA = 16  # tope del arg `nivel`; el índice recorta a los que tenga
+
+
+def _normalizar_rank(args: Args) -> Args:
+    out = normalizar_propios(args)
+    if out["nivel"] == "hijos":
+        out["por"] = "entidad_id"  # los hijos se rankean entre sí
+    return out
+
+
+RANK_POR_DELITO = registrar(
+    ToolSpec(
+        tool_id=6,
+        name="rank_por_delito",
+        version="1.1.0",
+        kind="analysis",
+        summary="Ranking por delito o por entidad (nivel actual|hijos, conteo|tasa_per_100k), top_k.",
+        requires=("dataset",),
+        normalizar=_normalizar_rank,
+        args_schema=esquema_objeto(
+            {
+                "top_k": prop_entero(10, 1, MAX_TOP_K),
+                "por": prop_opcion("delito", ("delito", "entidad_id")),
+                "nivel": prop_opcion("actual", ("actual", "hijos")),
+                "medida": prop_opcion("conteo", MEDIDAS),
+                **PROPIEDADES_PROPIAS,
+            }
+        ),
+        rollup=True,
+        ejecutar=implementacion("ranking", "_ejecutar"),
+        fluir=implementacion("ranking", "_fluir"),
+    )
+)
+
+
+TOP_ENTIDADES_POR_TOTAL = registrar(
+    ToolSpec(
+        tool_id=7,
+        name="top_entidades_por_total",
+        version="1.0.0",
+        kind="analysis",
+        summary="Top de entidades por total de eventos (conteo|tasa_per_100k).",
+        requires=("dataset",),
+        normalizar=dict,
+        args_schema=esquema_objeto(
+            {
+                "top_k": prop_entero(10, 1, MAX_TOP_K),
+                "medida": prop_opcion("conteo", MEDIDAS),
+            }
+        ),
+        rollup=True,
+        ejecutar=implementacion("ranking", "_ejecutar_top"),
+        fluir=implementacion("ranking", "_fluir_top"),
+    )
+)
+
+
+DETECTAR_PATRONES = registrar(
+    ToolSpec(
+        tool_id=8,
+        name="detectar_patrones",
+        version="1.0.0",
+        kind="analysis",
+        summary="Co-ocurrencias de delitos por celda entidad×tiempo con support/lift/score.",
+        requires=("dataset",),
+        normalizar=normalizar_propios,
+        args_schema=esquema_objeto(
+            {
+                "celda": prop_opcion("semana", ("dia", "semana", "mes")),
+                "min_support": prop_decimal(0.05, 0.001, 1.0),
+                "max_len": prop_entero(2, 2, 5),
+                "ordenar_por": prop_opcion("score", ("score", "lift", "support")),
+                "top_k": prop_entero(10, 1, MAX_TOP_K),
+                **PROPIEDADES_PROPIAS,
+            }
+        ),
+        rollup=True,
+        cpu_bound=True,
+        limite_s=LIMITE_CPU_S,
+        ejecutar=implementacion("patrones", "_ejecutar"),
+    )
+)
+
+
+LISTAR_EVIDENCIA = registrar(
+    ToolSpec(
+        tool_id=9,
+        name="listar_evidencia",
+        version="1.0.0",
+        kind="terminal",
+        summary="IDs/filas que sustentan las conclusiones (evidencia trazable).",
+        requires=("dataset", "evidence_capable"),
+        normalizar=dict,
+        args_schema=esquema_objeto({"max_ids": prop_entero(50, 1, MAX_IDS_EVIDENCIA)}),
+        ejecutar=implementacion("evidencia", "_ejecutar"),
+        fluir=implementacion("evidencia", "_fluir"),
+    )
+)
+
+
+DETECTAR_ANOMALIAS = registrar(
+    ToolSpec(
+        tool_id=10,
+        name="detectar_anomalias",
+        version="1.0.0",
+        kind="analysis",
+        summary="Picos por z-score rodante (window, z_threshold) en todas las series entidad×delito.",
+        requires=("dataset", "evidence_capable"),
+        normalizar=normalizar_propios,
+        args_schema=esquema_objeto(
+            {
+                "z_threshold": prop_decimal(3.0, 0.5, 20.0),
+                "window": prop_entero(28, 7, 365),
+                "nivel": prop_opcion("actual", ("actual", "hijos")),
+                "por": prop_opcion("entidad_delito", ("entidad_id", "entidad_delito")),
+                "top_k": prop_entero(10, 1, MAX_TOP_K),
+                "max_ids": prop_entero(20, 0, MAX_IDS_ANOMALIAS),
+                **PROPIEDADES_PROPIAS,
+            }
+        ),
+        rollup=True,
+        cpu_bound=True,
+        limite_s=LIMITE_CPU_S,
+        ejecutar=implementacion("anomalias", "_ejecutar"),
+    )
+)
+
+
+def _normalizar_hotspots(args: Args) -> Args:
+    out = normalizar_propios(args)
+    if "bbox" in out:
+        caja = out["bbox"]
+        numeros = isinstance(caja, list) and all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in caja
+        )
+        if not (
+            numeros
+            and len(caja) == 4
+            and -180 <= caja[0] < caja[2] <= 180
+            and -90 <= caja[1] < caja[3] <= 90
+        ):
+            raise ValidacionError(
+                "'bbox' debe ser [lon_min, lat_min, lon_max, lat_max] en grados, con min < max"
+            )
+        out["bbox"] = [float(v) for v in caja]
+    return out
+
+
+DETECTAR_HOTSPOTS = registrar(
+    ToolSpec(
+        tool_id=11,
+        name="detectar_hotspots",
+        version="1.0.0",
+        kind="analysis",
+        summary="Hotspots espaciales en una caja (bbox) y ventana: Gi* por celda o picos de densidad kernel (kde).",
+        requires=("dataset", "spatial"),
+        normalizar=_normalizar_hotspots,
+        args_schema=esquema_objeto(
+            {
+                "bbox": {"type": "array", "items": {"type": "number"}, "minItems": 4},
+                "metodo": prop_opcion("gi", ("gi", "kde")),
+                "nivel": prop_entero(
+                    -1, -1, NIVELES_MALLA - 1
+                ),  # -1 = según el tamaño de la caja
+                "radio": prop_entero(1, 1, 10),
+                "z_threshold": prop_decimal(1.96, 0.0, 20.0),
+                "ancho_banda_km": prop_decimal(1.5, 0.1, 100.0),
+                "top_k": prop_entero(10, 1, MAX_TOP_K),
+                **PROPIEDADES_PROPIAS,
+            }
+        ),
+        rollup=True,
+        ejecutar=implementacion("hotspots", "_ejecutar"),
+    )
+)
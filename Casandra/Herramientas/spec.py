@@ -0,0 +1,259 @@
+# casandra/herramientas/spec.py
+"""
+ToolSpec y registro de herramientas (doc anexo C).
+
+Cada tool se declara con su identidad (`tool_id`, `name@version`), su `kind`
+y funciones puras:
+
+- `args_schema`: esquema estricto de entrada (doc C.5), compilado una vez por
+  `catalog_version` (ver `esquema.py`).
+- `normalizar(args)`: forma canónica de los argumentos ya validados contra el
+  esquema (tipos, rangos, enums y defaults resueltos); valida lo semántico.
+- `filter`: `restringir(filtros, args, ctx)` -> (Filtros, meta parcial). No toca
+  datos; el Orquestador fusiona las restricciones en una sola consulta.
+- `analysis` / `terminal`: `ejecutar(filtros, args, ctx)` -> SobreOk. Son las
+  únicas que materializan datos, con los filtros acumulados ya empujados.
+  Si recortan su salida inline pueden publicar el resultado completo como
+  artefacto (`artefacto(ctx, ...)`).
+- `fluir(filtros, args, ctx)` (opcional) -> Flujo: la misma salida completa
+  en modo streaming (NDJSON / Arrow), para cuando el plan termina en la tool.
+- `rollup`: la tool se resuelve con agregados precalculados (cubo de conteos,
+  índice espacial) cuando están disponibles (no escanea Parquet); lo usa la
+  estimación de costo del Orquestador.
+- `cpu_bound`: el cálculo pesado de la tool corre en el pool de procesos
+  (`calcular`), no en el hilo del request. Los datos se materializan antes en
+  el proceso padre (Consultor/cubo) y viajan como arreglos Arrow/numpy;
+  `limite_s` es el límite de reloj del cálculo (RESOURCE_LIMIT al excederlo).
+
+Las declaraciones viven en módulos livianos (`filtros`, `registro`): listar
+el catálogo o validar un plan no importa numpy/scipy. Las tools pesadas
+apuntan a su implementación con `implementacion(modulo, funcion)`, que
+importa el módulo en la primera ejecución.
+"""
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass
+from typing import Any, Callable, Literal, Optional, TypeVar
+
+import pyarrow as pa
+
+from ..Celador.auditoria import audit
+from ..Celador.errores import ValidacionError
+from ..Celador.procesos import pool_cpu
+from ..Consultor.cubo import CuboConteos
+from ..Consultor.repo import Consultor, Filtros
+from ..dominio.nombres import EMPAQUETADOR, tool_name
+from ..dominio.sobre import SobreMeta, SobreOk
+from ..Empaquetador.artefactos import AlmacenArtefactos, Fuente, id_artefacto, publicar
+from ..Empaquetador.flujo import Flujo
+
+
+Kind = Literal["filter", "analysis", "terminal"]
+Args = dict[str, Any]
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class Contexto:
+    """Lo que una tool puede usar en ejecución, resuelto una vez por plan."""
+
+    consultor: Consultor
+    strict_time: bool = False
+    cubo: Optional[CuboConteos] = None  # del mismo dataset_version; None = solo SQL
+    artefactos: Optional[AlmacenArtefactos] = None  # None = solo salida inline
+    dataset_version: str = ""
+    query_hash: str = ""
+    paso: int = 0
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    tool_id: int
+    name: str
+    version: str
+    kind: Kind
+    summary: str
+    normalizar: Callable[[Args], Args]
+    args_schema: Optional[dict[str, Any]] = None
+    requires: tuple[str, ...] = ()
+    deterministic: bool = True
+    rollup: bool = False
+    cpu_bound: bool = False
+    limite_s: Optional[float] = None
+    restringir: Optional[
+        Callable[[Filtros, Args, Contexto], tuple[Filtros, SobreMeta]]
+    ] = None
+    ejecutar: Optional[Callable[[Filtros, Args, Contexto], SobreOk]] = None
+    fluir: Optional[Callable[[Filtros, Args, Contexto], Flujo]] = None
+
+    @property
+    def canonical(self) -> str:
+        return tool_name(self.name, self.version)
+
+
+_REGISTRO: dict[tuple[int, str], ToolSpec] = {}
+_MODULOS = (
+    "filtros",
+    "registro",
+)  # solo declaraciones; las implementaciones, al ejecutar
+_cargado = False
+
+
+def registrar(spec: ToolSpec) -> ToolSpec:
+    if spec.kind == "filter" and spec.restringir is None:
+        raise ValueError(f"{spec.canonical}: una tool 'filter' requiere restringir()")
+    if spec.kind != "filter" and spec.ejecutar is None:
+        raise ValueError(
+            f"{spec.canonical}: una tool '{spec.kind}' requiere ejecutar()"
+        )
+    if spec.cpu_bound:
+        # Los hijos del pool importan el módulo de la tool al calentar.
+        pool_cpu.registrar_modulo(spec.ejecutar.__module__)
+    _REGISTRO[(spec.tool_id, spec.version)] = spec
+    return spec
+
+
+def _cargar() -> None:
+    global _cargado
+    if not _cargado:
+        for mod in _MODULOS:
+            importlib.import_module(f"{__package__}.{mod}")
+        _cargado = True
+
+
+def implementacion(modulo: str, funcion: str) -> Callable[..., Any]:
+    """Referencia perezosa a `Herramientas.<modulo>.<funcion>`: importa al primer llamado."""
+    resuelta: list[Callable[..., Any]] = []
+
+    def llamar(*args: Any) -> Any:
+        if not resuelta:
+            mod = importlib.import_module(f"{__package__}.{modulo}")
+            resuelta.append(getattr(mod, funcion))
+        return resuelta[0](*args)
+
+    llamar.__qualname__ = f"{modulo}.{funcion}"
+    llamar.__module__ = f"{__package__}.{modulo}"
+    return llamar
+
+
+def calcular(spec: ToolSpec, fn: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+    """
+    `fn(*args, **kwargs)`: en el pool de procesos si la tool es `cpu_bound`,
+    si no en el hilo actual. `fn` es de nivel módulo y sus argumentos ya están
+    materializados (arreglos, no el Consultor).
+    """
+    if not spec.cpu_bound:
+        return fn(*args, **kwargs)
+    return pool_cpu.ejecutar(fn, args, kwargs, spec.limite_s)
+
+
+def herramientas() -> list[ToolSpec]:
+    _cargar()
+    return sorted(_REGISTRO.values(), key=lambda s: (s.tool_id, s.version))
+
+
+def resolver(tool_id: int, version: str) -> ToolSpec:
+    _cargar()
+    spec = _REGISTRO.get((tool_id, version))
+    if spec is None:
+        raise ValidacionError(f"Tool desconocida: tool_id={tool_id} version={version}")
+    return spec
+
+
+# --- Constructores de `args_schema` (mismas firmas que los validadores de abajo) ---
+
+
+def esquema_objeto(
+    propiedades: dict[str, Any], requeridos: tuple[str, ...] = ()
+) -> dict[str, Any]:
+    esquema: dict[str, Any] = {
+        "type": "object",
+        "properties": propiedades,
+        "additionalProperties": False,
+    }
+    if requeridos:
+        esquema["required"] = list(requeridos)
+    return esquema
+
+
+def prop_entero(default: int, minimo: int, maximo: int) -> dict[str, Any]:
+    return {"type": "integer", "default": default, "minimum": minimo, "maximum": maximo}
+
+
+def prop_decimal(default: float, minimo: float, maximo: float) -> dict[str, Any]:
+    return {"type": "number", "default": default, "minimum": minimo, "maximum": maximo}
+
+
+def prop_opcion(default: str, opciones: tuple[str, ...]) -> dict[str, Any]:
+    return {"type": "string", "enum": list(opciones), "default": default}
+
+
+# --- Validadores (camino interpretado; ver `esquema.Validador._interpretar`) ---
+
+
+def args_permitidos(args: Args, permitidos: tuple[str, ...], tool: str) -> None:
+    """`additionalProperties: false` (doc C.5)."""
+    extra = sorted(set(args) - set(permitidos))
+    if extra:
+        raise ValidacionError(f"{tool}: argumentos no permitidos: {', '.join(extra)}")
+
+
+def entero(args: Args, campo: str, default: int, minimo: int, maximo: int) -> int:
+    val = args.get(campo, default)
+    if isinstance(val, bool) or not isinstance(val, int):
+        raise ValidacionError(f"'{campo}' debe ser entero")
+    if not minimo <= val <= maximo:
+        raise ValidacionError(f"'{campo}' fuera de rango [{minimo}, {maximo}]: {val}")
+    return val
+
+
+def decimal(
+    args: Args, campo: str, default: float, minimo: float, maximo: float
+) -> float:
+    val = args.get(campo, default)
+    if isinstance(val, bool) or not isinstance(val, (int, float)):
+        raise ValidacionError(f"'{campo}' debe ser numérico")
+    if not minimo <= val <= maximo:
+        raise ValidacionError(f"'{campo}' fuera de rango [{minimo}, {maximo}]: {val}")
+    return float(val)
+
+
+def opcion(args: Args, campo: str, default: str, opciones: tuple[str, ...]) -> str:
+    val = args.get(campo, default)
+    if val not in opciones:
+        raise ValidacionError(f"'{campo}' debe ser uno de {list(opciones)}: {val!r}")
+    return val
+
+
+def lista(args: Args, campo: str, default: Optional[list]) -> list:
+    """Solo el tipo contenedor; los elementos los revisa el `normalizar` de la tool."""
+    val = args.get(campo, default)
+    if not isinstance(val, list):
+        raise ValidacionError(f"'{campo}' debe ser lista")
+    return val
+
+
+def artefacto(
+    ctx: Contexto,
+    nombre: str,
+    producir: Callable[[], Fuente],
+    esquema: Optional[pa.Schema] = None,
+) -> Optional[dict[str, dict[str, str]]]:
+    """
+    `data.artifacts` con el resultado completo bajo `nombre`, o None si el
+    contexto no publica artefactos. La clave es (dataset_version, query_hash,
+    paso): si ya existe, `producir` no se invoca. Un fallo de disco degrada a
+    solo-inline en vez de tumbar la tool.
+    """
+    if ctx.artefactos is None or not ctx.query_hash:
+        return None
+    aid = id_artefacto(ctx.dataset_version, ctx.query_hash, ctx.paso, nombre)
+    try:
+        return {"tables": {nombre: publicar(ctx.artefactos, aid, producir, esquema)}}
+    except OSError as e:
+        audit(
+            "artifact.error",
+            {"component": EMPAQUETADOR, "artifact_id": aid, "details": str(e)},
+        )
+        return None
@@ -0,0 +1,522 @@
+# casandra/orquestador/core.py
+"""
+Ejecución de planes (`/plan/execute`).
+
+1. Validación estática: tool+versión existen y sus args validan contra el
+   `args_schema` compilado. Se memoiza por hash del plan (`CacheValidacion`).
+2. Plan lógico: filtros consecutivos fusionados (ver `plan.plan_logico`),
+   y validación contextual de costo con estadísticas Parquet (`costos.py`):
+   un plan fuera de presupuesto se rechaza con RESOURCE_LIMIT sin ejecutar.
+3. Ejecución: cada `Escaneo` acumula sus restricciones (solo metadata) y
+   pide al Consultor las filas tras cada paso en UNA consulta; cada
+   `Materializar` corre con la conjunción completa ya empujada, de modo que
+   DuckDB poda particiones y row groups en vez de filtrar DataFrames.
+
+Cada paso corre bajo la Guardia de Celador de su tool (`tool.*` en la
+auditoría, métricas por tool y, si la tool es determinista, caché de
+resultados y single-flight por (plan, paso)) y sigue devolviendo su propio
+Sobre con timing y filas, como si hubiera corrido solo. Los resultados completos que una tool recorta se
+publican como artefactos bajo (dataset_version, query_hash, paso).
+
+`ejecutar_plan_flujo` (modo streaming) corre igual todos los pasos salvo el
+último, que si la tool lo soporta se devuelve como `Flujo` sin materializar.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import replace
+from typing import Callable, Optional, Union
+
+from ..Celador.auditoria import audit, query_hash
+from ..Celador.cache import ClaveCache
+from ..Celador.errores import (
+    CeladorError,
+    a_sobre_error,
+    error_code_http,
+    sobre_compute_error,
+)
+from ..Celador.guardia import Guardia
+from ..Celador.versiones import catalog_version, dataset_version
+from ..Consultor.cubo import CuboConteos, obtener_cubo
+from ..Consultor.repo import Consultor, Filtros, obtener_consultor
+from ..dominio.nombres import ORQUESTADOR
+from ..dominio.sobre import Resumen, SobreError, SobreOk
+from ..Empaquetador.artefactos import AlmacenArtefactos, id_de_uri, obtener_almacen
+from ..Empaquetador.flujo import Flujo
+from ..Herramientas.esquema import validar_args
+from ..Herramientas.spec import Contexto, ToolSpec, resolver
+from .costos import (
+    PRESUPUESTO_FILAS,
+    CostoPaso,
+    error_presupuesto,
+    estimar_plan,
+    obtener_indice,
+    verificar_presupuesto,
+)
+from .plan import (
+    CacheValidacion,
+    Escaneo,
+    Materializar,
+    PasoResuelto,
+    Plan,
+    RespuestaPlan,
+    clave_validacion,
+    forma_canonica,
+    plan_logico,
+)
+
+
+_VALIDADOS = CacheValidacion()
+_GUARDIAS: dict[str, Guardia] = {}
+
+
+def _ms(t0: float) -> int:
+    return int((time.perf_counter() - t0) * 1000)
+
+
+def _guardia(spec: ToolSpec) -> Guardia:
+    """
+    Guardia por tool. Los filtros solo tocan metadata: se auditan y miden,
+    pero no se cachean (sus filas salen de la consulta fusionada).
+    """
+    guardia = _GUARDIAS.get(spec.canonical)
+    if guardia is None:
+        cachear = spec.deterministic and spec.kind != "filter"
+        guardia = _GUARDIAS.setdefault(
+            spec.canonical,
+            Guardia(
+                spec.canonical,
+                "1.0.0",
+                spec.version,
+                deterministic=cachear,
+                coalesce=cachear,
+            ),
+        )
+    return guardia
+
+
+def _sin_clave() -> None:
+    return None
+
+
+def _clave_paso(paso: PasoResuelto, ctx: Contexto) -> ClaveCache:
+    """
+    Llave de caché de un paso: el query_hash del plan ya fija los filtros y
+    args que le llegan; el índice y si hay almacén fijan su salida (los ids
+    de artefacto dependen de (plan, paso)).
+    """
+    qh = query_hash(
+        {
+            "plan": ctx.query_hash,
+            "paso": paso.indice,
+            "artefactos": ctx.artefactos is not None,
+        },
+        catalog_version(),
+    )
+    return ClaveCache(paso.spec.canonical, ctx.dataset_version, qh)
+
+
+def _vigente(ctx: Contexto) -> Callable[[SobreOk], bool]:
+    """Un Sobre cacheado sirve solo si sus artefactos no fueron recolectados."""
+
+    def vigente(sobre: SobreOk) -> bool:
+        tablas = sobre.data.artifacts or {}
+        return all(
+            ctx.artefactos is not None and ctx.artefactos.existe(id_de_uri(u))
+            for grupo in tablas.values()
+            for u in grupo.values()
+        )
+
+    return vigente
+
+
+def _completar(
+    sobre: SobreOk, spec: ToolSpec, dv: str, qh: str, timing_ms: int
+) -> SobreOk:
+    meta = sobre.meta
+    meta.schema_version = meta.schema_version or "1.0.0"
+    meta.tool_version = spec.version
+    meta.dataset_version = dv
+    meta.query_hash = qh
+    meta.timing_ms = timing_ms
+    sobre.tool = sobre.tool or spec.canonical
+    return sobre
+
+
+def _error(
+    e: Exception, tool: str, tool_version: str, indice: Optional[int]
+) -> tuple[SobreError, int]:
+    if isinstance(e, CeladorError):
+        code, http = error_code_http(e)
+        audit(
+            "plan.error",
+            {
+                "component": ORQUESTADOR,
+                "paso": indice,
+                "tool": tool,
+                "code": code,
+                "details": str(e),
+            },
+        )
+        return a_sobre_error(e, tool_name=tool, tool_version=tool_version), http
+    audit(
+        "plan.exception",
+        {
+            "component": ORQUESTADOR,
+            "paso": indice,
+            "tool": tool,
+            "error": type(e).__name__,
+            "details": str(e),
+        },
+    )
+    return (
+        sobre_compute_error(
+            tool_name=tool,
+            details="Error interno en la tool.",
+            tool_version=tool_version,
+        ),
+        500,
+    )
+
+
+def _estimar(nodos: list, ctx: Contexto, fluir: bool) -> list[CostoPaso]:
+    """Costo estimado por paso; best-effort: sin índice (Depósito ilegible) no se estima."""
+    try:
+        return estimar_plan(nodos, ctx, obtener_indice(ctx.dataset_version), fluir)
+    except Exception as e:
+        audit("plan.cost_error", {"component": ORQUESTADOR, "details": str(e)})
+        return []
+
+
+def _auditar_costo_real(
+    costos: list[CostoPaso], sobres: list, reales: dict[int, int], qh: str
+) -> None:
+    """Estimado vs. real por paso, para contrastar el modelo en la Bitácora."""
+    if not costos:
+        return
+    timing = {
+        i: s.meta.timing_ms for i, s in enumerate(sobres) if isinstance(s, SobreOk)
+    }
+    audit(
+        "plan.cost_actual",
+        {
+            "component": ORQUESTADOR,
+            "query_hash": qh,
+            "pasos": [
+                {
+                    "paso": c.indice,
+                    "tool": c.spec.canonical,
+                    "filas_estimadas": c.filas_estimadas,
+                    "filas_reales": reales.get(c.indice),
+                    "timing_ms": timing.get(c.indice),
+                }
+                for c in costos
+            ],
+        },
+    )
+
+
+def _restringir(
+    paso: PasoResuelto, filtros: Filtros, ctx: Contexto
+) -> tuple[Filtros, SobreOk]:
+    """`restringir` bajo la Guardia; el Sobre sale sin conteo (lo pone `_escanear`)."""
+    salida: list[Filtros] = []
+
+    def restringir() -> SobreOk:
+        nuevos, meta = paso.spec.restringir(filtros, paso.args, ctx)
+        salida.append(nuevos)
+        return SobreOk(
+            tool=paso.spec.canonical, summary=Resumen(headline=""), meta=meta
+        )
+
+    sobre = _guardia(paso.spec).ejecutar(restringir, paso.args, _sin_clave)
+    return salida[0], sobre
+
+
+class _FalloEnPaso(Exception):
+    """
+    Falló un paso de un Escaneo fusionado: lleva el paso culpable y los Sobres
+    de los pasos previos del grupo, como si cada paso hubiera corrido solo.
+    """
+
+    def __init__(
+        self, paso: PasoResuelto, causa: Exception, previos: list[SobreOk]
+    ) -> None:
+        super().__init__(str(causa))
+        self.paso = paso
+        self.causa = causa
+        self.previos = previos
+
+
+def _escanear(
+    nodo: Escaneo,
+    filtros: Filtros,
+    ctx: Contexto,
+    dv: str,
+    qh: str,
+    reales: dict[int, int],
+) -> tuple[Filtros, list[SobreOk]]:
+    etapas: list[Filtros] = []
+    parciales: list[tuple[PasoResuelto, SobreOk, int]] = []
+    for paso in nodo.pasos:
+        t0 = time.perf_counter()
+        try:
+            filtros, sobre = _restringir(paso, filtros, ctx)
+        except Exception as e:
+            try:
+                previos = _contar(nodo, etapas, parciales, ctx, dv, qh, reales)
+            except Exception:
+                previos = []  # se reporta el error del paso, no el del conteo
+            raise _FalloEnPaso(paso, e, previos) from e
+        etapas.append(filtros)
+        parciales.append((paso, sobre, _ms(t0)))
+    try:
+        return filtros, _contar(nodo, etapas, parciales, ctx, dv, qh, reales)
+    except Exception as e:
+        # La consulta fusionada es del grupo: se reporta en su primer paso.
+        raise _FalloEnPaso(nodo.pasos[0], e, []) from e
+
+
+def _contar(
+    nodo: Escaneo,
+    etapas: list[Filtros],
+    parciales: list[tuple[PasoResuelto, SobreOk, int]],
+    ctx: Contexto,
+    dv: str,
+    qh: str,
+    reales: dict[int, int],
+) -> list[SobreOk]:
+    """Una sola consulta cuenta todas las etapas y completa el Sobre de cada paso."""
+    if not etapas:
+        return []
+    t0 = time.perf_counter()
+    filas = ctx.consultor.conteos_acumulados(etapas)
+    dt_scan = _ms(t0)
+
+    indices = [p.indice for p in nodo.pasos]
+    sobres = []
+    for (paso, sobre, dt), n in zip(parciales, filas):
+        highlights = [f"Fusionado con pasos {indices}"] if len(indices) > 1 else []
+        sobre.summary = Resumen(
+            headline=f"{n:,} filas tras {paso.spec.name}", highlights=highlights
+        )
+        # La consulta fusionada contesta a todos los pasos del grupo.
+        sobres.append(_completar(sobre, paso.spec, dv, qh, dt + dt_scan))
+        reales[paso.indice] = n
+        audit(
+            "plan.step",
+            {
+                "component": ORQUESTADOR,
+                "paso": paso.indice,
+                "tool": paso.spec.canonical,
+                "kind": "filter",
+                "rows": n,
+                "fused_with": indices,
+                "timing_ms": dt + dt_scan,
+            },
+        )
+    return sobres
+
+
+def _materializar(
+    nodo: Materializar, filtros: Filtros, ctx: Contexto, dv: str, qh: str
+) -> SobreOk:
+    paso = nodo.paso
+    t0 = time.perf_counter()
+    ctx = replace(ctx, paso=paso.indice)
+
+    def ejecutar() -> SobreOk:
+        return paso.spec.ejecutar(filtros, paso.args, ctx)
+
+    def clave_de() -> ClaveCache:
+        return _clave_paso(paso, ctx)
+
+    sobre = _guardia(paso.spec).ejecutar(ejecutar, paso.args, clave_de, _vigente(ctx))
+    sobre = _completar(sobre, paso.spec, dv, qh, _ms(t0))
+    audit(
+        "plan.step",
+        {
+            "component": ORQUESTADOR,
+            "paso": paso.indice,
+            "tool": paso.spec.canonical,
+            "kind": paso.spec.kind,
+            "rows": len(sobre.data.inline.rows),
+            "timing_ms": sobre.meta.timing_ms,
+        },
+    )
+    return sobre
+
+
+def _fluir(
+    nodo: Materializar, filtros: Filtros, ctx: Contexto, dv: str, qh: str
+) -> Flujo:
+    paso = nodo.paso
+    ctx = replace(ctx, paso=paso.indice)
+    flujo = paso.spec.fluir(filtros, paso.args, ctx)
+    meta = flujo.meta
+    meta.schema_version = meta.schema_version or "1.0.0"
+    meta.tool_version = paso.spec.version
+    meta.dataset_version = dv
+    meta.query_hash = qh
+    audit(
+        "plan.stream",
+        {
+            "component": ORQUESTADOR,
+            "paso": paso.indice,
+            "tool": paso.spec.canonical,
+            "query_hash": qh,
+        },
+    )
+    return flujo
+
+
+def validar_plan(
+    plan: Plan,
+) -> tuple[
+    Optional[tuple[tuple[PasoResuelto, ...], str]], Optional[tuple[SobreError, int]]
+]:
+    """
+    Validación estática: ((pasos resueltos, query_hash), None) o (None, (Sobre
+    de error, http)). Memoizada: un plan repetido no se revalida.
+    """
+    cv = catalog_version()
+    clave = clave_validacion(plan, cv)
+    validado = _VALIDADOS.obtener(clave)
+    if validado is not None:
+        return validado, None
+    resueltos: list[PasoResuelto] = []
+    for i, p in enumerate(plan.plan):
+        try:
+            spec = resolver(p.tool_id, p.tool_version)
+        except CeladorError as e:
+            return None, _error(e, ORQUESTADOR, p.tool_version, i)
+        try:
+            resueltos.append(PasoResuelto(i, spec, validar_args(spec, dict(p.args))))
+        except Exception as e:
+            return None, _error(e, spec.canonical, spec.version, i)
+    validado = (tuple(resueltos), query_hash(forma_canonica(resueltos, plan.meta), cv))
+    _VALIDADOS.guardar(clave, *validado)
+    return validado, None
+
+
+def ejecutar_plan(
+    plan: Plan,
+    consultor: Optional[Consultor] = None,
+    cubo: Optional[CuboConteos] = None,
+    artefactos: Optional[AlmacenArtefactos] = None,
+) -> tuple[RespuestaPlan, int]:
+    """
+    Sin `consultor` se usan los del proceso (Consultor, cubo del dataset
+    vigente y almacén de artefactos); con uno explícito, el cubo y el almacén
+    también deben pasarse explícitos (sin almacén, la salida es solo inline).
+    """
+    return _ejecutar(plan, consultor, cubo, artefactos, fluir=False)  # type: ignore[return-value]
+
+
+def ejecutar_plan_flujo(
+    plan: Plan,
+    consultor: Optional[Consultor] = None,
+    cubo: Optional[CuboConteos] = None,
+    artefactos: Optional[AlmacenArtefactos] = None,
+) -> tuple[Union[RespuestaPlan, Flujo], int]:
+    """
+    Como `ejecutar_plan`, pero si el último paso soporta streaming devuelve su
+    `Flujo` (200). Errores previos y tools sin `fluir` dan la RespuestaPlan normal.
+    """
+    return _ejecutar(plan, consultor, cubo, artefactos, fluir=True)
+
+
+def _ejecutar(
+    plan: Plan,
+    consultor: Optional[Consultor],
+    cubo: Optional[CuboConteos],
+    artefactos: Optional[AlmacenArtefactos],
+    fluir: bool,
+) -> tuple[Union[RespuestaPlan, Flujo], int]:
+    t0 = time.perf_counter()
+    audit("plan.start", {"component": ORQUESTADOR, "pasos": len(plan.plan)})
+
+    def _fin(sobres: list, http: int, qh: Optional[str]) -> tuple[RespuestaPlan, int]:
+        status = "ok" if http == 200 else "error"
+        if plan.devolver == "ultimo":
+            sobres = sobres[-1:]
+        dt = _ms(t0)
+        audit(
+            f"plan.{status}",
+            {"component": ORQUESTADOR, "query_hash": qh, "timing_ms": dt, "http": http},
+        )
+        return (
+            RespuestaPlan(status=status, query_hash=qh, timing_ms=dt, sobres=sobres),
+            http,
+        )
+
+    # 1) Validación estática
+    validado, fallo = validar_plan(plan)
+    if fallo is not None:
+        return _fin([fallo[0]], fallo[1], None)
+    pasos, qh = validado
+    try:
+        dv = dataset_version()
+        if consultor is None:
+            consultor, cubo, artefactos = (
+                obtener_consultor(),
+                obtener_cubo(),
+                obtener_almacen(),
+            )
+        if cubo is not None and cubo.dataset_version != dv:
+            cubo = None  # cubo de otra versión: resultados inconsistentes, mejor SQL
+        ctx = Contexto(consultor, plan.meta.strict_time, cubo, artefactos, dv, qh)
+    except Exception as e:
+        sobre, http = _error(e, ORQUESTADOR, "1.0.0", None)
+        return _fin([sobre], http, qh)
+
+    # 2) Plan lógico + validación contextual de costo
+    nodos = plan_logico(pasos)
+    costos = _estimar(nodos, ctx, fluir)
+    excedido = verificar_presupuesto(costos, ctx)
+    audit(
+        "plan.cost",
+        {
+            "component": ORQUESTADOR,
+            "query_hash": qh,
+            "dataset_version": dv,
+            "presupuesto_filas": PRESUPUESTO_FILAS,
+            "pasos": [c.como_dict() for c in costos],
+            "decision": "rechazado" if excedido is not None else "ok",
+        },
+    )
+    if excedido is not None:
+        sobre, http = _error(
+            error_presupuesto(excedido, ctx),
+            excedido.spec.canonical,
+            excedido.spec.version,
+            excedido.indice,
+        )
+        return _fin([sobre], http, qh)
+
+    # 3) Ejecución
+    filtros = Filtros()
+    sobres: list = []
+    reales: dict[int, int] = {}
+    for k, nodo in enumerate(nodos):
+        try:
+            if isinstance(nodo, Escaneo):
+                filtros, nuevos = _escanear(nodo, filtros, ctx, dv, qh, reales)
+                sobres.extend(nuevos)
+            elif fluir and k == len(nodos) - 1 and nodo.paso.spec.fluir is not None:
+                return _fluir(nodo, filtros, ctx, dv, qh), 200
+            else:
+                sobres.append(_materializar(nodo, filtros, ctx, dv, qh))
+        except _FalloEnPaso as f:
+            paso = f.paso
+            sobre, http = _error(
+                f.causa, paso.spec.canonical, paso.spec.version, paso.indice
+            )
+            return _fin(sobres + f.previos + [sobre], http, qh)
+        except Exception as e:
+            paso = nodo.paso  # Materializar: _escanear reporta su propio paso
+            sobre, http = _error(e, paso.spec.canonical, paso.spec.version, paso.indice)
+            return _fin(sobres + [sobre], http, qh)
+
+    _auditar_costo_real(costos, sobres, reales, qh)
+    return _fin(sobres, 200, qh)
@@ -0,0 +1,328 @@
+# casandra/orquestador/costos.py
+"""
+Estimación de costo de un plan (doc C.8.2, "estimación básica de consumo de
+recursos"), dentro de la validación contextual: solo metadata.
+
+- Índice por `dataset_version`: de cada row group del Depósito, la partición
+  (`anio=/mes=`), filas y min/max de `fecha`, `entidad_id` y `delito`,
+  leídos de los footers Parquet (sin datos). Se arma una vez por versión.
+- Por paso, con los filtros acumulados (los mismos `restringir` que usará la
+  ejecución, que no tocan datos):
+  * `filas_escaneadas`: filas de los row groups que DuckDB no puede podar
+    por partición ni por min/max; 0 si la tool sale del cubo (`rollup`).
+  * `filas_estimadas`: cardinalidad tras los filtros, suponiendo valores
+    uniformes dentro de cada row group (el Depósito está ordenado por
+    entidad, delito, fecha: la mayoría de los row groups son de una o pocas
+    entidades, así que la estimación es ajustada).
+- Presupuesto: un paso que materializaría más de `CASANDRA_PLAN_MAX_FILAS_ESCANEO`
+  filas escaneadas se rechaza antes de ejecutar con RESOURCE_LIMIT y pistas
+  accionables (acotar fechas/entidad/delito, construir el cubo, pedir
+  streaming). Quedan exentos los filtros (un COUNT agregado, memoria
+  constante), las tools que salen del cubo y el último paso en modo
+  streaming (memoria acotada por lotes).
+- Estimaciones y reales van a la auditoría (`plan.cost`, `plan.cost_actual`)
+  para contrastar y ajustar el modelo (`Celador/bitacora.py`).
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import pyarrow.parquet as pq
+
+from ..Celador.auditoria import audit
+from ..Celador.errores import CeladorError, PresupuestoExcedido
+from ..Consultor.repo import INCIDENTES_DIR, Filtros
+from ..Etl.deposito import leer_manifest, partes
+from ..dominio.nombres import ORQUESTADOR
+from ..Herramientas.catalogo import obtener_servicio_catalogo
+from ..Herramientas.filtros import restringir_propios
+from ..Herramientas.spec import Contexto, ToolSpec
+from .plan import Escaneo, NodoPlan
+
+
+# 0 = sin presupuesto.
+PRESUPUESTO_FILAS = int(os.getenv("CASANDRA_PLAN_MAX_FILAS_ESCANEO", "50000000"))
+
+_PARTICION = re.compile(r"anio=(\d+)/mes=(\d+)")
+
+
+@dataclass(frozen=True)
+class GrupoFilas:
+    """Estadísticas de un row group (None = sin min/max: no se puede podar)."""
+
+    anio: int
+    mes: int
+    filas: int
+    fechas: Optional[tuple[date, date]]
+    entidades: Optional[tuple[str, str]]
+    delitos: Optional[tuple[str, str]]
+
+
+def _min_max(md: Any, i: int, col: Optional[int]) -> Optional[tuple[Any, Any]]:
+    if col is None:
+        return None
+    st = md.row_group(i).column(col).statistics
+    if st is None or not st.has_min_max:
+        return None
+    return st.min, st.max
+
+
+def leer_grupos(archivos: Sequence[Path]) -> list[GrupoFilas]:
+    """Row groups de los Parquet `archivos`, solo footers."""
+    grupos: list[GrupoFilas] = []
+    for ruta in archivos:
+        m = _PARTICION.search(ruta.as_posix())
+        anio, mes = (int(m.group(1)), int(m.group(2))) if m else (0, 0)
+        md = pq.read_metadata(ruta)
+        nombres = md.schema.names
+        cols = {
+            c: nombres.index(c) if c in nombres else None
+            for c in ("fecha", "entidad_id", "delito")
+        }
+        for i in range(md.num_row_groups):
+            grupos.append(
+                GrupoFilas(
+                    anio=anio,
+                    mes=mes,
+                    filas=md.row_group(i).num_rows,
+                    fechas=_min_max(md, i, cols["fecha"]),
+                    entidades=_min_max(md, i, cols["entidad_id"]),
+                    delitos=_min_max(md, i, cols["delito"]),
+                )
+            )
+    return grupos
+
+
+def _fraccion_valores(
+    valores: Optional[tuple[str, ...]],
+    rango: Optional[tuple[str, str]],
+    universo: Sequence[str],
+) -> float:
+    """Fracción del row group que pasa `IN (valores)`; 0 si min/max lo poda."""
+    if valores is None or rango is None:
+        return 1.0
+    vmin, vmax = rango
+    dentro = sum(1 for v in valores if vmin <= v <= vmax)
+    if not dentro:
+        return 0.0
+    # Valores distintos que caben en [min, max]; sin universo, se asume solo los pedidos.
+    distintos = bisect_right(universo, vmax) - bisect_left(universo, vmin)
+    return dentro / max(distintos, dentro)
+
+
+def _fraccion_fechas(filtros: Filtros, g: GrupoFilas) -> float:
+    if g.anio:  # poda de partición
+        if filtros.desde is not None and (g.anio, g.mes) < (
+            filtros.desde.year,
+            filtros.desde.month,
+        ):
+            return 0.0
+        if filtros.hasta is not None and (g.anio, g.mes) > (
+            filtros.hasta.year,
+            filtros.hasta.month,
+        ):
+            return 0.0
+    if g.fechas is None:
+        return 1.0
+    fmin, fmax = g.fechas
+    ini = max(fmin, filtros.desde) if filtros.desde is not None else fmin
+    fin = min(fmax, filtros.hasta) if filtros.hasta is not None else fmax
+    if ini > fin:
+        return 0.0
+    return ((fin - ini).days + 1) / ((fmax - fmin).days + 1)
+
+
+class IndiceCostos:
+    """Row groups + universo ordenado de entidades/delitos de un `dataset_version`."""
+
+    def __init__(
+        self,
+        dataset_version: str,
+        grupos: Sequence[GrupoFilas],
+        entidades: Sequence[str] = (),
+        delitos: Sequence[str] = (),
+    ) -> None:
+        self.dataset_version = dataset_version
+        self.grupos = tuple(grupos)
+        self.entidades = sorted(entidades)
+        self.delitos = sorted(delitos)
+        self.filas = sum(g.filas for g in self.grupos)
+
+    def estimar(self, filtros: Filtros) -> tuple[int, int]:
+        """(filas escaneadas, filas estimadas tras `filtros`)."""
+        escaneadas = 0
+        estimadas = 0.0
+        for g in self.grupos:
+            f = _fraccion_fechas(filtros, g)
+            if f:
+                f *= _fraccion_valores(filtros.entidad_ids, g.entidades, self.entidades)
+            if f:
+                f *= _fraccion_valores(filtros.delitos, g.delitos, self.delitos)
+            if f:
+                escaneadas += g.filas
+                estimadas += g.filas * f
+        return escaneadas, round(estimadas)
+
+
+_indice: Optional[IndiceCostos] = None
+_indice_lock = threading.Lock()
+
+
+def obtener_indice(dv: str, base: Path = INCIDENTES_DIR) -> IndiceCostos:
+    """Índice del `dataset_version` vigente (footers leídos una vez por versión)."""
+    global _indice
+    indice = _indice
+    if indice is not None and indice.dataset_version == dv:
+        return indice
+    with _indice_lock:
+        if _indice is None or _indice.dataset_version != dv:
+            t0 = time.perf_counter()
+            spec = obtener_servicio_catalogo().actual().spec
+            archivos = partes(leer_manifest(base.parent), base.parent)
+            _indice = IndiceCostos(
+                dv, leer_grupos(archivos), spec.entidades, spec.delitos
+            )
+            audit(
+                "plan.cost_index",
+                {
+                    "component": ORQUESTADOR,
+                    "dataset_version": dv,
+                    "row_groups": len(_indice.grupos),
+                    "filas": _indice.filas,
+                    "timing_ms": round((time.perf_counter() - t0) * 1000, 3),
+                },
+            )
+        return _indice
+
+
+@dataclass(frozen=True)
+class CostoPaso:
+    indice: int
+    spec: ToolSpec
+    filtros: Filtros
+    filas_escaneadas: int
+    filas_estimadas: int
+    conteo: bool = False  # filtro: se contesta con un COUNT agregado
+    rollup: bool = False  # sale del cubo: no escanea Parquet
+    streaming: bool = False  # último paso servido como Flujo
+
+    def como_dict(self) -> dict[str, Any]:
+        return {
+            "paso": self.indice,
+            "tool": self.spec.canonical,
+            "filas_escaneadas": self.filas_escaneadas,
+            "filas_estimadas": self.filas_estimadas,
+            "conteo": self.conteo,
+            "rollup": self.rollup,
+            "streaming": self.streaming,
+        }
+
+
+def estimar_plan(
+    nodos: Sequence[NodoPlan], ctx: Contexto, indice: IndiceCostos, fluir: bool
+) -> list[CostoPaso]:
+    """
+    Costo por paso, en orden. Si un `restringir` falla (p.ej. strict_time) se
+    corta ahí: la ejecución reportará ese error en su paso, como siempre.
+    """
+    costos: list[CostoPaso] = []
+    filtros = Filtros()
+    for k, nodo in enumerate(nodos):
+        try:
+            if isinstance(nodo, Escaneo):
+                # Una sola consulta por grupo: escanea lo que deja la primera etapa.
+                for j, paso in enumerate(nodo.pasos):
+                    filtros, _ = paso.spec.restringir(filtros, paso.args, ctx)
+                    escaneadas, estimadas = indice.estimar(filtros)
+                    if j > 0:
+                        escaneadas = 0  # las etapas fusionadas no vuelven a escanear
+                    costo = CostoPaso(
+                        paso.indice,
+                        paso.spec,
+                        filtros,
+                        escaneadas,
+                        estimadas,
+                        conteo=True,
+                    )
+                    costos.append(costo)
+                continue
+            paso = nodo.paso
+            propios, _ = restringir_propios(filtros, paso.args, ctx)
+        except CeladorError:
+            break
+        escaneadas, estimadas = indice.estimar(propios)
+        rollup = paso.spec.rollup and ctx.cubo is not None
+        streaming = fluir and k == len(nodos) - 1 and paso.spec.fluir is not None
+        if rollup:
+            escaneadas = 0  # lo responde el cubo, sin escanear el Depósito
+        costo = CostoPaso(
+            paso.indice,
+            paso.spec,
+            propios,
+            escaneadas,
+            estimadas,
+            rollup=rollup,
+            streaming=streaming,
+        )
+        costos.append(costo)
+    return costos
+
+
+def _pistas(c: CostoPaso, ctx: Contexto, presupuesto: int) -> list[str]:
+    pistas: list[str] = []
+    if c.spec.rollup and ctx.cubo is None:
+        pistas.append(
+            f"{c.spec.name} puede resolverse con el cubo de conteos, pero no hay cubo para "
+            f"dataset_version={ctx.dataset_version}: re-ejecutar la ingesta "
+            "(python -m Casandra.Etl.ingesta) para construirlo."
+        )
+    if c.spec.fluir is not None:
+        pistas.append(
+            "Pedir el resultado en streaming como último paso "
+            "(Accept: application/x-ndjson o ?stream=ndjson)."
+        )
+    f = c.filtros
+    if f.desde is not None and f.hasta is not None:
+        dias = (f.hasta - f.desde).days + 1
+        cabe = max(1, int(dias * presupuesto / max(c.filas_escaneadas, 1)))
+        if cabe < dias:
+            pistas.append(
+                f"Acotar filtro_fecha: el rango de {dias} días cabe en el presupuesto con ~{cabe} días."
+            )
+    else:
+        pistas.append("Agregar filtro_fecha (from/to) para podar particiones.")
+    if f.entidad_ids is None:
+        pistas.append("Agregar enfoque_entidad (entidad_id) para podar por entidad.")
+    if f.delitos is None:
+        pistas.append("Agregar filtro_tipo (delitos) para podar por tipo de delito.")
+    return pistas
+
+
+def verificar_presupuesto(
+    costos: Sequence[CostoPaso], ctx: Contexto, presupuesto: int = PRESUPUESTO_FILAS
+) -> Optional[CostoPaso]:
+    """Primer paso que materializaría más que el presupuesto (None si todos caben)."""
+    if presupuesto <= 0:
+        return None
+    for c in costos:
+        if c.filas_escaneadas > presupuesto and not (c.conteo or c.streaming):
+            return c
+    return None
+
+
+def error_presupuesto(
+    c: CostoPaso, ctx: Contexto, presupuesto: int = PRESUPUESTO_FILAS
+) -> PresupuestoExcedido:
+    return PresupuestoExcedido(
+        f"El paso {c.indice} ({c.spec.canonical}) escanearía ~{c.filas_escaneadas:,} filas; "
+        f"el presupuesto es {presupuesto:,}",
+        _pistas(c, ctx, presupuesto),
+    )
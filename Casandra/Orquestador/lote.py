@@ -0,0 +1,287 @@
+# casandra/orquestador/lote.py
+"""
+Lotes de planes (`/plan/batch`): N planes bajo un mismo job_id padre.
+
+1. Cada plan se valida (memoizado) y los idénticos por (`query_hash`,
+   `devolver`) se ejecutan una sola vez; los duplicados reciben la misma
+   respuesta, marcada con `duplicado_de`.
+2. Escaneo compartido: las restricciones de los filtros de todos los planes
+   (solo metadata) se juntan y el Consultor cuenta las filas de todas las
+   etapas en UNA pasada (`Consultor.conteos_lote`), podada por la
+   envolvente de los filtros. Cada plan corre luego con un Consultor que
+   contesta sus `conteos_acumulados` de ese resultado.
+3. Ejecución concurrente acotada (`CASANDRA_LOTE_CONCURRENCIA` hilos,
+   compartidos por todos los lotes del proceso); cada plan audita con su
+   propio job_id, enlazado al padre en `lote.plan`.
+
+`EjecucionLote.en_orden()` entrega la respuesta completa en el orden del
+lote; `al_completar()` entrega cada resultado apenas termina (NDJSON).
+"""
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Iterator, Literal, Optional, Sequence
+
+import msgspec
+
+from ..Celador.auditoria import audit, get_job_id, new_job_id, set_job_id
+from ..Celador.errores import CeladorError, ValidacionError
+from ..Celador.versiones import dataset_version
+from ..Consultor.cubo import CuboConteos, obtener_cubo
+from ..Consultor.repo import Consultor, Filtros, obtener_consultor
+from ..dominio.nombres import ORQUESTADOR
+from ..Empaquetador.artefactos import AlmacenArtefactos, obtener_almacen
+from ..Herramientas.spec import Contexto
+from .core import ejecutar_plan, validar_plan
+from .plan import Escaneo, PasoResuelto, Plan, RespuestaPlan, plan_logico
+
+
+LOTE_MAX_PLANES = int(os.getenv("CASANDRA_LOTE_MAX_PLANES", "64"))
+LOTE_CONCURRENCIA = int(os.getenv("CASANDRA_LOTE_CONCURRENCIA", "4"))
+
+
+class Lote(msgspec.Struct, forbid_unknown_fields=True):
+    planes: list[Plan]
+
+
+class ResultadoLote(msgspec.Struct, kw_only=True):
+    indice: int
+    job_id: str
+    http: int
+    respuesta: RespuestaPlan
+    duplicado_de: Optional[int] = None
+
+
+class RespuestaLote(msgspec.Struct, kw_only=True):
+    status: Literal["ok", "parcial"]
+    job_id: str
+    timing_ms: int = 0
+    planes: int = 0
+    unicos: int = 0
+    resultados: list[ResultadoLote] = []
+
+
+_DECODER = msgspec.json.Decoder(Lote)
+
+
+def decodificar_lote(raw: bytes) -> Lote:
+    try:
+        lote = _DECODER.decode(raw)
+    except msgspec.DecodeError as e:
+        raise ValidacionError(f"Lote inválido: {e}")
+    if not lote.planes:
+        raise ValidacionError("Lote vacío")
+    if len(lote.planes) > LOTE_MAX_PLANES:
+        raise ValidacionError(
+            f"Lote de {len(lote.planes)} planes; el máximo es {LOTE_MAX_PLANES}"
+        )
+    for i, plan in enumerate(lote.planes):
+        if not plan.plan:
+            raise ValidacionError(f"Plan vacío en la posición {i}")
+    return lote
+
+
+class ConsultorLote(Consultor):
+    """Consultor que contesta `conteos_acumulados` con los conteos del escaneo compartido."""
+
+    def __init__(self, base: Consultor, conteos: dict[Filtros, int]) -> None:
+        super().__init__(base.pool)
+        self._conteos = conteos
+
+    def conteos_acumulados(self, etapas: Sequence[Filtros]) -> list[int]:
+        if all(e in self._conteos for e in etapas):
+            return [self._conteos[e] for e in etapas]
+        return super().conteos_acumulados(etapas)
+
+
+def _etapas(pasos: Sequence[PasoResuelto], ctx: Contexto) -> list[Filtros]:
+    """Filtros tras cada paso `filter` del plan, como los acumulará `_escanear`."""
+    etapas: list[Filtros] = []
+    filtros = Filtros()
+    for nodo in plan_logico(pasos):
+        if not isinstance(nodo, Escaneo):
+            continue
+        for paso in nodo.pasos:
+            try:
+                filtros, _ = paso.spec.restringir(filtros, paso.args, ctx)
+            except CeladorError:
+                return etapas  # el plan reportará el error al ejecutarse
+            etapas.append(filtros)
+    return etapas
+
+
+_ejecutor: Optional[ThreadPoolExecutor] = None
+_ejecutor_lock = threading.Lock()
+
+
+def _obtener_ejecutor() -> ThreadPoolExecutor:
+    global _ejecutor
+    if _ejecutor is None:
+        with _ejecutor_lock:
+            if _ejecutor is None:
+                _ejecutor = ThreadPoolExecutor(
+                    max(1, LOTE_CONCURRENCIA), thread_name_prefix="casandra-lote"
+                )
+    return _ejecutor
+
+
+class EjecucionLote:
+    """Lote en curso: los planes únicos ya están encolados en el ejecutor."""
+
+    def __init__(self, lote: Lote) -> None:
+        self.t0 = time.perf_counter()
+        self.job_id = get_job_id()
+        self.planes = len(lote.planes)
+        self._ctx = (
+            contextvars.copy_context()
+        )  # auditoría de cierre con el job_id padre
+        self._cerrado = False
+        self._lock = threading.Lock()
+
+        # 1) Validación y deduplicación
+        self._original: list[int] = []  # indice -> indice del plan que realmente corre
+        unicos: dict[tuple[str, str], int] = {}
+        validados: dict[int, tuple[tuple[PasoResuelto, ...], str]] = {}
+        for i, plan in enumerate(lote.planes):
+            validado, _ = validar_plan(plan)
+            if validado is None:
+                self._original.append(i)  # corre solo para producir su error
+                continue
+            clave = (validado[1], plan.devolver)
+            self._original.append(unicos.setdefault(clave, i))
+            if unicos[clave] == i:
+                validados[i] = validado
+        a_correr = sorted(set(self._original))
+        self.unicos = len(a_correr)
+
+        # 2) Escaneo compartido + 3) ejecución
+        self._compartido = self._escaneo_compartido(lote, validados)
+        audit(
+            "lote.start",
+            {
+                "component": ORQUESTADOR,
+                "planes": self.planes,
+                "unicos": self.unicos,
+                "escaneo_compartido": self._compartido is not None,
+            },
+        )
+        ejecutor = _obtener_ejecutor()
+        self._futuros: dict[int, Future] = {}
+        for i in a_correr:
+            ctx = contextvars.copy_context()
+            self._futuros[i] = ejecutor.submit(ctx.run, self._correr, i, lote.planes[i])
+
+    @staticmethod
+    def _escaneo_compartido(
+        lote: Lote, validados: dict[int, tuple[tuple[PasoResuelto, ...], str]]
+    ) -> Optional[tuple[ConsultorLote, Optional[CuboConteos], AlmacenArtefactos]]:
+        if len(validados) < 2:
+            return None
+        try:
+            base, cubo, artefactos = (
+                obtener_consultor(),
+                obtener_cubo(),
+                obtener_almacen(),
+            )
+            dv = dataset_version()
+            etapas = [
+                e
+                for i, (pasos, qh) in validados.items()
+                for e in _etapas(
+                    pasos,
+                    Contexto(base, lote.planes[i].meta.strict_time, None, None, dv, qh),
+                )
+            ]
+            if not etapas:
+                return None
+            return ConsultorLote(base, base.conteos_lote(etapas)), cubo, artefactos
+        except Exception as e:
+            # Sin escaneo compartido cada plan consulta por su cuenta (y reporta su error).
+            audit(
+                "lote.shared_scan_error", {"component": ORQUESTADOR, "details": str(e)}
+            )
+            return None
+
+    def _correr(self, indice: int, plan: Plan) -> tuple[str, RespuestaPlan, int]:
+        padre = self.job_id
+        jid = set_job_id(new_job_id())
+        audit(
+            "lote.plan",
+            {"component": ORQUESTADOR, "parent_job_id": padre, "indice": indice},
+        )
+        if self._compartido is None:
+            respuesta, http = ejecutar_plan(plan)
+        else:
+            respuesta, http = ejecutar_plan(plan, *self._compartido)
+        return jid, respuesta, http
+
+    def _resultados(self, i: int) -> list[ResultadoLote]:
+        """El resultado del plan `i` y los de sus duplicados."""
+        jid, respuesta, http = self._futuros[i].result()
+        return [
+            ResultadoLote(
+                indice=k,
+                job_id=jid,
+                http=http,
+                respuesta=respuesta,
+                duplicado_de=None if k == i else i,
+            )
+            for k, o in enumerate(self._original)
+            if o == i
+        ]
+
+    def _cerrar(self, resultados: Sequence[ResultadoLote]) -> RespuestaLote:
+        errores = sum(1 for r in resultados if r.http != 200)
+        respuesta = RespuestaLote(
+            status="ok" if not errores else "parcial",
+            job_id=self.job_id,
+            timing_ms=int((time.perf_counter() - self.t0) * 1000),
+            planes=self.planes,
+            unicos=self.unicos,
+        )
+        with self._lock:
+            if not self._cerrado:
+                self._cerrado = True
+                self._ctx.run(
+                    audit,
+                    "lote.ok",
+                    {
+                        "component": ORQUESTADOR,
+                        "planes": self.planes,
+                        "unicos": self.unicos,
+                        "errores": errores,
+                        "timing_ms": respuesta.timing_ms,
+                    },
+                )
+        return respuesta
+
+    def en_orden(self) -> RespuestaLote:
+        resultados = sorted(
+            (r for i in self._futuros for r in self._resultados(i)),
+            key=lambda r: r.indice,
+        )
+        respuesta = self._cerrar(resultados)
+        respuesta.resultados = resultados
+        return respuesta
+
+    def al_completar(self) -> Iterator[ResultadoLote]:
+        indices = {f: i for i, f in self._futuros.items()}
+        resultados: list[ResultadoLote] = []
+        for futuro in as_completed(indices):
+            for r in self._resultados(indices[futuro]):
+                resultados.append(r)
+                yield r
+        self._cerrar(resultados)
+
+
+def iniciar_lote(lote: Lote) -> EjecucionLote:
+    """Valida, deduplica, corre el escaneo compartido y encola los planes."""
+    return EjecucionLote(lote)
+
+
+def ejecutar_lote(lote: Lote) -> RespuestaLote:
+    return iniciar_lote(lote).en_orden()
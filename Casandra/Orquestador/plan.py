@@ -0,0 +1,150 @@
+# casandra/orquestador/plan.py
+"""
+Plan normalizado (doc §4.3) y plan lógico.
+
+El plan lógico agrupa las tools `filter` consecutivas en un solo `Escaneo`
+(se fusionan en una consulta al Consultor) y deja como `Materializar` las
+tools `analysis`/`terminal`, que son las únicas que leen datos.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Literal, Optional, Sequence, Union
+
+import msgspec
+
+from ..Celador.errores import ValidacionError
+from ..dominio.sobre import SobreError, SobreOk
+from ..Herramientas.spec import Args, ToolSpec
+
+
+class PasoPlan(msgspec.Struct, forbid_unknown_fields=True):
+    tool_id: int
+    tool_version: str
+    args: dict[str, Any] = {}
+
+
+class PlanMeta(msgspec.Struct, frozen=True):
+    catalog_version: Optional[str] = None
+    dataset_version: Optional[str] = None
+    strict_time: bool = False
+
+
+class Plan(msgspec.Struct, forbid_unknown_fields=True):
+    plan: list[PasoPlan]
+    meta: PlanMeta = PlanMeta()
+    devolver: Literal["ultimo", "todos"] = "todos"
+
+
+class RespuestaPlan(msgspec.Struct, kw_only=True):
+    status: Literal["ok", "error"]
+    query_hash: Optional[str] = None
+    timing_ms: int = 0
+    sobres: list[Union[SobreOk, SobreError]] = []
+
+
+_DECODER = msgspec.json.Decoder(Plan)
+
+
+def decodificar_plan(raw: bytes) -> Plan:
+    try:
+        plan = _DECODER.decode(raw)
+    except msgspec.DecodeError as e:
+        raise ValidacionError(f"Plan inválido: {e}")
+    if not plan.plan:
+        raise ValidacionError("Plan vacío")
+    return plan
+
+
+@dataclass(frozen=True)
+class PasoResuelto:
+    indice: int
+    spec: ToolSpec
+    args: Args
+
+
+@dataclass(frozen=True)
+class Escaneo:
+    """Tools `filter` consecutivas: una sola consulta para todas."""
+
+    pasos: tuple[PasoResuelto, ...]
+
+
+@dataclass(frozen=True)
+class Materializar:
+    paso: PasoResuelto
+
+
+NodoPlan = Union[Escaneo, Materializar]
+
+
+def plan_logico(pasos: Sequence[PasoResuelto]) -> list[NodoPlan]:
+    nodos: list[NodoPlan] = []
+    grupo: list[PasoResuelto] = []
+    for paso in pasos:
+        if paso.spec.kind == "filter":
+            grupo.append(paso)
+            continue
+        if grupo:
+            nodos.append(Escaneo(tuple(grupo)))
+            grupo = []
+        nodos.append(Materializar(paso))
+    if grupo:
+        nodos.append(Escaneo(tuple(grupo)))
+    return nodos
+
+
+def clave_validacion(plan: Plan, catalog_version: str) -> str:
+    """
+    Hash del plan tal como llegó (pasos con llaves ordenadas + strict_time) y
+    del catálogo: dos planes con la misma clave validan igual.
+    """
+    blob = msgspec.json.encode(
+        {
+            "plan": plan.plan,
+            "strict_time": plan.meta.strict_time,
+            "catalog_version": catalog_version,
+        },
+        order="sorted",
+    )
+    return hashlib.sha256(blob).hexdigest()
+
+
+class CacheValidacion:
+    """
+    Resultado de la validación estática (pasos resueltos + `query_hash`) por
+    `clave_validacion`, en un LRU acotado. Solo se guardan planes válidos; un
+    plan repetido se salta resolver tools y validar args. Los args normalizados
+    se comparten entre ejecuciones: las tools no los mutan.
+    """
+
+    def __init__(self, maximo: int = 1024) -> None:
+        self.maximo = maximo
+        self._items: "OrderedDict[str, tuple[tuple[PasoResuelto, ...], str]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> Optional[tuple[tuple[PasoResuelto, ...], str]]:
+        with self._lock:
+            item = self._items.get(clave)
+            if item is not None:
+                self._items.move_to_end(clave)
+            return item
+
+    def guardar(self, clave: str, pasos: tuple[PasoResuelto, ...], qh: str) -> None:
+        with self._lock:
+            self._items[clave] = (pasos, qh)
+            while len(self._items) > self.maximo:
+                self._items.popitem(last=False)
+
+
+def forma_canonica(pasos: Sequence[PasoResuelto], meta: PlanMeta) -> dict[str, Any]:
+    """Plan normalizado para `query_hash`: identidad canónica + args normalizados."""
+    return {
+        "plan": [{"tool": p.spec.canonical, "args": p.args} for p in pasos],
+        "strict_time": meta.strict_time,
+    }
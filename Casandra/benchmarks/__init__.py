@@ -0,0 +1,9 @@
+# casandra/benchmarks/__init__.py
+"""
+Benchmarks de rendimiento de Casandra.
+Se ejecutan como módulos desde la raíz del repo, p. ej.:
+    python -m Casandra.benchmarks.bench_auditoria
+
+`suite` agrupa micro-benchmarks y escenarios de carga con salida JSON
+comparable entre corridas; `sintetico` genera Depósitos de 1M–100M filas.
+"""
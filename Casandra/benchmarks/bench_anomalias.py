@@ -0,0 +1,77 @@
+# casandra/benchmarks/bench_anomalias.py
+"""
+z-score rodante vectorizado (sumas acumuladas sobre la matriz series × días)
+vs. el bucle natural por serie y por día, con picos inyectados.
+
+El bucle ingenuo se mide sobre una muestra de series y se extrapola.
+
+Uso:
+    python -m Casandra.benchmarks.bench_anomalias --series 2000 --dias 2400 --ventana 28
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from ..Analisis.Patrones.anomalias import STD_MIN, detectar
+
+
+def _ingenuo(
+    serie: np.ndarray, ventana: int, z_umbral: float
+) -> list[tuple[int, float]]:
+    out = []
+    for t in range(ventana, serie.size):
+        previa = serie[t - ventana : t]
+        std = max(previa.std(), STD_MIN)
+        z = (serie[t] - previa.mean()) / std
+        if z >= z_umbral:
+            out.append((t, z))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--series", type=int, default=2000)
+    ap.add_argument("--dias", type=int, default=2400)
+    ap.add_argument("--ventana", type=int, default=28)
+    ap.add_argument("--z", type=float, default=3.0)
+    ap.add_argument("--muestra", type=int, default=50)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(5)
+    tasas = rng.gamma(1.5, 2.0, size=(args.series, 1))
+    matriz = rng.poisson(tasas, size=(args.series, args.dias)).astype(np.int64)
+    picos = rng.integers(0, matriz.size, size=args.series)
+    matriz.flat[picos] += rng.integers(10, 40, size=picos.size)
+
+    t0 = time.perf_counter()
+    hallazgos = detectar(matriz, args.ventana, args.z)
+    dt_vec = time.perf_counter() - t0
+
+    muestra = min(args.muestra, args.series)
+    t0 = time.perf_counter()
+    ingenuo = [_ingenuo(matriz[s], args.ventana, args.z) for s in range(muestra)]
+    dt_ing = (time.perf_counter() - t0) * args.series / muestra
+
+    for s, esperados in enumerate(ingenuo):
+        sel = hallazgos.serie == s
+        assert list(hallazgos.dia[sel]) == [t for t, _ in esperados]
+        assert np.allclose(hallazgos.z[sel], [z for _, z in esperados])
+
+    puntos = args.series * args.dias
+    print(
+        f"series={args.series:,} días={args.dias:,} ventana={args.ventana} puntos={puntos:,}"
+    )
+    print(f"anomalías: {len(hallazgos):,} (picos inyectados: {picos.size:,})")
+    print(
+        f"vectorizado : {dt_vec * 1000:>10.1f} ms  ({puntos / dt_vec / 1e6:,.1f} M puntos/s)"
+    )
+    print(
+        f"por serie   : {dt_ing * 1000:>10.1f} ms  (extrapolado de {muestra} series)  x{dt_ing / dt_vec:,.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
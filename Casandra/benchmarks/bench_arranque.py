@@ -0,0 +1,110 @@
+# casandra/benchmarks/bench_arranque.py
+"""
+Arranque en frío: tiempo de `import Casandra.Expositor.api` medido con
+`python -X importtime` en un proceso nuevo (mediana de `--repeticiones`).
+
+Falla (exit 1) si el import supera `--presupuesto-ms` o si arrastra alguna
+dependencia pesada que solo deben cargar las tools y los handlers al
+ejecutarse (duckdb, pyarrow, numpy, scipy, polars, pandas, scikit-learn,
+statsmodels, pyod). También verifica que
+importar no cree directorios en el cwd. Imprime los módulos más caros.
+
+Uso:
+    python -m Casandra.benchmarks.bench_arranque --presupuesto-ms 1200
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+MODULO = "Casandra.Expositor.api"
+PROHIBIDOS = (
+    "duckdb",
+    "pyarrow",
+    "numpy",
+    "scipy",
+    "polars",
+    "pandas",
+    "sklearn",
+    "statsmodels",
+    "pyod",
+)
+_LINEA = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _importar(modulo: str) -> tuple[dict[str, tuple[int, int]], list[str]]:
+    """{módulo: (self_us, acumulado_us)} de un import en frío + lo que quedó en el cwd."""
+    raiz = Path(__file__).resolve().parents[2]
+    entorno = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [str(raiz), os.getenv("PYTHONPATH")])
+        ),
+    }
+    with tempfile.TemporaryDirectory() as cwd:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+            cwd=cwd,
+            env=entorno,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if proc.returncode != 0:
+            raise SystemExit(f"falló `import {modulo}`:\n{proc.stderr[-2000:]}")
+        residuos = sorted(os.listdir(cwd))
+    tiempos: dict[str, tuple[int, int]] = {}
+    for linea in proc.stderr.splitlines():
+        m = _LINEA.match(linea)
+        if m:
+            tiempos[m.group(4)] = (int(m.group(1)), int(m.group(2)))
+    return tiempos, residuos
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--modulo", default=MODULO)
+    ap.add_argument("--presupuesto-ms", type=float, default=1200.0)
+    ap.add_argument("--repeticiones", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15)
+    args = ap.parse_args()
+
+    corridas = [_importar(args.modulo) for _ in range(max(1, args.repeticiones))]
+    totales = [t[args.modulo][1] / 1000 for t, _ in corridas]
+    mediana = statistics.median(totales)
+    tiempos, residuos = corridas[totales.index(sorted(totales)[len(totales) // 2])]
+
+    print(
+        f"import {args.modulo}: mediana {mediana:.1f} ms  (min {min(totales):.1f}, max {max(totales):.1f}; "
+        f"presupuesto {args.presupuesto_ms:.0f} ms)"
+    )
+    print("\nmódulos más caros (acumulado, corrida mediana):")
+    for nombre, (propio, acum) in sorted(tiempos.items(), key=lambda kv: -kv[1][1])[
+        : args.top
+    ]:
+        print(f"  {acum / 1000:9.1f} ms  (propio {propio / 1000:7.1f})  {nombre}")
+
+    fallas = []
+    if mediana > args.presupuesto_ms:
+        fallas.append(
+            f"import {mediana:.1f} ms > presupuesto {args.presupuesto_ms:.0f} ms"
+        )
+    cargados = sorted({n.split(".", 1)[0] for n in tiempos} & set(PROHIBIDOS))
+    if cargados:
+        fallas.append(f"dependencias pesadas en el arranque: {', '.join(cargados)}")
+    if residuos:
+        fallas.append(f"el import creó en el cwd: {', '.join(residuos)}")
+    for f in fallas:
+        print(f"REGRESIÓN: {f}")
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# casandra/benchmarks/bench_artefactos.py
+"""
+Paginado de un listado grande de incidentes: re-ejecutar la consulta por cada
+página (LIMIT/OFFSET en DuckDB) vs. escribir el artefacto una vez y rebanar
+el Arrow IPC mapeado en memoria.
+
+Uso:
+    python -m Casandra.benchmarks.bench_artefactos --filas 5000000 --paginas 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+from ..Consultor.repo import Consultor, Filtros, PoolDuckDB, _sql_filas
+from ..Empaquetador.artefactos import AlmacenArtefactos
+from .sintetico import escribir_deposito, generar_tabla
+
+
+DESDE, HASTA = date(2019, 1, 1), date(2025, 8, 13)
+COLUMNAS = ("entidad_id", "delito", "fecha")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--filas", type=int, default=5_000_000)
+    ap.add_argument("--paginas", type=int, default=200)
+    ap.add_argument("--limit", type=int, default=500)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        incidentes = escribir_deposito(
+            generar_tabla(args.filas, DESDE, HASTA), Path(tmp) / "dep"
+        )
+        consultor = Consultor(PoolDuckDB(incidentes))
+        almacen = AlmacenArtefactos(Path(tmp) / "art")
+        filtros = Filtros()
+        rng = random.Random(7)
+        offsets = [
+            rng.randrange(0, args.filas - args.limit) for _ in range(args.paginas)
+        ]
+        cur = consultor.pool.cursor()
+        sql = _sql_filas(filtros.forma(), COLUMNAS) + " LIMIT ? OFFSET ?"
+
+        t0 = time.perf_counter()
+        for off in offsets:
+            cur.execute(sql, filtros.parametros() + [args.limit, off]).fetchall()
+        dt_sql = time.perf_counter() - t0
+
+        lotes = consultor.lotes_incidentes(filtros, COLUMNAS)
+        primero = next(lotes)
+        t0 = time.perf_counter()
+        filas = almacen.guardar(
+            "0" * 24, (b for s in ([primero], lotes) for b in s), primero.schema
+        )
+        dt_escritura = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for off in offsets:
+            almacen.pagina("0" * 24, off, args.limit)
+        dt_mmap = time.perf_counter() - t0
+
+        # Memoria en una pasada aparte: tracemalloc distorsiona los tiempos.
+        tracemalloc.start()
+        for off in offsets:
+            almacen.pagina("0" * 24, off, args.limit)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"filas={filas:,} paginas={args.paginas} limit={args.limit}")
+    print(f"re-consulta    : {dt_sql * 1000 / args.paginas:9.2f} ms/página")
+    print(f"escritura IPC  : {dt_escritura * 1000:9.1f} ms (una vez)")
+    print(
+        f"rebanada mmap  : {dt_mmap * 1000 / args.paginas:9.3f} ms/página"
+        f"  pico {pico / 2**20:6.1f} MB  x{dt_sql / dt_mmap:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# casandra/benchmarks/bench_auditoria.py
+"""
+Eventos/seg del sumidero por lotes vs. el open/append por evento original.
+
+Uso:
+    python -m Casandra.benchmarks.bench_auditoria --eventos 50000 --hilos 4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from ..Celador.auditoria import AuditRecord, SumideroAuditoria
+
+
+def _payload(i: int) -> dict:
+    return {"tool": "demo_rank@1.0.0", "args": {"entidad_id": "GTO.MUN.LEON", "i": i}}
+
+
+def _por_evento(directorio: Path, n: int) -> None:
+    # Réplica de audit() previo: open/json/close por cada evento.
+    out = directorio / "audit_bench.jsonl"
+    for i in range(n):
+        rec = AuditRecord(
+            job_id="a" * 32,
+            when_ms=int(time.time() * 1000),
+            stage="tool.start",
+            payload=_payload(i),
+        )
+        with out.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(rec), ensure_ascii=False, default=str) + "\n")
+
+
+def _por_lotes(sumidero: SumideroAuditoria, n: int) -> None:
+    for i in range(n):
+        sumidero.encolar("a" * 32, int(time.time() * 1000), "tool.start", _payload(i))
+
+
+def _medir(objetivo, args_por_hilo, hilos: int) -> float:
+    ts = [threading.Thread(target=objetivo, args=a) for a in args_por_hilo[:hilos]]
+    t0 = time.perf_counter()
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--eventos", type=int, default=50_000)
+    ap.add_argument("--hilos", type=int, default=4)
+    args = ap.parse_args()
+    por_hilo = args.eventos // args.hilos
+
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        dt_evento = _medir(_por_evento, [(d, por_hilo)] * args.hilos, args.hilos)
+
+        sumidero = SumideroAuditoria(d, queue_max=args.eventos * 2)
+        t0 = time.perf_counter()
+        dt_encolar = _medir(_por_lotes, [(sumidero, por_hilo)] * args.hilos, args.hilos)
+        sumidero.cerrar(timeout=30)
+        dt_total = time.perf_counter() - t0
+        stats = sumidero.stats()
+
+    total = por_hilo * args.hilos
+    print(f"eventos={total} hilos={args.hilos}")
+    print(f"por_evento   : {total / dt_evento:>12,.0f} ev/s")
+    print(
+        f"lotes(encola): {total / dt_encolar:>12,.0f} ev/s  (latencia vista por el request)"
+    )
+    print(f"lotes(total) : {total / dt_total:>12,.0f} ev/s  (incluye drenado a disco)")
+    print(f"stats        : {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# casandra/benchmarks/bench_bitacora.py
+"""
+Bitácora de auditoría: buscar un job y agregar latencias sobre JSONL crudo
+(escaneo + json.loads, como hoy) vs. Parquet compactado (`Celador/bitacora.py`).
+
+Genera `--dias` archivos `audit_<día>.jsonl` sintéticos con `--eventos` líneas
+cada uno, con la forma real de los eventos de `celar` y del Orquestador.
+
+Uso:
+    python -m Casandra.benchmarks.bench_bitacora --dias 30 --eventos 200000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from ..Celador.bitacora import Bitacora
+
+
+TOOLS = (
+    "rank_por_delito@1.1.0",
+    "detectar_patrones@1.0.0",
+    "listar_evidencia@1.0.0",
+    "filtro_fecha@1.0.0",
+)
+CODIGOS = ("INVALID_PAYLOAD", "DATA_QUALITY_ISSUE", "INVALID_DATE_RANGE")
+
+
+def _generar(directorio: Path, dias: int, eventos: int, semilla: int = 11) -> str:
+    """Escribe los JSONL y devuelve un job_id que aparece a mitad del periodo."""
+    rng = random.Random(semilla)
+    inicio = date(2025, 6, 1)
+    buscado = ""
+    for d in range(dias):
+        dia = inicio + timedelta(days=d)
+        base = int(datetime(dia.year, dia.month, dia.day, 0, 0).timestamp() * 1000)
+        lineas = []
+        for i in range(0, eventos, 4):
+            jid = f"{rng.getrandbits(128):032x}"
+            if d == dias // 2 and i == eventos // 2:
+                buscado = jid
+            t = base + i * 86_400_000 // eventos
+            tool = TOOLS[i % len(TOOLS)]
+            ms = int(rng.lognormvariate(3, 1))
+            lineas.append(
+                json.dumps(
+                    {
+                        "job_id": jid,
+                        "when_ms": t,
+                        "stage": "request_in",
+                        "payload": {
+                            "job_id": jid,
+                            "path": "/plan/execute",
+                            "method": "POST",
+                        },
+                    }
+                )
+            )
+            lineas.append(
+                json.dumps(
+                    {
+                        "job_id": jid,
+                        "when_ms": t + 1,
+                        "stage": "tool.start",
+                        "payload": {"tool": tool, "args": {"top_k": 10}},
+                    }
+                )
+            )
+            if rng.random() < 0.03:
+                lineas.append(
+                    json.dumps(
+                        {
+                            "job_id": jid,
+                            "when_ms": t + ms,
+                            "stage": "plan.error",
+                            "payload": {
+                                "component": "orquestador",
+                                "paso": 0,
+                                "tool": tool,
+                                "code": rng.choice(CODIGOS),
+                                "details": "x",
+                            },
+                        }
+                    )
+                )
+            else:
+                lineas.append(
+                    json.dumps(
+                        {
+                            "job_id": jid,
+                            "when_ms": t + ms,
+                            "stage": "tool.ok",
+                            "payload": {"tool": tool, "timing_ms": ms},
+                        }
+                    )
+                )
+            lineas.append(
+                json.dumps(
+                    {
+                        "job_id": jid,
+                        "when_ms": t + ms + 1,
+                        "stage": "request_out",
+                        "payload": {"job_id": jid, "status": 200, "timing_ms": ms + 1},
+                    }
+                )
+            )
+        (directorio / f"audit_{dia.isoformat()}.jsonl").write_text(
+            "\n".join(lineas) + "\n"
+        )
+    return buscado
+
+
+def _escaneo_json(directorio: Path, job_id: str) -> int:
+    n = 0
+    for p in sorted(directorio.glob("audit_*.jsonl")):
+        with p.open("rb") as f:
+            for linea in f:
+                if json.loads(linea)["job_id"] == job_id:
+                    n += 1
+    return n
+
+
+def _mb(rutas) -> float:
+    return sum(p.stat().st_size for p in rutas) / 2**20
+
+
+def _tiempo(fn, repeticiones: int = 5) -> tuple[float, object]:
+    mejor, r = float("inf"), None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        r = fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor * 1000, r
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--dias", type=int, default=30)
+    ap.add_argument("--eventos", type=int, default=200_000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raiz = Path(tmp)
+        job = _generar(raiz, args.dias, args.eventos)
+        print(
+            f"{args.dias} días x {args.eventos:,} eventos = {args.dias * args.eventos:,}  "
+            f"JSONL {_mb(raiz.glob('audit_*.jsonl')):.0f} MB"
+        )
+
+        bit = Bitacora(raiz)
+        ms, n = _tiempo(lambda: _escaneo_json(raiz, job), 1)
+        print(f"job (escaneo json.loads)      : {ms:9.1f} ms  eventos={n}")
+        ms, t = _tiempo(lambda: bit.eventos_job(job), 1)
+        print(f"job (DuckDB sobre JSONL)      : {ms:9.1f} ms  eventos={t.num_rows}")
+        ms, t = _tiempo(lambda: bit.latencias(), 1)
+        print(f"p99 por tool/hora (JSONL)     : {ms:9.1f} ms  grupos={t.num_rows}")
+
+        t0 = time.perf_counter()
+        dias = bit.compactar(antes_de=date(2100, 1, 1))
+        print(
+            f"compactar {len(dias)} días              : {(time.perf_counter() - t0) * 1000:9.1f} ms  "
+            f"Parquet {_mb(raiz.glob('compactado/*/*.parquet')):.0f} MB"
+        )
+
+        ms, t = _tiempo(lambda: bit.eventos_job(job))
+        print(f"job (Parquet compactado)      : {ms:9.1f} ms  eventos={t.num_rows}")
+        ms, t = _tiempo(lambda: bit.latencias())
+        print(f"p99 por tool/hora (Parquet)   : {ms:9.1f} ms  grupos={t.num_rows}")
+        ms, t = _tiempo(lambda: bit.errores())
+        print(f"errores por etapa (Parquet)   : {ms:9.1f} ms  grupos={t.num_rows}")
+
+
+if __name__ == "__main__":
+    main()
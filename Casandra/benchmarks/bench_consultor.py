@@ -0,0 +1,98 @@
+# casandra/benchmarks/bench_consultor.py
+"""
+N consultas paralelas contra el Consultor (cursor por hilo) vs. una sola
+conexión DuckDB compartida con lock y vs. abrir una conexión por consulta,
+sobre un Depósito sintético.
+
+Uso:
+    python -m Casandra.benchmarks.bench_consultor --filas 2000000 --consultas 400 --hilos 8
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from ..Consultor.repo import Consultor, Filtros, PoolDuckDB, _sql_conteo, _tabla
+from .sintetico import DELITOS, ENTIDADES_GTO, escribir_deposito, generar_tabla
+
+
+def _filtros(n: int, semilla: int = 11) -> list[Filtros]:
+    rng = np.random.default_rng(semilla)
+    out = []
+    for _ in range(n):
+        d1 = date(2022, 1, 1) + timedelta(days=int(rng.integers(0, 1200)))
+        out.append(
+            Filtros(
+                entidad_ids=(ENTIDADES_GTO[int(rng.integers(0, len(ENTIDADES_GTO)))],),
+                desde=d1,
+                hasta=d1 + timedelta(days=30),
+                delitos=(DELITOS[int(rng.integers(0, len(DELITOS)))],),
+            )
+        )
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--filas", type=int, default=2_000_000)
+    ap.add_argument("--consultas", type=int, default=400)
+    ap.add_argument("--hilos", type=int, default=8)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        incidentes = escribir_deposito(generar_tabla(args.filas), Path(tmp))
+        filtros = _filtros(args.consultas)
+
+        pool = PoolDuckDB(incidentes)
+        consultor = Consultor(pool)
+        consultor.conteo_por(filtros[0])  # calentamiento
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(args.hilos) as ex:
+            list(ex.map(consultor.conteo_por, filtros))
+        dt_pool = time.perf_counter() - t0
+
+        compartida = pool.cursor()  # una sola conexión para todos, con lock
+        lock = threading.Lock()
+
+        def _serial(f: Filtros):
+            with lock:
+                return _tabla(
+                    compartida.execute(
+                        _sql_conteo(f.forma(), ("entidad_id",)), f.parametros()
+                    )
+                )
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(args.hilos) as ex:
+            list(ex.map(_serial, filtros))
+        dt_lock = time.perf_counter() - t0
+        pool.cerrar()
+
+        def _nueva(f: Filtros):
+            p = PoolDuckDB(incidentes)
+            try:
+                return Consultor(p).conteo_por(f)
+            finally:
+                p.cerrar()
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(args.hilos) as ex:
+            list(ex.map(_nueva, filtros))
+        dt_nueva = time.perf_counter() - t0
+
+    print(f"filas={args.filas:,} consultas={args.consultas} hilos={args.hilos}")
+    print(f"cursor por hilo      : {args.consultas / dt_pool:>8,.0f} q/s")
+    print(f"conexión con lock    : {args.consultas / dt_lock:>8,.0f} q/s")
+    print(f"conexión por consulta: {args.consultas / dt_nueva:>8,.0f} q/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# casandra/benchmarks/bench_cubo.py
+"""
+Ranking de entidades en ventanas deslizantes de 30 días: cubo de sumas prefijo
+(mmap) vs. `conteo_por` del Consultor sobre Parquet, en un Depósito sintético.
+
+Uso:
+    python -m Casandra.benchmarks.bench_cubo --filas 5000000 --ventanas 200
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from ..Consultor.cubo import CuboConteos
+from ..Consultor.repo import Consultor, Filtros, PoolDuckDB
+from ..Etl.cubo import construir_cubo
+from ..Etl.deposito import Manifest
+from .sintetico import DELITOS, escribir_deposito, generar_tabla
+
+
+DESDE, HASTA = date(2019, 1, 1), date(2025, 8, 13)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--filas", type=int, default=5_000_000)
+    ap.add_argument("--ventanas", type=int, default=200)
+    ap.add_argument("--top-k", type=int, default=10)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deposito = Path(tmp)
+        incidentes = escribir_deposito(
+            generar_tabla(args.filas, DESDE, HASTA), deposito
+        )
+        manifest = Manifest(
+            dataset_version="bench", min_date=str(DESDE), max_date=str(HASTA)
+        )
+
+        t0 = time.perf_counter()
+        directorio = construir_cubo(deposito, manifest)
+        dt_build = time.perf_counter() - t0
+        cubo = CuboConteos(directorio)
+        consultor = Consultor(PoolDuckDB(incidentes))
+
+        paso = max(1, ((HASTA - DESDE).days - 30) // args.ventanas)
+        filtros = [
+            Filtros(desde=d, hasta=d + timedelta(days=29), delitos=(DELITOS[i % 3],))
+            for i, d in enumerate(
+                DESDE + timedelta(days=k * paso) for k in range(args.ventanas)
+            )
+        ]
+        consultor.conteo_por(filtros[0], limite=args.top_k + 1)  # calentamiento
+
+        t0 = time.perf_counter()
+        sql = [
+            consultor.conteo_por(f, ("entidad_id",), limite=args.top_k)
+            .column("entidad_id")
+            .to_pylist()
+            for f in filtros
+        ]
+        dt_sql = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        rap = [
+            [k for k, _, _ in cubo.ranking(f, "entidad_id", args.top_k)[0]]
+            for f in filtros
+        ]
+        dt_cubo = time.perf_counter() - t0
+        assert rap == sql, "el cubo y el SQL no coinciden"
+
+    mb = cubo.acumulado.nbytes / (1 << 20)
+    print(f"filas={args.filas:,} ventanas={args.ventanas} top_k={args.top_k}")
+    print(
+        f"cubo {tuple(cubo.acumulado.shape)} {cubo.acumulado.dtype}: {mb:.1f} MB, construido en {dt_build:.2f}s"
+    )
+    print(f"SQL (Parquet) : {dt_sql / args.ventanas * 1000:>8.2f} ms/ventana")
+    print(
+        f"cubo (mmap)   : {dt_cubo / args.ventanas * 1000:>8.3f} ms/ventana  x{dt_sql / dt_cubo:,.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
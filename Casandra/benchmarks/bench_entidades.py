@@ -0,0 +1,120 @@
+# casandra/benchmarks/bench_entidades.py
+"""
+Jerarquía de entidades (`Consultor/entidades.py`) sobre un universo
+sintético de `--estados` x `--municipios` entidades:
+
+- construcción (códigos, rangos de hijos) y primer índice de nombres;
+- hijos de un estado: slice de la jerarquía vs. recorrer el universo
+  comparando prefijos (lo que hacía `es_hijo`);
+- resolución de nombres libres: exacto normalizado y con un error de tipeo.
+
+Uso:
+    python -m Casandra.benchmarks.bench_entidades --estados 32 --municipios 80   # ~2,500: escala de México
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from ..Consultor.entidades import JerarquiaEntidades, nombre_de_id
+
+
+_SILABAS = (
+    "ca",
+    "ma",
+    "re",
+    "to",
+    "lo",
+    "sa",
+    "pa",
+    "ne",
+    "gui",
+    "chi",
+    "tla",
+    "co",
+    "xo",
+    "te",
+    "pe",
+)
+
+
+def _universo(estados: int, municipios: int, semilla: int = 7) -> list[str]:
+    rng = random.Random(semilla)
+    ids = []
+    for k in range(estados):
+        pref = "".join(chr(65 + (k // 26**j) % 26) for j in range(3))
+        ids.append(f"{pref}.EST.{pref}")
+        for m in range(municipios):
+            nombre = "_".join(
+                "".join(rng.choice(_SILABAS) for _ in range(rng.randint(2, 4)))
+                for _ in range(rng.randint(1, 3))
+            )
+            ids.append(f"{pref}.MUN.{nombre.upper()}_{m}")
+    return ids
+
+
+def _us(fn, n: int) -> float:
+    tiempos = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        tiempos.append((time.perf_counter() - t0) / n * 1e6)
+    return statistics.median(tiempos)
+
+
+def _tipeo(texto: str, rng: random.Random) -> str:
+    i = rng.randrange(len(texto))
+    return texto[:i] + texto[i + 1 :]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--estados", type=int, default=32)
+    ap.add_argument("--municipios", type=int, default=80)
+    ap.add_argument("--n", type=int, default=20_000)
+    args = ap.parse_args()
+
+    ids = _universo(args.estados, args.municipios)
+    t0 = time.perf_counter()
+    jer = JerarquiaEntidades(ids)
+    dt_armar = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    jer.buscar("x")
+    dt_indice = (time.perf_counter() - t0) * 1000
+    print(
+        f"{len(jer):,} entidades: jerarquía {dt_armar:.1f} ms, índice de nombres {dt_indice:.1f} ms"
+    )
+
+    padre = jer.ids[len(jer.ids) // 2].split(".", 1)[0]
+    padre = f"{padre}.EST.{padre}"
+    pref = padre.split(".", 1)[0] + ".MUN."
+    assert list(jer.hijos(padre)) == sorted(e for e in ids if e.startswith(pref))
+    n = max(1, args.n // 100)
+    print(f"\nhijos de {padre} ({len(jer.hijos(padre))}):")
+    print(f"  slice de la jerarquía : {_us(lambda: jer.hijos(padre), n):10.2f} µs")
+    print(
+        f"  recorrer el universo  : {_us(lambda: [e for e in jer.ids if e.startswith(pref)], n):10.2f} µs"
+    )
+
+    rng = random.Random(3)
+    muestra = [jer.ids[rng.randrange(len(jer.ids))] for _ in range(256)]
+    nombres = [nombre_de_id(e) for e in muestra]
+    unicos = [t for t, e in zip(nombres, muestra) if jer.buscar(t) == (e,)]
+    tipeos = [_tipeo(t, rng) for t in unicos]
+    acertados = sum(1 for t, e in zip(tipeos, muestra) if e in jer.buscar(t))
+    it = iter(range(1 << 62))
+    print(f"\nresolución ({len(unicos)} nombres sin homónimos):")
+    print(
+        f"  exacto    : {_us(lambda: jer.resolver(unicos[next(it) % len(unicos)]), args.n):8.3f} µs"
+    )
+    print(
+        f"  con tipeo : {_us(lambda: jer.buscar(tipeos[next(it) % len(tipeos)]), args.n // 10):8.3f} µs  "
+        f"(candidato correcto en {acertados}/{len(tipeos)})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# casandra/benchmarks/bench_espacial.py
+"""
+Índice espacial (`Etl/espacial.py`, `Consultor/espacial.py`) sobre incidentes
+sintéticos con coordenadas y los 46 polígonos municipales de `sintetico`:
+
+- punto -> municipio de `--puntos` incidentes: por punto (cajas + cruces),
+  numpy sin índice (cada polígono contra todos los puntos; ambos sobre una
+  muestra y extrapolados), R-tree de polígonos (`Poligonos.asignar`) y,
+  si está instalado, el STRtree de shapely como referencia;
+- construcción del índice (R-tree de puntos + malla de 7 niveles);
+- conteos por celda en cajas × ventanas al azar: malla (slice por fechas),
+  R-tree de puntos y escaneo numpy de todos los puntos. Los tres deben coincidir.
+
+Uso:
+    python -m Casandra.benchmarks.bench_espacial --puntos 2000000 --consultas 200
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+from ..Analisis.Espacial.poligonos import Poligonos
+from ..Consultor.espacial import IndiceEspacial, Malla
+from ..Etl.deposito import Manifest
+from ..Etl.espacial import construir_espacial
+from .sintetico import ENTIDADES_GTO, escribir_deposito, generar_tabla, geografia
+
+
+DESDE, HASTA = date(2021, 1, 1), date(2025, 8, 13)
+
+
+def _por_punto(poligonos: Poligonos, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    cajas = poligonos.cajas
+    codigo = np.full(x.size, -1, dtype=np.int32)
+    for i in range(x.size):
+        for p in range(len(poligonos)):
+            c = cajas[p]
+            if (
+                c[0] <= x[i] <= c[2]
+                and c[1] <= y[i] <= c[3]
+                and poligonos.contiene(p, x[i : i + 1], y[i : i + 1])[0]
+            ):
+                codigo[i] = p
+                break
+    return codigo
+
+
+def _sin_indice(poligonos: Poligonos, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    codigo = np.full(x.size, -1, dtype=np.int32)
+    for p in reversed(
+        range(len(poligonos))
+    ):  # el menor escribe al final, como `asignar`
+        codigo[poligonos.contiene(p, x, y)] = p
+    return codigo
+
+
+def _shapely(geo, ids: list[str], x: np.ndarray, y: np.ndarray):
+    try:
+        import shapely
+    except ImportError:
+        return None
+    t0 = time.perf_counter()
+    poligonos = [shapely.Polygon(geo.poligonos[e]) for e in ids]
+    arbol = shapely.STRtree(poligonos)
+    punto, pol = arbol.query(shapely.points(x, y), predicate="intersects")
+    codigo = np.full(x.size, -1, dtype=np.int32)
+    codigo[punto[::-1]] = pol[::-1]
+    return codigo, time.perf_counter() - t0
+
+
+def _conteos(indice: IndiceEspacial, malla: Malla, pos: np.ndarray) -> np.ndarray:
+    """Conteos de `malla` con los puntos `pos`, con la misma asignación a celdas que la ETL."""
+    e = indice.ejes
+    xy = np.asarray(indice.xy[pos])
+    c = (
+        np.floor((xy[:, 0] - e.lon0) / e.celda).astype(np.int64) >> malla.nivel
+    ) - round((malla.lon0 - e.lon0) / malla.celda)
+    f = (
+        np.floor((xy[:, 1] - e.lat0) / e.celda).astype(np.int64) >> malla.nivel
+    ) - round((malla.lat0 - e.lat0) / malla.celda)
+    alto, ancho = malla.conteos.shape
+    ok = (c >= 0) & (c < ancho) & (f >= 0) & (f < alto)
+    pesos = np.asarray(indice.eventos[pos])[ok]
+    return (
+        np.bincount(f[ok] * ancho + c[ok], weights=pesos, minlength=alto * ancho)
+        .astype(np.int64)
+        .reshape(alto, ancho)
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--puntos", type=int, default=2_000_000)
+    ap.add_argument(
+        "--muestra", type=int, default=20_000, help="puntos para los métodos sin índice"
+    )
+    ap.add_argument("--consultas", type=int, default=200)
+    ap.add_argument("--semilla", type=int, default=7)
+    args = ap.parse_args()
+
+    geo = geografia(args.semilla)
+    tabla = generar_tabla(args.puntos, DESDE, HASTA, args.semilla, coordenadas=True)
+    x = tabla.column("lon").to_numpy()
+    y = tabla.column("lat").to_numpy()
+
+    # --- punto -> municipio ---
+    t0 = time.perf_counter()
+    poligonos, orden = Poligonos.desde_anillos(
+        [[geo.poligonos[e]] for e in ENTIDADES_GTO]
+    )
+    dt_poligonos = time.perf_counter() - t0
+    ids = [ENTIDADES_GTO[int(i)] for i in orden]
+
+    t0 = time.perf_counter()
+    codigo = poligonos.asignar(x, y)
+    dt_arbol = time.perf_counter() - t0
+
+    m = min(args.muestra, x.size)
+    t0 = time.perf_counter()
+    bruto = _sin_indice(poligonos, x[:m], y[:m])
+    dt_bruto = (time.perf_counter() - t0) * x.size / m
+    mp = max(1, m // 10)
+    t0 = time.perf_counter()
+    uno = _por_punto(poligonos, x[:mp], y[:mp])
+    dt_punto = (time.perf_counter() - t0) * x.size / mp
+    assert np.array_equal(bruto, codigo[:m]) and np.array_equal(
+        uno, codigo[:mp]
+    ), "asignaciones distintas"
+
+    sin_municipio = float((codigo < 0).mean())
+
+    print(
+        f"puntos={x.size:,} polígonos={len(poligonos)} ({poligonos.xy.shape[0]:,} vértices, {dt_poligonos * 1000:.1f} ms)"
+    )
+    print("\npunto -> municipio:")
+    print(f"  por punto (cajas + cruces) : {dt_punto:>9.2f} s  (extrapolado de {mp:,})")
+    print(f"  numpy sin índice           : {dt_bruto:>9.2f} s  (extrapolado de {m:,})")
+    print(
+        f"  R-tree de polígonos        : {dt_arbol:>9.2f} s  {x.size / dt_arbol:>12,.0f} puntos/s  x{dt_bruto / dt_arbol:,.1f}"
+    )
+    ref = _shapely(geo, ids, x, y)
+    if ref is not None:
+        iguales = float((ref[0] == codigo).mean())
+        print(
+            f"  shapely STRtree            : {ref[1]:>9.2f} s  {x.size / ref[1]:>12,.0f} puntos/s  (coincide {iguales:.4%})"
+        )
+    print(f"  sin municipio: {sin_municipio:.2%}")
+
+    # --- índice y consultas ---
+    with tempfile.TemporaryDirectory() as tmp:
+        deposito = Path(tmp)
+        escribir_deposito(
+            tabla.append_column("id", pa.array(np.arange(x.size, dtype=np.int64))),
+            deposito,
+        )
+        del tabla
+        manifest = Manifest(
+            dataset_version="bench", min_date=str(DESDE), max_date=str(HASTA)
+        )
+        t0 = time.perf_counter()
+        directorio = construir_espacial(deposito, manifest)
+        dt_build = time.perf_counter() - t0
+        indice = IndiceEspacial(directorio)
+        todos = np.arange(indice.ejes.puntos)
+
+        rng = np.random.default_rng(args.semilla)
+        x0, y0, x1, y1 = indice.extension()
+        consultas = []
+        for _ in range(args.consultas):
+            lado = rng.uniform(0.05, 0.6)
+            cx, cy = rng.uniform(x0, x1 - lado), rng.uniform(y0, y1 - lado)
+            d1 = DESDE + timedelta(
+                days=int(rng.integers(0, (HASTA - DESDE).days - 365))
+            )
+            consultas.append(
+                (
+                    (cx, cy, cx + lado, cy + lado),
+                    d1,
+                    d1 + timedelta(days=int(rng.integers(7, 365))),
+                )
+            )
+
+        t0 = time.perf_counter()
+        mallas = [indice.malla(caja, d1, d2) for caja, d1, d2 in consultas]
+        dt_malla = time.perf_counter() - t0
+
+        def alineada(mm: Malla):
+            alto, ancho = mm.conteos.shape
+            return (
+                mm.lon0,
+                mm.lat0,
+                mm.lon0 + ancho * mm.celda,
+                mm.lat0 + alto * mm.celda,
+            )
+
+        t0 = time.perf_counter()
+        por_arbol = [
+            _conteos(indice, mm, indice.puntos(alineada(mm), d1, d2))
+            for mm, (_, d1, d2) in zip(mallas, consultas)
+        ]
+        dt_arbol_q = time.perf_counter() - t0
+
+        dia = np.asarray(indice.dia)
+        t0 = time.perf_counter()
+        por_escaneo = []
+        for mm, (_, d1, d2) in zip(mallas, consultas):
+            t1, t2 = (d1 - indice.ejes.dia0).days, (d2 - indice.ejes.dia0).days
+            por_escaneo.append(_conteos(indice, mm, todos[(dia >= t1) & (dia <= t2)]))
+        dt_escaneo = time.perf_counter() - t0
+
+        for mm, a, b in zip(mallas, por_arbol, por_escaneo):
+            assert np.array_equal(mm.conteos, a) and np.array_equal(
+                mm.conteos, b
+            ), "la malla y los puntos no coinciden"
+        niveles = np.bincount(
+            [mm.nivel for mm in mallas], minlength=indice.ejes.niveles
+        )
+        mb = sum(f.stat().st_size for f in directorio.iterdir()) / (1 << 20)
+
+    n = args.consultas
+    print(
+        f"\níndice: {mb:.1f} MB, construido en {dt_build:.2f}s; malla {indice.ejes.columnas}×{indice.ejes.filas} en el nivel 0"
+    )
+    print(
+        f"conteos por celda, {n} cajas × ventanas (niveles usados {niveles.tolist()}):"
+    )
+    print(f"  escaneo numpy    : {dt_escaneo / n * 1000:>8.2f} ms/consulta")
+    print(
+        f"  R-tree de puntos : {dt_arbol_q / n * 1000:>8.2f} ms/consulta  x{dt_escaneo / dt_arbol_q:,.1f}"
+    )
+    print(
+        f"  malla (mmap)     : {dt_malla / n * 1000:>8.3f} ms/consulta  x{dt_escaneo / dt_malla:,.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# casandra/benchmarks/bench_flujo.py
+"""
+Listado completo de incidentes: Sobre JSON armado en memoria vs. streaming
+NDJSON / Arrow IPC desde el iterador de lotes del Consultor.
+
+Mide tiempo al primer byte (TTFB), tiempo total, bytes y pico de RSS. Cada
+modo corre en un subproceso propio para que el pico de RSS no se contamine.
+
+Uso:
+    python -m Casandra.benchmarks.bench_flujo --filas 5000000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import msgspec
+
+from ..Consultor.repo import Consultor, Filtros, PoolDuckDB
+from ..dominio.sobre import DataInline, Resumen, SobreData, SobreMeta, SobreOk
+from ..Empaquetador.flujo import Flujo, codificar, columnas
+from .sintetico import escribir_deposito, generar_tabla
+
+
+DESDE, HASTA = date(2019, 1, 1), date(2025, 8, 13)
+COLUMNAS = ("entidad_id", "delito", "fecha")
+MODOS = ("json", "ndjson", "arrow")
+
+
+def _correr(modo: str, incidentes: Path) -> dict:
+    consultor = Consultor(PoolDuckDB(incidentes))
+    filtros = Filtros()
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    ttfb = None
+    total = 0
+
+    if modo == "json":
+        tabla = consultor.incidentes(filtros, COLUMNAS)
+        cols = [c.to_pylist() for c in tabla.columns]
+        sobre = SobreOk(
+            tool="bench",
+            summary=Resumen(headline=f"{tabla.num_rows} filas"),
+            data=SobreData(
+                inline=DataInline(
+                    columns=columnas(tabla.schema), rows=[list(f) for f in zip(*cols)]
+                )
+            ),
+        )
+        cuerpo = msgspec.json.encode(sobre)
+        ttfb = time.perf_counter() - t0  # el primer byte sale con el cuerpo completo
+        total = len(cuerpo)
+    else:
+        flujo = Flujo(
+            tool="bench",
+            meta=SobreMeta(),
+            esquema=consultor.incidentes(filtros, COLUMNAS, limite=0).schema,
+            lotes=consultor.lotes_incidentes(filtros, COLUMNAS),
+            resumen=lambda n: Resumen(headline=f"{n} filas"),
+        )
+        for trozo in codificar(flujo, modo):  # type: ignore[arg-type]
+            if ttfb is None:
+                ttfb = time.perf_counter() - t0
+            total += len(trozo)
+
+    return {
+        "modo": modo,
+        "ttfb_ms": round(ttfb * 1000, 2),
+        "total_ms": round((time.perf_counter() - t0) * 1000, 1),
+        "bytes": total,
+        "rss_pico_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "rss_delta_mb": round(
+            (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base) / 1024, 1
+        ),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--filas", type=int, default=5_000_000)
+    ap.add_argument("--modo", choices=MODOS, help=argparse.SUPPRESS)
+    ap.add_argument("--incidentes", type=Path, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.modo:
+        print(json.dumps(_correr(args.modo, args.incidentes)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        incidentes = escribir_deposito(
+            generar_tabla(args.filas, DESDE, HASTA), Path(tmp)
+        )
+        print(f"filas={args.filas:,}")
+        for modo in MODOS:
+            salida = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    __spec__.name,
+                    "--modo",
+                    modo,
+                    "--incidentes",
+                    str(incidentes),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            r = json.loads(salida.strip().splitlines()[-1])
+            print(
+                f"{modo:7s}: TTFB {r['ttfb_ms']:9.1f} ms  total {r['total_ms']:8.1f} ms  "
+                f"{r['bytes'] / 2**20:7.1f} MB  RSS pico {r['rss_pico_mb']:7.1f} MB (+{r['rss_delta_mb']})"
+            )
+
+
+if __name__ == "__main__":
+    main()
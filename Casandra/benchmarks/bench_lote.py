@@ -0,0 +1,157 @@
+# casandra/benchmarks/bench_lote.py
+"""
+Ráfaga de planes casi idénticos (lo que emite una sesión LLM): el mismo
+`[filtro_fecha, filtro_tipo|enfoque_entidad, rank_por_delito]` para cada
+delito o para cada municipio. Compara N llamadas secuenciales a
+`/plan/execute` contra una sola a `/plan/batch` (dedupe + escaneo
+compartido + ejecución concurrente), sobre la app completa (TestClient), y
+verifica que ambas rutas den los mismos Sobres.
+
+Uso:
+    python -m Casandra.benchmarks.bench_lote --filas 3000000 --repeticiones 5
+    python -m Casandra.benchmarks.bench_lote --deposito ./data/deposito
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Optional
+
+# Sin imports de Casandra a nivel de módulo: el entorno (CASANDRA_*_DIR) debe
+# quedar fijado antes de que se resuelvan los directorios.
+
+DESDE, HASTA = date(2023, 1, 1), date(2024, 12, 31)
+
+
+def _plan(filtro: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "plan": [
+            {
+                "tool_id": 2,
+                "tool_version": "1.0.0",
+                "args": {"from": DESDE.isoformat(), "to": HASTA.isoformat()},
+            },
+            filtro,
+            {
+                "tool_id": 6,
+                "tool_version": "1.1.0",
+                "args": {"top_k": 5, "por": "entidad_id"},
+            },
+        ]
+    }
+
+
+def _clave(respuesta: dict[str, Any]) -> list:
+    return [
+        (s.get("summary"), s.get("data", {}).get("inline", {}).get("rows"))
+        for s in respuesta["sobres"]
+    ]
+
+
+def _medir(fn, repeticiones: int) -> float:
+    fn()  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos) * 1000
+
+
+def _escenario(
+    cliente, nombre: str, planes: list[dict[str, Any]], repeticiones: int
+) -> None:
+    def secuencial() -> list:
+        return [cliente.post("/plan/execute", json=p).json() for p in planes]
+
+    def lote() -> list:
+        r = cliente.post("/plan/batch", json={"planes": planes}).json()
+        return [x["respuesta"] for x in r["resultados"]]
+
+    sec, lot = secuencial(), lote()
+    assert [_clave(r) for r in sec] == [
+        _clave(r) for r in lot
+    ], "el lote difiere de las llamadas sueltas"
+    errores = sum(1 for r in lot if r["status"] != "ok")
+    dt_sec = _medir(secuencial, repeticiones)
+    dt_lot = _medir(lote, repeticiones)
+    print(f"\n{nombre}: {len(planes)} planes ({errores} con error)")
+    print(
+        f"  secuencial : {dt_sec:>8.1f} ms  ({len(planes) * 1000 / dt_sec:7.1f} planes/s)"
+    )
+    print(
+        f"  lote       : {dt_lot:>8.1f} ms  ({len(planes) * 1000 / dt_lot:7.1f} planes/s)  x{dt_sec / dt_lot:.1f}"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--filas", type=int, default=3_000_000)
+    ap.add_argument(
+        "--deposito",
+        type=Path,
+        default=None,
+        help="Depósito existente (si no, uno sintético)",
+    )
+    ap.add_argument("--municipios", type=int, default=46)
+    ap.add_argument("--repeticiones", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_p = Path(tmp)
+        os.environ["CASANDRA_AUDIT_DIR"] = str(tmp_p / "audit")
+        os.environ["CASANDRA_CACHE_DIR"] = str(tmp_p / "cache")
+        os.environ["CASANDRA_ARTEFACTOS_DIR"] = str(tmp_p / "artefactos")
+        deposito: Optional[Path] = args.deposito
+        if deposito is None:
+            deposito = tmp_p / "deposito"
+            os.environ["CASANDRA_DEPOSITO_DIR"] = str(deposito)
+            from .sintetico import generar_deposito
+
+            t0 = time.perf_counter()
+            generar_deposito(args.filas, deposito, date(2021, 1, 1), date(2025, 8, 13))
+            print(
+                f"deposito sintético: {args.filas:,} filas en {time.perf_counter() - t0:.1f} s",
+                file=sys.stderr,
+            )
+        else:
+            os.environ["CASANDRA_DEPOSITO_DIR"] = str(deposito)
+
+        from fastapi.testclient import TestClient
+
+        from ..Expositor.api import crear_app
+        from ..Herramientas.catalogo import obtener_servicio_catalogo
+
+        with TestClient(crear_app()) as cliente:
+            spec = obtener_servicio_catalogo().actual().spec
+            print(
+                f"ventana={DESDE}..{HASTA}  {len(spec.delitos)} delitos, {len(spec.entidades)} entidades"
+            )
+            por_delito = [
+                _plan({"tool_id": 3, "tool_version": "1.0.0", "args": {"delitos": [d]}})
+                for d in spec.delitos
+            ]
+            por_entidad = [
+                _plan(
+                    {"tool_id": 1, "tool_version": "1.0.0", "args": {"entidad_id": e}}
+                )
+                for e in spec.entidades[: args.municipios]
+            ]
+            _escenario(cliente, "rank por delito", por_delito, args.repeticiones)
+            _escenario(cliente, "rank por municipio", por_entidad, args.repeticiones)
+            _escenario(
+                cliente,
+                "rank por delito, cada plan x3",
+                por_delito * 3,
+                args.repeticiones,
+            )
+
+
+if __name__ == "__main__":
+    main()
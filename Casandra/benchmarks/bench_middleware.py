@@ -0,0 +1,82 @@
+# casandra/benchmarks/bench_middleware.py
+"""
+Requests/seg sobre `/demo/rank` con el JobIdMiddleware ASGI puro vs. la
+versión previa basada en BaseHTTPMiddleware (reproducida aquí).
+
+Uso:
+    python -m Casandra.benchmarks.bench_middleware --requests 3000 --concurrencia 32
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from ..Celador.auditoria import audit, cerrar_auditoria, set_job_id
+from ..Expositor import api
+from ..Expositor.middleware import JobIdMiddleware
+
+
+class _JobIdMiddlewareBase(BaseHTTPMiddleware):
+    # Comportamiento original: call_next + headers sobre el Response.
+    async def dispatch(self, request: Request, call_next):
+        jid = set_job_id(None)
+        audit(
+            "request_in",
+            {"job_id": jid, "path": request.url.path, "method": request.method},
+        )
+        resp = await call_next(request)
+        resp.headers["X-Job-Id"] = jid
+        audit("response_out", {"job_id": jid, "status_code": resp.status_code})
+        return resp
+
+
+def _app_con(middleware: type) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware)
+    app.add_api_route("/demo/rank", api.demo_rank_http, methods=["GET"])
+    return app
+
+
+async def _carga(app: FastAPI, n: int, concurrencia: int) -> float:
+    params = {"entidad_id": "GTO.MUN.LEON", "from": "2024-02-01", "to": "2025-01-01"}
+    transport = httpx.ASGITransport(app=app)
+    sem = asyncio.Semaphore(concurrencia)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def uno() -> None:
+            async with sem:
+                r = await client.get("/demo/rank", params=params)
+                assert r.headers["X-Job-Id"]
+
+        await uno()  # calentamiento
+        t0 = time.perf_counter()
+        await asyncio.gather(*(uno() for _ in range(n)))
+        return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--requests", type=int, default=3000)
+    ap.add_argument("--concurrencia", type=int, default=32)
+    args = ap.parse_args()
+
+    for nombre, mw in (
+        ("BaseHTTPMiddleware", _JobIdMiddlewareBase),
+        ("ASGI puro", JobIdMiddleware),
+    ):
+        dt = asyncio.run(_carga(_app_con(mw), args.requests, args.concurrencia))
+        print(f"{nombre:<20}: {args.requests / dt:>10,.0f} req/s")
+    cerrar_auditoria()
+
+
+if __name__ == "__main__":
+    main()
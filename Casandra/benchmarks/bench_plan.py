@@ -0,0 +1,121 @@
+# casandra/benchmarks/bench_plan.py
+"""
+Plan `[filtros...] -> [rank_por_delito]` ejecutado por el Orquestador (filtros
+fusionados y empujados al Consultor) vs. paso a paso (cada filtro materializa
+una tabla Arrow y se la pasa al siguiente), sobre un Depósito sintético de
+varios años.
+
+Uso:
+    python -m Casandra.benchmarks.bench_plan --filas 5000000 --repeticiones 20
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ..Consultor.metadata import ServicioMetadata, registrar_proveedores
+from ..Consultor.repo import Consultor, Filtros, PoolDuckDB
+from ..Orquestador.core import ejecutar_plan
+from ..Orquestador.plan import PasoPlan, Plan
+from .sintetico import DELITOS, ENTIDADES_GTO, escribir_deposito, generar_tabla
+
+
+ENTIDAD = ENTIDADES_GTO[3]
+DESDE, HASTA = date(2023, 1, 1), date(2023, 12, 31)
+TIPOS = list(DELITOS[:3])
+
+PASOS = {
+    "entidad": PasoPlan(1, "1.0.0", {"entidad_id": ENTIDAD}),
+    "fecha": PasoPlan(2, "1.0.0", {"from": DESDE.isoformat(), "to": HASTA.isoformat()}),
+    "tipo": PasoPlan(3, "1.0.0", {"delitos": TIPOS}),
+}
+RANK = PasoPlan(6, "1.1.0", {"top_k": 10})
+
+
+def _paso_a_paso(consultor: Consultor, orden: list[str]) -> list[int]:
+    """Ejecución ingenua: el primer filtro lee, los demás filtran en memoria."""
+    tabla: pa.Table | None = None
+    filas = []
+    for nombre in orden:
+        if tabla is None:
+            f = {
+                "entidad": Filtros(entidad_ids=(ENTIDAD,)),
+                "fecha": Filtros(desde=DESDE, hasta=HASTA),
+                "tipo": Filtros(delitos=tuple(TIPOS)),
+            }[nombre]
+            tabla = consultor.incidentes(f)
+        elif nombre == "entidad":
+            tabla = tabla.filter(pc.equal(tabla["entidad_id"], ENTIDAD))
+        elif nombre == "fecha":
+            tabla = tabla.filter(
+                pc.and_(
+                    pc.greater_equal(tabla["fecha"], pa.scalar(DESDE)),
+                    pc.less_equal(tabla["fecha"], pa.scalar(HASTA)),
+                )
+            )
+        else:
+            tabla = tabla.filter(pc.is_in(tabla["delito"], pa.array(TIPOS)))
+        filas.append(tabla.num_rows)
+
+    rank = (
+        tabla.group_by("delito")
+        .aggregate([("eventos", "sum")])
+        .sort_by([("eventos_sum", "descending"), ("delito", "ascending")])
+        .slice(0, 10)
+    )
+    filas.append(rank.num_rows)
+    return filas
+
+
+def _medir(fn, repeticiones: int) -> float:
+    fn()  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos) * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--filas", type=int, default=5_000_000)
+    ap.add_argument("--repeticiones", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deposito = Path(tmp)
+        incidentes = escribir_deposito(
+            generar_tabla(args.filas, date(2019, 1, 1), date(2025, 8, 13)), deposito
+        )
+        registrar_proveedores(ServicioMetadata(deposito))
+        consultor = Consultor(PoolDuckDB(incidentes))
+
+        print(f"filas={args.filas:,} entidad={ENTIDAD} ventana={DESDE}..{HASTA}")
+        for orden in (["entidad", "fecha", "tipo"], ["fecha", "entidad", "tipo"]):
+            plan = Plan(plan=[PASOS[n] for n in orden] + [RANK])
+            respuesta, _ = ejecutar_plan(plan, consultor)
+            assert respuesta.status == "ok", respuesta
+            esperado = _paso_a_paso(consultor, orden)
+            obtenido = [
+                int(s.summary.headline.split()[0].replace(",", ""))
+                for s in respuesta.sobres[:-1]
+            ]
+            assert obtenido == esperado[:-1], (obtenido, esperado)
+
+            dt_fus = _medir(lambda: ejecutar_plan(plan, consultor), args.repeticiones)
+            dt_seq = _medir(lambda: _paso_a_paso(consultor, orden), args.repeticiones)
+            print(f"\n{' -> '.join(orden)} -> rank   filas por paso={esperado[:-1]}")
+            print(f"  fusionado   : {dt_fus:>8.1f} ms (p50)")
+            print(f"  paso a paso : {dt_seq:>8.1f} ms (p50)  x{dt_seq / dt_fus:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# casandra/benchmarks/bench_procesos.py
+"""
+Tool CPU-bound bajo `celar`: inline (hilo del request, retiene el GIL) vs.
+`cpu_bound=True` (pool de procesos). Mientras `--pesadas` hilos ejecutan la
+tool pesada, se mide la latencia de una tarea liviana en otro hilo: es lo
+que sienten los demás requests del worker.
+
+También mide el paso de una tabla Arrow grande por memoria compartida.
+
+Uso:
+    python -m Casandra.benchmarks.bench_procesos --pesadas 2 --n 3000000
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import threading
+import time
+
+import numpy as np
+import pyarrow as pa
+
+from ..Celador.guardia import celar
+from ..Celador.procesos import pool_cpu
+from ..dominio.sobre import Resumen, SobreOk
+
+
+def _calculo(n: int) -> SobreOk:
+    acc = 0
+    for i in range(n):  # Python puro: retiene el GIL todo el tiempo
+        acc = (acc + i * i) % 1_000_003
+    return SobreOk(tool="bench_cpu@1.0.0", summary=Resumen(headline=str(acc)))
+
+
+@celar("bench_cpu_inline@1.0.0")
+def cpu_inline(*, n: int) -> SobreOk:
+    return _calculo(n)
+
+
+@celar("bench_cpu_pool@1.0.0", cpu_bound=True, limite_s=120)
+def cpu_pool(*, n: int) -> SobreOk:
+    return _calculo(n)
+
+
+@celar("bench_tabla@1.0.0", cpu_bound=True, limite_s=120)
+def filas_tabla(*, tabla: pa.Table) -> SobreOk:
+    return SobreOk(
+        tool="bench_tabla@1.0.0", summary=Resumen(headline=str(tabla.num_rows))
+    )
+
+
+def _latencias_livianas(activo: threading.Event, muestras: list[float]) -> None:
+    # Cada muestra = despertar de un sleep de 1 ms + trabajo liviano: incluye la espera por el GIL.
+    while activo.is_set():
+        t0 = time.perf_counter()
+        time.sleep(0.001)
+        sum(range(2_000))  # "request" liviano
+        muestras.append((time.perf_counter() - t0) * 1000)
+
+
+def _escenario(nombre: str, tool, pesadas: int, n: int) -> None:
+    activo, muestras = threading.Event(), []
+    activo.set()
+    medidor = threading.Thread(target=_latencias_livianas, args=(activo, muestras))
+    medidor.start()
+    t0 = time.perf_counter()
+    hilos = [threading.Thread(target=tool, kwargs={"n": n}) for _ in range(pesadas)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    dt = time.perf_counter() - t0
+    activo.clear()
+    medidor.join()
+    muestras.sort()
+    p99 = muestras[int(len(muestras) * 0.99)] if muestras else float("nan")
+    print(
+        f"{nombre:8s} pesadas {dt * 1000:8.0f} ms   livianas: {len(muestras):6d} muestras  "
+        f"p50 {statistics.median(muestras):7.3f} ms  p99 {p99:7.3f} ms"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--pesadas", type=int, default=2)
+    ap.add_argument("--n", type=int, default=3_000_000)
+    ap.add_argument("--filas", type=int, default=5_000_000)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    print(
+        f"calentar: {pool_cpu.calentar()} procesos en {(time.perf_counter() - t0) * 1000:.0f} ms"
+    )
+    _escenario("inline", cpu_inline, args.pesadas, args.n)
+    _escenario("pool", cpu_pool, args.pesadas, args.n)
+
+    tabla = pa.table(
+        {"x": np.arange(args.filas), "y": np.random.default_rng(3).random(args.filas)}
+    )
+    t0 = time.perf_counter()
+    sobre, _ = filas_tabla(tabla=tabla)
+    print(
+        f"tabla {tabla.nbytes / 2**20:.0f} MB al hijo por Arrow IPC compartido: "
+        f"{(time.perf_counter() - t0) * 1000:.1f} ms  ({sobre.summary.headline} filas)"
+    )
+    pool_cpu.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# casandra/benchmarks/bench_sobre.py
+"""
+Serialización de Sobres: dict + JSONResponse (json stdlib) vs. SobreOk +
+SobreResponse (msgspec). Mide µs/sobre y pico de memoria asignada.
+
+Uso:
+    python -m Casandra.benchmarks.bench_sobre --iteraciones 5000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import msgspec
+from starlette.responses import JSONResponse
+
+from ..dominio.sobre import (
+    Columna,
+    DataInline,
+    Evidencia,
+    LimitNotice,
+    RangoEfectivo,
+    Resumen,
+    SobreData,
+    SobreMeta,
+    SobreOk,
+)
+from ..Expositor.respuestas import SobreResponse
+
+
+_COLUMNAS = [
+    ("entidad_id", "string"),
+    ("label", "string"),
+    ("conteo", "int"),
+    ("tasa_per_100k", "float"),
+]
+
+
+def _filas(n: int) -> list[list]:
+    return [[f"GTO.MUN.M{i:03d}", f"Municipio {i}", 100 + i, 1.5 * i] for i in range(n)]
+
+
+def _sobre_struct(filas: int, artefactos: int, evidencia: int) -> SobreOk:
+    return SobreOk(
+        tool="rank_por_delito@1.1.0",
+        summary=Resumen(
+            headline="Top homicidio_doloso", highlights=["Top-1: GTO.MUN.LEON"]
+        ),
+        data=SobreData(
+            inline=DataInline(
+                columns=[Columna(name=n, type=t) for n, t in _COLUMNAS],
+                rows=_filas(filas),
+                limit_notice=LimitNotice(applied=True, max_rows=50),
+            ),
+            artifacts=(
+                {
+                    "tables": {
+                        f"t{i}": f"artifact://tables/2025-08-19/t{i}.parquet"
+                        for i in range(artefactos)
+                    }
+                }
+                if artefactos
+                else None
+            ),
+        ),
+        evidence=[Evidencia(table="incidents", ids=list(range(evidencia)))],
+        meta=SobreMeta(
+            schema_version="1.0.0",
+            tool_version="1.1.0",
+            dataset_version="gx-2025.08.15",
+            anchor_date="2025-08-13",
+            date_range_effective=RangoEfectivo(desde="2025-07-15", hasta="2025-08-13"),
+            range_adjusted=False,
+            timing_ms=12,
+            query_hash="sha256:" + "0" * 64,
+        ),
+    )
+
+
+def _medir(fn, iteraciones: int) -> tuple[float, int]:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(iteraciones):
+        fn()
+    dt_us = (time.perf_counter() - t0) / iteraciones * 1e6
+
+    tracemalloc.start()
+    fn()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dt_us, pico
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--iteraciones", type=int, default=5000)
+    args = ap.parse_args()
+
+    escenarios = {
+        "50 filas inline": (50, 0, 10),
+        "artefactos + evidencia": (50, 200, 5000),
+    }
+    for nombre, (filas, artefactos, evidencia) in escenarios.items():
+        sobre = _sobre_struct(filas, artefactos, evidencia)
+        como_dict = msgspec.to_builtins(sobre)  # shape idéntico al dict de antes
+
+        t_dict, m_dict = _medir(
+            lambda: JSONResponse(content=como_dict), args.iteraciones
+        )
+        t_struct, m_struct = _medir(
+            lambda: SobreResponse(content=sobre), args.iteraciones
+        )
+
+        print(f"[{nombre}]")
+        print(
+            f"  render        json stdlib: {t_dict:9.1f} µs   msgspec: {t_struct:9.1f} µs   x{t_dict / t_struct:.1f}"
+        )
+        print(f"  pico memoria  json stdlib: {m_dict:9d} B    msgspec: {m_struct:9d} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# casandra/benchmarks/bench_telemetria.py
+"""
+Costo por observación del registro de métricas (`Celador/telemetria.py`)
+frente a un histograma con lock, y exactitud de las cuentas con varios hilos.
+
+Uso:
+    python -m Casandra.benchmarks.bench_telemetria --n 2000000 --hilos 4
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from bisect import bisect_left
+
+from ..Celador.telemetria import BUCKETS_LATENCIA, Registro
+
+
+class _HistogramaConLock:
+    def __init__(self) -> None:
+        self.cuentas = [0] * (len(BUCKETS_LATENCIA) + 1)
+        self.suma = 0.0
+        self.lock = threading.Lock()
+
+    def observar(self, v: float) -> None:
+        with self.lock:
+            self.cuentas[bisect_left(BUCKETS_LATENCIA, v)] += 1
+            self.suma += v
+
+
+def _ns(fn, n: int) -> float:
+    valores = [(i % 997) / 10_000 for i in range(1000)]
+    t0 = time.perf_counter_ns()
+    for i in range(n):
+        fn(valores[i % 1000])
+    return (time.perf_counter_ns() - t0) / n
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--n", type=int, default=2_000_000)
+    ap.add_argument("--hilos", type=int, default=4)
+    args = ap.parse_args()
+
+    reg = Registro()
+    hist = reg.histograma("bench_seconds", "bench", ("tool",)).con("t")
+    cont = reg.contador("bench_total", "bench", ("tool",)).con("t")
+    base = _ns(lambda v: None, args.n)
+
+    print(f"n={args.n:,} (costo neto, descontando el bucle vacío de {base:.0f} ns)")
+    print(f"histograma fragmentado : {_ns(hist.observar, args.n) - base:7.1f} ns/obs")
+    print(
+        f"contador fragmentado   : {_ns(lambda v: cont.inc(), args.n) - base:7.1f} ns/obs"
+    )
+    print(
+        f"histograma con lock    : {_ns(_HistogramaConLock().observar, args.n) - base:7.1f} ns/obs"
+    )
+
+    multi = reg.histograma("bench_multi_seconds", "bench").con()
+    por_hilo = args.n // args.hilos
+
+    def trabajar() -> None:
+        for i in range(por_hilo):
+            multi.observar(0.001 * (i % 7))
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(args.hilos)]
+    t0 = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    dt = time.perf_counter() - t0
+    cuentas, _ = multi.instantanea()
+    esperado = por_hilo * args.hilos
+    print(
+        f"{args.hilos} hilos: {esperado / dt / 1e6:.2f} M obs/s  "
+        f"cuenta={cuentas[-1]:,} esperado={esperado:,} {'OK' if cuentas[-1] == esperado else 'PERDIDAS'}"
+    )
+    print(
+        f"p50≈{multi.cuantil(0.5) * 1000:.2f} ms  p99≈{multi.cuantil(0.99) * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
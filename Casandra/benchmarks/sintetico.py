@@ -0,0 +1,424 @@
+# casandra/benchmarks/sintetico.py
+"""
+Generador determinista de datos sintéticos de Guanajuato con el esquema
+mínimo (`fecha, entidad_id, delito, eventos`) y el layout del Depósito
+(`incidentes/anio=YYYY/mes=M/*.parquet`).
+
+- `generar_tabla` / `escribir_deposito`: tabla en memoria para benchmarks
+  puntuales (hasta unos pocos millones de filas).
+- `generar_lotes` / `generar_deposito`: escala 1M–100M filas por lotes de
+  memoria acotada, escritos con el mismo `EscritorFuente` de la ingesta, con
+  `id`, manifest, cubo y `poblacion.csv`; el Depósito resultante sirve tal
+  cual a la API (`CASANDRA_DEPOSITO_DIR`).
+- `coordenadas=True`: además `lat`/`lon` y `municipios.geojson`. Cada
+  municipio es una celda de una malla 8×6 deformada sobre la caja de
+  Guanajuato, con fronteras dentadas compartidas (polígonos de ~40 vértices
+  que teselan el estado); sus incidentes se concentran en 3 focos.
+
+Uso:
+    python -m Casandra.benchmarks.sintetico --filas 10000000 --destino ./data/bench/deposito
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from functools import lru_cache
+from typing import Iterator, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from ..Etl.cubo import POBLACION, construir_cubo
+from ..Etl.espacial import MUNICIPIOS, construir_espacial
+from ..Etl.deposito import (
+    EscritorFuente,
+    FuenteManifest,
+    Manifest,
+    base_ids,
+    escribir_manifest,
+    fecha_iso,
+)
+
+
+MUNICIPIOS_GTO = (
+    "ABASOLO",
+    "ACAMBARO",
+    "APASEO_EL_ALTO",
+    "APASEO_EL_GRANDE",
+    "ATARJEA",
+    "CELAYA",
+    "COMONFORT",
+    "CORONEO",
+    "CORTAZAR",
+    "CUERAMARO",
+    "DOCTOR_MORA",
+    "DOLORES_HIDALGO",
+    "GUANAJUATO",
+    "HUANIMARO",
+    "IRAPUATO",
+    "JARAL_DEL_PROGRESO",
+    "JERECUARO",
+    "LEON",
+    "MANUEL_DOBLADO",
+    "MOROLEON",
+    "OCAMPO",
+    "PENJAMO",
+    "PUEBLO_NUEVO",
+    "PURISIMA_DEL_RINCON",
+    "ROMITA",
+    "SALAMANCA",
+    "SALVATIERRA",
+    "SAN_DIEGO_DE_LA_UNION",
+    "SAN_FELIPE",
+    "SAN_FRANCISCO_DEL_RINCON",
+    "SAN_JOSE_ITURBIDE",
+    "SAN_LUIS_DE_LA_PAZ",
+    "SAN_MIGUEL_DE_ALLENDE",
+    "SANTA_CATARINA",
+    "SANTA_CRUZ_DE_JUVENTINO_ROSAS",
+    "SANTIAGO_MARAVATIO",
+    "SILAO",
+    "TARANDACUAO",
+    "TARIMORO",
+    "TIERRA_BLANCA",
+    "URIANGATO",
+    "VALLE_DE_SANTIAGO",
+    "VICTORIA",
+    "VILLAGRAN",
+    "XICHU",
+    "YURIRIA",
+)
+ENTIDADES_GTO = tuple(f"GTO.MUN.{m}" for m in MUNICIPIOS_GTO)
+
+DELITOS = (
+    "homicidio_doloso",
+    "homicidio_culposo",
+    "feminicidio",
+    "lesiones_dolosas",
+    "robo_a_casa_habitacion",
+    "robo_a_negocio",
+    "robo_de_vehiculo",
+    "robo_a_transeunte",
+    "extorsion",
+    "secuestro",
+    "narcomenudeo",
+    "violencia_familiar",
+    "danio_en_propiedad",
+    "fraude",
+)
+
+
+FILAS_POR_LOTE = 2_000_000
+
+CAJA_GTO = (-102.10, 19.90, -99.65, 21.85)  # lon_min, lat_min, lon_max, lat_max
+MALLA_GTO = (8, 6)  # columnas × filas; sobran 2 celdas sin municipio
+_TRAMOS = 10  # segmentos por lado de celda
+
+
+class Geografia:
+    """Polígonos municipales sintéticos y focos de incidentes, reproducibles por semilla."""
+
+    def __init__(self, semilla: int) -> None:
+        rng = np.random.default_rng([semilla, 2_000_003])
+        cols, filas = MALLA_GTO
+        x0, y0, x1, y1 = CAJA_GTO
+        dx, dy = (x1 - x0) / cols, (y1 - y0) / filas
+        # Vértices de la malla, deformados salvo en el borde exterior.
+        vx = x0 + np.arange(cols + 1)[:, None] * dx + np.zeros((1, filas + 1))
+        vy = y0 + np.arange(filas + 1)[None, :] * dy + np.zeros((cols + 1, 1))
+        interior = np.zeros((cols + 1, filas + 1), dtype=bool)
+        interior[1:-1, 1:-1] = True
+        vx[interior] += rng.uniform(-0.22, 0.22, interior.sum()) * dx
+        vy[interior] += rng.uniform(-0.22, 0.22, interior.sum()) * dy
+        t = np.linspace(0.0, 1.0, _TRAMOS + 1)
+
+        def lado(a: tuple[int, int], b: tuple[int, int], borde: bool) -> np.ndarray:
+            p, q = np.array([vx[a], vy[a]]), np.array([vx[b], vy[b]])
+            puntos = p + t[:, None] * (q - p)
+            if not borde:  # dientes perpendiculares, nulos en los extremos
+                normal = np.array([-(q - p)[1], (q - p)[0]])
+                ruido = rng.uniform(-0.12, 0.12, t.size) * np.sin(np.pi * t)
+                puntos += ruido[:, None] * normal
+            return puntos
+
+        horizontales = {
+            (i, j): lado((i, j), (i + 1, j), j in (0, filas))
+            for j in range(filas + 1)
+            for i in range(cols)
+        }
+        verticales = {
+            (i, j): lado((i, j), (i, j + 1), i in (0, cols))
+            for i in range(cols + 1)
+            for j in range(filas)
+        }
+        self.poligonos: dict[str, np.ndarray] = {}
+        centros = []
+        for k, e in enumerate(ENTIDADES_GTO):
+            i, j = k % cols, k // cols
+            anillo = np.concatenate(
+                [
+                    horizontales[(i, j)][:-1],
+                    verticales[(i + 1, j)][:-1],
+                    horizontales[(i, j + 1)][::-1][:-1],
+                    verticales[(i, j)][::-1][:-1],
+                ]
+            )
+            self.poligonos[e] = anillo
+            centros.append(
+                [
+                    (vx[i, j] + vx[i + 1, j + 1] + vx[i + 1, j] + vx[i, j + 1]) / 4,
+                    (vy[i, j] + vy[i + 1, j + 1] + vy[i + 1, j] + vy[i, j + 1]) / 4,
+                ]
+            )
+        self.centros = np.array(centros)
+        self.celda = np.array([dx, dy])
+        self.focos = (
+            self.centros[:, None, :]
+            + rng.uniform(-0.2, 0.2, (len(ENTIDADES_GTO), 3, 2)) * self.celda
+        )
+
+    def puntos(
+        self, rng: np.random.Generator, ent: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(lon, lat) para incidentes de las entidades `ent`: 70% en focos, el resto disperso."""
+        foco = self.focos[ent, rng.integers(0, 3, ent.size)]
+        xy = foco + rng.normal(0.0, 0.04, (ent.size, 2)) * self.celda
+        disperso = rng.random(ent.size) >= 0.7
+        xy[disperso] = (
+            self.centros[ent[disperso]]
+            + rng.uniform(-0.35, 0.35, (int(disperso.sum()), 2)) * self.celda
+        )
+        return xy[:, 0], xy[:, 1]
+
+    def geojson(self) -> dict:
+        return {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "properties": {"entidad_id": e},
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [np.vstack([a, a[:1]]).round(6).tolist()],
+                    },
+                }
+                for e, a in self.poligonos.items()
+            ],
+        }
+
+
+@lru_cache(maxsize=4)
+def geografia(semilla: int = 7) -> Geografia:
+    return Geografia(semilla)
+
+
+def _tabla(
+    rng: np.random.Generator,
+    filas: int,
+    desde: date,
+    hasta: date,
+    geo: Optional[Geografia] = None,
+) -> pa.Table:
+    dias = (hasta - desde).days + 1
+
+    pesos_ent = 1.0 / np.arange(1, len(ENTIDADES_GTO) + 1) ** 0.8
+    pesos_del = 1.0 / np.arange(1, len(DELITOS) + 1) ** 0.6
+
+    ent = rng.choice(len(ENTIDADES_GTO), size=filas, p=pesos_ent / pesos_ent.sum())
+    dl = rng.choice(len(DELITOS), size=filas, p=pesos_del / pesos_del.sum())
+    fecha = np.datetime64(desde, "D") + rng.integers(0, dias, size=filas).astype(
+        "timedelta64[D]"
+    )
+    eventos = rng.poisson(1.2, size=filas).astype(np.int32) + 1
+
+    coordenadas = {}
+    if geo is not None:
+        lon, lat = geo.puntos(rng, ent)
+        coordenadas = {"lat": pa.array(lat), "lon": pa.array(lon)}
+    return pa.table(
+        {
+            "fecha": pa.array(fecha),
+            "entidad_id": pa.DictionaryArray.from_arrays(
+                pa.array(ent, pa.int32()), pa.array(ENTIDADES_GTO)
+            ).cast(pa.string()),
+            "delito": pa.DictionaryArray.from_arrays(
+                pa.array(dl, pa.int32()), pa.array(DELITOS)
+            ).cast(pa.string()),
+            "eventos": pa.array(eventos),
+            **coordenadas,
+        }
+    )
+
+
+def generar_tabla(
+    filas: int,
+    desde: date = date(2021, 1, 1),
+    hasta: date = date(2025, 8, 13),
+    semilla: int = 7,
+    coordenadas: bool = False,
+) -> pa.Table:
+    """
+    Tabla sintética reproducible. Entidades y delitos siguen una distribución
+    sesgada (pocos municipios concentran la mayoría, como en los datos reales).
+    """
+    geo = geografia(semilla) if coordenadas else None
+    return _tabla(np.random.default_rng(semilla), filas, desde, hasta, geo)
+
+
+def generar_lotes(
+    filas: int,
+    desde: date = date(2021, 1, 1),
+    hasta: date = date(2025, 8, 13),
+    semilla: int = 7,
+    filas_por_lote: int = FILAS_POR_LOTE,
+    coordenadas: bool = False,
+) -> Iterator[pa.Table]:
+    """
+    Igual distribución que `generar_tabla`, en lotes. Cada lote tiene su propia
+    semilla derivada (semilla, i): el resultado no depende de la memoria
+    disponible sino solo de (filas, rango, semilla, filas_por_lote).
+    """
+    geo = geografia(semilla) if coordenadas else None
+    for i, inicio in enumerate(range(0, filas, filas_por_lote)):
+        n = min(filas_por_lote, filas - inicio)
+        yield _tabla(np.random.default_rng([semilla, i]), n, desde, hasta, geo)
+
+
+def poblacion_sintetica(semilla: int = 7) -> dict[str, int]:
+    """Población reproducible por municipio (20k–1.7M, sesgada como los conteos)."""
+    rng = np.random.default_rng([semilla, 1_000_003])
+    base = 1.7e6 / np.arange(1, len(ENTIDADES_GTO) + 1) ** 0.9
+    return {
+        e: int(b * rng.uniform(0.8, 1.2)) + 20_000 for e, b in zip(ENTIDADES_GTO, base)
+    }
+
+
+def generar_deposito(
+    filas: int,
+    deposito_dir: Path,
+    desde: date = date(2021, 1, 1),
+    hasta: date = date(2025, 8, 13),
+    semilla: int = 7,
+    filas_por_lote: int = FILAS_POR_LOTE,
+    coordenadas: bool = False,
+) -> Manifest:
+    """
+    Depósito completo (partes, manifest, cubo, poblacion.csv; con
+    `coordenadas`, también municipios.geojson e índice espacial) con memoria
+    acotada por `filas_por_lote`. Dos corridas con los mismos parámetros
+    producen el mismo `dataset_version`.
+    """
+    clave = f"sintetico:{filas}:{desde}:{hasta}:{semilla}:{filas_por_lote}" + (
+        ":geo" if coordenadas else ""
+    )
+    hash_fuente = "sha256:" + hashlib.sha256(clave.encode("utf-8")).hexdigest()
+    base = base_ids("sintetico", hash_fuente)  # mismo esquema que la ingesta
+
+    escritor = EscritorFuente(deposito_dir, "sintetico", hash_fuente)
+    n = 0
+    try:
+        for lote in generar_lotes(
+            filas, desde, hasta, semilla, filas_por_lote, coordenadas
+        ):
+            ids = pa.array(
+                np.arange(base + n, base + n + lote.num_rows, dtype=np.int64)
+            )
+            escritor.agregar(lote.append_column("id", ids))
+            n += lote.num_rows
+        particiones = escritor.cerrar()
+    except BaseException:
+        escritor.abortar()
+        raise
+
+    fuente = FuenteManifest(
+        hash=hash_fuente,
+        filas=n,
+        rechazadas=0,
+        min_date=fecha_iso(desde),
+        max_date=fecha_iso(hasta),
+        particiones=particiones,
+        parte=escritor.nombre,
+        base_id=base,
+    )
+    manifest = Manifest(
+        dataset_version=f"gx-sintetico-{hash_fuente[7:15]}",
+        min_date=fecha_iso(desde),
+        max_date=fecha_iso(hasta),
+        updated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        fuentes={"sintetico": fuente},
+        particiones_tocadas=particiones,
+    )
+    lineas = ["entidad_id,poblacion"] + [
+        f"{e},{p}" for e, p in poblacion_sintetica(semilla).items()
+    ]
+    (deposito_dir / POBLACION).write_text("\n".join(lineas) + "\n", encoding="utf-8")
+    construir_cubo(deposito_dir, manifest)
+    if coordenadas:
+        (deposito_dir / MUNICIPIOS).write_text(
+            json.dumps(geografia(semilla).geojson()), encoding="utf-8"
+        )
+        construir_espacial(deposito_dir, manifest)
+    escribir_manifest(manifest, deposito_dir)
+    return manifest
+
+
+def escribir_deposito(tabla: pa.Table, deposito_dir: Path) -> Path:
+    """Escribe `tabla` como `deposito_dir/incidentes/anio=/mes=/` (Hive)."""
+    destino = deposito_dir / "incidentes"
+    tabla = tabla.sort_by([("fecha", "ascending"), ("entidad_id", "ascending")])
+    tabla = tabla.append_column("anio", pc.year(tabla["fecha"]).cast(pa.int16()))
+    tabla = tabla.append_column("mes", pc.month(tabla["fecha"]).cast(pa.int8()))
+    ds.write_dataset(
+        tabla,
+        destino,
+        format="parquet",
+        partitioning=["anio", "mes"],
+        partitioning_flavor="hive",
+        existing_data_behavior="overwrite_or_ignore",
+        basename_template="sintetico-{i}.parquet",
+    )
+    return destino
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument("--filas", type=int, default=1_000_000)
+    ap.add_argument("--destino", type=Path, required=True)
+    ap.add_argument("--desde", type=date.fromisoformat, default=date(2021, 1, 1))
+    ap.add_argument("--hasta", type=date.fromisoformat, default=date(2025, 8, 13))
+    ap.add_argument("--semilla", type=int, default=7)
+    ap.add_argument("--filas-por-lote", type=int, default=FILAS_POR_LOTE)
+    ap.add_argument(
+        "--coordenadas",
+        action="store_true",
+        help="lat/lon, municipios.geojson e índice espacial",
+    )
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    manifest = generar_deposito(
+        args.filas,
+        args.destino,
+        args.desde,
+        args.hasta,
+        args.semilla,
+        args.filas_por_lote,
+        args.coordenadas,
+    )
+    dt = time.perf_counter() - t0
+    print(
+        f"{manifest.dataset_version}: {args.filas:,} filas en {dt:.1f} s "
+        f"({args.filas / dt:,.0f} filas/s) -> {args.destino}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+# casandra/benchmarks/suite.py
+"""
+Suite reproducible de rendimiento. Tres subcomandos:
+
+- micro: validaciones (`entidad_id`, `validar_rango`), `query_hash`, `audit`,
+  serialización de Sobres, decodificación de planes y telemetría.
+- carga: escenarios end-to-end contra la `app` FastAPI (`/demo/rank`,
+  `/dataset/metadata`, `/plan/execute`) con concurrencia configurable, sobre
+  un Depósito sintético (`sintetico.generar_deposito`) o uno existente; con
+  `--url` se apunta a un servidor ya levantado.
+- comparar: marca regresiones entre dos corridas (exit 1 si hay alguna).
+
+Cada resultado trae p50/p95/p99 (`unidad` us|ms), throughput (`ops_s`) y RSS,
+en un JSON con metadatos de la corrida (commit, python, CPUs, parámetros).
+
+Uso:
+    python -m Casandra.benchmarks.suite micro --salida micro.json
+    python -m Casandra.benchmarks.suite carga --filas 5000000 --concurrencia 16 --requests 2000 --salida carga.json
+    python -m Casandra.benchmarks.suite comparar base.json nuevo.json --tolerancia 0.15
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+# Sin imports de Casandra a nivel de módulo: el entorno (CASANDRA_*_DIR) debe
+# fijarse antes de que Etl.deposito / Celador.auditoria lean sus variables.
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return round(
+                int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1
+            )
+    except OSError:
+        return _rss_pico_mb()
+
+
+def _rss_pico_mb() -> float:
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / 2**20 if sys.platform == "darwin" else pico / 1024, 1)
+
+
+def _percentiles(muestras: list[float], escala: float) -> dict[str, float]:
+    p50, p95, p99 = np.percentile(np.asarray(muestras) * escala, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+    }
+
+
+def _meta(params: dict[str, Any]) -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": params,
+    }
+
+
+def _entorno(tmp: Path, deposito: Optional[Path] = None) -> None:
+    os.environ["CASANDRA_AUDIT_DIR"] = str(tmp / "audit")
+    os.environ["CASANDRA_CACHE_DIR"] = str(tmp / "cache")
+    os.environ["CASANDRA_ARTEFACTOS_DIR"] = str(tmp / "artefactos")
+    if deposito is not None:
+        os.environ["CASANDRA_DEPOSITO_DIR"] = str(deposito)
+
+
+def _emitir(salida: Optional[Path], doc: dict[str, Any]) -> None:
+    texto = json.dumps(doc, indent=2, ensure_ascii=False)
+    if salida is None:
+        print(texto)
+    else:
+        salida.write_text(texto + "\n", encoding="utf-8")
+        print(f"-> {salida}")
+
+
+# --- micro ---
+
+
+def _casos_micro() -> dict[str, Callable[[], Any]]:
+    import msgspec
+
+    from ..Celador.auditoria import audit, query_hash
+    from ..Celador.telemetria import Registro
+    from ..Celador.validaciones import entidad_id, validar_rango
+    from ..dominio.sobre import (
+        Columna,
+        DataInline,
+        LimitNotice,
+        Resumen,
+        SobreData,
+        SobreMeta,
+        SobreOk,
+    )
+    from ..Herramientas.esquema import validar_args
+    from ..Herramientas.spec import resolver
+    from ..Orquestador.plan import decodificar_plan
+    from .sintetico import ENTIDADES_GTO
+
+    rng = random.Random(7)
+    ids = list(ENTIDADES_GTO) + ["GTO.EST.GTO"]
+    rangos = [
+        (date(2024, 1, 1) + timedelta(days=rng.randrange(400)), rng.randrange(1, 120))
+        for _ in range(256)
+    ]
+    planes = [
+        {"tool": "demo_rank@1.0.0", "args": {"entidad_id": e, "from": "2025-01-01"}}
+        for e in ENTIDADES_GTO
+    ]
+    sobre = SobreOk(
+        tool="rank_por_delito@1.1.0",
+        summary=Resumen(
+            headline="Top 50 por entidad_id (conteo)",
+            highlights=["Top-1: GTO.MUN.LEON (132)"],
+        ),
+        data=SobreData(
+            inline=DataInline(
+                columns=[
+                    Columna(name="entidad_id", type="string"),
+                    Columna(name="conteo", type="int"),
+                ],
+                rows=[[e, 1000 - i] for i, e in enumerate(ENTIDADES_GTO)],
+                limit_notice=LimitNotice(applied=True, max_rows=50),
+            )
+        ),
+        meta=SobreMeta(
+            schema_version="1.0.0",
+            tool_version="1.1.0",
+            dataset_version="gx-bench",
+            timing_ms=12,
+        ),
+    )
+    encoder = msgspec.json.Encoder()
+    cuerpo_plan = msgspec.json.encode(
+        {
+            "plan": [
+                {
+                    "tool_id": 2,
+                    "tool_version": "1.0.0",
+                    "args": {"from": "2025-01-01", "to": "2025-03-01"},
+                },
+                {
+                    "tool_id": 6,
+                    "tool_version": "1.1.0",
+                    "args": {"top_k": 10, "por": "entidad_id"},
+                },
+            ]
+        }
+    )
+    rank = resolver(6, "1.1.0")
+    args_rank = {
+        "top_k": 10,
+        "entidad_id": "GTO.EST.GTO",
+        "from": "2025-01-01",
+        "to": "2025-03-01",
+    }
+    hist = Registro().histograma("bench_seconds", "bench").con()
+    dmin, dmax = date(2021, 1, 1), date(2025, 8, 13)
+    i = iter(range(1 << 62))
+
+    def _rango():
+        d, n = rangos[next(i) % 256]
+        return validar_rango(d, d + timedelta(days=n), dmin, dmax)
+
+    return {
+        "validaciones.entidad_id": lambda: entidad_id(ids[next(i) % len(ids)]),
+        "validaciones.validar_rango": _rango,
+        "auditoria.query_hash": lambda: query_hash(
+            planes[next(i) % len(planes)], "1.0.0"
+        ),
+        "auditoria.audit": lambda: audit(
+            "bench.micro", {"tool": "demo_rank@1.0.0", "i": 1}
+        ),
+        "sobre.encode": lambda: encoder.encode(sobre),
+        "plan.decode": lambda: decodificar_plan(cuerpo_plan),
+        "plan.validar_args": lambda: validar_args(rank, dict(args_rank)),
+        "telemetria.observar": lambda: hist.observar(0.0123),
+    }
+
+
+def micro(args: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        _entorno(Path(tmp))
+        from ..Celador.auditoria import cerrar_auditoria
+
+        resultados: dict[str, Any] = {}
+        for nombre, fn in _casos_micro().items():
+            if args.filtro and args.filtro not in nombre:
+                continue
+            for _ in range(args.lote):  # calentamiento
+                fn()
+            por_op: list[float] = []
+            t_total = time.perf_counter()
+            for _ in range(args.repeticiones):
+                t0 = time.perf_counter()
+                for _ in range(args.lote):
+                    fn()
+                por_op.append((time.perf_counter() - t0) / args.lote)
+            dt = time.perf_counter() - t_total
+            resultados[nombre] = {
+                "unidad": "us",
+                **_percentiles(por_op, 1e6),
+                "ops_s": round(args.repeticiones * args.lote / dt, 1),
+                "rss_mb": _rss_mb(),
+            }
+            r = resultados[nombre]
+            print(
+                f"{nombre:28s} p50 {r['p50']:8.3f} us  p99 {r['p99']:8.3f} us  {r['ops_s']:>12,.0f} op/s",
+                file=sys.stderr,
+            )
+        cerrar_auditoria()
+
+    params = {"repeticiones": args.repeticiones, "lote": args.lote}
+    return {"suite": "micro", "meta": _meta(params), "resultados": resultados}
+
+
+# --- carga ---
+
+Peticion = tuple[
+    str, str, Optional[dict], Optional[dict]
+]  # (método, path, query, json)
+
+
+def _escenarios(
+    desde: date, hasta: date
+) -> dict[str, Callable[[random.Random], Peticion]]:
+    from .sintetico import DELITOS, ENTIDADES_GTO
+
+    dias = (hasta - desde).days
+
+    def ventana(rng: random.Random) -> tuple[str, str]:
+        d = desde + timedelta(days=rng.randrange(max(1, dias - 90)))
+        return str(d), str(d + timedelta(days=rng.choice((7, 30, 90))))
+
+    def demo_rank(rng: random.Random) -> Peticion:
+        f, t = ventana(rng)
+        return (
+            "GET",
+            "/demo/rank",
+            {"entidad_id": rng.choice(ENTIDADES_GTO), "from": f, "to": t},
+            None,
+        )
+
+    def metadata(rng: random.Random) -> Peticion:
+        return "GET", "/dataset/metadata", None, None
+
+    def plan_rank(rng: random.Random) -> Peticion:
+        f, t = ventana(rng)
+        plan = [
+            {"tool_id": 2, "tool_version": "1.0.0", "args": {"from": f, "to": t}},
+            {
+                "tool_id": 3,
+                "tool_version": "1.0.0",
+                "args": {"delitos": [rng.choice(DELITOS)]},
+            },
+            {
+                "tool_id": 6,
+                "tool_version": "1.1.0",
+                "args": {"top_k": 10, "por": "entidad_id"},
+            },
+        ]
+        return "POST", "/plan/execute", None, {"plan": plan}
+
+    def plan_evidencia(rng: random.Random) -> Peticion:
+        f, t = ventana(rng)
+        plan = [
+            {
+                "tool_id": 1,
+                "tool_version": "1.0.0",
+                "args": {"entidad_id": rng.choice(ENTIDADES_GTO)},
+            },
+            {"tool_id": 2, "tool_version": "1.0.0", "args": {"from": f, "to": t}},
+            {"tool_id": 9, "tool_version": "1.0.0", "args": {"max_ids": 50}},
+        ]
+        return "POST", "/plan/execute", None, {"plan": plan}
+
+    return {
+        "demo_rank": demo_rank,
+        "dataset_metadata": metadata,
+        "plan_rank": plan_rank,
+        "plan_evidencia": plan_evidencia,
+    }
+
+
+async def _correr_escenario(
+    cliente,
+    generar: Callable[[random.Random], Peticion],
+    n: int,
+    concurrencia: int,
+    semilla: int,
+) -> dict[str, Any]:
+    rng = random.Random(semilla)
+    peticiones = [generar(rng) for _ in range(n)]
+    latencias: list[float] = []
+    estados: dict[str, int] = {}
+    errores = 0
+    siguiente = iter(range(n))
+
+    async def trabajador() -> None:
+        nonlocal errores
+        for k in siguiente:
+            metodo, path, query, cuerpo = peticiones[k]
+            t0 = time.perf_counter()
+            try:
+                r = await cliente.request(metodo, path, params=query, json=cuerpo)
+                codigo = str(r.status_code)
+            except Exception as e:  # conexión caída, timeout
+                codigo = type(e).__name__
+            latencias.append(time.perf_counter() - t0)
+            estados[codigo] = estados.get(codigo, 0) + 1
+            if not codigo.startswith("2"):
+                errores += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    dt = time.perf_counter() - t0
+    return {
+        "unidad": "ms",
+        **_percentiles(latencias, 1e3),
+        "ops_s": round(n / dt, 1),
+        "requests": n,
+        "errores": errores,
+        "status": estados,
+        "rss_mb": _rss_mb(),
+        "rss_pico_mb": _rss_pico_mb(),
+    }
+
+
+async def _carga_async(
+    args: argparse.Namespace, desde: date, hasta: date
+) -> dict[str, Any]:
+    import httpx
+
+    if args.url:
+        cliente = httpx.AsyncClient(base_url=args.url, timeout=60.0)
+    else:
+        from ..Expositor.api import crear_app
+
+        cliente = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=crear_app()),
+            base_url="http://bench",
+            timeout=60.0,
+        )
+
+    escenarios = _escenarios(desde, hasta)
+    elegidos = args.escenarios.split(",") if args.escenarios else list(escenarios)
+    resultados: dict[str, Any] = {}
+    async with cliente:
+        for nombre in elegidos:
+            generar = escenarios[nombre]
+            await _correr_escenario(
+                cliente,
+                generar,
+                min(50, args.requests),
+                args.concurrencia,
+                args.semilla + 1,
+            )
+            r = await _correr_escenario(
+                cliente, generar, args.requests, args.concurrencia, args.semilla
+            )
+            resultados[nombre] = r
+            print(
+                f"{nombre:18s} p50 {r['p50']:8.2f} ms  p95 {r['p95']:8.2f} ms  p99 {r['p99']:8.2f} ms  "
+                f"{r['ops_s']:8.1f} req/s  errores {r['errores']}  RSS {r['rss_mb']} MB",
+                file=sys.stderr,
+            )
+    return resultados
+
+
+def carga(args: argparse.Namespace) -> dict[str, Any]:
+    desde, hasta = date(2021, 1, 1), date(2025, 8, 13)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_p = Path(tmp)
+        deposito = args.deposito
+        if deposito is None and not args.url:
+            deposito = tmp_p / "deposito"
+            _entorno(tmp_p, deposito)
+            from .sintetico import generar_deposito
+
+            t0 = time.perf_counter()
+            generar_deposito(args.filas, deposito, desde, hasta, args.semilla)
+            print(
+                f"deposito sintético: {args.filas:,} filas en {time.perf_counter() - t0:.1f} s",
+                file=sys.stderr,
+            )
+        else:
+            _entorno(tmp_p, deposito)
+
+        if deposito is not None:
+            from ..Etl.deposito import leer_manifest
+
+            manifest = leer_manifest(deposito)
+            if manifest.min_date and manifest.max_date:
+                desde, hasta = date.fromisoformat(
+                    manifest.min_date
+                ), date.fromisoformat(manifest.max_date)
+
+        resultados = asyncio.run(_carga_async(args, desde, hasta))
+
+        if not args.url:
+            from ..Celador.auditoria import cerrar_auditoria
+
+            cerrar_auditoria()
+
+    params = {
+        "filas": None if args.deposito or args.url else args.filas,
+        "deposito": str(args.deposito) if args.deposito else None,
+        "url": args.url,
+        "requests": args.requests,
+        "concurrencia": args.concurrencia,
+        "semilla": args.semilla,
+    }
+    return {"suite": "carga", "meta": _meta(params), "resultados": resultados}
+
+
+# --- comparar ---
+
+
+def comparar(args: argparse.Namespace) -> int:
+    """Regresión = percentil que sube o throughput que baja más de `tolerancia`."""
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    nuevo = json.loads(args.nuevo.read_text(encoding="utf-8"))
+    metricas = args.metricas.split(",")
+    regresiones = 0
+    for nombre in sorted(set(base["resultados"]) & set(nuevo["resultados"])):
+        b, n = base["resultados"][nombre], nuevo["resultados"][nombre]
+        for m in metricas:
+            if m not in b or m not in n or not b[m]:
+                continue
+            cambio = (n[m] - b[m]) / b[m]
+            peor = (
+                cambio < -args.tolerancia if m == "ops_s" else cambio > args.tolerancia
+            )
+            regresiones += peor
+            marca = "REGRESION" if peor else ""
+            print(
+                f"{nombre:28s} {m:6s} {b[m]:>12.3f} -> {n[m]:>12.3f}  {cambio:+7.1%}  {marca}"
+            )
+    print(f"{regresiones} regresiones (tolerancia {args.tolerancia:.0%})")
+    return 1 if regresiones else 0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    sub = ap.add_subparsers(dest="comando", required=True)
+
+    m = sub.add_parser("micro", help="micro-benchmarks en proceso")
+    m.add_argument("--repeticiones", type=int, default=200)
+    m.add_argument("--lote", type=int, default=500)
+    m.add_argument("--filtro", help="solo casos cuyo nombre contenga este texto")
+    m.add_argument("--salida", type=Path)
+
+    c = sub.add_parser("carga", help="escenarios end-to-end contra la app")
+    c.add_argument(
+        "--filas",
+        type=int,
+        default=1_000_000,
+        help="tamaño del Depósito sintético (1M–100M)",
+    )
+    c.add_argument(
+        "--deposito", type=Path, help="Depósito existente en vez del sintético"
+    )
+    c.add_argument("--url", help="servidor ya levantado (p.ej. http://127.0.0.1:8000)")
+    c.add_argument("--requests", type=int, default=1000)
+    c.add_argument("--concurrencia", type=int, default=16)
+    c.add_argument("--escenarios", help="lista separada por comas (default: todos)")
+    c.add_argument("--semilla", type=int, default=7)
+    c.add_argument("--salida", type=Path)
+
+    k = sub.add_parser("comparar", help="marca regresiones entre dos corridas")
+    k.add_argument("base", type=Path)
+    k.add_argument("nuevo", type=Path)
+    k.add_argument("--tolerancia", type=float, default=0.15)
+    k.add_argument("--metricas", default="p50,p95,ops_s")
+
+    args = ap.parse_args()
+    if args.comando == "comparar":
+        sys.exit(comparar(args))
+    doc = micro(args) if args.comando == "micro" else carga(args)
+    _emitir(args.salida, doc)
+
+
+if __name__ == "__main__":
+    main()
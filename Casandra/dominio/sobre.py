@@ -0,0 +1,95 @@
+# casandra/dominio/sobre.py
+"""
+Sobre (Envelope) tipado: contrato de salida de toda tool (doc §4.4).
+
+Se define con `msgspec.Struct` para que el Expositor lo codifique directo a
+bytes sin pasar por dicts intermedios. `gc=False` es seguro aquí: los sobres
+son árboles (nunca forman ciclos) y así no cargan al recolector.
+"""
+from __future__ import annotations
+
+from typing import Any, Literal, Optional, Union
+
+import msgspec
+from msgspec import UNSET, UnsetType
+
+
+class _Struct(msgspec.Struct, gc=False):
+    pass
+
+
+class Columna(_Struct):
+    name: str
+    type: str
+
+
+class LimitNotice(_Struct):
+    applied: bool = False
+    max_rows: int = 50
+
+
+class DataInline(_Struct):
+    columns: list[Columna] = []
+    rows: list[list[Any]] = []
+    limit_notice: LimitNotice = msgspec.field(default_factory=LimitNotice)
+
+
+class SobreData(_Struct, omit_defaults=True):
+    inline: DataInline = msgspec.field(default_factory=DataInline)
+    artifacts: Optional[dict[str, dict[str, str]]] = None
+
+
+class Resumen(_Struct):
+    headline: str
+    highlights: list[str] = []
+
+
+class Evidencia(_Struct):
+    table: str
+    ids: list[int] = []
+
+
+class RangoEfectivo(_Struct):
+    desde: str = msgspec.field(name="from")
+    hasta: str = msgspec.field(name="to")
+
+
+class SobreMeta(_Struct, omit_defaults=True):
+    """Campos `None` no se emiten: el JSON conserva el shape de los dicts previos."""
+
+    schema_version: Optional[str] = None
+    tool_version: Optional[str] = None
+    dataset_version: Optional[str] = None
+    anchor_date: Optional[str] = None
+    date_range_effective: Optional[RangoEfectivo] = None
+    range_adjusted: Optional[bool] = None
+    timing_ms: Optional[int] = None
+    query_hash: Optional[str] = None
+    cache: Optional[Literal["hit", "miss"]] = None
+
+
+class SobreOk(_Struct, kw_only=True):
+    status: Literal["ok"] = "ok"
+    tool: str = ""
+    summary: Resumen
+    data: SobreData = msgspec.field(default_factory=SobreData)
+    evidence: list[Evidencia] = []
+    # doc §13.4; UNSET no se emite (sin `"metrics": null` en las tools que no miden).
+    metrics: Union[dict[str, Union[int, float]], UnsetType] = UNSET
+    meta: SobreMeta = msgspec.field(default_factory=SobreMeta)
+
+
+class SobreErrorDetails(_Struct):
+    code: str
+    details: str
+    hints: list[str] = []
+
+
+class SobreError(_Struct, kw_only=True):
+    status: Literal["error"] = "error"
+    tool: str
+    error: SobreErrorDetails
+    meta: SobreMeta = msgspec.field(default_factory=SobreMeta)
+
+
+Sobre = SobreOk | SobreError
@@ -0,0 +1,5 @@
+# casandra/tests/__init__.py
+"""
+Pruebas de comportamiento (pytest). Desde la raíz del repo:
+    python -m pytest -q Casandra/tests
+"""
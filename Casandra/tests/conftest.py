@@ -0,0 +1,50 @@
+# casandra/tests/conftest.py
+"""
+Los módulos de Casandra leen sus directorios (`CASANDRA_*_DIR`) al importarse:
+se apuntan a un directorio temporal antes de que cualquier prueba los importe,
+así la suite nunca toca `./data`.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_RAIZ = Path(tempfile.mkdtemp(prefix="casandra-pruebas-"))
+os.environ["CASANDRA_DATA_DIR"] = str(_RAIZ)
+os.environ["CASANDRA_DEPOSITO_DIR"] = str(_RAIZ / "deposito")
+os.environ["CASANDRA_AUDIT_DIR"] = str(_RAIZ / "audit")
+os.environ["CASANDRA_CACHE_DIR"] = str(_RAIZ / "cache")
+os.environ["CASANDRA_ARTEFACTOS_DIR"] = str(_RAIZ / "artefactos")
+
+
+def pytest_sessionfinish(session, exitstatus) -> None:
+    shutil.rmtree(_RAIZ, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def deposito() -> Path:
+    """
+    Depósito sintético (2021-01-01..2025-08-13) en `CASANDRA_DEPOSITO_DIR`,
+    con la versión de dataset y el watermark registrados en Celador.
+    """
+    from Casandra.benchmarks.sintetico import generar_deposito
+    from Casandra.Consultor.metadata import registrar_proveedores
+
+    destino = Path(os.environ["CASANDRA_DEPOSITO_DIR"])
+    generar_deposito(20_000, destino)
+    registrar_proveedores()
+    return destino
+
+
+@pytest.fixture(scope="session")
+def cliente(deposito: Path):
+    from fastapi.testclient import TestClient
+
+    from Casandra.Expositor.api import crear_app
+
+    with TestClient(crear_app()) as c:
+        yield c
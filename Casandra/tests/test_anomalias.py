@@ -0,0 +1,64 @@
+# casandra/tests/test_anomalias.py
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from Casandra.Analisis.Patrones.anomalias import STD_MIN, detectar, zscores_rodantes
+from Casandra.Consultor.cubo import obtener_cubo
+from Casandra.Consultor.repo import Filtros, obtener_consultor
+from Casandra.Herramientas.esquema import validar_args
+from Casandra.Herramientas.registro import DETECTAR_ANOMALIAS
+from Casandra.Herramientas.spec import Contexto
+
+
+def _z_ingenuo(x: np.ndarray, ventana: int) -> np.ndarray:
+    z = np.full(x.shape, np.nan)
+    for s in range(x.shape[0]):
+        for t in range(ventana, x.shape[1]):
+            previos = x[s, t - ventana : t]
+            z[s, t] = (x[s, t] - previos.mean()) / max(previos.std(), STD_MIN)
+    return z
+
+
+def test_zscores_igual_al_calculo_por_serie() -> None:
+    x = np.random.default_rng(3).poisson(2.0, size=(6, 60))
+    z, media = zscores_rodantes(x, 14)
+    np.testing.assert_allclose(z, _z_ingenuo(x.astype(float), 14), equal_nan=True)
+    assert np.isnan(media[:, :14]).all()
+    np.testing.assert_allclose(media[:, 14], x[:, :14].mean(axis=1))
+
+
+def test_detecta_el_pico_inyectado() -> None:
+    x = np.ones((3, 40), dtype=np.int64)
+    x[1, 30] = 9  # z = (9 - 1) / STD_MIN
+    x[2, 35] = 5
+    hallazgos = detectar(x, ventana=7, z_umbral=3.0)
+    assert len(hallazgos) == 2
+    primero = hallazgos.top(1)[0]
+    assert (hallazgos.serie[primero], hallazgos.dia[primero]) == (1, 30)
+    assert hallazgos.z[primero] == pytest.approx(8.0)
+    assert hallazgos.severidad[primero] == pytest.approx(1 - 3.0 / 8.0)
+    # Días antes de `desde_dia` no se reportan.
+    assert len(detectar(x, ventana=7, z_umbral=3.0, desde_dia=33)) == 1
+
+
+@pytest.mark.parametrize("por", ["entidad_id", "entidad_delito"])
+def test_cubo_y_sql_dan_las_mismas_anomalias(deposito, por: str) -> None:
+    args = validar_args(
+        DETECTAR_ANOMALIAS,
+        {"z_threshold": 2.0, "window": 14, "por": por, "top_k": 20, "max_ids": 0},
+    )
+    filtros = Filtros(desde=date(2024, 1, 1), hasta=date(2024, 6, 30))
+    consultor = obtener_consultor()
+    con_cubo = Contexto(consultor, cubo=obtener_cubo(deposito))
+    sin_cubo = Contexto(consultor)
+    assert con_cubo.cubo is not None
+
+    a = DETECTAR_ANOMALIAS.ejecutar(filtros, args, con_cubo)
+    b = DETECTAR_ANOMALIAS.ejecutar(filtros, args, sin_cubo)
+    assert a.data.inline.rows
+    assert a.data.inline.rows == b.data.inline.rows
+    assert a.metrics == b.metrics
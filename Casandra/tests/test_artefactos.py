@@ -0,0 +1,86 @@
+# casandra/tests/test_artefactos.py
+from __future__ import annotations
+
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+from Casandra.Celador.errores import ArtefactoNoEncontrado, ValidacionError
+from Casandra.Empaquetador.artefactos import (
+    AlmacenArtefactos,
+    id_artefacto,
+    obtener_almacen,
+)
+
+FILAS = 250
+
+
+def _tabla() -> pa.Table:
+    return pa.table({"id": list(range(FILAS)), "delito": ["robo"] * FILAS})
+
+
+@pytest.fixture
+def almacen(tmp_path: Path) -> AlmacenArtefactos:
+    return AlmacenArtefactos(tmp_path)
+
+
+def test_paginas_recorren_el_artefacto(almacen: AlmacenArtefactos) -> None:
+    aid = id_artefacto("dv", "qh", 0, "filas")
+    assert almacen.guardar(aid, _tabla()) == FILAS
+
+    filas, offsets, offset = [], [], 0
+    while offset is not None:
+        p = almacen.pagina(aid, offset, limit=100)
+        assert p.total_rows == FILAS and p.offset == offset
+        filas += p.rows
+        offsets.append(p.next_offset)
+        offset = p.next_offset
+    assert offsets == [100, 200, None]
+    assert [f[0] for f in filas] == list(range(FILAS))
+    assert [c.name for c in p.columns] == ["id", "delito"]
+
+
+def test_pagina_fuera_de_rango_y_limites(almacen: AlmacenArtefactos) -> None:
+    aid = id_artefacto("dv", "qh", 0, "filas")
+    almacen.guardar(aid, _tabla())
+    vacia = almacen.pagina(aid, offset=FILAS + 10)
+    assert vacia.rows == [] and vacia.next_offset is None
+    with pytest.raises(ValidacionError):
+        almacen.pagina(aid, offset=-1)
+    with pytest.raises(ValidacionError):
+        almacen.pagina(aid, limit=0)
+    with pytest.raises(ArtefactoNoEncontrado):
+        almacen.pagina(id_artefacto("dv", "qh", 1, "filas"))
+
+
+def test_guardar_lotes_e_idempotente(almacen: AlmacenArtefactos) -> None:
+    tabla = _tabla()
+    aid = id_artefacto("dv", "qh", 0, "lotes")
+    lotes = iter(tabla.to_batches(max_chunksize=64))
+    assert almacen.guardar(aid, lotes, esquema=tabla.schema) == FILAS
+
+    def nunca():
+        raise AssertionError("ya existe: no se vuelve a producir")
+        yield
+
+    assert almacen.guardar(aid, nunca(), esquema=tabla.schema) == FILAS
+    assert almacen.pagina(aid, 240, 100).rows[-1] == [FILAS - 1, "robo"]
+
+
+def test_pagina_por_http(cliente) -> None:
+    aid = id_artefacto("dv", "qh", 0, "http")
+    obtener_almacen().guardar(aid, _tabla())
+
+    r = cliente.get(f"/artifacts/{aid}.arrow", params={"offset": 200})
+    assert r.status_code == 200
+    cuerpo = r.json()
+    assert (cuerpo["offset"], cuerpo["limit"], len(cuerpo["rows"])) == (200, 100, 50)
+    assert "next_offset" not in cuerpo  # última página: se omite
+
+    assert (
+        cliente.get(f"/artifacts/{aid}", params={"limit": 10}).json()["next_offset"]
+        == 10
+    )
+    assert cliente.get("/artifacts/" + "0" * 24).status_code == 404
+    assert cliente.get(f"/artifacts/{aid}", params={"limit": 0}).status_code == 422
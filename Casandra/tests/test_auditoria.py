@@ -0,0 +1,78 @@
+# casandra/tests/test_auditoria.py
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from Casandra.Celador.auditoria import (
+    SumideroAuditoria,
+    archivos_auditoria,
+    leer_auditoria,
+)
+
+pytest.importorskip("zstandard")
+
+DIA_MS = 86_400_000
+
+
+def _evento(job_id: str, dias_atras: int) -> tuple[str, int, str, dict]:
+    return (
+        job_id,
+        int(time.time() * 1000) - dias_atras * DIA_MS,
+        "prueba",
+        {"n": dias_atras},
+    )
+
+
+def test_cada_proceso_escribe_su_archivo(tmp_path: Path) -> None:
+    sumidero = SumideroAuditoria(tmp_path, comprimir=False)
+    sumidero._escribir([_evento("j1", 0)])
+    (archivo,) = tmp_path.iterdir()
+    assert archivo.name.endswith(f".p{os.getpid()}.jsonl")
+    assert json.loads(archivo.read_text())["job_id"] == "j1"
+
+
+def test_rotacion_comprime_dias_cerrados(tmp_path: Path) -> None:
+    sumidero = SumideroAuditoria(tmp_path, comprimir=True)
+    sumidero._escribir([_evento("j1", 2)])
+    sumidero._escribir([_evento("j2", 1)])  # cambia el día: rota el anterior
+    nombres = sorted(p.name for p in tmp_path.iterdir())
+    assert [n.endswith(".jsonl.zst") for n in nombres] == [True, False]
+
+
+def test_evento_tardio_no_pisa_el_archivo_rotado(tmp_path: Path) -> None:
+    from Casandra.Celador.bitacora import Bitacora
+
+    sumidero = SumideroAuditoria(tmp_path, comprimir=True)
+    sumidero._escribir([_evento("j1", 2)])
+    sumidero._escribir([_evento("j2", 1)])
+    sumidero._escribir(
+        [_evento("j3", 2)]
+    )  # tardío: recrea el JSONL de un día ya rotado
+    sumidero._escribir([_evento("j4", 0)])  # rota de nuevo ese día y el siguiente
+
+    comprimidos = sorted(p.name for p in tmp_path.glob("*.zst"))
+    assert len(comprimidos) == 3  # el día tardío queda en dos archivos numerados
+    bitacora = Bitacora(tmp_path)
+    assert len(bitacora.compactar()) == 2
+    assert not list(tmp_path.glob("*.zst"))
+    assert [bitacora.eventos_job(j).num_rows for j in ("j1", "j2", "j3")] == [1, 1, 1]
+
+
+def test_lector_acepta_nombres_viejos_y_nuevos(tmp_path: Path) -> None:
+    sumidero = SumideroAuditoria(tmp_path, comprimir=True)
+    sumidero._escribir([_evento("nuevo", 2)])
+    sumidero._escribir([_evento("vivo", 0)])  # rota el de hace dos días a .zst
+    dia = time.strftime("%Y-%m-%d", time.localtime(time.time() - 2 * 86_400))
+    viejo = tmp_path / f"audit_{dia}.jsonl"  # formato previo: sin pid
+    viejo.write_text(json.dumps({"job_id": "viejo"}) + "\n", encoding="utf-8")
+    (tmp_path / "otro.jsonl").write_text("{}\n")
+
+    rutas = archivos_auditoria(tmp_path, dia)
+    assert len(rutas) == 2 and viejo in rutas
+    assert sorted(r["job_id"] for r in leer_auditoria(rutas)) == ["nuevo", "viejo"]
+    assert len(archivos_auditoria(tmp_path)) == 3
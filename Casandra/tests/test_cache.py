@@ -0,0 +1,71 @@
+# casandra/tests/test_cache.py
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+from Casandra.Celador.cache import (
+    MARCADOR,
+    CacheDisco,
+    CacheMemoria,
+    CacheResultados,
+    ClaveCache,
+)
+from Casandra.dominio.sobre import Resumen, SobreOk
+
+
+def _sobre(texto: str) -> SobreOk:
+    return SobreOk(tool="t@1.0.0", summary=Resumen(headline=texto), metrics={"n": 1})
+
+
+def _cache(raiz: Path, ttl_s: float = 3600) -> CacheResultados:
+    return CacheResultados(CacheMemoria(1 << 20), CacheDisco(raiz, ttl_s=ttl_s))
+
+
+def test_miss_y_luego_hit_en_memoria_y_disco(tmp_path: Path) -> None:
+    cache = _cache(tmp_path)
+    clave = ClaveCache("t@1.0.0", "v1", "sha256:aa")
+    assert cache.obtener(clave) is None
+
+    cache.guardar(clave, _sobre("uno"))
+    sobre, nivel = cache.obtener(clave)
+    assert (nivel, sobre.summary.headline, sobre.metrics) == ("mem", "uno", {"n": 1})
+
+    # Otro proceso (memoria vacía) lo encuentra en disco.
+    sobre, nivel = _cache(tmp_path).obtener(clave)
+    assert (nivel, sobre.summary.headline) == ("disk", "uno")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_llaves_distintas_no_se_mezclan(tmp_path: Path) -> None:
+    cache = _cache(tmp_path)
+    cache.guardar(ClaveCache("t@1.0.0", "v1", "sha256:aa"), _sobre("uno"))
+    assert cache.obtener(ClaveCache("t@1.0.0", "v1", "sha256:bb")) is None
+    assert cache.obtener(ClaveCache("t@2.0.0", "v1", "sha256:aa")) is None
+
+
+def test_nueva_version_invalida_la_anterior(tmp_path: Path) -> None:
+    cache = _cache(tmp_path, ttl_s=0)
+    vieja = ClaveCache("t@1.0.0", "v1", "sha256:aa")
+    cache.guardar(vieja, _sobre("uno"))
+    assert cache.obtener(vieja) is not None
+
+    (tmp_path / "ajeno").mkdir()  # directorio que no es de la caché
+    assert cache.obtener(ClaveCache("t@1.0.0", "v2", "sha256:aa")) is None
+    assert len(cache.memoria) == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["ajeno"]
+
+
+def test_purga_respeta_versiones_recientes(tmp_path: Path) -> None:
+    disco = CacheDisco(tmp_path, ttl_s=60)
+    disco.put(ClaveCache("t@1.0.0", "v1", "sha256:aa"), b"x")
+    disco.put(ClaveCache("t@1.0.0", "v2", "sha256:aa"), b"y")
+
+    disco.purgar_excepto("v3")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["v1", "v2"]
+
+    vencido = time.time() - 120
+    os.utime(tmp_path / "v1" / MARCADOR, (vencido, vencido))
+    disco.purgar_excepto("v3")
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["v2"]
@@ -0,0 +1,75 @@
+# casandra/tests/test_coalescencia.py
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from Casandra.Celador.coalescencia import SingleFlight
+from Casandra.dominio.sobre import Resumen, SobreOk
+
+SEGUIDORES = 3
+
+
+def _vuelo(fn_resultado):
+    """Un líder bloqueado hasta que se unan SEGUIDORES; devuelve los futures (líder primero) y las llamadas."""
+    sf = SingleFlight()
+    empezo, soltar = threading.Event(), threading.Event()
+    unidos = threading.Semaphore(0)
+    llamadas = []
+
+    def fn():
+        llamadas.append(threading.get_ident())
+        empezo.set()
+        assert soltar.wait(5)
+        return fn_resultado()
+
+    def auditar(rol, _vuelo) -> None:
+        if rol == "follower":
+            unidos.release()
+
+    pool = ThreadPoolExecutor(SEGUIDORES + 1)
+    futuros = [pool.submit(sf.ejecutar, "llave", fn, auditar)]
+    assert empezo.wait(5)
+    futuros += [
+        pool.submit(sf.ejecutar, "llave", fn, auditar) for _ in range(SEGUIDORES)
+    ]
+    for _ in range(SEGUIDORES):
+        assert unidos.acquire(timeout=5)
+    soltar.set()
+    pool.shutdown(wait=True)
+    return futuros, llamadas
+
+
+def test_seguidores_reciben_el_resultado_del_lider() -> None:
+    futuros, llamadas = _vuelo(
+        lambda: SobreOk(tool="t", summary=Resumen(headline="h"), metrics={"n": 7})
+    )
+    assert len(llamadas) == 1
+
+    resultados = [f.result() for f in futuros]
+    assert [rol for _, rol in resultados] == ["leader"] + ["follower"] * SEGUIDORES
+    sobres = [s for s, _ in resultados]
+    assert all(s == sobres[0] for s in sobres)
+    # Cada seguidor tiene su copia: mutarla no toca la de los demás.
+    assert len({id(s) for s in sobres}) == len(sobres)
+    sobres[1].meta.cache = "hit"
+    assert sobres[2].meta.cache is None
+
+
+def test_seguidores_reciben_la_excepcion_del_lider() -> None:
+    def falla():
+        raise ValueError("boom")
+
+    futuros, llamadas = _vuelo(falla)
+    assert len(llamadas) == 1
+    for f in futuros:
+        with pytest.raises(ValueError, match="boom"):
+            f.result()
+
+
+def test_tras_el_vuelo_la_llave_se_libera() -> None:
+    sf = SingleFlight()
+    roles = [sf.ejecutar("llave", lambda: 1, lambda *_: None)[1] for _ in range(2)]
+    assert roles == ["leader", "leader"]
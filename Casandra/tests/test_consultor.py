@@ -0,0 +1,66 @@
+# casandra/tests/test_consultor.py
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from Casandra.Consultor.repo import Consultor, Filtros, PoolDuckDB
+from Casandra.Etl.deposito import incidentes_dir
+from Casandra.Etl.ingesta import ingerir
+from Casandra.tests.test_ingesta import _csv
+
+
+def _total(cur) -> int:
+    return cur.execute("SELECT count(*) FROM incidentes").fetchone()[0]
+
+
+@pytest.fixture
+def pool(tmp_path: Path):
+    deposito = tmp_path / "deposito"
+    fuente = _csv(tmp_path / "a.csv", 100)
+    ingerir([fuente], deposito)
+    p = PoolDuckDB(incidentes_dir(deposito))
+    p.fuente = fuente
+    yield p
+    p.cerrar()
+
+
+def _reingerir(pool: PoolDuckDB, filas: int) -> None:
+    _csv(pool.fuente, filas, desfase=1)
+    ingerir([pool.fuente], pool.deposito_dir)
+
+
+def test_nueva_version_se_ve_en_el_siguiente_cursor(pool: PoolDuckDB) -> None:
+    consultor = Consultor(pool)
+    assert consultor.conteos_acumulados([Filtros()]) == [100]
+    _reingerir(pool, 150)
+    assert consultor.conteos_acumulados([Filtros()]) == [150]
+
+
+def test_generacion_previa_se_cierra_al_soltar_su_ultimo_cursor(
+    pool: PoolDuckDB,
+) -> None:
+    viejo = pool.cursor()
+    conexion_vieja = pool._local.generacion.conn
+    _reingerir(pool, 150)
+
+    # Otro hilo pasa a la nueva vista; el cursor viejo sigue retenido y vivo.
+    salida: list[int] = []
+    hilo = threading.Thread(target=lambda: salida.append(_total(pool.cursor())))
+    hilo.start()
+    hilo.join()
+    assert salida == [150]
+    assert _total(viejo) == 100
+
+    # Este hilo también cambia de generación y suelta el último cursor viejo.
+    del viejo
+    assert _total(pool.cursor()) == 150
+    with pytest.raises(duckdb.ConnectionException):
+        conexion_vieja.execute("SELECT 1")
+
+
+def test_cursor_del_hilo_se_reutiliza(pool: PoolDuckDB) -> None:
+    assert pool.cursor() is pool.cursor()
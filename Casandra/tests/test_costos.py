@@ -0,0 +1,62 @@
+# casandra/tests/test_costos.py
+from __future__ import annotations
+
+from functools import partial
+
+import pytest
+
+from Casandra.Orquestador import core
+from Casandra.Orquestador.costos import error_presupuesto, verificar_presupuesto
+
+PRESUPUESTO = 1_000
+
+
+def _plan(desde: str, hasta: str) -> dict:
+    return {
+        "plan": [
+            {
+                "tool_id": 2,
+                "tool_version": "1.0.0",
+                "args": {"from": desde, "to": hasta},
+            },
+            {"tool_id": 9, "tool_version": "1.0.0", "args": {"max_ids": 5}},
+        ]
+    }
+
+
+@pytest.fixture
+def presupuesto_chico(monkeypatch) -> None:
+    monkeypatch.setattr(
+        core,
+        "verificar_presupuesto",
+        partial(verificar_presupuesto, presupuesto=PRESUPUESTO),
+    )
+    monkeypatch.setattr(
+        core, "error_presupuesto", partial(error_presupuesto, presupuesto=PRESUPUESTO)
+    )
+
+
+def test_plan_sobre_presupuesto_se_rechaza_antes_de_ejecutar(
+    cliente, presupuesto_chico
+) -> None:
+    r = cliente.post("/plan/execute", json=_plan("2022-01-01", "2024-12-31"))
+    assert r.status_code == 422
+    (sobre,) = r.json()["sobres"]  # nada corrió: solo el error del paso culpable
+    assert sobre["tool"] == "listar_evidencia@1.0.0"
+    assert sobre["error"]["code"] == "RESOURCE_LIMIT"
+    assert "presupuesto es 1,000" in sobre["error"]["details"]
+    pistas = " ".join(sobre["error"]["hints"])
+    assert "streaming" in pistas and "Acotar filtro_fecha" in pistas
+
+
+def test_plan_dentro_del_presupuesto_corre(cliente, presupuesto_chico) -> None:
+    r = cliente.post("/plan/execute", json=_plan("2024-01-01", "2024-01-07"))
+    assert r.status_code == 200, r.text
+
+
+def test_streaming_y_rollup_no_cuentan(cliente, presupuesto_chico) -> None:
+    plan = _plan("2022-01-01", "2024-12-31")
+    r = cliente.post("/plan/execute", json=plan, params={"stream": "ndjson"})
+    assert r.status_code == 200
+    plan["plan"][1] = {"tool_id": 7, "tool_version": "1.0.0", "args": {"top_k": 3}}
+    assert cliente.post("/plan/execute", json=plan).status_code == 200
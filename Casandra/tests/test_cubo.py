@@ -0,0 +1,51 @@
+# casandra/tests/test_cubo.py
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from Casandra.Consultor.cubo import obtener_cubo
+from Casandra.Consultor.repo import Filtros, obtener_consultor
+
+FILTROS = [
+    Filtros(),
+    Filtros(desde=date(2024, 1, 1), hasta=date(2024, 3, 31)),
+    Filtros(desde=date(2021, 1, 1), hasta=date(2021, 1, 1)),  # un solo día (borde)
+    Filtros(desde=date(2025, 8, 1), hasta=date(2026, 1, 1)),  # recortado al cubo
+    Filtros(desde=date(2023, 6, 1), hasta=date(2023, 5, 1)),  # ventana vacía
+]
+
+
+@pytest.fixture(scope="module")
+def fuentes(deposito):
+    cubo = obtener_cubo(deposito)
+    assert cubo is not None
+    return cubo, obtener_consultor()
+
+
+@pytest.mark.parametrize("filtros", FILTROS)
+def test_ventana_igual_al_sql(fuentes, filtros: Filtros) -> None:
+    cubo, consultor = fuentes
+    ventana = cubo.ventana(filtros.desde, filtros.hasta)
+    sql = consultor.conteo_por(filtros, por=("entidad_id", "delito")).to_pylist()
+    esperado = {(f["entidad_id"], f["delito"]): f["conteo"] for f in sql}
+    ie = cubo.jerarquia.codigos
+    idl = {d: i for i, d in enumerate(cubo.ejes.delitos)}
+    obtenido = {
+        (e, d): int(ventana[ie[e], idl[d]])
+        for e in cubo.ejes.entidades
+        for d in cubo.ejes.delitos
+        if ventana[ie[e], idl[d]]
+    }
+    assert obtenido == esperado
+
+
+@pytest.mark.parametrize("por", ["entidad_id", "delito"])
+@pytest.mark.parametrize("filtros", FILTROS[:2])
+def test_ranking_igual_al_sql(fuentes, filtros: Filtros, por: str) -> None:
+    cubo, consultor = fuentes
+    filas, _ = cubo.ranking(filtros, por, top_k=5)
+    assert filas
+    sql = consultor.conteo_por(filtros, por=(por,), limite=5).to_pylist()
+    assert [(k, n) for k, n, _ in filas] == [(f[por], f["conteo"]) for f in sql]
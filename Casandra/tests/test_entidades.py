@@ -0,0 +1,94 @@
+# casandra/tests/test_entidades.py
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from Casandra.benchmarks.sintetico import ENTIDADES_GTO
+from Casandra.Celador.errores import ValidacionError
+from Casandra.Consultor.entidades import JerarquiaEntidades
+
+ESTADOS = ("GTO.EST.GTO", "JAL.EST.JAL")
+JALISCO = ("JAL.MUN.GUADALAJARA", "JAL.MUN.ZAPOPAN", "JAL.MUN.LEON_VIEJO")
+
+
+@pytest.fixture(scope="module")
+def jerarquia() -> JerarquiaEntidades:
+    return JerarquiaEntidades(
+        ENTIDADES_GTO + JALISCO + ESTADOS,
+        nombres={"GTO.MUN.DOLORES_HIDALGO": "Dolores Hidalgo C.I.N."},
+    )
+
+
+def test_hijos_son_rango_contiguo(jerarquia: JerarquiaEntidades) -> None:
+    ini, fin = jerarquia.rango_hijos("GTO.EST.GTO")
+    assert jerarquia.ids[ini:fin] == tuple(sorted(ENTIDADES_GTO))
+    assert jerarquia.hijos("JAL.EST.JAL") == tuple(sorted(JALISCO))
+    assert jerarquia.hijos("GTO.MUN.LEON") == ()
+    # Estado ausente del dataset: el rango sale igual del prefijo.
+    sin_estados = JerarquiaEntidades(ENTIDADES_GTO + JALISCO)
+    assert sin_estados.hijos("JAL.EST.JAL") == tuple(sorted(JALISCO))
+    gto = jerarquia.codigo("GTO.EST.GTO")
+    assert all(jerarquia.padre[i] == gto for i in range(ini, fin))
+    assert jerarquia.padre[gto] == -1
+
+
+def test_codigos_son_posiciones_ordenadas(jerarquia: JerarquiaEntidades) -> None:
+    assert list(jerarquia.ids) == sorted(jerarquia.ids)
+    for e in ("GTO.MUN.LEON", "JAL.EST.JAL"):
+        assert jerarquia.ids[jerarquia.codigo(e)] == e
+    assert jerarquia.codigo("GTO.MUN.NO_EXISTE") == -1
+    assert jerarquia.expandir("JAL.EST.JAL") == ("JAL.EST.JAL",) + tuple(
+        sorted(JALISCO)
+    )
+
+
+@pytest.mark.parametrize(
+    "texto,esperado",
+    [
+        ("GTO.MUN.LEON", "GTO.MUN.LEON"),
+        ("León", "GTO.MUN.LEON"),
+        ("apaseo el alto", "GTO.MUN.APASEO_EL_ALTO"),
+        ("Municipio de Acámbaro", "GTO.MUN.ACAMBARO"),
+        ("Acambro", "GTO.MUN.ACAMBARO"),  # un borrado
+        ("Zapopn", "JAL.MUN.ZAPOPAN"),
+        ("dolores hidalgo c.i.n.", "GTO.MUN.DOLORES_HIDALGO"),
+        ("Guanajuato", "GTO.MUN.GUANAJUATO"),  # municipio gana a su estado
+    ],
+)
+def test_resolver(jerarquia: JerarquiaEntidades, texto: str, esperado: str) -> None:
+    assert jerarquia.resolver(texto) == esperado
+
+
+def test_resolver_desconocida_o_ambigua(jerarquia: JerarquiaEntidades) -> None:
+    with pytest.raises(ValidacionError, match="desconocida"):
+        jerarquia.resolver("Atlantida")
+    # Nombres cortos no entran al difuso.
+    with pytest.raises(ValidacionError, match="desconocida"):
+        jerarquia.resolver("Lon")
+    assert jerarquia.resolver("apaseo el grand") == "GTO.MUN.APASEO_EL_GRANDE"
+    # A una sustitución de dos municipios distintos.
+    amb = JerarquiaEntidades(["AAA.MUN.SALAS", "AAA.MUN.SALAR"])
+    with pytest.raises(ValidacionError, match="ambigua"):
+        amb.resolver("salax")
+
+
+def test_resolver_acota_por_estado(jerarquia: JerarquiaEntidades) -> None:
+    assert jerarquia.buscar("zapopan", estado="GTO") == ()
+    assert jerarquia.resolver("zapopan", estado="JAL.EST.JAL") == "JAL.MUN.ZAPOPAN"
+    with pytest.raises(ValidacionError):
+        jerarquia.resolver("zapopan", estado="GTO")
+
+
+def test_endpoint_resolver(cliente, deposito: Path) -> None:
+    r = cliente.get("/entidades/resolver", params={"texto": "León"})
+    assert r.status_code == 200
+    cuerpo = r.json()
+    datos = cuerpo.get("data", cuerpo)
+    assert datos["entidad_id"] == "GTO.MUN.LEON"
+    assert datos["nombre"] == "Leon"
+    assert datos["candidatos"] == ["GTO.MUN.LEON"]
+    r = cliente.get("/entidades/resolver", params={"texto": "Atlantida"})
+    assert r.status_code == 422
+    assert r.json()["error"]["code"] == "INVALID_PAYLOAD"
@@ -0,0 +1,59 @@
+# casandra/tests/test_esquema.py
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from Casandra.benchmarks.sintetico import ENTIDADES_GTO
+from Casandra.Celador.errores import ValidacionError
+from Casandra.Herramientas.esquema import validador
+from Casandra.Herramientas.spec import ToolSpec, herramientas
+
+VALIDOS = {
+    "entidad_id": ENTIDADES_GTO[0],
+    "delito": "robo_a_negocio",
+    "delitos": ["robo_a_negocio"],
+    "from": "2024-01-01",
+    "to": "2024-03-31",
+    "bbox": [-101.8, 20.5, -100.5, 21.5],
+}
+
+
+def _casos(spec: ToolSpec) -> list[dict[str, Any]]:
+    """Args válidos e inválidos derivados del esquema de la tool."""
+    props = spec.args_schema["properties"]
+    requeridos = {c: VALIDOS[c] for c in spec.args_schema.get("required", ())}
+    casos: list[dict[str, Any]] = [{}, dict(requeridos), {**requeridos, "extra": 1}]
+    for campo, prop in props.items():
+        malos: list[Any] = [None, True, "x", 1.5, [], {}]
+        if "enum" in prop:
+            malos.append(prop["enum"][-1])  # válido
+        elif "maximum" in prop:
+            malos += [prop["minimum"], prop["maximum"], prop["maximum"] + 1]
+            malos.append(prop["minimum"] - 1)
+        if campo in VALIDOS:
+            malos += [VALIDOS[campo], "no-valido", ""]
+        casos += [{**requeridos, campo: v} for v in malos]
+    return casos
+
+
+def _resultado(fn) -> tuple[str, Any]:
+    try:
+        return "ok", fn()
+    except ValidacionError as e:
+        return "error", str(e)
+
+
+@pytest.mark.parametrize(
+    "spec", [s for s in herramientas() if s.args_schema], ids=lambda s: s.canonical
+)
+def test_compilado_e_interpretado_coinciden(spec: ToolSpec) -> None:
+    v = validador(spec)
+    errores = 0
+    for args in _casos(spec):
+        compilado = _resultado(lambda: v.validar(args))
+        interpretado = _resultado(lambda: v._interpretar(args))
+        assert compilado == interpretado, args
+        errores += compilado[0] == "error"
+    assert errores  # los casos inválidos sí se rechazan
@@ -0,0 +1,38 @@
+# casandra/tests/test_etag.py
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.mark.parametrize("ruta", ["/dataset/metadata", "/tools/catalog"])
+def test_if_none_match_da_304(cliente, ruta: str) -> None:
+    r = cliente.get(ruta)
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+
+    r304 = cliente.get(ruta, headers={"If-None-Match": etag})
+    assert r304.status_code == 304
+    assert r304.content == b""
+    assert r304.headers["etag"] == etag
+
+    # Comparación débil: con o sin W/, y dentro de una lista.
+    assert (
+        cliente.get(
+            ruta, headers={"If-None-Match": f'"otro", {etag.removeprefix("W/")}'}
+        ).status_code
+        == 304
+    )
+    assert cliente.get(ruta, headers={"If-None-Match": '"otro"'}).status_code == 200
+
+
+@pytest.mark.parametrize("ruta", ["/dataset/metadata", "/tools/catalog"])
+def test_mismo_etag_mismo_cuerpo(cliente, ruta: str) -> None:
+    a, b = cliente.get(ruta), cliente.get(ruta)
+    assert a.headers["etag"] == b.headers["etag"]
+    assert a.content == b.content
+
+
+def test_metadata_refleja_el_deposito(cliente) -> None:
+    meta = cliente.get("/dataset/metadata").json()
+    assert (meta["min_date"], meta["max_date"]) == ("2021-01-01", "2025-08-13")
+    assert meta["filas"] == 20_000
@@ -0,0 +1,115 @@
+# casandra/tests/test_flujo.py
+from __future__ import annotations
+
+import io
+import json
+
+import pyarrow as pa
+import pytest
+
+from Casandra.Celador.errores import DatosFaltantesError, ValidacionError
+from Casandra.dominio.sobre import Resumen, SobreMeta
+from Casandra.Empaquetador.flujo import Flujo, codificar, negociar
+
+TABLA = pa.table({"entidad_id": ["A", "B", "C"], "conteo": [3, 2, 1]})
+
+
+def _flujo(lotes) -> Flujo:
+    return Flujo(
+        tool="t@1.0.0",
+        meta=SobreMeta(dataset_version="dv"),
+        esquema=TABLA.schema,
+        lotes=lotes,
+        resumen=lambda n: Resumen(headline=f"{n} filas"),
+    )
+
+
+def _con_fallo():
+    yield TABLA.slice(0, 2).to_batches()[0]
+    raise DatosFaltantesError("partición ilegible")
+
+
+def _lineas(cuerpo: bytes) -> list:
+    return [json.loads(x) for x in cuerpo.splitlines()]
+
+
+def test_ndjson_cabecera_filas_y_cierre() -> None:
+    lotes = TABLA.to_batches(max_chunksize=2)
+    lineas = _lineas(b"".join(codificar(_flujo(iter(lotes)), "ndjson")))
+    cabecera, *filas, cierre = lineas
+    assert cabecera["type"] == "header" and cabecera["status"] == "ok"
+    assert [c["name"] for c in cabecera["columns"]] == ["entidad_id", "conteo"]
+    assert cabecera["meta"] == {"dataset_version": "dv"}
+    assert filas == [["A", 3], ["B", 2], ["C", 1]]
+    assert cierre["type"] == "trailer" and cierre["status"] == "ok"
+    assert (cierre["rows"], cierre["summary"]["headline"]) == (3, "3 filas")
+
+
+def test_ndjson_fallo_a_mitad_cierra_con_error() -> None:
+    *_, cierre = _lineas(b"".join(codificar(_flujo(_con_fallo()), "ndjson")))
+    assert cierre["status"] == "error" and cierre["rows"] == 2
+    assert cierre["error"]["code"] == "DATA_QUALITY_ISSUE"
+    assert "summary" not in cierre
+
+
+def test_arrow_cabecera_en_schema_y_cierre_en_lote_vacio() -> None:
+    cuerpo = b"".join(codificar(_flujo(iter(TABLA.to_batches())), "arrow"))
+    lector = pa.ipc.open_stream(io.BytesIO(cuerpo))
+    cabecera = json.loads(lector.schema.metadata[b"casandra:header"])
+    assert cabecera["tool"] == "t@1.0.0"
+
+    lotes = []
+    while True:
+        try:
+            lote, metadata = lector.read_next_batch_with_custom_metadata()
+        except StopIteration:
+            break
+        lotes.append((lote, metadata))
+    datos, (vacio, fin) = lotes[:-1], lotes[-1]
+    assert pa.Table.from_batches([b for b, _ in datos]).to_pylist() == TABLA.to_pylist()
+    assert vacio.num_rows == 0
+    cierre = json.loads(fin[b"casandra:trailer"])
+    assert (cierre["status"], cierre["rows"]) == ("ok", 3)
+
+
+def test_arrow_fallo_a_mitad_queda_sin_cierre() -> None:
+    cuerpo = b"".join(codificar(_flujo(_con_fallo()), "arrow"))
+    lector = pa.ipc.open_stream(io.BytesIO(cuerpo))
+    metadatas = []
+    while True:
+        try:
+            _, metadata = lector.read_next_batch_with_custom_metadata()
+        except StopIteration:
+            break
+        metadatas.append(metadata)
+    # Solo el lote previo al fallo; sin lote de cierre el lector sabe que se cortó.
+    assert len(metadatas) == 1
+    assert metadatas[0] is None or b"casandra:trailer" not in metadatas[0]
+
+
+def test_negociar() -> None:
+    assert negociar(None, None) is None
+    assert negociar("application/json", None) is None
+    assert negociar("text/html, application/x-ndjson;q=0.9", None) == "ndjson"
+    assert negociar("application/x-ndjson", "arrow") == "arrow"  # ?stream= manda
+    with pytest.raises(ValidacionError):
+        negociar(None, "csv")
+
+
+def test_plan_en_streaming(cliente) -> None:
+    plan = {
+        "plan": [
+            {
+                "tool_id": 2,
+                "tool_version": "1.0.0",
+                "args": {"from": "2024-01-01", "to": "2024-01-31"},
+            },
+            {"tool_id": 9, "tool_version": "1.0.0", "args": {"max_ids": 5}},
+        ]
+    }
+    r = cliente.post("/plan/execute", json=plan, params={"stream": "ndjson"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    cabecera, *filas, cierre = _lineas(r.content)
+    assert cabecera["tool"] == "listar_evidencia@1.0.0"
+    assert cierre["status"] == "ok" and cierre["rows"] == len(filas) > 0
@@ -0,0 +1,49 @@
+# casandra/tests/test_hotspots.py
+from __future__ import annotations
+
+import pytest
+
+from Casandra.Celador.errores import ValidacionError
+from Casandra.Herramientas.esquema import validar_args
+from Casandra.Herramientas.registro import DETECTAR_HOTSPOTS
+
+CAJA = [-101.8, 20.5, -100.5, 21.5]
+
+
+def test_bbox_valida_se_normaliza_a_float() -> None:
+    args = validar_args(DETECTAR_HOTSPOTS, {"bbox": [-102, 20, -100, 22]})
+    assert args["bbox"] == [-102.0, 20.0, -100.0, 22.0]
+    assert all(type(v) is float for v in args["bbox"])
+
+
+@pytest.mark.parametrize(
+    "bbox",
+    [
+        ["a", 1, 2, 3],  # elemento no numérico
+        [True, 20.5, -100.5, 21.5],  # bool no es número
+        "-101.8,20.5,-100.5,21.5",  # no es lista
+        {"lon": -101.8},
+        CAJA + [0.0],  # sobra un elemento
+        CAJA[:3],
+        [-100.5, 20.5, -101.8, 21.5],  # min > max
+        [-181.0, 20.5, -100.5, 21.5],
+    ],
+)
+def test_bbox_invalida_es_error_de_validacion(bbox) -> None:
+    with pytest.raises(ValidacionError, match="bbox"):
+        validar_args(DETECTAR_HOTSPOTS, {"bbox": bbox})
+
+
+def test_bbox_invalida_en_plan_da_422(cliente) -> None:
+    plan = {
+        "plan": [
+            {
+                "tool_id": DETECTAR_HOTSPOTS.tool_id,
+                "tool_version": "1.0.0",
+                "args": {"bbox": ["a", 1, 2, 3]},
+            }
+        ]
+    }
+    r = cliente.post("/plan/execute", json=plan)
+    assert r.status_code == 422
+    assert r.json()["sobres"][-1]["error"]["code"] == "INVALID_PAYLOAD"
@@ -0,0 +1,73 @@
+# casandra/tests/test_lote.py
+from __future__ import annotations
+
+import json
+
+
+def _paso(tool_id: int, args: dict) -> dict:
+    return {"tool_id": tool_id, "tool_version": "1.0.0", "args": args}
+
+
+def _plan(delitos: list[str], **extra) -> dict:
+    return {
+        "plan": [
+            _paso(2, {"from": "2024-01-01", "to": "2024-06-30"}),
+            _paso(3, {"delitos": delitos}),
+            _paso(7, {"top_k": 3}),
+        ],
+        **extra,
+    }
+
+
+A = _plan(["robo_a_negocio", "homicidio_doloso"])
+A_REORDENADO = _plan(["homicidio_doloso", "robo_a_negocio"])  # mismo query_hash
+B = _plan(["robo_a_negocio"])
+A_ULTIMO = _plan(["robo_a_negocio", "homicidio_doloso"], devolver="ultimo")
+INVALIDO = {"plan": [_paso(7, {"top_k": 0})]}
+
+
+def _sin_tiempos(respuesta: dict) -> list:
+    return [(s["status"], s["tool"], s.get("summary")) for s in respuesta["sobres"]]
+
+
+def test_duplicados_corren_una_vez(cliente) -> None:
+    lote = {"planes": [A, B, A_REORDENADO, A_ULTIMO, INVALIDO, A]}
+    r = cliente.post("/plan/batch", json=lote)
+    assert r.status_code == 200
+    cuerpo = r.json()
+    assert (cuerpo["planes"], cuerpo["unicos"]) == (6, 4)
+    assert cuerpo["status"] == "parcial"  # el inválido no tumba el lote
+
+    res = cuerpo["resultados"]
+    assert [x["indice"] for x in res] == list(range(6))
+    assert [x.get("duplicado_de") for x in res] == [None, None, 0, None, None, 0]
+    # Un duplicado es la misma ejecución: mismo job_id y misma respuesta.
+    assert res[2]["job_id"] == res[5]["job_id"] == res[0]["job_id"]
+    assert res[2]["respuesta"] == res[0]["respuesta"]
+    assert len({x["job_id"] for x in res}) == 4
+    # `devolver` distinto no es duplicado.
+    assert len(res[3]["respuesta"]["sobres"]) == 1
+    assert res[4]["http"] == 422
+
+
+def test_escaneo_compartido_da_lo_mismo_que_planes_sueltos(cliente) -> None:
+    lote = cliente.post("/plan/batch", json={"planes": [A, B]}).json()
+    for plan, resultado in zip((A, B), lote["resultados"]):
+        suelto = cliente.post("/plan/execute", json=plan).json()
+        assert _sin_tiempos(resultado["respuesta"]) == _sin_tiempos(suelto)
+
+
+def test_lote_en_ndjson(cliente) -> None:
+    r = cliente.post(
+        "/plan/batch", json={"planes": [A, A_REORDENADO]}, params={"stream": "ndjson"}
+    )
+    assert r.status_code == 200
+    lineas = [json.loads(x) for x in r.content.splitlines()]
+    assert sorted(x["indice"] for x in lineas) == [0, 1]
+    assert {x.get("duplicado_de") for x in lineas} == {None, 0}
+
+
+def test_lote_vacio_o_arrow_es_invalido(cliente) -> None:
+    assert cliente.post("/plan/batch", json={"planes": []}).status_code == 422
+    r = cliente.post("/plan/batch", json={"planes": [A]}, params={"stream": "arrow"})
+    assert r.status_code == 422
@@ -0,0 +1,70 @@
+# casandra/tests/test_middleware.py
+from __future__ import annotations
+
+import asyncio
+import re
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from Casandra.Celador.auditoria import get_job_id
+from Casandra.Expositor import middleware
+from Casandra.Expositor.middleware import JobIdMiddleware
+
+PAUSA_S = 0.15
+
+
+async def _eco(request) -> PlainTextResponse:
+    return PlainTextResponse(get_job_id(), status_code=201)
+
+
+async def _lento(request) -> StreamingResponse:
+    async def cuerpo():
+        yield b"a"
+        await asyncio.sleep(PAUSA_S)
+        yield b"b"
+
+    return StreamingResponse(cuerpo())
+
+
+@pytest.fixture
+def eventos(monkeypatch) -> list[tuple[str, dict]]:
+    capturados: list[tuple[str, dict]] = []
+    monkeypatch.setattr(
+        middleware, "audit", lambda etapa, datos: capturados.append((etapa, datos))
+    )
+    return capturados
+
+
+@pytest.fixture
+def cliente() -> TestClient:
+    app = Starlette(routes=[Route("/eco", _eco), Route("/lento", _lento)])
+    app.add_middleware(JobIdMiddleware)
+    return TestClient(app)
+
+
+def test_job_id_valido_se_conserva(cliente, eventos) -> None:
+    jid = "ab" * 16
+    r = cliente.get("/eco", headers={"X-Job-Id": jid})
+    assert r.headers["x-job-id"] == jid
+    assert r.text == jid  # el handler ve el mismo job_id en su contexto
+    assert [e for e, _ in eventos] == ["request_in", "response_out"]
+    assert eventos[1][1]["status_code"] == 201
+
+
+def test_job_id_invalido_se_reemplaza(cliente, eventos) -> None:
+    r = cliente.get("/eco", headers={"X-Job-Id": "no-es-hex"})
+    assert re.fullmatch(r"[0-9a-f]{32}", r.headers["x-job-id"])
+    assert r.text == r.headers["x-job-id"]
+
+
+def test_streaming_pasa_y_ttfb_antes_de_la_latencia(cliente, eventos) -> None:
+    r = cliente.get("/lento")
+    assert r.content == b"ab"
+    assert "x-job-id" in r.headers
+    salida = dict(eventos)["response_out"]
+    # El primer byte sale antes de la pausa; la latencia total la incluye.
+    assert salida["ttfb_ms"] < PAUSA_S * 1000 <= salida["latency_ms"]
@@ -0,0 +1,77 @@
+# casandra/tests/test_patrones.py
+from __future__ import annotations
+
+from datetime import date
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from Casandra.Analisis.Patrones.coocurrencia import itemsets, matriz_incidencia, pares
+from Casandra.Consultor.cubo import obtener_cubo
+from Casandra.Consultor.repo import Filtros, obtener_consultor
+from Casandra.Herramientas.esquema import validar_args
+from Casandra.Herramientas.registro import DETECTAR_PATRONES
+from Casandra.Herramientas.spec import Contexto
+
+
+def _transacciones(n_celdas: int, n_items: int, semilla: int) -> np.ndarray:
+    """Matriz densa 0/1 con ítems correlacionados (0 y 1 casi siempre juntos)."""
+    rng = np.random.default_rng(semilla)
+    x = rng.random((n_celdas, n_items)) < 0.25
+    x[:, 1] |= x[:, 0] & (rng.random(n_celdas) < 0.9)
+    return x
+
+
+def _ingenuo(x: np.ndarray, min_support: float, max_len: int) -> dict[tuple, int]:
+    x = x[x.any(axis=1)]  # celdas vacías no cuentan
+    n = x.shape[0]
+    out = {}
+    for k in range(2, max_len + 1):
+        for s in combinations(range(x.shape[1]), k):
+            c = int(x[:, list(s)].all(axis=1).sum())
+            if c >= max(1, np.ceil(min_support * n)):
+                out[s] = c
+    return out
+
+
+def _csr(x: np.ndarray):
+    celda, item = np.nonzero(x)
+    return matriz_incidencia(celda, item, *x.shape)
+
+
+@pytest.mark.parametrize("n_items", [8, 70])  # máscaras de bits / transacciones
+def test_itemsets_igual_a_fuerza_bruta(n_items: int) -> None:
+    x = _transacciones(300, n_items, semilla=n_items)
+    min_support = 0.06 if n_items < 62 else 0.05
+    p = itemsets(_csr(x), min_support, max_len=3)
+    assert dict(zip(p.items, p.conteo.tolist())) == _ingenuo(x, min_support, 3)
+
+
+def test_pares_y_medidas() -> None:
+    x = _transacciones(400, 6, semilla=1)
+    p = pares(_csr(x), 0.05)
+    assert dict(zip(p.items, p.conteo.tolist())) == _ingenuo(x, 0.05, 2)
+
+    n = p.celdas
+    soporte = x[x.any(axis=1)].sum(axis=0) / n
+    i = p.items.index((0, 1))
+    esperado = soporte[0] * soporte[1]
+    assert p.support[i] == pytest.approx(p.conteo[i] / n)
+    assert p.lift[i] == pytest.approx(p.support[i] / esperado)
+    assert p.score[i] == pytest.approx(p.support[i] - esperado)
+    assert p.lift[i] > 1  # el par correlacionado supera la independencia
+
+
+def test_cubo_y_sql_dan_los_mismos_patrones(deposito) -> None:
+    args = validar_args(
+        DETECTAR_PATRONES, {"celda": "semana", "min_support": 0.02, "max_len": 3}
+    )
+    filtros = Filtros(desde=date(2023, 1, 1), hasta=date(2024, 12, 31))
+    consultor = obtener_consultor()
+    a = DETECTAR_PATRONES.ejecutar(
+        filtros, args, Contexto(consultor, cubo=obtener_cubo(deposito))
+    )
+    b = DETECTAR_PATRONES.ejecutar(filtros, args, Contexto(consultor))
+    assert a.data.inline.rows
+    assert a.data.inline.rows == b.data.inline.rows
@@ -0,0 +1,112 @@
+# casandra/tests/test_plan.py
+from __future__ import annotations
+
+from datetime import date
+
+import msgspec
+import pytest
+
+from Casandra.benchmarks.sintetico import ENTIDADES_GTO
+from Casandra.Celador.errores import RangoVacio
+from Casandra.Consultor.repo import Filtros
+
+ENFOQUE, FECHA, ANALISIS = (
+    1,
+    2,
+    7,
+)  # enfoque_entidad, filtro_fecha, top_entidades_por_total
+
+
+def _paso(tool_id: int, args: dict, version: str = "1.0.0") -> dict:
+    return {"tool_id": tool_id, "tool_version": version, "args": args}
+
+
+def _fechas(desde: str, hasta: str) -> dict:
+    return _paso(FECHA, {"from": desde, "to": hasta})
+
+
+def test_restringir_intersecta_rangos() -> None:
+    f = Filtros().restringir(desde=date(2024, 1, 1), hasta=date(2025, 6, 1))
+    f = f.restringir(desde=date(2024, 6, 1), hasta=date(2026, 1, 1))
+    assert (f.desde, f.hasta) == (date(2024, 6, 1), date(2025, 6, 1))
+    f = f.restringir(entidad_ids=["A", "B"]).restringir(entidad_ids=["B", "C"])
+    assert f.entidad_ids == ("B",)
+
+
+def test_restringir_rangos_disjuntos() -> None:
+    f = Filtros().restringir(desde=date(2024, 1, 1), hasta=date(2024, 3, 1))
+    with pytest.raises(RangoVacio):
+        f.restringir(desde=date(2024, 6, 1), hasta=date(2024, 9, 1))
+
+
+def test_filtros_consecutivos_se_fusionan_en_un_escaneo(deposito) -> None:
+    from Casandra.Orquestador.core import validar_plan
+    from Casandra.Orquestador.plan import (
+        Escaneo,
+        Materializar,
+        decodificar_plan,
+        plan_logico,
+    )
+
+    crudo = {
+        "plan": [
+            _fechas("2024-01-01", "2025-06-01"),
+            _fechas("2024-06-01", "2026-01-01"),
+            _paso(ANALISIS, {"top_k": 3}),
+        ]
+    }
+    validado, error = validar_plan(decodificar_plan(msgspec.json.encode(crudo)))
+    assert error is None
+    nodos = plan_logico(validado[0])
+    assert [type(n) for n in nodos] == [Escaneo, Materializar]
+    assert len(nodos[0].pasos) == 2
+
+
+def test_rango_efectivo_del_plan(cliente) -> None:
+    plan = {
+        "plan": [
+            _fechas("2024-01-01", "2025-06-01"),
+            _fechas("2024-06-01", "2026-01-01"),
+            _paso(ANALISIS, {"top_k": 3}),
+        ]
+    }
+    r = cliente.post("/plan/execute", json=plan)
+    assert r.status_code == 200, r.text
+    ultimo = r.json()["sobres"][-1]
+    assert ultimo["meta"]["date_range_effective"] == {
+        "from": "2024-06-01",
+        "to": "2025-06-01",
+    }
+
+
+def test_plan_con_fechas_disjuntas(cliente) -> None:
+    plan = {
+        "plan": [
+            _fechas("2024-01-01", "2024-03-01"),
+            _fechas("2024-06-01", "2024-09-01"),
+            _paso(ANALISIS, {"top_k": 3}),
+        ]
+    }
+    r = cliente.post("/plan/execute", json=plan)
+    assert r.status_code == 422
+    assert r.json()["sobres"][-1]["error"]["code"] == "INVALID_DATE_RANGE"
+
+
+def test_error_en_escaneo_fusionado_nombra_el_paso_que_falla(cliente) -> None:
+    plan = {
+        "plan": [
+            _paso(ENFOQUE, {"entidad_id": ENTIDADES_GTO[0]}),
+            _fechas("2024-01-01", "2024-03-01"),
+            _fechas("2024-06-01", "2024-09-01"),
+            _paso(ANALISIS, {"top_k": 3}),
+        ]
+    }
+    r = cliente.post("/plan/execute", json=plan)
+    assert r.status_code == 422
+    sobres = r.json()["sobres"]
+    # Un Sobre por paso hasta el que falla, como si no hubiera fusión.
+    assert len(sobres) == 3
+    assert [s["status"] for s in sobres] == ["ok", "ok", "error"]
+    assert sobres[0]["tool"] == "enfoque_entidad@1.0.0"
+    assert sobres[2]["tool"] == "filtro_fecha@1.0.0"
+    assert sobres[2]["error"]["code"] == "INVALID_DATE_RANGE"
@@ -0,0 +1,67 @@
+# casandra/tests/test_procesos.py
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import pytest
+
+from Casandra.Celador.errores import (
+    HerramientaError,
+    LimiteRecursosError,
+    error_code_http,
+)
+from Casandra.Celador.procesos import PoolCPU
+
+
+# Las tareas se resuelven por (módulo, qualname) en el hijo: nivel módulo.
+def _pid() -> int:
+    return os.getpid()
+
+
+def _dormir(segundos: float) -> float:
+    time.sleep(segundos)
+    return segundos
+
+
+def _morir() -> None:
+    os._exit(3)
+
+
+def _eco(valor):
+    return valor
+
+
+@pytest.fixture
+def pool():
+    p = PoolCPU(procesos=1)
+    yield p
+    p.cerrar()
+
+
+def test_limite_de_tiempo_da_resource_limit_y_repone(pool: PoolCPU) -> None:
+    antes = pool.ejecutar(_pid)
+    with pytest.raises(LimiteRecursosError) as exc:
+        pool.ejecutar(_dormir, (5.0,), limite_s=0.3)
+    assert error_code_http(exc.value) == ("RESOURCE_LIMIT", 503)
+    despues = pool.ejecutar(_pid)
+    assert despues != antes  # se mató solo ese proceso y se arrancó otro
+    assert pool.stats()["procesos"] == 1
+
+
+def test_trabajador_caido_se_repone(pool: PoolCPU) -> None:
+    antes = pool.ejecutar(_pid)
+    with pytest.raises(HerramientaError, match="terminó inesperadamente"):
+        pool.ejecutar(_morir)
+    assert pool.ejecutar(_pid) != antes
+    assert pool.stats()["caidas"] == 1
+
+
+def test_argumento_no_serializable_no_pierde_el_lugar(pool: PoolCPU) -> None:
+    pid = pool.ejecutar(_pid)
+    for _ in range(3):  # con un solo proceso, un lugar perdido colgaría la siguiente
+        with pytest.raises(HerramientaError, match="no serializables"):
+            pool.ejecutar(_eco, (threading.Lock(),))
+    assert pool.ejecutar(_eco, ({"a": 1},)) == {"a": 1}
+    assert pool.ejecutar(_pid) == pid  # el proceso estaba sano: volvió al pool
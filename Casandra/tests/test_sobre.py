@@ -0,0 +1,92 @@
+# casandra/tests/test_sobre.py
+from __future__ import annotations
+
+import json
+
+import msgspec
+
+from Casandra.Celador.errores import (
+    RangoVacio,
+    a_sobre_error,
+    error_code_http,
+    sobre_compute_error,
+)
+from Casandra.dominio.sobre import (
+    RangoEfectivo,
+    Resumen,
+    SobreMeta,
+    SobreOk,
+)
+from Casandra.Expositor.respuestas import SobreResponse
+
+
+def _json(sobre) -> dict:
+    return json.loads(SobreResponse(content=sobre).body)
+
+
+def test_sobre_ok_minimo_omite_defaults() -> None:
+    cuerpo = _json(SobreOk(tool="t@1.0.0", summary=Resumen(headline="h")))
+    assert cuerpo == {
+        "status": "ok",
+        "tool": "t@1.0.0",
+        "summary": {"headline": "h", "highlights": []},
+        "data": {
+            "inline": {
+                "columns": [],
+                "rows": [],
+                "limit_notice": {"applied": False, "max_rows": 50},
+            }
+        },
+        "evidence": [],
+        "meta": {},  # sin campos None
+    }
+    assert "metrics" not in cuerpo and "artifacts" not in cuerpo["data"]
+
+
+def test_meta_con_alias_y_metrics() -> None:
+    meta = SobreMeta(
+        dataset_version="dv",
+        date_range_effective=RangoEfectivo(desde="2024-01-01", hasta="2024-02-01"),
+        range_adjusted=False,
+    )
+    cuerpo = _json(
+        SobreOk(tool="t", summary=Resumen(headline="h"), metrics={"n": 3}, meta=meta)
+    )
+    assert cuerpo["metrics"] == {"n": 3}
+    assert cuerpo["meta"] == {
+        "dataset_version": "dv",
+        "date_range_effective": {"from": "2024-01-01", "to": "2024-02-01"},
+        "range_adjusted": False,  # False no es default: se emite
+    }
+
+
+def test_ida_y_vuelta() -> None:
+    ok = SobreOk(tool="t", summary=Resumen(headline="h"), metrics={"x": 1.5})
+    error = a_sobre_error(RangoVacio("vacío"), "t")
+    for sobre in (ok, error):
+        crudo = msgspec.json.encode(sobre)
+        assert msgspec.json.decode(crudo, type=type(sobre)) == sobre
+
+
+def test_sobre_error_con_codigo_del_mapa() -> None:
+    error = a_sobre_error(RangoVacio("from > to"), "filtro_fecha@1.0.0")
+    assert error_code_http(RangoVacio("x")) == ("INVALID_DATE_RANGE", 422)
+    assert _json(error) == {
+        "status": "error",
+        "tool": "filtro_fecha@1.0.0",
+        "error": {"code": "INVALID_DATE_RANGE", "details": "from > to", "hints": []},
+        "meta": {"schema_version": "1.0.0", "tool_version": "1.0.0"},
+    }
+
+
+def test_compute_error_ignora_meta_desconocida() -> None:
+    error = sobre_compute_error(
+        tool_name="t",
+        extra_meta={"query_hash": "sha256:x", "no_existe": 1, "tool_version": "9"},
+    )
+    meta = _json(error)["meta"]
+    assert meta == {
+        "schema_version": "1.0.0",
+        "tool_version": "1.0.0",
+        "query_hash": "sha256:x",
+    }